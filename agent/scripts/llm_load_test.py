@@ -0,0 +1,204 @@
+"""
+Drive full trading `assisted_flow` cycles against the local LLM stand-in
+server to measure end-to-end throughput of the real HTTP genner paths.
+
+Code execution is replaced by an in-process stand-in so that only the LLM
+round trips, prompt building and flow bookkeeping are measured.
+
+Run from the agent directory:
+    python -m scripts.llm_load_test --cycles 20 --concurrency 4 --ttft 0.5 --tps 80
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Tuple
+
+# The wallet module opens its database on import
+os.environ.setdefault(
+	"SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "load_test_wallet.db")
+)
+
+from loguru import logger
+from openai import OpenAI
+from result import Ok, Result
+
+from src.agent.trading import TradingAgent, TradingPromptGenerator
+from src.client.openrouter import OpenRouter
+from src.config import OAIConfig
+from src.db import SQLiteDB
+from src.flows.trading import BestOfNConfig, assisted_flow
+from src.genner import get_genner
+from src.genner.Base import Genner
+from src.genner.OAI import OAIGenner
+from src.summarizer import get_summarizer
+from tests.mock_client.rag import MockRAGClient
+from tests.mock_llm_server import MockLLMConfig, MockLLMServer
+from tests.mock_sensor.trading import MockTradingSensor
+
+
+class EchoContainerManager:
+	"""
+	Stand-in for `ContainerManager` that pretends every script succeeds after
+	`exec_seconds`, so cycles can run concurrently without docker.
+	"""
+
+	def __init__(self, exec_seconds: float = 0.0):
+		self.exec_seconds = exec_seconds
+
+	def run_code_in_con(self, code: str, postfix: str) -> Result[Tuple[str, str], str]:
+		time.sleep(self.exec_seconds)
+		return Ok(("mock step completed\n", code))
+
+	def run_code_in_con_concurrent(
+		self, code: str, postfix: str, timeout_seconds: int = 600
+	) -> Result[Tuple[str, str], str]:
+		return self.run_code_in_con(code, postfix)
+
+	def kill_codes_in_con(self, postfix: str) -> None:
+		pass
+
+
+def build_genner(server: MockLLMServer, flavour: str, stream: bool) -> Genner:
+	stream_fn: Callable[[str], None] | None = (lambda token: None) if stream else None
+
+	if flavour == "openai":
+		client = OpenAI(api_key="load-test", base_url=server.openai_base_url)
+		return OAIGenner(
+			client, OAIConfig(name="mock", model=server.config.model), stream_fn
+		)
+
+	or_client = OpenRouter(
+		api_key="load-test",
+		base_url=server.openrouter_base_url,
+		include_reasoning=True,
+	)
+	return get_genner(backend="deepseek_or", or_client=or_client, stream_fn=stream_fn)
+
+
+def run_cycle(
+	index: int,
+	genner: Genner,
+	db: SQLiteDB,
+	exec_seconds: float,
+	best_of_n: BestOfNConfig | None,
+) -> float:
+	agent_id = f"load_test_{index}"
+	session_id = f"load_test_session_{index}"
+	agent = TradingAgent(
+		agent_id=agent_id,
+		rag=MockRAGClient(agent_id, session_id),
+		db=db,
+		sensor=MockTradingSensor(
+			eth_address="0x0000000000000000000000000000000000000000",
+			infura_project_id="",
+			etherscan_api_key="",
+		),
+		genner=genner,
+		container_manager=EchoContainerManager(exec_seconds),
+		prompt_generator=TradingPromptGenerator(
+			prompts=TradingPromptGenerator.get_default_prompts()
+		),
+	)
+
+	start = time.monotonic()
+	assisted_flow(
+		agent=agent,
+		session_id=session_id,
+		role="trader",
+		network="ethereum",
+		time="24h",
+		apis=[],
+		trading_instruments=["spot"],
+		metric_name="wallet",
+		prev_strat=None,
+		notif_str="",
+		txn_service_url="http://localhost:9009",
+		summarizer=get_summarizer(genner),
+		best_of_n=best_of_n,
+	)
+	return time.monotonic() - start
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+	parser.add_argument("--cycles", type=int, default=10)
+	parser.add_argument("--concurrency", type=int, default=4)
+	parser.add_argument(
+		"--flavour", choices=["openrouter", "openai"], default="openrouter"
+	)
+	parser.add_argument(
+		"--stream", action="store_true", help="Use streaming completions"
+	)
+	parser.add_argument(
+		"--ttft", type=float, default=0.5, help="Time to first token, seconds"
+	)
+	parser.add_argument("--tps", type=float, default=80.0, help="Tokens per second")
+	parser.add_argument("--reasoning-tokens", type=int, default=0)
+	parser.add_argument("--error-rate", type=float, default=0.0)
+	parser.add_argument("--mid-stream-error-rate", type=float, default=0.0)
+	parser.add_argument(
+		"--exec-seconds", type=float, default=0.0, help="Simulated code run time"
+	)
+	parser.add_argument(
+		"--best-of-n", type=int, default=0, help="Run code steps best-of-N"
+	)
+	parser.add_argument("--seed", type=int, default=None)
+	args = parser.parse_args()
+
+	config = MockLLMConfig(
+		ttft_seconds=args.ttft,
+		tokens_per_second=args.tps,
+		reasoning_tokens=args.reasoning_tokens,
+		error_rate=args.error_rate,
+		mid_stream_error_rate=args.mid_stream_error_rate,
+		seed=args.seed,
+	)
+	best_of_n = BestOfNConfig(n=args.best_of_n) if args.best_of_n > 0 else None
+
+	with MockLLMServer(config) as server, tempfile.TemporaryDirectory() as tmp_dir:
+		genner = build_genner(server, args.flavour, args.stream)
+		db = SQLiteDB(db_path=os.path.join(tmp_dir, "load_test.db"))
+
+		durations: List[float] = []
+		failures = 0
+		start = time.monotonic()
+
+		with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+			futures = [
+				executor.submit(run_cycle, i, genner, db, args.exec_seconds, best_of_n)
+				for i in range(args.cycles)
+			]
+			for future in as_completed(futures):
+				try:
+					durations.append(future.result())
+				except Exception as e:
+					failures += 1
+					logger.error(f"Cycle failed: {e}")
+
+		elapsed = time.monotonic() - start
+		stats = server.stats
+
+	durations.sort()
+	print(f"\n{args.cycles} cycles, concurrency {args.concurrency}, {args.flavour}")
+	print(f"  completed:          {len(durations)} ok, {failures} failed")
+	print(f"  wall time:          {elapsed:.2f}s")
+	print(f"  throughput:         {len(durations) / elapsed:.2f} cycles/s")
+	if durations:
+		p95 = durations[min(len(durations) - 1, int(0.95 * len(durations)))]
+		print(f"  cycle p50 / p95:    {statistics.median(durations):.2f}s / {p95:.2f}s")
+	print(f"  LLM requests:       {stats.requests} ({stats.requests / elapsed:.1f}/s)")
+	print(
+		f"  injected errors:    {stats.injected_errors} + {stats.dropped_streams} dropped streams"
+	)
+	print(
+		f"  completion tokens:  {stats.completion_tokens} "
+		f"({stats.completion_tokens / elapsed:.0f}/s), reasoning {stats.reasoning_tokens}"
+	)
+
+
+if __name__ == "__main__":
+	main()
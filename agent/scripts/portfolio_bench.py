@@ -0,0 +1,124 @@
+"""
+Value many wallets with `PortfolioEngine` and compare it with valuing them
+one by one the way `get_wallet_stats` does, with a price lookup per wallet
+and a Python loop over its tokens.
+
+Prices come from an in-process stand-in that only counts lookups, so the
+numbers measure valuation work, not the network.
+
+Run from the agent directory:
+    python -m scripts.portfolio_bench --wallets 1000 --tokens 50
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from src.portfolio import Holdings, PortfolioEngine, value_holdings
+
+
+class CountingPrices:
+	def __init__(self, prices: Dict[str, float]):
+		self.prices = prices
+		self.lookups = 0
+		self.tokens_looked_up = 0
+
+	def __call__(self, tokens: List[Tuple[str, str]]) -> Dict[str, float]:
+		self.lookups += 1
+		self.tokens_looked_up += len(tokens)
+		return {addr: self.prices[addr] for addr, _ in tokens if addr in self.prices}
+
+
+def make_wallets(n_wallets: int, n_tokens: int, universe: int, seed: int):
+	rng = random.Random(seed)
+	tokens = [(f"0x{i:040x}", f"TK{i}") for i in range(universe)]
+	prices = {addr: rng.uniform(0.01, 5000.0) for addr, _ in tokens}
+	changes = {symbol: rng.uniform(-20.0, 20.0) for _, symbol in tokens}
+	wallets = [
+		{
+			"wallet_address": f"0x{w:040x}",
+			"eth_balance": rng.uniform(0, 10),
+			"tokens": {
+				addr: {"symbol": symbol, "balance": rng.uniform(0, 1000)}
+				for addr, symbol in rng.sample(tokens, n_tokens)
+			},
+		}
+		for w in range(n_wallets)
+	]
+	return wallets, prices, changes
+
+
+def value_one_by_one(wallets, get_prices, eth_price: float) -> List[float]:
+	totals = []
+	for wallet in wallets:
+		total = wallet["eth_balance"] * eth_price
+		tokens = wallet["tokens"]
+		found = get_prices([(addr, t["symbol"]) for addr, t in tokens.items()])
+		for addr, price in found.items():
+			total += tokens[addr]["balance"] * price
+		totals.append(total)
+	return totals
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument("--wallets", type=int, default=1000)
+	parser.add_argument("--tokens", type=int, default=50, help="Tokens per wallet")
+	parser.add_argument("--universe", type=int, default=500, help="Distinct tokens")
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	wallets, prices, changes = make_wallets(
+		args.wallets, args.tokens, args.universe, args.seed
+	)
+	eth_price = 2000.0
+
+	baseline_prices = CountingPrices(prices)
+	started = time.perf_counter()
+	for _ in range(args.repeat):
+		expected = value_one_by_one(wallets, baseline_prices, eth_price)
+	baseline = (time.perf_counter() - started) / args.repeat
+
+	engine_prices = CountingPrices(prices)
+	engine = PortfolioEngine(
+		lambda: eth_price,
+		engine_prices,
+		lambda symbols: {s: changes[s] for s in symbols if s in changes},
+	)
+	started = time.perf_counter()
+	for _ in range(args.repeat):
+		valuations = engine.value(wallets)
+	vectorised = (time.perf_counter() - started) / args.repeat
+	engine_lookups = engine_prices.lookups // args.repeat
+	engine_tokens = engine_prices.tokens_looked_up // args.repeat
+
+	holdings = Holdings.from_wallet_stats(wallets)
+	asset_prices = engine._price_assets(holdings.assets)
+	asset_changes = engine._changes(holdings.assets)
+	started = time.perf_counter()
+	for _ in range(args.repeat):
+		value_holdings(holdings, asset_prices, asset_changes)
+	array_pass = (time.perf_counter() - started) / args.repeat
+
+	worst = max(
+		abs(v.total_value_usd - e) / max(e, 1.0) for v, e in zip(valuations, expected)
+	)
+	print(f"{args.wallets} wallets x {args.tokens} tokens ({args.universe} distinct)")
+	print(
+		f"one by one   {baseline * 1000:8.1f} ms"
+		f"  {baseline_prices.lookups // args.repeat} lookups"
+		f" of {baseline_prices.tokens_looked_up // args.repeat} tokens"
+	)
+	print(
+		f"engine       {vectorised * 1000:8.1f} ms"
+		f"  {engine_lookups} lookups of {engine_tokens} tokens"
+		f"  (includes 24h change)"
+	)
+	print(f"  of which the array pass {array_pass * 1000:8.1f} ms")
+	print(f"max relative difference in totals: {worst:.2e}")
+
+
+if __name__ == "__main__":
+	main()
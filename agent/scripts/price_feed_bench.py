@@ -0,0 +1,84 @@
+"""
+Replay recorded order-book ticks through a `PriceFeed` and measure feed
+throughput and the latency of wallet price lookups served from its table.
+
+Without --ticks-file a synthetic recording is generated first. To record
+real ticks, run a `BinanceBookTickerSource` and pass what it yields to
+`write_ticks`.
+
+Run from the agent directory:
+    python -m scripts.price_feed_bench --symbols 50 --ticks 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+import src.wallet as wallet
+from src.price_feed import PriceFeed, ReplaySource, Tick, write_ticks
+
+
+def synthetic_ticks(symbols: List[str], count: int, seed: int):
+	rng = random.Random(seed)
+	mids = {symbol: rng.uniform(0.1, 3000.0) for symbol in symbols}
+	for i in range(count):
+		symbol = symbols[i % len(symbols)]
+		mids[symbol] *= 1 + rng.gauss(0, 0.0005)
+		spread = mids[symbol] * 0.0002
+		yield Tick(symbol, mids[symbol] - spread, mids[symbol] + spread, i * 0.001)
+
+
+def time_lookups(symbols: List[str], rounds: int) -> List[float]:
+	tokens = [f"0x{i:040x}" for i in range(len(symbols))]
+	timings = []
+	for _ in range(rounds):
+		started = time.perf_counter()
+		wallet.get_eth_price_v2()
+		wallet.get_token_prices_v2(tokens, symbols)
+		timings.append(time.perf_counter() - started)
+	return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+	print(
+		f"{name:<28} median {statistics.median(timings) * 1e6:9.1f} us"
+		f"  max {max(timings) * 1e6:9.1f} us"
+	)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument("--symbols", type=int, default=50)
+	parser.add_argument("--ticks", type=int, default=200_000)
+	parser.add_argument("--ticks-file", help="Recorded ticks to replay")
+	parser.add_argument("--rounds", type=int, default=200)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	symbols = ["ETH"] + [f"TK{i}" for i in range(args.symbols - 1)]
+	path = args.ticks_file
+	if path is None:
+		path = os.path.join(tempfile.mkdtemp(), "ticks.jsonl")
+		write_ticks(path, synthetic_ticks(symbols, args.ticks, args.seed))
+
+	feed = PriceFeed(ReplaySource(path))
+	started = time.perf_counter()
+	feed.start().join()
+	elapsed = time.perf_counter() - started
+	print(
+		f"replayed {feed.stats.ticks} ticks in {elapsed:.2f}s"
+		f" ({feed.stats.ticks / elapsed:,.0f} ticks/s)"
+	)
+
+	wallet.use_price_table(feed.table)
+	report(f"ETH + {len(symbols)} token prices", time_lookups(symbols, args.rounds))
+
+
+if __name__ == "__main__":
+	main()
@@ -1,17 +1,21 @@
-import replicate
-import os
+import shutil
 from typing import Optional
 
-def generate_image(prompt: str, output_path: str = "output.png") -> Optional[str]:
+from src.asset_cache import get_asset_cache
+
+IMAGE_MODEL = "google/imagen-4"
+
+def generate_image(prompt: str, output_path: Optional[str] = None) -> Optional[str]:
+    """Generate an image, or reuse the one generated before for the same prompt.
+
+    Returns the cached file, or a copy of it at `output_path` when one is given.
+    """
+    path = get_asset_cache().get(IMAGE_MODEL, prompt, ext="png")
+    if path is None or output_path is None:
+        return path
     try:
-        input = {"prompt": prompt}
-        output = replicate.run(
-            "google/imagen-4",
-            input=input
-        )
-        with open(output_path, "wb") as file:
-            file.write(output.read())
+        shutil.copyfile(path, output_path)
         return output_path
     except Exception as e:
-        print(f"Error generating image: {e}")
-        return None 
\ No newline at end of file
+        print(f"Error copying generated image: {e}")
+        return None
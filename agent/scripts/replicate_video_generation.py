@@ -1,17 +1,21 @@
-import replicate
-import os
+import shutil
 from typing import Optional
 
-def generate_video(prompt: str, output_path: str = "output.mp4") -> Optional[str]:
+from src.asset_cache import get_asset_cache
+
+VIDEO_MODEL = "minimax/video-01"
+
+def generate_video(prompt: str, output_path: Optional[str] = None) -> Optional[str]:
+    """Generate a video, or reuse the one generated before for the same prompt.
+
+    Returns the cached file, or a copy of it at `output_path` when one is given.
+    """
+    path = get_asset_cache().get(VIDEO_MODEL, prompt, ext="mp4")
+    if path is None or output_path is None:
+        return path
     try:
-        input = {"prompt": prompt}
-        output = replicate.run(
-            "minimax/video-01",
-            input=input
-        )
-        with open(output_path, "wb") as file:
-            file.write(output.read())
+        shutil.copyfile(path, output_path)
         return output_path
     except Exception as e:
-        print(f"Error generating video: {e}")
-        return None 
\ No newline at end of file
+        print(f"Error copying generated video: {e}")
+        return None
@@ -0,0 +1,171 @@
+"""
+Compare the ffmpeg slideshow renderer against the MoviePy one on seconds per
+video and peak memory.
+
+Every render runs in a fresh process, so peak RSS is that render's alone. It
+counts ffmpeg child processes too, whichever renderer started them.
+Images are synthetic product-photo sized JPEGs; narration is a generated tone.
+
+Needs ffmpeg on the PATH, Pillow, and MoviePy for the MoviePy renderer. Run
+from the agent directory:
+    python -m scripts.slideshow_bench --images 12 --runs 3
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+RENDERERS = ["moviepy", "ffmpeg", "ffmpeg-ken-burns"]
+
+
+def make_images(directory: str, count: int, seed: int) -> List[str]:
+	import random
+
+	from PIL import Image, ImageDraw
+
+	rng = random.Random(seed)
+	paths = []
+	for i in range(count):
+		# Marketplace photos come in all sizes, mostly large and square-ish
+		width = rng.choice([800, 1000, 1200, 1600])
+		height = int(width * rng.uniform(0.75, 1.33))
+		image = Image.new(
+			"RGB", (width, height), tuple(rng.randrange(256) for _ in range(3))
+		)
+		draw = ImageDraw.Draw(image)
+		for _ in range(20):
+			x, y = rng.randrange(width), rng.randrange(height)
+			draw.ellipse(
+				(x, y, x + width // 4, y + height // 4),
+				fill=tuple(rng.randrange(256) for _ in range(3)),
+			)
+		path = os.path.join(directory, f"image_{i}.jpg")
+		image.save(path, quality=90)
+		paths.append(path)
+	return paths
+
+
+def make_audio(path: str, seconds: float) -> str:
+	subprocess.run(
+		["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi"]
+		+ ["-i", f"sine=frequency=440:duration={seconds}", "-c:a", "libmp3lame", path],
+		check=True,
+	)
+	return path
+
+
+def render(
+	renderer: str,
+	images: List[str],
+	audio: str | None,
+	output: str,
+	resize_workers: int,
+	results,
+) -> None:
+	"""
+	Render once and report (seconds, peak RSS in MB). Runs in its own process.
+	"""
+	from scripts.slideshow_maker import make_slideshow, make_slideshow_moviepy
+
+	started = time.perf_counter()
+	if renderer == "moviepy":
+		make_slideshow_moviepy(images, audio_path=audio, output_path=output)
+	else:
+		make_slideshow(
+			images,
+			audio_path=audio,
+			output_path=output,
+			ken_burns=renderer == "ffmpeg-ken-burns",
+			resize_workers=resize_workers,
+		)
+	elapsed = time.perf_counter() - started
+	# ru_maxrss is in kB on Linux; children covers ffmpeg
+	peak = max(
+		resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+		resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+	)
+	results.put((elapsed, peak / 1024))
+
+
+def run(
+	renderer: str,
+	images: List[str],
+	audio: str | None,
+	output: str,
+	resize_workers: int,
+) -> Tuple[float, float]:
+	context = multiprocessing.get_context("spawn")
+	results = context.Queue()
+	process = context.Process(
+		target=render, args=(renderer, images, audio, output, resize_workers, results)
+	)
+	process.start()
+	process.join()
+	if process.exitcode != 0:
+		raise RuntimeError(f"{renderer} render exited with {process.exitcode}")
+	return results.get()
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument("--images", type=int, default=12)
+	parser.add_argument("--runs", type=int, default=3)
+	parser.add_argument("--renderers", nargs="+", choices=RENDERERS, default=RENDERERS)
+	parser.add_argument("--resize-workers", type=int, default=os.cpu_count() or 1)
+	parser.add_argument("--no-audio", action="store_true")
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory(prefix="slideshow_bench_") as directory:
+		images = make_images(directory, args.images, args.seed)
+		audio = (
+			None
+			if args.no_audio
+			else make_audio(os.path.join(directory, "narration.mp3"), args.images * 2.5)
+		)
+		print(
+			f"{args.images} images, {args.runs} runs per renderer,"
+			f" {'no audio' if audio is None else 'with audio'}, {args.resize_workers} resize workers"
+		)
+		summary: Dict[str, Tuple[float, float]] = {}
+		for renderer in args.renderers:
+			timings, peaks = [], []
+			for i in range(args.runs):
+				output = os.path.join(directory, f"{renderer}_{i}.mp4")
+				try:
+					elapsed, peak = run(
+						renderer, images, audio, output, args.resize_workers
+					)
+				except RuntimeError as e:
+					print(f"{renderer}: {e}")
+					break
+				timings.append(elapsed)
+				peaks.append(peak)
+				rendered = output
+			if not timings:
+				continue
+			summary[renderer] = (statistics.median(timings), max(peaks))
+			size = os.path.getsize(rendered) / 1024 / 1024
+			print(
+				f"{renderer:>17}: median {summary[renderer][0]:6.2f}s per video,"
+				f" peak RSS {summary[renderer][1]:7.1f} MB, {size:.1f} MB output"
+			)
+
+		if "moviepy" in summary:
+			base_seconds, base_peak = summary["moviepy"]
+			for renderer, (seconds, peak) in summary.items():
+				if renderer != "moviepy":
+					print(
+						f"{renderer} vs moviepy: {base_seconds / seconds:.1f}x faster,"
+						f" {base_peak / peak:.1f}x less memory"
+					)
+
+
+if __name__ == "__main__":
+	main()
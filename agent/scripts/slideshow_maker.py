@@ -1,14 +1,12 @@
 import os
+import sys
 import requests
-from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip
-from PIL import Image
-import numpy as np
 
-# Pillow compatibility for resampling
-if hasattr(Image, 'Resampling'):
-    RESAMPLE = Image.Resampling.LANCZOS
-else:
-    RESAMPLE = Image.LANCZOS
+# Importable as `slideshow_maker` from scripts/ and as
+# `agent.scripts.slideshow_maker` from the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.slideshow import SlideshowOptions, render_slideshow
 
 def download_images(image_urls, output_folder="slideshow_images"):
     os.makedirs(output_folder, exist_ok=True)
@@ -25,7 +23,27 @@ def download_images(image_urls, output_folder="slideshow_images"):
             print(f"Error downloading {url}: {e}")
     return local_paths
 
-def make_slideshow(image_paths, audio_path=None, output_path="slideshow.mp4", duration_per_image=2.5):
+def make_slideshow(image_paths, audio_path=None, output_path="slideshow.mp4", duration_per_image=2.5, ken_burns=False, resize_workers=1):
+    """Render images, and optionally narration, into a 720px wide slideshow with ffmpeg."""
+    options = SlideshowOptions(
+        duration_per_image=duration_per_image,
+        ken_burns=ken_burns,
+        resize_workers=resize_workers,
+    )
+    return render_slideshow(image_paths, audio_path, output_path, options)
+
+def make_slideshow_moviepy(image_paths, audio_path=None, output_path="slideshow.mp4", duration_per_image=2.5):
+    """The MoviePy renderer `make_slideshow` replaced, kept to benchmark against."""
+    from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip
+    from PIL import Image
+    import numpy as np
+
+    # Pillow compatibility for resampling
+    if hasattr(Image, 'Resampling'):
+        RESAMPLE = Image.Resampling.LANCZOS
+    else:
+        RESAMPLE = Image.LANCZOS
+
     def resize_clip(img):
         return ImageClip(img).set_duration(duration_per_image).resize(width=720)
     # Patch moviepy's resize to use the correct resample
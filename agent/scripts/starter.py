@@ -32,7 +32,7 @@ from src.summarizer import get_summarizer
 from anthropic import Anthropic
 import docker
 from functools import partial
-from src.flows.trading import assisted_flow as trading_assisted_flow
+from src.flows.trading import BestOfNConfig, assisted_flow as trading_assisted_flow
 from src.flows.marketing import unassisted_flow as marketing_unassisted_flow
 from loguru import logger
 from src.constants import SERVICE_TO_ENV
@@ -45,11 +45,32 @@ from src.sensor.affiliate_promoter import AffiliatePromoterSensor
 from src.sensor.interface import TradingSensorInterface, AffiliatePromoterSensorInterface
 from src.agent.affiliate_promoter import AffiliatePromoterAgent, AffiliatePromoterPromptGenerator
 from src.flows.affiliate_promoter import unassisted_flow as affiliate_promoter_unassisted_flow
+from src.product_catalogue import ProductCatalogue
+from src.media_jobs import get_media_jobs
+from src.metric_store import WalletMetricStore
 from src.constants import FE_DATA_AFFILIATE_PROMOTER_DEFAULTS, FE_DATA_TRADING_DEFAULTS
 
 load_dotenv()
 
 
+def best_of_n_from_env() -> BestOfNConfig | None:
+	"""
+	Best-of-N code generation from `BEST_OF_N` (candidates per round) and
+	`BEST_OF_N_MAX_CANDIDATES` (cost cap per step), None when unset, which
+	generates one candidate at a time.
+	"""
+	n = os.getenv("BEST_OF_N")
+	if not n:
+		return None
+	defaults = BestOfNConfig()
+	return BestOfNConfig(
+		n=int(n),
+		max_candidates=int(
+			os.getenv("BEST_OF_N_MAX_CANDIDATES", str(defaults.max_candidates))
+		),
+	)
+
+
 def start_marketing_agent(
 	agent_type: str,
 	session_id: str,
@@ -180,6 +201,10 @@ def start_trading_agent(
 		metric_name=metric_name,
 		txn_service_url=txn_service_url,
 		summarizer=summarizer,
+		best_of_n=best_of_n_from_env(),
+		metric_store=WalletMetricStore(
+			os.getenv("WALLET_METRICS_PATH", "wallet_metrics")
+		),
 	)
 
 	run_cycle(
@@ -477,6 +502,8 @@ def start_affiliate_promoter_agent(
 		apis=apis,
 		metric_name=metric_name,
 		summarizer=summarizer,
+		catalogue=ProductCatalogue(db) if isinstance(db, SQLiteDB) else None,
+		media_jobs=get_media_jobs(os.getenv("MEDIA_JOBS_PATH", "media_jobs.db")),
 	)
 
 	run_cycle(
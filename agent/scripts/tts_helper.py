@@ -1,63 +1,44 @@
 import os
-from google.cloud import texttospeech
-from pydub import AudioSegment
+import shutil
+import sys
 
-# Requires: pip install google-cloud-texttospeech pydub
+# Importable as `tts_helper` from scripts/ and as `agent.scripts.tts_helper`
+# from the repository root, not only as `scripts.tts_helper`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tts_cache import get_phrase_cache
+
+# Requires: pip install google-cloud-texttospeech
 # Και να έχεις GOOGLE_APPLICATION_CREDENTIALS στο env σου (json credentials file)
 
 def synthesize_speech(text, voice_name, output_path):
-    client = texttospeech.TextToSpeechClient()
-    input_text = texttospeech.SynthesisInput(text=text)
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        name=voice_name,
-    )
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3
-    )
-    response = client.synthesize_speech(
-        input=input_text, voice=voice, audio_config=audio_config
-    )
-    with open(output_path, "wb") as out:
-        out.write(response.audio_content)
+    """Speak one phrase into `output_path`, reusing the audio if it was synthesised before."""
+    shutil.copyfile(get_phrase_cache().get(voice_name, text), output_path)
     return output_path
 
 def split_script_by_voice(script):
-    # Returns list of (voice, text) tuples
+    # Returns list of (voice, text) tuples, one per line of the script, so a
+    # line shared between scripts is cached on its own whatever surrounds it
     lines = script.strip().split("\n")
     result = []
     current_voice = "en-US-Wavenet-D"  # Default male
-    buffer = []
     for line in lines:
         if line.strip().startswith("[Male Voice]"):
-            if buffer:
-                result.append((current_voice, " ".join(buffer)))
-                buffer = []
             current_voice = "en-US-Wavenet-D"
         elif line.strip().startswith("[Female Voice]"):
-            if buffer:
-                result.append((current_voice, " ".join(buffer)))
-                buffer = []
             current_voice = "en-US-Wavenet-F"
-        else:
-            buffer.append(line.strip())
-    if buffer:
-        result.append((current_voice, " ".join(buffer)))
+        elif line.strip():
+            result.append((current_voice, line.strip()))
     return result
 
-def generate_tts_audio(script, output_audio="output_tts.mp3"):
+def generate_tts_audio(script, output_audio="output_tts.mp3", max_workers=4):
+    """Narrate a script into one MP3.
+
+    Parts are synthesised concurrently and cached per (voice, text), so the
+    intro, disclosure and outro every video shares are only synthesised once.
+    """
     parts = split_script_by_voice(script)
-    audio_segments = []
-    for i, (voice, text) in enumerate(parts):
-        part_path = f"tts_part_{i}.mp3"
-        synthesize_speech(text, voice, part_path)
-        audio_segments.append(AudioSegment.from_mp3(part_path))
-    final_audio = sum(audio_segments)
-    final_audio.export(output_audio, format="mp3")
-    # Καθάρισε τα προσωρινά αρχεία
-    for i in range(len(parts)):
-        os.remove(f"tts_part_{i}.mp3")
-    return output_audio
+    return get_phrase_cache().render(parts, output_audio, max_workers=max_workers)
 
 if __name__ == "__main__":
     # Demo usage
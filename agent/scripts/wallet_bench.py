@@ -0,0 +1,131 @@
+"""
+Run the real wallet code, `get_wallet_stats` and the price layer behind it,
+against the offline chain and price simulator and report latency, request
+counts and correctness.
+
+Every wallet is sampled twice: a cold pass that discovers tokens and fills
+the caches, then a warm pass like the next trading cycle would make.
+
+Run from the agent directory:
+    python -m scripts.wallet_bench --wallets 50 --tokens-per-wallet 20 --profile realistic
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from tests.mock_chain import SERVICES, MockChainSimulator, ServiceProfile
+
+PROFILES: Dict[str, Dict[str, ServiceProfile]] = {
+	"ideal": {},
+	"realistic": {
+		"rpc": ServiceProfile(latency_seconds=0.05, jitter_seconds=0.03),
+		"etherscan": ServiceProfile(latency_seconds=0.15, rate_limit=5.0),
+		"binance": ServiceProfile(latency_seconds=0.05, jitter_seconds=0.02),
+		"kraken": ServiceProfile(latency_seconds=0.2, rate_limit=1.0),
+		"huobi": ServiceProfile(latency_seconds=0.1),
+		"coingecko": ServiceProfile(latency_seconds=0.3, rate_limit=0.5, burst=5),
+	},
+	"degraded": {
+		"rpc": ServiceProfile(latency_seconds=0.1, jitter_seconds=0.1, error_rate=0.02),
+		"etherscan": ServiceProfile(
+			latency_seconds=0.3, rate_limit=5.0, error_rate=0.05
+		),
+		"binance": ServiceProfile(blocked=True),
+		"kraken": ServiceProfile(latency_seconds=0.3, rate_limit=1.0, error_rate=0.1),
+		"huobi": ServiceProfile(latency_seconds=0.2, error_rate=0.1),
+		"coingecko": ServiceProfile(latency_seconds=0.4, rate_limit=0.5, burst=5),
+	},
+}
+
+
+def run_pass(
+	get_wallet_stats, sim: MockChainSimulator, wallets: List[str], workers: int
+):
+	def sample(address: str):
+		started = time.perf_counter()
+		try:
+			stats = get_wallet_stats(address, "", "bench-key")
+		except Exception as e:
+			return time.perf_counter() - started, None, str(e)
+		return time.perf_counter() - started, stats, None
+
+	started = time.perf_counter()
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		results = list(pool.map(sample, wallets))
+	elapsed = time.perf_counter() - started
+
+	latencies = sorted(latency for latency, _, _ in results)
+	failures = [error for _, _, error in results if error]
+	wrong = sum(
+		1
+		for address, (_, stats, _) in zip(wallets, results)
+		if stats is not None
+		and abs(stats["total_value_usd"] - sim.expected_total_usd(address))
+		> 1e-6 * max(1.0, sim.expected_total_usd(address))
+	)
+	return elapsed, latencies, failures, wrong
+
+
+def snapshot_requests(sim: MockChainSimulator) -> Dict[str, int]:
+	counts = {name: sim.stats[name].requests for name in SERVICES}
+	counts["rpc calls"] = sim.chain.stats.rpc_calls
+	return counts
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument("--wallets", type=int, default=50)
+	parser.add_argument("--tokens-per-wallet", type=int, default=20)
+	parser.add_argument("--universe", type=int, default=200, help="Distinct tokens")
+	parser.add_argument("--workers", type=int, default=8)
+	parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	sim, wallets = MockChainSimulator.random_world(
+		n_wallets=args.wallets,
+		tokens_per_wallet=args.tokens_per_wallet,
+		n_tokens=args.universe,
+		seed=args.seed,
+		profiles=PROFILES[args.profile],
+	)
+	with sim:
+		# src.wallet reads its endpoints and database path at import time
+		os.environ.update(sim.env())
+		os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+		from src.wallet import get_wallet_stats
+
+		print(
+			f"{args.wallets} wallets x {args.tokens_per_wallet} tokens"
+			f" ({args.universe} distinct), profile {args.profile}, {args.workers} workers"
+		)
+		for name in ("cold", "warm"):
+			before = snapshot_requests(sim)
+			elapsed, latencies, failures, wrong = run_pass(
+				get_wallet_stats, sim, wallets, args.workers
+			)
+			after = snapshot_requests(sim)
+
+			p95 = latencies[int(0.95 * (len(latencies) - 1))]
+			print(
+				f"{name}: {elapsed:6.2f}s total, per wallet median"
+				f" {statistics.median(latencies):.3f}s p95 {p95:.3f}s,"
+				f" {len(failures)} failed, {wrong} wrong totals"
+			)
+			print(
+				"  requests: "
+				+ ", ".join(
+					f"{k} {after[k] - before[k]}" for k in after if after[k] - before[k]
+				)
+			)
+			for error in failures[:3]:
+				print(f"  error: {error}")
+
+
+if __name__ == "__main__":
+	main()
@@ -696,7 +696,7 @@ class AliExpressAPIClient:
 		signature = hmac.new(self.api_secret.encode('utf-8'), concat.encode('utf-8'), hashlib.sha256).hexdigest().upper()
 		return signature
 
-	def search_products(self, query="smartwatch", limit=5):
+	def search_products(self, query="smartwatch", limit=5, page=1):
 		if not self.can_request():
 			print("[AliExpress] Request limit reached for this month!")
 			return []
@@ -708,7 +708,7 @@ class AliExpressAPIClient:
 			"sign_method": "sha256",
 			"method": "aliexpress.affiliate.product.query",
 			"keywords": query,
-			"page_no": "1",
+			"page_no": str(page),
 			"page_size": str(limit),
 			"fields": "productId,productTitle,productUrl,productImage,originalPrice,salePrice,promotion_link,product_detail_url",
 		}
@@ -837,7 +837,7 @@ class EbayAPIClient:
 			self.refresh_access_token()
 		return self.user_token
 
-	def search_products(self, query="laptop", limit=5):
+	def search_products(self, query="laptop", limit=5, page=1):
 		if not self.can_request():
 			print("[eBay] Request limit reached for today!")
 			return []
@@ -845,7 +845,7 @@ class EbayAPIClient:
 			"Authorization": f"Bearer {self.get_valid_token()}",
 			"Content-Type": "application/json"
 		}
-		params = {"q": query, "limit": limit}
+		params = {"q": query, "limit": limit, "offset": (page - 1) * limit}
 		try:
 			response = requests.get(self.base_url, headers=headers, params=params, timeout=10)
 			self.request_count += 1
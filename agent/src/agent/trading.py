@@ -10,7 +10,7 @@ from src.container import ContainerManager
 from src.genner.Base import Genner
 from src.client.rag import RAGClient
 from src.sensor.trading import TradingSensor
-from src.types import ChatHistory, Message
+from src.my_types import ChatHistory, Message
 
 
 class TradingPromptGenerator:
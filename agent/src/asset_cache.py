@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, Protocol
+
+from loguru import logger
+
+_SCHEMA = """
+create table if not exists generated_assets (
+  request_key TEXT PRIMARY KEY,
+  model TEXT NOT NULL,
+  prompt TEXT NOT NULL,
+  params TEXT NOT NULL,
+  sha256 TEXT NOT NULL,
+  path TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  created_at REAL NOT NULL
+);
+create index if not exists idx_generated_assets_sha256 on generated_assets (sha256);
+"""
+
+
+class GenerationBackend(Protocol):
+	def run(self, model: str, input: Dict[str, Any]) -> bytes:
+		"""
+		Run a model and return the generated file's content.
+		"""
+		...
+
+
+class ReplicateBackend:
+	"""
+	Runs models on Replicate, reading `REPLICATE_API_TOKEN` from the environment.
+	"""
+
+	def run(self, model: str, input: Dict[str, Any]) -> bytes:
+		import replicate
+
+		output = replicate.run(model, input=input)
+		# Some models return a list of files, we only ever ask for one
+		if isinstance(output, (list, tuple)):
+			output = output[0]
+		return output.read()
+
+
+def request_key(model: str, prompt: str, params: Dict[str, Any]) -> str:
+	"""
+	Get a stable hash of a generation request. Parameter order does not matter.
+	"""
+	request = json.dumps(
+		{"model": model, "prompt": prompt, "params": params},
+		sort_keys=True,
+		separators=(",", ":"),
+	)
+	return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class AssetCacheStats:
+	hits: int = 0
+	generations: int = 0
+	# Callers that waited for an identical generation already running
+	joined: int = 0
+	failures: int = 0
+	generation_seconds: float = 0.0
+
+
+class GeneratedAssetCache:
+	"""
+	Store of generated images and videos, keyed by (model, prompt, params).
+
+	A request that was generated before returns the stored file without
+	calling the model. Files are named by the SHA-256 of their content, so
+	no two requests ever write to the same path. Identical requests made
+	while one is still generating wait for it instead of paying twice.
+	"""
+
+	def __init__(self, directory: str, backend: GenerationBackend | None = None):
+		"""
+		Open or create a store.
+
+		Args:
+			directory (str): Directory holding the files and the index
+			backend (GenerationBackend | None): Runs the models, Replicate by default
+		"""
+		self.directory = directory
+		self.backend = backend if backend is not None else ReplicateBackend()
+		self.stats = AssetCacheStats()
+		self.db_path = os.path.join(directory, "index.db")
+		self._inflight: Dict[str, Future] = {}
+		self._lock = threading.Lock()
+
+		os.makedirs(os.path.join(directory, "tmp"), exist_ok=True)
+		with sqlite3.connect(self.db_path) as conn:
+			conn.executescript(_SCHEMA)
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.db_path, timeout=30)
+
+	def lookup(
+		self, model: str, prompt: str, params: Dict[str, Any] | None = None
+	) -> str | None:
+		"""
+		Get the stored file for a request without generating anything.
+		"""
+		key = request_key(model, prompt, params or {})
+		with self._connect() as conn:
+			row = conn.execute(
+				"SELECT path FROM generated_assets WHERE request_key = ?", (key,)
+			).fetchone()
+		if row is None or not os.path.exists(row[0]):
+			return None
+		return row[0]
+
+	def _generate(
+		self, key: str, model: str, prompt: str, params: Dict[str, Any], ext: str
+	) -> str:
+		started = time.monotonic()
+		content = self.backend.run(model, {**params, "prompt": prompt})
+		elapsed = time.monotonic() - started
+
+		sha256 = hashlib.sha256(content).hexdigest()
+		path = os.path.join(self.directory, sha256[:2], f"{sha256}.{ext}")
+		if not os.path.exists(path):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.directory, "tmp"))
+			with os.fdopen(fd, "wb") as f:
+				f.write(content)
+			os.replace(tmp_path, path)
+
+		with self._connect() as conn:
+			conn.execute(
+				"""INSERT OR REPLACE INTO generated_assets
+				(request_key, model, prompt, params, sha256, path, size, created_at)
+				VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+				(
+					key,
+					model,
+					prompt,
+					json.dumps(params, sort_keys=True),
+					sha256,
+					path,
+					len(content),
+					time.time(),
+				),
+			)
+		with self._lock:
+			self.stats.generations += 1
+			self.stats.generation_seconds += elapsed
+		logger.info(f"[Assets] Generated {path} with {model} in {elapsed:.1f}s")
+		return path
+
+	def get(
+		self,
+		model: str,
+		prompt: str,
+		params: Dict[str, Any] | None = None,
+		ext: str = "png",
+	) -> str | None:
+		"""
+		Get the file for a request, generating it on a miss.
+
+		Args:
+			model (str): Model to run, e.g. "google/imagen-4"
+			prompt (str): Prompt
+			params (Dict[str, Any] | None): Other model inputs
+			ext (str): Extension to store a new file under
+
+		Returns:
+			str | None: Path of the file, None if generation failed
+		"""
+		params = params or {}
+		cached = self.lookup(model, prompt, params)
+		if cached is not None:
+			with self._lock:
+				self.stats.hits += 1
+			return cached
+
+		key = request_key(model, prompt, params)
+		with self._lock:
+			future = self._inflight.get(key)
+			owner = future is None
+			if owner:
+				future = self._inflight[key] = Future()
+			else:
+				self.stats.joined += 1
+
+		if owner:
+			try:
+				future.set_result(self._generate(key, model, prompt, params, ext))
+			except Exception as e:
+				future.set_exception(e)
+			finally:
+				with self._lock:
+					self._inflight.pop(key, None)
+
+		try:
+			return future.result()
+		except Exception as e:
+			with self._lock:
+				self.stats.failures += 1
+			logger.error(f"[Assets] Generating with {model} failed: {e}")
+			return None
+
+
+_caches: Dict[str, GeneratedAssetCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_asset_cache(directory: str = "generated_media") -> GeneratedAssetCache:
+	"""
+	Get the process-wide generated-asset cache for a directory, backed by Replicate.
+	"""
+	key = os.path.abspath(directory)
+	with _caches_lock:
+		if key not in _caches:
+			_caches[key] = GeneratedAssetCache(directory)
+		return _caches[key]
@@ -1,5 +1,6 @@
 import httpx
 import json
+import threading
 from typing import Optional, Dict, Generator, List, Any, Tuple
 from dataclasses import dataclass
 
@@ -53,6 +54,19 @@ class OpenRouter:
 			"Content-Type": "application/json",
 		}
 		self.http_client = httpx.Client(timeout=timeout)
+		# Usage is tracked per thread so concurrent callers sharing this client
+		# each see the usage of their own last request
+		self._local = threading.local()
+
+	@property
+	def last_usage(self) -> Optional[Dict[str, Any]]:
+		"""
+		The raw `usage` object of the last completion made from this thread.
+
+		Returns:
+		    Optional[Dict[str, Any]]: OpenRouter usage accounting, or None if not reported
+		"""
+		return getattr(self._local, "usage", None)
 
 	def _prepare_payload(
 		self,
@@ -94,6 +108,8 @@ class OpenRouter:
 			"include_reasoning": include_reasoning,
 			"model": model,
 			"stream": stream,
+			# Ask OpenRouter to report token usage, including cached prompt tokens
+			"usage": {"include": True},
 		}
 
 		if not providers:
@@ -146,7 +162,9 @@ class OpenRouter:
 		)
 
 		endpoint = f"{self.base_url}/chat/completions"
+		self._local.usage = None
 		response = self._send_request(endpoint, payload)
+		self._local.usage = response.get("usage")
 
 		try:
 			content = response["choices"][0]["message"]["content"]
@@ -230,6 +248,7 @@ class OpenRouter:
 		)
 
 		endpoint = f"{self.base_url}/chat/completions"
+		self._local.usage = None
 		return self._stream_response(endpoint, payload)
 
 	def _stream_response(
@@ -283,6 +302,9 @@ class OpenRouter:
 								return
 							try:
 								data_obj = json.loads(data)
+								# The final chunk carries the usage accounting
+								if data_obj.get("usage"):
+									self._local.usage = data_obj["usage"]
 								if "choices" in data_obj and data_obj["choices"]:
 									delta = data_obj["choices"][0].get("delta", {})
 									content = delta.get("content")
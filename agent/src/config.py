@@ -1,5 +1,6 @@
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 
 
 @dataclass
@@ -97,11 +98,13 @@ class ClaudeConfig(BaseLLMConfig):
 		name (str): The display name of the model
 		model (str): The model identifier for Claude
 		max_tokens (int): The maximum number of tokens for model output
+		prompt_caching (bool): Whether to mark the stable prompt prefix with cache-control breakpoints
 	"""
 
 	name: str = "Claude"
 	model: str = "claude-3-5-sonnet-latest"
 	max_tokens = 8192
+	prompt_caching: bool = True
 
 
 @dataclass
@@ -116,9 +119,45 @@ class OpenRouterConfig(BaseLLMConfig):
 		name (str): The display name of the model
 		model (str): The model identifier for Claude
 		max_tokens (int): The maximum number of tokens for model output
+		prompt_caching (bool): Whether to mark the stable prompt prefix with cache-control breakpoints
+			on models that need explicit breakpoints
+		max_history_messages (int | None): On models without prompt caching, keep at most this many
+			non-system messages of the chat history. None keeps everything
 	"""
 
 	name: str = "openai/o3-mini"
 	model: str = "openai/o3-mini"
 	max_tokens = 8192
 	temperature: float | None = None
+	prompt_caching: bool = True
+	max_history_messages: int | None = None
+
+
+@dataclass
+class RouterConfig(BaseLLMConfig):
+	"""
+	Configuration for the latency-aware multi-backend router.
+
+	This class contains settings for routing completions across several
+	backends, including the rolling window used for latency/error statistics
+	and the hedging policy.
+
+	Attributes:
+		name (str): The display name of the router
+		backends (List[str]): Backend names (as accepted by `get_genner`) in preference order
+		window_size (int): Number of recent calls kept per backend for p50/p95 and error rate
+		min_samples (int): Samples required before a backend's statistics are trusted
+		max_error_rate (float): Error rate above which a backend is considered unhealthy
+		hedge (bool): Whether to fire a duplicate request when the primary exceeds its p95
+		hedge_min_delay (float): Lower bound in seconds before a hedged request is fired
+	"""
+
+	name: str = "Router"
+	backends: List[str] = field(
+		default_factory=lambda: ["deepseek_or", "deepseek_v3", "claude", "gemini"]
+	)
+	window_size: int = 50
+	min_samples: int = 5
+	max_error_rate: float = 0.5
+	hedge: bool = False
+	hedge_min_delay: float = 1.0
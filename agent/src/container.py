@@ -1,8 +1,10 @@
 import io
+import shlex
 import tarfile
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Tuple, cast
+from threading import Lock
+from typing import Dict, Set, Tuple, cast
 
 import docker
 import docker.errors
@@ -11,7 +13,7 @@ from docker.models.containers import Container
 from loguru import logger
 from result import Err, Ok, Result
 
-from src.helper import timeout
+from src.helper import nanoid, timeout
 
 
 class ContainerManager:
@@ -85,6 +87,10 @@ class ContainerManager:
 		self.container = _container
 		self.in_con_env = in_con_env
 
+		# Scripts started by `run_code_in_con_concurrent`, keyed by postfix
+		self._running: Dict[str, Set[str]] = {}
+		self._running_lock = Lock()
+
 	def write_code_in_con(
 		self, code: str, postfix: str, in_container_path: str = "/"
 	) -> Tuple[str, str]:
@@ -111,7 +117,8 @@ class ContainerManager:
 		"""
 		# Create temp file name with timestamp
 		current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-		temp_file_name = f"temp_script_{current_time}.py"
+		# The random suffix keeps scripts written within the same second apart
+		temp_file_name = f"temp_script_{current_time}_{nanoid(6)}.py"
 		temp_file_path = f"{in_container_path}/{temp_file_name}"
 
 		# Create host file path and ensure directory exists
@@ -221,3 +228,81 @@ class ContainerManager:
 				reflected_code,
 			)
 		)
+
+	def run_code_in_con_concurrent(
+		self, code: str, postfix: str, timeout_seconds: int = 600
+	) -> Result[Tuple[str, str], str]:
+		"""Thread-safe variant of `run_code_in_con` for running several scripts at once.
+
+		`run_code_in_con` relies on SIGALRM, which only works on the main thread,
+		and kills every python process in the container afterwards. This variant
+		enforces the timeout inside the container with `timeout` and only ever
+		kills its own script, so candidates running side by side don't interfere.
+
+		Args:
+		    code (str): The Python code to run in the container
+		    postfix (str): The type identifier for the agent, used in the file path
+		    timeout_seconds (int, optional): Maximum run time of the script. Defaults to 600.
+
+		Returns:
+		    Result[Tuple[str, str], str]:
+		        - Ok: A tuple containing (execution_output, reflected_code)
+		        - Err: An error message describing what went wrong
+		"""
+		temp_file_path, reflected_code = self.write_code_in_con(code, postfix)
+
+		with self._running_lock:
+			self._running.setdefault(postfix, set()).add(temp_file_path)
+
+		command_str = f"timeout -s KILL {timeout_seconds} python -u {shlex.quote(temp_file_path)} 2>&1"
+		cmd = ["/bin/sh", "-c", command_str]
+
+		try:
+			python_exit_code, python_output = cast(
+				Tuple[int, bytes],
+				self.container.exec_run(
+					cmd=cmd,
+					environment=self.in_con_env,
+					demux=False,
+					stream=False,
+				),
+			)
+			python_output_str = python_output.decode("utf-8", errors="replace")
+		except (docker.errors.ContainerError, docker.errors.APIError) as e:
+			return Err(
+				f"ContainerManager.run_code_in_con_concurrent: Container error, error: \n{e}"
+			)
+		finally:
+			with self._running_lock:
+				self._running.get(postfix, set()).discard(temp_file_path)
+
+		# `timeout -s KILL` makes the shell report 128 + SIGKILL
+		if python_exit_code == 137:
+			return Err(
+				f"ContainerManager.run_code_in_con_concurrent: Code ran too long or was cancelled, program output: \n{python_output_str}"
+			)
+
+		if python_exit_code != 0:
+			return Err(
+				f"ContainerManager.run_code_in_con_concurrent: Code that has been run failed, program output: \n{python_output_str}"
+			)
+
+		return Ok((python_output_str, reflected_code))
+
+	def kill_codes_in_con(self, postfix: str) -> None:
+		"""Kill every script still running under `postfix` via `run_code_in_con_concurrent`.
+
+		Args:
+		    postfix (str): The type identifier the scripts were started with
+		"""
+		with self._running_lock:
+			temp_file_paths = list(self._running.get(postfix, set()))
+
+		for temp_file_path in temp_file_paths:
+			self.container.exec_run(
+				cmd=[
+					"/bin/sh",
+					"-c",
+					f"pkill -9 -f {shlex.quote(temp_file_path)} || true",
+				]
+			)
@@ -152,3 +152,49 @@ create table if not exists sup_token_price (
   UNIQUE(token_addr)
 );
 
+create table if not exists sup_token_metadata (
+  token_addr TEXT PRIMARY KEY,
+  symbol TEXT,
+  name TEXT,
+  decimals INTEGER NOT NULL
+);
+
+create table if not exists sup_wallet_tokens (
+  data_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  wallet_address TEXT NOT NULL,
+  token_addr TEXT NOT NULL,
+  first_seen_block INTEGER,
+  UNIQUE(wallet_address, token_addr)
+);
+
+create table if not exists sup_wallet_sync (
+  wallet_address TEXT PRIMARY KEY,
+  last_block INTEGER NOT NULL,
+  updated_at DATETIME NOT NULL
+);
+
+create table if not exists sup_provider_health (
+  provider TEXT PRIMARY KEY,
+  success_rate REAL NOT NULL,
+  latency REAL NOT NULL,
+  consecutive_failures INTEGER NOT NULL,
+  open_until REAL NOT NULL,
+  updated_at DATETIME NOT NULL
+);
+
+create table if not exists sup_products (
+  source TEXT NOT NULL,
+  product_id TEXT NOT NULL,
+  title TEXT NOT NULL,
+  price REAL NOT NULL,
+  currency TEXT,
+  data TEXT NOT NULL,
+  first_seen_at DATETIME NOT NULL,
+  last_seen_at DATETIME NOT NULL,
+  promoted_price REAL,
+  promoted_at DATETIME,
+  PRIMARY KEY (source, product_id)
+);
+
+create index if not exists idx_products_product_id on sup_products (product_id);
+create index if not exists idx_products_source_price on sup_products (source, price);
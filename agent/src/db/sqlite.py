@@ -1,11 +1,12 @@
 import json
 import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from src.datatypes import StrategyData, StrategyInsertData
 from src.db.interface import DBInterface
 from src.my_types import ChatHistory
+from src.provider_health import ProviderHealthData
 import uuid
 
 
@@ -18,6 +19,33 @@ class TokenPriceData:
 	metadata: str
 
 
+@dataclass
+class TokenMetadata:
+	token_addr: str
+	symbol: str
+	name: str
+	decimals: int
+
+
+@dataclass
+class CatalogueProduct:
+	source: str
+	product_id: str
+	title: str
+	price: float
+	currency: Optional[str]
+	# ProductData fields as JSON
+	data: str
+	first_seen_at: str
+	last_seen_at: str
+	promoted_price: Optional[float] = None
+	promoted_at: Optional[str] = None
+
+
+# Keys per query, well under SQLite's limit on bound parameters
+_CATALOGUE_CHUNK = 500
+
+
 class SQLiteDB(DBInterface):
 	def __init__(self, db_path: str):
 		"""Initialize SQLite database connection and create tables if they don't exist.
@@ -419,3 +447,243 @@ class SQLiteDB(DBInterface):
 				return cursor.rowcount > 0
 		except sqlite3.Error:
 			return False
+
+	def get_wallet_last_block(self, wallet_address: str) -> Optional[int]:
+		"""Get the last block whose token transfers were processed for a wallet.
+
+		Args:
+		    wallet_address (str): Wallet address, in any case
+
+		Returns:
+		    Optional[int]: The block number, or None if the wallet was never synced
+		"""
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			cursor.execute(
+				"""SELECT last_block FROM sup_wallet_sync WHERE wallet_address = ?""",
+				(wallet_address.lower(),),
+			)
+			row = cursor.fetchone()
+			return row[0] if row else None
+
+	def get_wallet_tokens(self, wallet_address: str) -> List[TokenMetadata]:
+		"""Get every token contract a wallet is known to have touched.
+
+		Args:
+		    wallet_address (str): Wallet address, in any case
+
+		Returns:
+		    List[TokenMetadata]: The tokens, in the order they were discovered
+		"""
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			cursor.execute(
+				"""SELECT m.token_addr, m.symbol, m.name, m.decimals
+				FROM sup_wallet_tokens w
+				JOIN sup_token_metadata m ON m.token_addr = w.token_addr
+				WHERE w.wallet_address = ?
+				ORDER BY w.data_id""",
+				(wallet_address.lower(),),
+			)
+			return [
+				TokenMetadata(
+					token_addr=row[0], symbol=row[1], name=row[2], decimals=row[3]
+				)
+				for row in cursor.fetchall()
+			]
+
+	def record_wallet_tokens(
+		self,
+		wallet_address: str,
+		last_block: int,
+		tokens: List[TokenMetadata],
+		first_seen_blocks: Dict[str, int],
+	) -> bool:
+		"""Add newly discovered tokens to a wallet's registry and advance its sync block.
+
+		Token metadata is immutable on chain, so a token's first recorded
+		metadata is kept forever. The sync block never moves backwards.
+
+		Args:
+		    wallet_address (str): Wallet address, in any case
+		    last_block (int): Last block whose transfers have been processed
+		    tokens (List[TokenMetadata]): Tokens seen in the processed transfers
+		    first_seen_blocks (Dict[str, int]): Block each token was first seen in, by token address
+
+		Returns:
+		    bool: True if everything was written, False on a database error
+		"""
+		wallet = wallet_address.lower()
+		try:
+			with sqlite3.connect(self.db_path) as conn:
+				cursor = conn.cursor()
+				cursor.executemany(
+					"""INSERT OR IGNORE INTO sup_token_metadata (token_addr, symbol, name, decimals)
+                       VALUES (?, ?, ?, ?)""",
+					[(t.token_addr, t.symbol, t.name, t.decimals) for t in tokens],
+				)
+				cursor.executemany(
+					"""INSERT OR IGNORE INTO sup_wallet_tokens (wallet_address, token_addr, first_seen_block)
+                       VALUES (?, ?, ?)""",
+					[
+						(wallet, t.token_addr, first_seen_blocks.get(t.token_addr))
+						for t in tokens
+					],
+				)
+				cursor.execute(
+					"""INSERT INTO sup_wallet_sync (wallet_address, last_block, updated_at)
+                       VALUES (?, ?, ?)
+                       ON CONFLICT(wallet_address) DO UPDATE SET
+                           last_block = MAX(last_block, excluded.last_block),
+                           updated_at = excluded.updated_at""",
+					(wallet, last_block, datetime.now().isoformat()),
+				)
+				return True
+		except sqlite3.Error:
+			return False
+
+	def get_provider_health(self) -> List[ProviderHealthData]:
+		"""Get the last saved health of every API provider.
+
+		Returns:
+		    List[ProviderHealthData]: One record per provider
+		"""
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			cursor.execute(
+				"""SELECT provider, success_rate, latency, consecutive_failures, open_until
+				FROM sup_provider_health"""
+			)
+			return [ProviderHealthData(*row) for row in cursor.fetchall()]
+
+	def save_provider_health(self, records: List[ProviderHealthData]) -> bool:
+		"""Save the health of API providers, replacing what was saved before.
+
+		Args:
+		    records (List[ProviderHealthData]): One record per provider
+
+		Returns:
+		    bool: True if everything was written, False on a database error
+		"""
+		try:
+			with sqlite3.connect(self.db_path) as conn:
+				cursor = conn.cursor()
+				cursor.executemany(
+					"""INSERT OR REPLACE INTO sup_provider_health
+                       (provider, success_rate, latency, consecutive_failures, open_until, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+					[
+						(
+							r.provider,
+							r.success_rate,
+							r.latency,
+							r.consecutive_failures,
+							r.open_until,
+							datetime.now().isoformat(),
+						)
+						for r in records
+					],
+				)
+				return True
+		except sqlite3.Error:
+			return False
+
+	def get_catalogue_products(
+		self, keys: List[Tuple[str, str]]
+	) -> Dict[Tuple[str, str], CatalogueProduct]:
+		"""Get catalogued products by (source, product id).
+
+		Args:
+		    keys (List[Tuple[str, str]]): (source, product id) of each product to look up
+
+		Returns:
+		    Dict[Tuple[str, str], CatalogueProduct]: The products found, by key
+		"""
+		found: Dict[Tuple[str, str], CatalogueProduct] = {}
+		wanted = set(keys)
+		product_ids = list({product_id for _, product_id in wanted})
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			for i in range(0, len(product_ids), _CATALOGUE_CHUNK):
+				chunk = product_ids[i : i + _CATALOGUE_CHUNK]
+				cursor.execute(
+					f"""SELECT source, product_id, title, price, currency, data,
+					first_seen_at, last_seen_at, promoted_price, promoted_at
+					FROM sup_products
+					WHERE product_id IN ({",".join("?" * len(chunk))})""",
+					chunk,
+				)
+				for row in cursor.fetchall():
+					if (row[0], row[1]) in wanted:
+						found[(row[0], row[1])] = CatalogueProduct(*row)
+		return found
+
+	def upsert_catalogue_products(self, products: List[CatalogueProduct]) -> bool:
+		"""Add products to the catalogue or refresh the ones already in it.
+
+		The first sighting and the last promotion of a product already in the
+		catalogue are kept.
+
+		Args:
+		    products (List[CatalogueProduct]): Products as just seen
+
+		Returns:
+		    bool: True if everything was written, False on a database error
+		"""
+		try:
+			with sqlite3.connect(self.db_path) as conn:
+				cursor = conn.cursor()
+				cursor.executemany(
+					"""INSERT INTO sup_products
+                       (source, product_id, title, price, currency, data, first_seen_at, last_seen_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(source, product_id) DO UPDATE SET
+                           title = excluded.title,
+                           price = excluded.price,
+                           currency = excluded.currency,
+                           data = excluded.data,
+                           last_seen_at = excluded.last_seen_at""",
+					[
+						(
+							p.source,
+							p.product_id,
+							p.title,
+							p.price,
+							p.currency,
+							p.data,
+							p.first_seen_at,
+							p.last_seen_at,
+						)
+						for p in products
+					],
+				)
+				return True
+		except sqlite3.Error:
+			return False
+
+	def mark_catalogue_products_promoted(
+		self, promoted: List[Tuple[str, str, float]]
+	) -> bool:
+		"""Record that products were promoted, and at what price.
+
+		Args:
+		    promoted (List[Tuple[str, str, float]]): (source, product id, price) of each promoted product
+
+		Returns:
+		    bool: True if everything was written, False on a database error
+		"""
+		now = datetime.now().isoformat()
+		try:
+			with sqlite3.connect(self.db_path) as conn:
+				cursor = conn.cursor()
+				cursor.executemany(
+					"""UPDATE sup_products SET promoted_price = ?, promoted_at = ?
+                       WHERE source = ? AND product_id = ?""",
+					[
+						(price, now, source, product_id)
+						for source, product_id, price in promoted
+					],
+				)
+				return True
+		except sqlite3.Error:
+			return False
@@ -1,13 +1,12 @@
 from typing import Callable, List
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from datetime import datetime
 import time
-import requests
 import os
 import re
 import json
-from PIL import Image
 from io import BytesIO
-import subprocess
 
 from loguru import logger
 from result import UnwrapError
@@ -15,11 +14,17 @@ from src.agent.affiliate_promoter import AffiliatePromoterAgent, AliExpressAPICl
 from src.datatypes import StrategyData, StrategyInsertData
 from src.datatypes.affiliate_promoter import ProductData, ContentData, VideoContentData, PublishingResult
 from src.sensor.affiliate_promoter import AffiliatePromoterTwitterClient
+from src.pipeline import Pipeline, Stage
+from src.product_discovery import Marketplace, ProductDiscovery, SearchFn
+from src.product_catalogue import ProductCatalogue, catalogue_key
+from src.media_cache import get_media_cache
+from src.job_queue import JobQueue
+from src.publisher import MultiPlatformPublisher, PostItem, publishing_platforms
 from scripts.replicate_image_generation import generate_image
 from scripts.replicate_video_generation import generate_video
 from scripts.publish_to_site import git_publish
 
-SITE_PUBLISH_SCRIPT = "/home/anza/suggestoai-site/publish_post.py"
+SITE_PUBLISH_SCRIPT = os.getenv("SITE_PUBLISH_SCRIPT", "/home/anza/suggestoai-site/publish_post.py")
 
 def unassisted_flow(
 	agent: AffiliatePromoterAgent,
@@ -31,6 +36,8 @@ def unassisted_flow(
 	prev_strat: StrategyData | None,
 	notif_str: str | None,
 	summarizer: Callable[[List[str]], str],
+	catalogue: ProductCatalogue | None = None,
+	media_jobs: JobQueue | None = None,
 ):
 	"""
 	Execute an autonomous affiliate promotion workflow with the affiliate promoter agent.
@@ -43,6 +50,9 @@ def unassisted_flow(
 	5. Integrate value-oriented features (guarantees, return policies, seller trust).
 	6. Run autonomously in a loop or via cron.
 	The agent's success metric is affiliate sales, clicks on affiliate links, or views/interactions with published content.
+
+	With a `catalogue`, only products that are new or got cheaper since they were last promoted go past discovery.
+	With `media_jobs`, videos are queued instead of waited for, and the ones finished since the last cycle are published with this one.
 	"""
 	agent.reset()
 	logger.info("Reset agent")
@@ -56,182 +66,100 @@ def unassisted_flow(
 	blogger_client = BloggerAPIClient()
 	linkedin_client = LinkedInAPIClient()
 	youtube_client = YouTubeAPIClient()
-	ebay_products = []
-	aliexpress_products = []
-	if ebay_client.can_request():
-		logger.info("[eBay] Using real API for product discovery...")
-		ebay_products = ebay_client.search_products(query="laptop", limit=3)
-	if aliexpress_client.can_request():
-		logger.info("[AliExpress] Using real API for product discovery...")
-		aliexpress_products = aliexpress_client.search_products(query="smartwatch", limit=3)
-	discovered_products = ebay_products + aliexpress_products
+	# Every keyword on every marketplace at once, merged, deduped and ranked
+	discovery = ProductDiscovery([
+		Marketplace("ebay", marketplace_search(ebay_client), page_size=DISCOVERY_PAGE_SIZE, max_pages=DISCOVERY_MAX_PAGES),
+		Marketplace("aliexpress", marketplace_search(aliexpress_client), page_size=DISCOVERY_PAGE_SIZE, max_pages=DISCOVERY_MAX_PAGES),
+	])
+	discovered_products = discovery.discover(DISCOVERY_KEYWORDS, k=DISCOVERY_CANDIDATES)
+	if catalogue is not None:
+		# Products already promoted at this price would only be promoted again
+		discovered_products = [c.product for c in catalogue.changed(discovered_products)]
+	discovered_products = discovered_products[:DISCOVERY_TOP_K]
 	logger.info(f"Discovered products: {[f'{p.title} ({p.source})' for p in discovered_products]}")
 
-	# After discovery, ensure at least one AliExpress product is present for demo
-	if not any(p.source == "aliexpress" for p in discovered_products):
-		demo_ali = aliexpress_client.search_products(query="smartwatch", limit=1)
-		if demo_ali:
-			logger.info("[AliExpress] Forcing inclusion of one AliExpress product for demo.")
-			discovered_products.append(demo_ali[0])
-
 	# Autonomous content type selection per product
-	content_plan = []
+	jobs = []
 	for product in discovered_products:
-		plan = {"product": product, "types": []}
 		# Example logic: if product is from eBay, prefer blog+video; if AliExpress, prefer image+video
 		if product.source == "ebay":
-			plan["types"] = ["blog", "video"]
+			types = ["blog", "video"]
 		elif product.source == "aliexpress":
-			plan["types"] = ["image", "video"]
+			types = ["image", "video"]
 		else:
-			plan["types"] = ["blog"]
-		logger.info(f"[Decision] For '{product.title}' ({product.source}), will generate: {plan['types']}")
-		content_plan.append(plan)
-
-	# Generate content according to plan
-	logger.info("Step 2: Generating content using LLMs and RAG...")
-	generated_content = []
-	generated_videos = []
-	for plan in content_plan:
-		product = plan["product"]
-		if "blog" in plan["types"]:
-			generated_content += generate_content_for_products_with_ai([product])
-		if "image" in plan["types"]:
-			# Generate image (Replicate or other real API)
-			img_path = generate_image(product.title + ", product photo, high detail")
-			logger.info(f"[Image] Generated for '{product.title}': {img_path}")
-		if "video" in plan["types"]:
-			generated_videos += generate_video_for_products_with_ai([product])
+			types = ["blog"]
+		logger.info(f"[Decision] For '{product.title}' ({product.source}), will generate: {types}")
+		jobs.append(ProductJob(product=product, types=types))
+
+	# Steps 2-4 run as a pipeline, so every product moves through content,
+	# video and publishing on its own and a cycle takes about as long as its
+	# slowest product
+	logger.info("Steps 2-4: Generating content and videos and publishing, product by product...")
+	# Every post goes to every platform at once, paced and retried per platform
+	publisher = MultiPlatformPublisher(
+		publishing_platforms(
+			twitter_client, devto_client, hashnode_client, blogger_client, linkedin_client, youtube_client,
+			site_script=SITE_PUBLISH_SCRIPT,
+			facebook_page_id=os.getenv("FACEBOOK_PAGE_ID"),
+			facebook_token=os.getenv("FACEBOOK_ACCESS_TOKEN"),
+		),
+		max_workers=STAGE_WORKERS["publish"],
+		on_failure=save_failed_post,
+	)
+	# Videos rendered in the background since the last cycle, published with this one
+	ready_jobs = []
+	if media_jobs is not None:
+		for video_job in media_jobs.claim_finished("video"):
+			video = video_from_payload(video_job.payload["video"])
+			video.video_path = video_job.result["video_path"]
+			ready_jobs.append(ProductJob(product=video.product, types=[], videos=[video], media_job_id=video_job.job_id))
+		logger.info(f"[Jobs] {len(ready_jobs)} queued videos ready to publish")
+
+	finished_jobs = []
+	# Fetch every product image at once rather than one per content worker
+	get_media_cache().prefetch(p.image for p in discovered_products)
+
+	def plan_publishing(job: ProductJob) -> List[PostItem]:
+		finished_jobs.append(job)
+		return post_items_for_job(job)
+
+	pipeline = Pipeline([
+		Stage("content", generate_job_content, workers=STAGE_WORKERS["content"]),
+		Stage(
+			"video",
+			generate_job_videos if media_jobs is None else partial(enqueue_job_videos, media_jobs=media_jobs),
+			workers=STAGE_WORKERS["video"],
+		),
+		Stage("plan_publishing", plan_publishing, fan_out=True),
+		Stage("publish", publisher.publish_item, workers=STAGE_WORKERS["publish"], fan_out=True, queue_size=32),
+	])
+	with publisher:
+		result = pipeline.run(ready_jobs + jobs)
+	logger.info(f"[Pipeline] {result.summary()}")
+	logger.info(f"[Pipeline] Metrics: {json.dumps(result.metrics())}")
+	for failure in result.failures:
+		title = failure.item.title if isinstance(failure.item, PostItem) else failure.item.product.title
+		logger.warning(f"[Pipeline] '{title}' failed at {failure.stage}: {failure.error}")
+	logger.info(f"[Publish] Stats: {json.dumps(asdict(publisher.stats))}")
+	published_links: List[PublishingResult] = result.outputs
+	if media_jobs is not None:
+		# Queued videos are done with once uploaded, the others are claimed again next cycle
+		uploaded = {r.content_id for r in published_links if r.content_type == "video" and r.status == "success"}
+		acked = [job.media_job_id for job in ready_jobs if catalogue_key(job.product) in uploaded]
+		media_jobs.ack(acked)
+		media_jobs.release([job.media_job_id for job in ready_jobs if job.media_job_id not in acked])
+		logger.info(f"[Jobs] {len(acked)} of {len(ready_jobs)} queued videos published")
+		logger.info(f"[Jobs] Metrics: {json.dumps(asdict(media_jobs.metrics()))}")
+
+	if catalogue is not None:
+		# Only products that actually went out somewhere count as promoted
+		catalogue.mark_published([job.product for job in finished_jobs], published_links)
+
+	generated_content = [c for job in finished_jobs for c in job.content]
+	generated_videos = [v for job in finished_jobs for v in job.videos]
 	logger.info(f"Generated content types: {[c.type for c in generated_content]}")
 	logger.info(f"Generated videos: {[v.title for v in generated_videos]}")
-
-	# 4. Publish content to multiple platforms
-	logger.info("Step 4: Publishing content to multiple platforms (Blogger, Medium, Dev.to, Hashnode, X/Twitter, LinkedIn)...")
-	published_links = mock_publish_content(generated_content, generated_videos)
-	logger.info(f"Published links: {[r.url for r in published_links]}")
-
-	# Twitter posting για κάθε generated blog (always in English)
-	FACEBOOK_TOKEN = os.getenv("FACEBOOK_ACCESS_TOKEN")
-	FACEBOOK_PAGE_ID = os.getenv("FACEBOOK_PAGE_ID")
-	for content in generated_content:
-		if content.type == "blog":
-			eng_title = only_english(content.title)
-			eng_summary = only_english(content.summary)
-			eng_body = only_english(content.body)
-			# Φιλτράρω/μεταφράζω όλα τα value features
-			pros = [only_english(p) for p in getattr(content, 'pros', [])]
-			cons = [only_english(c) for c in getattr(content, 'cons', [])]
-			qas = [(only_english(qa[0]), only_english(qa[1])) for qa in getattr(content, 'qas', [])] if hasattr(content, 'qas') else []
-			seller_trust = only_english(getattr(content, 'seller_trust', ''))
-			shipping_info = only_english(getattr(content, 'shipping_info', ''))
-			aff_link = get_affiliate_link(content)
-			post_text = f"{eng_title}\n{eng_summary[:200]}...\nBuy here: {aff_link}"
-			# Twitter
-			try:
-				twitter_client.create_tweet(post_text)
-			except Exception as e:
-				print(f"[MOCK] Twitter error: {e}")
-				save_mock_post("twitter", eng_title, post_text)
-			# Dev.to publishing
-			tags = [only_english(tag) for tag in (content.tags if content.tags else ["affiliate", "review", "aigenerated"])]
-			if "ai-generated" in tags:
-				tags = [t if t != "ai-generated" else "aigenerated" for t in tags]
-			try:
-				devto_client.publish_article(
-					title=eng_title,
-					body_markdown=f"{eng_body}\n\nBuy here: {aff_link}",
-					tags=tags,
-					canonical_url=aff_link,
-					published=True
-				)
-			except Exception as e:
-				print(f"[MOCK] Dev.to error: {e}")
-				save_mock_post("devto", eng_title, post_text)
-			# Hashnode publishing
-			try:
-				hashnode_client.publish_article(
-					title=eng_title,
-					content_markdown=f"{eng_body}\n\nBuy here: {aff_link}",
-					tags=tags,
-					published=True
-				)
-			except Exception as e:
-				print(f"[MOCK] Hashnode error: {e}")
-				save_mock_post("hashnode", eng_title, post_text)
-			# Blogger publishing
-			try:
-				blogger_client.publish_post(
-					title=eng_title,
-					content=f"{eng_body}\n\nBuy here: {aff_link}",
-					labels=tags,
-					published=True
-				)
-			except Exception as e:
-				print(f"[MOCK] Blogger error: {e}")
-				save_mock_post("blogger", eng_title, post_text)
-				if 'accessNotConfigured' in str(e):
-					print("[Blogger] Blogger API is not enabled. Go to https://console.developers.google.com/apis/api/blogger.googleapis.com/overview?project=YOUR_PROJECT_ID and enable it.")
-			# LinkedIn publishing
-			try:
-				linkedin_client.publish_post(
-					text=post_text,
-					url=aff_link
-				)
-			except Exception as e:
-				print(f"[MOCK] LinkedIn error: {e}")
-				save_mock_post("linkedin", eng_title, post_text)
-			# Facebook publishing
-			if FACEBOOK_TOKEN and FACEBOOK_PAGE_ID:
-				fb_url = f"https://graph.facebook.com/v19.0/{FACEBOOK_PAGE_ID}/feed"
-				fb_payload = {"message": post_text, "access_token": FACEBOOK_TOKEN}
-				try:
-					fb_resp = requests.post(fb_url, data=fb_payload, timeout=10)
-					if fb_resp.status_code in [200, 201]:
-						print(f"[Facebook] Δημοσιεύτηκε το post: {eng_title}")
-					else:
-						print(f"[MOCK] Facebook API error: {fb_resp.status_code}")
-						print(fb_resp.text)
-						save_mock_post("facebook", eng_title, post_text)
-				except Exception as e:
-					print(f"[MOCK] Facebook Exception: {e}")
-					save_mock_post("facebook", eng_title, post_text)
-			else:
-				save_mock_post("facebook", eng_title, post_text)
-			# Μετά το generated_content, για κάθε blog post, κάνε publish στο site
-			publish_to_site(
-				title=content.title,
-				desc=content.summary,
-				img=getattr(content.product, "image", ""),
-				afflink=get_affiliate_link(content),
-				review=content.body
-			)
-	# Thread posting για κάθε Q&A (one thread per product, always in English)
-	for product in discovered_products:
-		qas = [c for c in generated_content if c.product == product and c.type == "qa"]
-		if qas:
-			thread_texts = [f"Q: {qa.qa[0]['q']}\nA: {qa.qa[0]['a']}" for qa in qas if qa.qa]
-			if thread_texts:
-				twitter_client.post_thread(thread_texts)
-
-	# Twitter posting για κάθε generated video (YouTube link, always in English)
-	for video in generated_videos:
-		eng_video_title = only_english(video.title)
-		eng_video_desc = only_english(video.description)
-		aff_link = get_affiliate_link(video) if hasattr(video, 'affiliate_link') or hasattr(video, 'product') else ''
-		yt_desc = f"{eng_video_desc}\n\nBuy here: {aff_link}"
-		# Fix YouTube title: max 95 chars, remove problematic characters, fallback if empty
-		safe_title = eng_video_title[:95].replace('|', '').replace(':', '').strip()
-		if not safe_title:
-			safe_title = "AI Product Review"
-		try:
-			upload_result = youtube_client.upload_video(video_file=video.video_path, title=safe_title, description=yt_desc)
-			if upload_result:
-				logger.info(f"[YouTube] Video uploaded: {safe_title}")
-			else:
-				logger.warning(f"[YouTube] Upload failed for: {safe_title}")
-		except Exception as e:
-			logger.error(f"[YouTube] Exception during upload: {e}")
-			save_mock_post("youtube", safe_title, yt_desc)
+	logger.info(f"Published links: {[r.url for r in published_links if r.status == 'success']}")
 
 	# 5. Integrate value-oriented features
 	logger.info("Step 5: Integrating value-oriented features (guarantees, return policies, seller trust)...")
@@ -269,6 +197,170 @@ def unassisted_flow(
 		raise
 
 
+# Searched on every marketplace each cycle
+DISCOVERY_KEYWORDS = ["laptop", "smartwatch", "wireless earbuds", "power bank"]
+DISCOVERY_PAGE_SIZE = 20
+DISCOVERY_MAX_PAGES = 2
+# Products promoted per cycle, the best ranked across all marketplaces
+DISCOVERY_TOP_K = 6
+# Best ranked products compared against the catalogue to find those top ones
+DISCOVERY_CANDIDATES = 30
+
+# Workers per pipeline stage, sized to what each API takes in parallel:
+# Replicate runs a few predictions at once, publishing is mostly waiting
+STAGE_WORKERS = {"content": 4, "video": 2, "publish": 8}
+
+
+@dataclass
+class ProductJob:
+	product: ProductData
+	types: List[str]
+	content: List[ContentData] = field(default_factory=list)
+	videos: List[VideoContentData] = field(default_factory=list)
+	# Queued video job this product's video came from, acknowledged once uploaded
+	media_job_id: str | None = None
+
+
+def marketplace_search(client) -> SearchFn:
+	"""Search function for `ProductDiscovery` over an eBay or AliExpress client, respecting its request budget."""
+	def search(query: str, limit: int, page: int) -> List[ProductData]:
+		if not client.can_request():
+			logger.warning(f"[Discovery] {type(client).__name__} request limit reached, skipping '{query}' page {page}")
+			return []
+		return client.search_products(query=query, limit=limit, page=page)
+	return search
+
+
+def generate_job_content(job: ProductJob) -> ProductJob:
+	"""Pipeline stage: blog content and product image for one product."""
+	product = job.product
+	if "blog" in job.types:
+		job.content = generate_content_for_products_with_ai([product])
+	if "image" in job.types:
+		# Generate image (Replicate or other real API)
+		img_path = generate_image(product.title + ", product photo, high detail")
+		logger.info(f"[Image] Generated for '{product.title}': {img_path}")
+	return job
+
+
+def generate_job_videos(job: ProductJob) -> ProductJob:
+	"""Pipeline stage: video for one product."""
+	if "video" in job.types:
+		job.videos = generate_video_for_products_with_ai([job.product])
+	return job
+
+
+def enqueue_job_videos(job: ProductJob, media_jobs: JobQueue) -> ProductJob:
+	"""Pipeline stage: queue the video for one product, a later cycle publishes it once rendered."""
+	if "video" in job.types:
+		prompt = video_prompt(job.product)
+		video = video_content_for_product(job.product)
+		media_jobs.enqueue("video", {"prompt": prompt, "video": video_to_payload(video)}, dedupe_key=f"video:{prompt}")
+		logger.info(f"[Jobs] Queued video for '{job.product.title}'")
+	return job
+
+
+def video_to_payload(video: VideoContentData) -> dict:
+	"""JSON-serialisable form of a video, to carry it through the job queue."""
+	payload = asdict(video)
+	payload["created_at"] = video.created_at.isoformat() if video.created_at else None
+	return payload
+
+
+def video_from_payload(payload: dict) -> VideoContentData:
+	created_at = payload.get("created_at")
+	return VideoContentData(**{
+		**payload,
+		"product": ProductData(**payload["product"]),
+		"created_at": datetime.fromisoformat(created_at) if created_at else None,
+	})
+
+
+def save_failed_post(item: PostItem, platform: str, error: str) -> None:
+	"""Keep a post that failed for good as a mock post, so it can be posted by hand."""
+	if "accessNotConfigured" in error:
+		print("[Blogger] Blogger API is not enabled. Go to https://console.developers.google.com/apis/api/blogger.googleapis.com/overview?project=YOUR_PROJECT_ID and enable it.")
+	save_mock_post(platform, item.title, item.text)
+
+
+def post_items_for_job(job: ProductJob) -> List[PostItem]:
+	"""Every post to make for one product's blogs, Q&A and videos, always in English."""
+	items = []
+	for content in job.content:
+		if content.type == "blog":
+			items += blog_post_items(content)
+
+	qas = [c for c in job.content if c.type == "qa"]
+	thread_texts = [f"Q: {qa.qa[0]['q']}\nA: {qa.qa[0]['a']}" for qa in qas if qa.qa]
+	if thread_texts:
+		items.append(PostItem(
+			title=f"Q&A thread: {job.product.title}",
+			content_type="qa",
+			text=thread_texts[0],
+			thread=thread_texts,
+			platforms=["twitter"],
+		))
+
+	for video in job.videos:
+		items.append(video_post_item(video))
+	# Tags every result with its product, see `ProductCatalogue.mark_published`
+	for item in items:
+		item.content_id = catalogue_key(job.product)
+	return items
+
+
+def blog_post_items(content: ContentData) -> List[PostItem]:
+	"""A blog post for the social and blogging platforms, and as written for the site."""
+	eng_title = only_english(content.title)
+	eng_summary = only_english(content.summary)
+	eng_body = only_english(content.body)
+	aff_link = get_affiliate_link(content)
+	tags = [only_english(tag) for tag in (content.tags if content.tags else ["affiliate", "review", "aigenerated"])]
+	if "ai-generated" in tags:
+		tags = [t if t != "ai-generated" else "aigenerated" for t in tags]
+
+	return [
+		PostItem(
+			title=eng_title,
+			content_type="blog",
+			text=f"{eng_title}\n{eng_summary[:200]}...\nBuy here: {aff_link}",
+			body=f"{eng_body}\n\nBuy here: {aff_link}",
+			summary=eng_summary,
+			link=aff_link,
+			tags=tags,
+			platforms=["twitter", "devto", "hashnode", "blogger", "linkedin", "facebook"],
+		),
+		PostItem(
+			title=content.title,
+			content_type="blog",
+			body=content.body,
+			summary=content.summary,
+			link=aff_link,
+			image=getattr(content.product, "image", ""),
+			platforms=["site"],
+		),
+	]
+
+
+def video_post_item(video: VideoContentData) -> PostItem:
+	eng_video_title = only_english(video.title)
+	eng_video_desc = only_english(video.description)
+	aff_link = get_affiliate_link(video) if hasattr(video, 'affiliate_link') or hasattr(video, 'product') else ''
+	yt_desc = f"{eng_video_desc}\n\nBuy here: {aff_link}"
+	# Fix YouTube title: max 95 chars, remove problematic characters, fallback if empty
+	safe_title = eng_video_title[:95].replace('|', '').replace(':', '').strip()
+	if not safe_title:
+		safe_title = "AI Product Review"
+	return PostItem(
+		title=safe_title,
+		content_type="video",
+		text=yt_desc,
+		body=yt_desc,
+		link=aff_link,
+		video_path=video.video_path,
+	)
+
+
 def mock_discover_affiliate_products(query: str = "smartphone") -> list[ProductData]:
 	"""Mock discovery of affiliate products (eBay, AliExpress, Amazon) enriched with value features"""
 	return [
@@ -340,30 +432,8 @@ def enrich_value_features_text(product: ProductData) -> str:
 	return " | ".join(features)
 
 def download_product_image(image_url, output_folder="downloaded_images"):
-	if not image_url:
-		return None
-	os.makedirs(output_folder, exist_ok=True)
-	try:
-		response = requests.get(image_url, timeout=10)
-		if response.status_code == 200:
-			ext = image_url.split('.')[-1].split('?')[0]
-			if ext.lower() not in ["jpg", "jpeg", "png", "webp"]:
-				ext = "jpg"
-			local_path = os.path.join(output_folder, f"img_{abs(hash(image_url))}.{ext}")
-			with open(local_path, "wb") as f:
-				f.write(response.content)
-			# Validate image
-			try:
-				Image.open(local_path).verify()
-			except Exception:
-				os.remove(local_path)
-				return None
-			return local_path
-		else:
-			return None
-	except Exception as e:
-		logger.warning(f"[Image Download] Failed to download {image_url}: {e}")
-		return None
+	"""Local copy of a product image from the shared media cache, None if it could not be fetched."""
+	return get_media_cache(output_folder).get(image_url)
 
 def generate_content_for_products_with_ai(products: list[ProductData]) -> list[ContentData]:
 	"""Content generation for affiliate products (blog, table, Q&A) enriched with value features and AI image, με disclosures"""
@@ -422,16 +492,17 @@ def generate_content_for_products_with_ai(products: list[ProductData]) -> list[C
 		logger.info(f"[Enrichment] Content for {p.title} enriched with value features and disclosures.")
 	return content
 
-def generate_video_for_products_with_ai(products: list[ProductData]) -> list[VideoContentData]:
-	"""Video generation for affiliate products enriched with value features, AI video, and disclosures"""
-	videos = []
+def video_prompt(p: ProductData) -> str:
+	return p.title + ", product showcase, high detail"
+
+def video_content_for_product(p: ProductData) -> VideoContentData:
+	"""Video script, title and description for a product enriched with value features and disclosures, without the video itself"""
 	affiliate_disclosure = "This video contains affiliate links. Content generated by AI."
 	ai_disclosure = "This video was generated by AI."
-	for p in products:
-		value_features = enrich_value_features_text(p)
-		# Use the same image as thumbnail (real or AI-generated)
-		thumbnail = p.image
-		script = f"""
+	value_features = enrich_value_features_text(p)
+	# Use the same image as thumbnail (real or AI-generated)
+	thumbnail = p.image
+	script = f"""
 [Male Voice]
 Welcome to SuggestoAI! Today, we're reviewing the brand new {p.title} – the ultimate smartwatch for 2025!
 
@@ -452,47 +523,30 @@ This watch features {value_features}. It's waterproof, stylish, and perfect for
 [Outro]
 [Male Voice] SuggestoAI – Your smart product finder!
 """
-		video_path = generate_video(p.title + ", product showcase, high detail")
-		videos.append(VideoContentData(
-			product=p,
-			script=script,
-			tts_audio_path=None,  # Θα παραχθεί από TTS module
-			video_path=video_path,
-			thumbnail=thumbnail,
-			duration_sec=90,
-			title=f"{p.title} Review & Unboxing! {value_features}",
-			description=f"{ai_disclosure}\n{affiliate_disclosure}\nHands-on review of {p.title}. {value_features} Affiliate link: {p.affiliate_link or p.url}",
-			created_at=datetime.now(),
-			language="en",
-			author="AffiliateBot"
-		))
-		logger.info(f"[Enrichment] Video for {p.title} enriched with value features, pro script, and disclosures.")
-	return videos
+	video = VideoContentData(
+		product=p,
+		script=script,
+		tts_audio_path=None,  # Θα παραχθεί από TTS module
+		video_path=None,
+		thumbnail=thumbnail,
+		duration_sec=90,
+		title=f"{p.title} Review & Unboxing! {value_features}",
+		description=f"{ai_disclosure}\n{affiliate_disclosure}\nHands-on review of {p.title}. {value_features} Affiliate link: {p.affiliate_link or p.url}",
+		created_at=datetime.now(),
+		language="en",
+		author="AffiliateBot"
+	)
+	logger.info(f"[Enrichment] Video for {p.title} enriched with value features, pro script, and disclosures.")
+	return video
 
-def mock_publish_content(contents: list[ContentData], videos: list[VideoContentData]) -> list[PublishingResult]:
-	"""Mock publishing to multiple platforms (Dev.to, Medium, Twitter, LinkedIn, YouTube)"""
-	results = []
-	now = datetime.now()
-	for c in contents:
-		for platform in ["devto", "medium", "twitter", "linkedin"]:
-			results.append(PublishingResult(
-				platform=platform,
-				url=f"https://{platform}.com/post/{c.title.replace(' ', '-').lower()}",
-				status="success",
-				timestamp=now,
-				content_type=c.type,
-				content_title=c.title
-			))
-	for v in videos:
-		results.append(PublishingResult(
-			platform="youtube",
-			url=f"https://youtube.com/watch?v=mockid_{v.title.replace(' ', '').lower()}",
-			status="success",
-			timestamp=now,
-			content_type="video",
-			content_title=v.title
-		))
-	return results
+def generate_video_for_products_with_ai(products: list[ProductData]) -> list[VideoContentData]:
+	"""Video generation for affiliate products enriched with value features, AI video, and disclosures"""
+	videos = []
+	for p in products:
+		video = video_content_for_product(p)
+		video.video_path = generate_video(video_prompt(p))
+		videos.append(video)
+	return videos
 
 def mock_rag_save(category: str, data: list, session_id: str = "default"):
 	"""Mock αποθήκευση δεδομένων σε RAG (απλή λίστα/logging)"""
@@ -554,19 +608,6 @@ def save_mock_post(platform, title, body):
         f.write(f"Title: {title}\n\n{body}\n{'='*40}\n")
     print(f"[MOCK] Saved mock post for {platform} at {fname}")
 
-def publish_to_site(title, desc, img, afflink, review=None):
-    cmd = ["python3", SITE_PUBLISH_SCRIPT, "--title", title, "--desc", desc, "--img", img, "--afflink", afflink]
-    if review:
-        cmd += ["--review", review]
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            logger.info(f"[Site] Post published to site: {title}")
-        else:
-            logger.error(f"[Site] Failed to publish post: {title}\n{result.stderr}")
-    except Exception as e:
-        logger.error(f"[Site] Exception during publish_post.py: {e}")
-
 # AliExpress debug
 try:
     aliexpress_products = aliexpress_client.search_products(query="laptop", limit=3)
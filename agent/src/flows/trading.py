@@ -1,10 +1,13 @@
 import json
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import timedelta
+from functools import partial
 from textwrap import dedent
-from typing import Callable, List
+from typing import Callable, Dict, List, Tuple
 
 from loguru import logger
-from result import UnwrapError
+from result import Err, Ok, Result, UnwrapError
 from dateutil import parser
 from src.agent.trading import TradingAgent
 from src.datatypes import (
@@ -13,8 +16,167 @@ from src.datatypes import (
 	StrategyInsertData,
 	WalletStats,
 )
+from src.genner.Base import Genner
 from src.helper import nanoid
-from src.types import ChatHistory
+from src.metric_store import WalletMetricStore
+from src.summarizer import summarize_all
+from src.my_types import ChatHistory
+
+
+def log_token_usage(genner: Genner, step: str) -> None:
+	"""
+	Log cached vs uncached input tokens of the genner's latest completion.
+
+	Args:
+	    genner (Genner): The genner that served the step
+	    step (str): Name of the flow step, used as the log prefix
+	"""
+	usage = genner.last_usage
+	if usage is None:
+		return
+
+	logger.info(
+		f"[{step}] Input tokens: {usage.input_tokens} "
+		f"(cached: {usage.cached_input_tokens}, uncached: {usage.uncached_input_tokens}, "
+		f"cache writes: {usage.cache_write_tokens}), output tokens: {usage.output_tokens}"
+	)
+
+
+@dataclass
+class BestOfNConfig:
+	"""
+	Settings for generating and running code candidates in parallel.
+
+	Attributes:
+	    n (int): Number of candidates requested concurrently per round
+	    max_candidates (int): Cost cap, total candidates generated for one step across all rounds
+	    timeout_seconds (int): Maximum run time of a single candidate in the container
+	"""
+
+	n: int = 3
+	max_candidates: int = 9
+	timeout_seconds: int = 600
+
+
+def gen_code_best_of_n(
+	agent: TradingAgent,
+	gen_fn: Callable[[], Tuple[Result[str, str], ChatHistory]],
+	postfix: str,
+	config: BestOfNConfig,
+) -> Tuple[Result[Tuple[str, str], str], List[ChatHistory]]:
+	"""
+	Generate code candidates concurrently and keep the first one that works.
+
+	Each round requests up to `config.n` candidates at once. Every candidate is
+	executed in the container as soon as it is generated, and the first one that
+	exits 0 with non-empty output wins; the others are cancelled or killed. If a
+	whole round fails, the next round regenerates from a failed candidate and
+	the accumulated errors through `gen_better_code`, until
+	`config.max_candidates` candidates have been spent.
+
+	Args:
+	    agent (TradingAgent): The trading agent to use
+	    gen_fn (Callable): Generates one first-round candidate, e.g. a partial of `agent.gen_trading_code`
+	    postfix (str): The type identifier for the code, used for the container file paths
+	    config (BestOfNConfig): Number of candidates per round and the cost cap
+
+	Returns:
+	    Tuple[Result[Tuple[str, str], str], List[ChatHistory]]:
+	        - Ok((code, output)) of the winning candidate, or Err with all errors
+	        - Chat histories of every candidate, the winner's last
+	"""
+	executor = ThreadPoolExecutor(
+		max_workers=config.n * 2, thread_name_prefix=f"best-of-n-{postfix}"
+	)
+	chat_histories: List[ChatHistory] = []
+	err_acc = ""
+	spent = 0
+	round_fn = gen_fn
+
+	def generate(
+		fn: Callable[[], Tuple[Result[str, str], ChatHistory]],
+	) -> Tuple[Result[str, str], ChatHistory]:
+		code_result, candidate_ch = fn()
+		# Read in the worker, genner usage is tracked per thread
+		log_token_usage(agent.genner, postfix)
+		return code_result, candidate_ch
+
+	try:
+		while spent < config.max_candidates:
+			batch = min(config.n, config.max_candidates - spent)
+			spent += batch
+			logger.info(
+				f"Generating {batch} {postfix} candidates in parallel ({spent}/{config.max_candidates})..."
+			)
+
+			pending: Dict[Future, Tuple[str, ChatHistory | None]] = {
+				executor.submit(generate, round_fn): ("gen", None) for _ in range(batch)
+			}
+			failed_ch: ChatHistory | None = None
+
+			while pending:
+				done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+
+				for future in done:
+					kind, candidate_ch = pending.pop(future)
+
+					try:
+						outcome = future.result()
+					except Exception as e:
+						# One broken candidate is dropped, the others carry on
+						logger.error(f"A {postfix} candidate failed at {kind}: {e}")
+						err_acc += f"\n{e}"
+						continue
+
+					if kind == "gen":
+						code_result, candidate_ch = outcome
+						chat_histories.append(candidate_ch)
+
+						if err := code_result.err():
+							err_acc += f"\n{err}"
+							continue
+
+						run_future = executor.submit(
+							agent.container_manager.run_code_in_con_concurrent,
+							code_result.unwrap(),
+							postfix,
+							config.timeout_seconds,
+						)
+						pending[run_future] = ("run", candidate_ch)
+						continue
+
+					run_result = outcome
+					if run_result.is_ok() and run_result.unwrap()[0].strip():
+						for loser in pending:
+							loser.cancel()
+						agent.container_manager.kill_codes_in_con(postfix)
+
+						# Move the winner to the end so callers can treat it as the latest turn
+						chat_histories.remove(candidate_ch)
+						chat_histories.append(candidate_ch)
+
+						output, reflected_code = run_result.unwrap()
+						return Ok((reflected_code, output)), chat_histories
+
+					err_acc += (
+						f"\n{run_result.err() or 'Code ran but produced no output'}"
+					)
+					failed_ch = candidate_ch
+
+			logger.error(f"All {batch} {postfix} candidates of this round failed")
+
+			if failed_ch is not None:
+				round_fn = partial(
+					agent.gen_better_code,
+					research_code=failed_ch.get_latest_response(),
+					errors=err_acc,
+				)
+	finally:
+		executor.shutdown(wait=False, cancel_futures=True)
+
+	return Err(
+		f"gen_code_best_of_n: No {postfix} candidate succeeded after {spent} candidates, errors: {err_acc}"
+	), chat_histories
 
 
 def assisted_flow(
@@ -30,6 +192,8 @@ def assisted_flow(
 	notif_str: str,
 	txn_service_url: str,
 	summarizer: Callable[[List[str]], str],
+	best_of_n: BestOfNConfig | None = None,
+	metric_store: WalletMetricStore | None = None,
 ):
 	"""
 	Execute an assisted trading workflow with the trading agent.
@@ -51,6 +215,10 @@ def assisted_flow(
 	    notif_str (str | None): Notification string to process
 	    txn_service_url (str): URL of the transaction service
 	    summarizer (Callable[[List[str]], str]): Function to summarize text
+	    best_of_n (BestOfNConfig | None): When set, code steps generate and run candidates
+	        in parallel instead of regenerating one at a time
+	    metric_store (WalletMetricStore | None): When set, wallet samples are recorded in it
+	        and its recent deltas, drawdown and volatility are added to the metric state
 
 	Returns:
 	    None: This function doesn't return a value but logs its progress
@@ -73,6 +241,13 @@ def assisted_flow(
 			assets=str(start_metric_state),
 		)
 
+	metric_state = str(start_metric_state)
+	if metric_name == "wallet" and metric_store is not None:
+		metric_store.record(start_metric_state)
+		history = metric_store.summary(start_metric_state["wallet_address"])
+		if history:
+			metric_state += f"\nRecent performance:\n{history}"
+
 	if notif_str:
 		logger.info(
 			f"Getting relevant RAG strategies with `query`: \n{notif_str[:100].strip()}...{notif_str[-100:].strip()}"
@@ -201,7 +376,7 @@ def assisted_flow(
 		time=time,
 		metric_name=metric_name,
 		network=network,
-		metric_state=str(start_metric_state),
+		metric_state=metric_state,
 	)
 	agent.chat_history += new_ch
 	for_training_chat_history += new_ch
@@ -213,59 +388,96 @@ def assisted_flow(
 	err_acc = ""
 	regen = False
 	success = False
-	for i in range(3):
-		try:
-			if regen:
-				logger.info("Attempt to regenerate research code...")
+	if best_of_n is not None:
+		if not prev_strat:
+			first_gen = partial(
+				agent.gen_research_code_on_first, apis=apis, network=network
+			)
+		else:
+			first_gen = partial(
+				agent.gen_research_code,
+				notifications_str=notif_str if notif_str else "Fresh",
+				prev_strategy=prev_strat.summarized_desc if prev_strat else "",
+				apis=apis,
+				rag_summary=rag_summary,
+				before_metric_state=str(rag_start_metric_state) or "",
+				after_metric_state=str(rag_end_metric_state) or "",
+			)
 
-				if new_ch.get_latest_instruction() == "":
-					logger.warning("No instruction found on chat history")
-				if new_ch.get_latest_response() == "":
-					logger.warning("No response found on chat history")
+		research_result, attempt_chs = gen_code_best_of_n(
+			agent, first_gen, "trader_research_code", best_of_n
+		)
+		for new_ch in attempt_chs:
+			for_training_chat_history += new_ch
 
-				research_code_result, new_ch = agent.gen_better_code(
-					research_code=new_ch.get_latest_response(),
-					errors=err_acc,
-				)
-				research_code = research_code_result.unwrap()
-			else:
-				if not prev_strat:
-					research_code_result, new_ch = agent.gen_research_code_on_first(
-						apis=apis, network=network
+		if err := research_result.err():
+			logger.error(f"Best-of-N failed on research code generation, err: \n{err}")
+		else:
+			research_code, research_code_output = research_result.unwrap()
+			success = True
+	else:
+		for i in range(3):
+			try:
+				if regen:
+					logger.info("Attempt to regenerate research code...")
+
+					if new_ch.get_latest_instruction() == "":
+						logger.warning("No instruction found on chat history")
+					if new_ch.get_latest_response() == "":
+						logger.warning("No response found on chat history")
+
+					research_code_result, new_ch = agent.gen_better_code(
+						research_code=new_ch.get_latest_response(),
+						errors=err_acc,
 					)
+					log_token_usage(agent.genner, "research")
 					research_code = research_code_result.unwrap()
 				else:
-					research_code_result, new_ch = agent.gen_research_code(
-						notifications_str=notif_str if notif_str else "Fresh",
-						prev_strategy=prev_strat.summarized_desc if prev_strat else "",
-						apis=apis,
-						rag_summary=rag_summary,
-						before_metric_state=str(rag_start_metric_state) or "",
-						after_metric_state=str(rag_end_metric_state) or "",
+					if not prev_strat:
+						research_code_result, new_ch = agent.gen_research_code_on_first(
+							apis=apis, network=network
+						)
+						log_token_usage(agent.genner, "research")
+						research_code = research_code_result.unwrap()
+					else:
+						research_code_result, new_ch = agent.gen_research_code(
+							notifications_str=notif_str if notif_str else "Fresh",
+							prev_strategy=prev_strat.summarized_desc
+							if prev_strat
+							else "",
+							apis=apis,
+							rag_summary=rag_summary,
+							before_metric_state=str(rag_start_metric_state) or "",
+							after_metric_state=str(rag_end_metric_state) or "",
+						)
+						log_token_usage(agent.genner, "research")
+						research_code = research_code_result.unwrap()
+
+				# logger.info(f"Response: {new_ch.get_latest_response()}")
+				# Temporarily avoid new chat to reduce cost
+				# agent.chat_history += new_ch
+				for_training_chat_history += new_ch
+
+				logger.info("Running the resulting research code in conatiner...")
+				code_execution_result = agent.container_manager.run_code_in_con(
+					research_code, "trader_research_code"
+				)
+				research_code_output, _ = code_execution_result.unwrap()
+
+				success = True
+				break
+			except UnwrapError as e:
+				e = e.result.err()
+				if regen:
+					logger.error(
+						f"Regen failed on research code generation..., err: \n{e}"
 					)
-					research_code = research_code_result.unwrap()
-
-			# logger.info(f"Response: {new_ch.get_latest_response()}")
-			# Temporarily avoid new chat to reduce cost
-			# agent.chat_history += new_ch
-			for_training_chat_history += new_ch
-
-			logger.info("Running the resulting research code in conatiner...")
-			code_execution_result = agent.container_manager.run_code_in_con(
-				research_code, "trader_research_code"
-			)
-			research_code_output, _ = code_execution_result.unwrap()
-
-			success = True
-			break
-		except UnwrapError as e:
-			e = e.result.err()
-			if regen:
-				logger.error(f"Regen failed on research code generation..., err: \n{e}")
-			else:
-				logger.error(f"Failed on first research code generation..., err: \n{e}")
-			regen = True
-			err_acc += f"\n{str(e)}"
+				else:
+					logger.error(
+						f"Failed on first research code generation..., err: \n{e}"
+					)
+				regen = True
+				err_acc += f"\n{str(e)}"
 
 	if not success:
 		logger.info(
@@ -289,6 +501,7 @@ def assisted_flow(
 				research_output_str=research_code_output,
 				network=network,
 			)
+			log_token_usage(agent.genner, "strategy")
 			strategy_output = strategy_output_result.unwrap()
 
 			# logger.info(f"Response: {new_ch.get_latest_response()}")
@@ -321,47 +534,65 @@ def assisted_flow(
 	err_acc = ""
 	regen = False
 	success = False
-	for i in range(10):
-		try:
-			if regen:
-				logger.info("Regenning on address research...")
+	if best_of_n is not None:
+		address_result, attempt_chs = gen_code_best_of_n(
+			agent,
+			partial(agent.gen_account_research_code, strategy_output=strategy_output),
+			"trader_address_research",
+			best_of_n,
+		)
+		for new_ch in attempt_chs:
+			for_training_chat_history += new_ch
+
+		if err := address_result.err():
+			logger.error(f"Best-of-N failed on address research code, err: \n{err}")
+		else:
+			address_research_code, address_research_output = address_result.unwrap()
+			success = True
+	else:
+		for i in range(10):
+			try:
+				if regen:
+					logger.info("Regenning on address research...")
 
-				if new_ch.get_latest_instruction() == "":
-					logger.warning("No instruction found on chat history")
-				if new_ch.get_latest_response() == "":
-					logger.warning("No response found on chat history")
+					if new_ch.get_latest_instruction() == "":
+						logger.warning("No instruction found on chat history")
+					if new_ch.get_latest_response() == "":
+						logger.warning("No response found on chat history")
 
-				address_research_code_result, new_ch = agent.gen_better_code(
-					research_code=new_ch.get_latest_response(),
-					errors=err_acc,
-				)
-				address_research_code = address_research_code_result.unwrap()
-			else:
-				address_research_code_result, new_ch = agent.gen_account_research_code(
-					strategy_output=strategy_output
-				)
+					address_research_code_result, new_ch = agent.gen_better_code(
+						research_code=new_ch.get_latest_response(),
+						errors=err_acc,
+					)
+				else:
+					address_research_code_result, new_ch = (
+						agent.gen_account_research_code(strategy_output=strategy_output)
+					)
+				log_token_usage(agent.genner, "address research")
 				address_research_code = address_research_code_result.unwrap()
 
-			# logger.info(f"Response: {new_ch.get_latest_response()}")
-			# Temporarily avoid new chat to reduce cost
-			# agent.chat_history += new_ch
-			for_training_chat_history += new_ch
+				# logger.info(f"Response: {new_ch.get_latest_response()}")
+				# Temporarily avoid new chat to reduce cost
+				# agent.chat_history += new_ch
+				for_training_chat_history += new_ch
 
-			logger.info("Running the resulting address research code in conatiner...")
-			code_execution_result = agent.container_manager.run_code_in_con(
-				address_research_code, "trader_address_research"
-			)
-			address_research_output, _ = code_execution_result.unwrap()
-			success = True
-			break
-		except UnwrapError as e:
-			e = e.result.err()
-			if regen:
-				logger.error(f"Regen failed on address research, err: \n{e}")
-			else:
-				logger.error(f"Failed on first address research code, err: \n{e}")
-			regen = True
-			err_acc += f"\n{str(e)}"
+				logger.info(
+					"Running the resulting address research code in conatiner..."
+				)
+				code_execution_result = agent.container_manager.run_code_in_con(
+					address_research_code, "trader_address_research"
+				)
+				address_research_output, _ = code_execution_result.unwrap()
+				success = True
+				break
+			except UnwrapError as e:
+				e = e.result.err()
+				if regen:
+					logger.error(f"Regen failed on address research, err: \n{e}")
+				else:
+					logger.error(f"Failed on first address research code, err: \n{e}")
+				regen = True
+				err_acc += f"\n{str(e)}"
 
 	if not success:
 		logger.info(
@@ -378,53 +609,78 @@ def assisted_flow(
 	code_output = ""
 	success = False
 	regen = False
-	for i in range(3):
-		try:
-			if regen:
-				logger.info("Regenning on trading code...")
+	if best_of_n is not None:
+		trading_result, attempt_chs = gen_code_best_of_n(
+			agent,
+			partial(
+				agent.gen_trading_code,
+				strategy_output=strategy_output,
+				address_research=address_research_output,
+				trading_instruments=trading_instruments,
+				metric_state=str(start_metric_state),
+				agent_id=agent.agent_id,
+				txn_service_url=txn_service_url,
+				session_id=session_id,
+			),
+			"trader_trading_code",
+			best_of_n,
+		)
+		for new_ch in attempt_chs:
+			for_training_chat_history += new_ch
+
+		if err := trading_result.err():
+			logger.error(f"Best-of-N failed on trading code, err: \n{err}")
+		else:
+			trading_code, trading_code_output = trading_result.unwrap()
+			success = True
+	else:
+		for i in range(3):
+			try:
+				if regen:
+					logger.info("Regenning on trading code...")
 
-				if new_ch.get_latest_instruction() == "":
-					logger.warning("No instruction found on chat history")
-				if new_ch.get_latest_response() == "":
-					logger.warning("No response found on chat history")
+					if new_ch.get_latest_instruction() == "":
+						logger.warning("No instruction found on chat history")
+					if new_ch.get_latest_response() == "":
+						logger.warning("No response found on chat history")
 
-				trading_code_result, new_ch = agent.gen_better_code(
-					research_code=new_ch.get_latest_response(),
-					errors=err_acc,
-				)
-				trading_code = trading_code_result.unwrap()
-			else:
-				trading_code_result, new_ch = agent.gen_trading_code(
-					strategy_output=strategy_output,
-					address_research=address_research_output,
-					trading_instruments=trading_instruments,
-					metric_state=str(start_metric_state),
-					agent_id=agent.agent_id,
-					txn_service_url=txn_service_url,
-					session_id=session_id,
-				)
+					trading_code_result, new_ch = agent.gen_better_code(
+						research_code=new_ch.get_latest_response(),
+						errors=err_acc,
+					)
+				else:
+					trading_code_result, new_ch = agent.gen_trading_code(
+						strategy_output=strategy_output,
+						address_research=address_research_output,
+						trading_instruments=trading_instruments,
+						metric_state=str(start_metric_state),
+						agent_id=agent.agent_id,
+						txn_service_url=txn_service_url,
+						session_id=session_id,
+					)
+				log_token_usage(agent.genner, "trading")
 				trading_code = trading_code_result.unwrap()
 
-			# logger.info(f"Response: {new_ch.get_latest_response()}")
-			# Temporarily avoid new chat to reduce cost
-			# agent.chat_history += new_ch
-			for_training_chat_history += new_ch
+				# logger.info(f"Response: {new_ch.get_latest_response()}")
+				# Temporarily avoid new chat to reduce cost
+				# agent.chat_history += new_ch
+				for_training_chat_history += new_ch
 
-			logger.info("Running the resulting trading code in conatiner...")
-			code_execution_result = agent.container_manager.run_code_in_con(
-				trading_code, "trader_trading_code"
-			)
-			trading_code_output, _ = code_execution_result.unwrap()
-			success = True
-			break
-		except UnwrapError as e:
-			e = e.result.err()
-			if regen:
-				logger.error(f"Regen failed on trading code, err: \n{e}")
-			else:
-				logger.error(f"Failed on first trading code, err: \n{e}")
-			regen = True
-			err_acc += f"\n{str(e)}"
+				logger.info("Running the resulting trading code in conatiner...")
+				code_execution_result = agent.container_manager.run_code_in_con(
+					trading_code, "trader_trading_code"
+				)
+				trading_code_output, _ = code_execution_result.unwrap()
+				success = True
+				break
+			except UnwrapError as e:
+				e = e.result.err()
+				if regen:
+					logger.error(f"Regen failed on trading code, err: \n{e}")
+				else:
+					logger.error(f"Failed on first trading code, err: \n{e}")
+				regen = True
+				err_acc += f"\n{str(e)}"
 
 	if not success:
 		logger.info("Failed generating output of trading code after 3 times...")
@@ -435,6 +691,8 @@ def assisted_flow(
 	agent.db.insert_chat_history(session_id, for_training_chat_history)
 
 	end_metric_state = metric_fn()
+	if metric_name == "wallet" and metric_store is not None:
+		metric_store.record(end_metric_state)
 	agent.db.insert_wallet_snapshot(
 		snapshot_id=f"{nanoid(8)}-{session_id}-{start_metric_state['wallet_address']}",
 		agent_id=agent.agent_id,
@@ -449,20 +707,24 @@ def assisted_flow(
         USD Value After: {end_metric_state["total_value_usd"]}
     """)
 
-	summarized_code = summarizer(
+	logger.info("Summarizing code and strategy...")
+	summarized_code, summarized_desc = summarize_all(
+		summarizer,
 		[
-			trading_code,
-			"Summarize the code above in points",
-		]
+			[
+				trading_code,
+				"Summarize the code above in points",
+			],
+			[strategy_output],
+		],
 	)
-	logger.info("Summarizing code...")
 	logger.info(f"Summarized code: \n{summarized_code}")
 
 	logger.info("Saving strategy and its result...")
 	agent.db.insert_strategy_and_result(
 		agent_id=agent.agent_id,
 		strategy_result=StrategyInsertData(
-			summarized_desc=summarizer([strategy_output]),
+			summarized_desc=summarized_desc,
 			full_desc=strategy_output,
 			parameters={
 				"apis": apis,
@@ -1,3 +1,4 @@
+import threading
 from abc import ABC, abstractmethod
 from typing import Callable, List, Tuple
 from ollama import ChatResponse, chat
@@ -6,7 +7,7 @@ from result import Err, Ok, Result
 from src.config import (
 	OllamaConfig,
 )
-from src.my_types import ChatHistory, Message
+from src.my_types import ChatHistory, Message, TokenUsage
 
 
 class Genner(ABC):
@@ -23,6 +24,21 @@ class Genner(ABC):
 		"""
 		self.identifier = identifier
 		self.do_stream = do_stream
+		# Token accounting is kept per thread, so callers sharing a genner
+		# concurrently each see the usage of their own completion
+		self._usage = threading.local()
+
+	@property
+	def last_usage(self) -> TokenUsage | None:
+		"""
+		Token accounting of the most recent completion made from this thread,
+		when the backend reports it.
+		"""
+		return getattr(self._usage, "value", None)
+
+	@last_usage.setter
+	def last_usage(self, usage: TokenUsage | None) -> None:
+		self._usage.value = usage
 
 	@abstractmethod
 	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
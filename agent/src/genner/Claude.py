@@ -5,8 +5,8 @@ import yaml
 from anthropic import Anthropic, TextEvent
 from result import Err, Ok, Result
 from src.config import ClaudeConfig
-from src.helper import extract_content
-from src.my_types import ChatHistory, Message
+from src.helper import extract_content, with_cache_control
+from src.my_types import ChatHistory, Message, TokenUsage
 
 from .Base import Genner
 
@@ -41,7 +41,10 @@ class ClaudeGenner(Genner):
 
 		This method sends the chat history to the Claude API and retrieves
 		a completion response, with optional streaming support. It separates
-		the system message from the rest of the chat history.
+		the system message from the rest of the chat history. With prompt
+		caching enabled, the system prompt and the accumulated history before
+		the latest message are marked as cache breakpoints, so repeated calls
+		within a cycle only pay full price for the newest turn.
 
 		Args:
 			messages (ChatHistory): Chat history containing the conversation context
@@ -56,7 +59,16 @@ class ClaudeGenner(Genner):
 		system = system_message.content
 		ch = ChatHistory(messages.messages[1:])
 
+		native_messages = ch.as_native()
+		system_param = system
+		if self.config.prompt_caching:
+			system_param = with_cache_control(
+				[{"role": "system", "content": system}], [0]
+			)[0]["content"]
+			native_messages = with_cache_control(native_messages, [-2])
+
 		final_response = ""
+		self.last_usage = None
 
 		try:
 			if self.do_stream:
@@ -65,8 +77,8 @@ class ClaudeGenner(Genner):
 				with self.client.messages.stream(
 					model="claude-3-opus-20240229",
 					max_tokens=1024,
-					messages=ch.as_native(),  # type: ignore
-					system=system,
+					messages=native_messages,  # type: ignore
+					system=system_param,  # type: ignore
 				) as stream:
 					token_counts = 0
 					for chunk in stream:
@@ -78,15 +90,20 @@ class ClaudeGenner(Genner):
 							token_counts += 1
 							if token_counts >= self.config.max_tokens:
 								break
+
+					self.last_usage = self._to_token_usage(
+						stream.current_message_snapshot.usage
+					)
 			else:
 				response = self.client.messages.create(
 					model=self.config.model,  # e.g. "claude-3-opus-20240229"
-					messages=ch.as_native(),  # type: ignore
+					messages=native_messages,  # type: ignore
 					max_tokens=self.config.max_tokens,
-					system=system,
+					system=system_param,  # type: ignore
 				)
 
 				final_response = response.content[0].text  # type: ignore
+				self.last_usage = self._to_token_usage(response.usage)
 
 			assert isinstance(final_response, str)
 		except AssertionError as e:
@@ -98,6 +115,24 @@ class ClaudeGenner(Genner):
 
 		return Ok(final_response)
 
+	@staticmethod
+	def _to_token_usage(usage) -> TokenUsage:
+		"""
+		Convert Anthropic usage into a TokenUsage.
+
+		Anthropic's `input_tokens` excludes cache reads and writes, so they are
+		added back to get the total prompt size.
+		"""
+		cache_read = usage.cache_read_input_tokens or 0
+		cache_write = usage.cache_creation_input_tokens or 0
+
+		return TokenUsage(
+			input_tokens=usage.input_tokens + cache_read + cache_write,
+			cached_input_tokens=cache_read,
+			cache_write_tokens=cache_write,
+			output_tokens=usage.output_tokens,
+		)
+
 	def generate_code(
 		self, messages: ChatHistory, blocks: List[str] = [""]
 	) -> Result[Tuple[List[str], str], str]:
@@ -10,7 +10,7 @@ from result import Err, Ok, Result
 from src.config import DeepseekConfig
 from src.helper import extract_content
 from src.client.openrouter import OpenRouter
-from src.my_types import ChatHistory, Message
+from src.my_types import ChatHistory, Message, TokenUsage
 
 from .Base import Genner
 
@@ -56,6 +56,7 @@ class DeepseekGenner(Genner):
 				Err(str): Error message if the API call fails
 		"""
 		final_response = ""
+		self.last_usage = None
 
 		try:
 			if isinstance(self.client, OpenAI):
@@ -136,6 +137,7 @@ class DeepseekGenner(Genner):
 						max_tokens=self.config.max_tokens,
 						temperature=self.config.temperature,
 					)
+				self.last_usage = TokenUsage.from_openai(self.client.last_usage)
 				assert isinstance(final_response, str)
 		except AssertionError as e:
 			return Err(f"DeepseekGenner.ch_completion: {e}")
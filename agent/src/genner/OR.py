@@ -1,15 +1,20 @@
 import re
-from typing import Callable, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 import yaml
 from result import Err, Ok, Result
 from src.client.openrouter import OpenRouter
 from src.config import OpenRouterConfig
-from src.helper import extract_content
-from src.my_types import ChatHistory, Message
+from src.helper import extract_content, with_cache_control
+from src.my_types import ChatHistory, Message, TokenUsage
 
 from .Base import Genner
 
+# Models that only cache prompts marked with cache-control breakpoints
+EXPLICIT_CACHE_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+# Models whose providers cache long prompt prefixes automatically
+IMPLICIT_CACHE_MODEL_PREFIXES = ("openai/", "deepseek/", "x-ai/")
+
 
 class OpenRouterGenner(Genner):
 	def __init__(
@@ -35,6 +40,42 @@ class OpenRouterGenner(Genner):
 		self.config = config
 		self.stream_fn = stream_fn
 
+	def _prepare_messages(self, messages: ChatHistory) -> List[Dict[str, Any]]:
+		"""
+		Convert the chat history into the native payload, applying prompt caching.
+
+		Models with explicit caching get breakpoints on the system prompt and on
+		the accumulated history before the latest message. Models with implicit
+		caching are sent as is. For the rest, older turns are trimmed to
+		`max_history_messages` when configured, since there is no cache to
+		amortise resending them.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+
+		Returns:
+			List[Dict[str, Any]]: Messages ready for the OpenRouter payload
+		"""
+		model = self.config.model
+
+		if model.startswith(EXPLICIT_CACHE_MODEL_PREFIXES):
+			if not self.config.prompt_caching:
+				return messages.as_native()
+			breakpoints = [-2]
+			if messages.messages and messages.messages[0].role == "system":
+				breakpoints.append(0)
+			return with_cache_control(messages.as_native(), breakpoints)
+
+		if model.startswith(IMPLICIT_CACHE_MODEL_PREFIXES):
+			return messages.as_native()
+
+		if self.config.max_history_messages is not None:
+			return messages.trim_older_turns(
+				self.config.max_history_messages
+			).as_native()
+
+		return messages.as_native()
+
 	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
 		"""
 		Generate a completion using the Claude API.
@@ -51,13 +92,15 @@ class OpenRouterGenner(Genner):
 			Err(str): Error message if the API call fails
 		"""
 		final_response = ""
+		self.last_usage = None
+		native_messages = self._prepare_messages(messages)
 
 		try:
 			if self.do_stream:
 				assert self.stream_fn is not None
 
 				stream_ = self.client.create_chat_completion_stream(
-					messages=messages.as_native(),
+					messages=native_messages,
 					model=self.config.model,
 					max_tokens=self.config.max_tokens,
 					temperature=self.config.temperature,
@@ -85,11 +128,12 @@ class OpenRouterGenner(Genner):
 				self.stream_fn("\n")
 			else:
 				final_response = self.client.create_chat_completion(
-					messages=messages.as_native(),
+					messages=native_messages,
 					model=self.config.model,
 					max_tokens=self.config.max_tokens,
 					temperature=self.config.temperature,
 				)
+			self.last_usage = TokenUsage.from_openai(self.client.last_usage)
 			assert isinstance(final_response, str)
 		except AssertionError as e:
 			return Err(
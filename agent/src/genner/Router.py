@@ -0,0 +1,320 @@
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from loguru import logger
+from result import Err, Result
+
+from src.config import RouterConfig
+from src.my_types import ChatHistory, TokenUsage
+
+from .Base import Genner
+
+T = TypeVar("T")
+
+
+class BackendStats:
+	"""
+	Rolling latency and error statistics for a single backend.
+
+	Only the last `window_size` calls are kept, so a backend that recovers
+	from an outage becomes healthy again once its bad samples age out.
+	"""
+
+	def __init__(self, window_size: int):
+		"""
+		Initialize empty rolling windows.
+
+		Args:
+			window_size (int): Number of recent calls to keep
+		"""
+		self.latencies: deque[float] = deque(maxlen=window_size)
+		self.outcomes: deque[bool] = deque(maxlen=window_size)
+		self.lock = Lock()
+
+	def record(self, latency: float, ok: bool) -> None:
+		"""
+		Record the outcome of one call.
+
+		Latency is only recorded for successful calls, failures are fast more
+		often than not and would make a broken backend look attractive.
+
+		Args:
+			latency (float): Wall time of the call in seconds
+			ok (bool): Whether the call succeeded
+		"""
+		with self.lock:
+			if ok:
+				self.latencies.append(latency)
+			self.outcomes.append(ok)
+
+	def percentile(self, q: float) -> float | None:
+		"""
+		Nearest-rank percentile of recorded latencies.
+
+		Args:
+			q (float): Percentile in the range [0, 100]
+
+		Returns:
+			float | None: The latency in seconds, or None when there are no samples
+		"""
+		with self.lock:
+			if not self.latencies:
+				return None
+			ordered = sorted(self.latencies)
+		index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+		return ordered[index]
+
+	@property
+	def p50(self) -> float | None:
+		return self.percentile(50)
+
+	@property
+	def p95(self) -> float | None:
+		return self.percentile(95)
+
+	@property
+	def samples(self) -> int:
+		with self.lock:
+			return len(self.outcomes)
+
+	@property
+	def error_rate(self) -> float:
+		with self.lock:
+			if not self.outcomes:
+				return 0.0
+			return self.outcomes.count(False) / len(self.outcomes)
+
+
+class RouterGenner(Genner):
+	def __init__(
+		self,
+		backends: Dict[str, Genner],
+		config: RouterConfig,
+	):
+		"""
+		Initialize the routing generator.
+
+		This constructor wraps several already-built genners. Each call is sent
+		to the fastest healthy backend according to its rolling p50 latency,
+		failing over to the next one on error. When hedging is enabled and the
+		primary has not answered within its own p95, a duplicate request is sent
+		to the runner-up and whichever finishes first wins.
+
+		Args:
+			backends (Dict[str, Genner]): Backend name to genner, in preference order
+			config (RouterConfig): Routing and hedging configuration
+		"""
+		super().__init__("router", False)
+		assert backends, "RouterGenner needs at least one backend"
+
+		self.backends = backends
+		self.config = config
+		self.stats: Dict[str, BackendStats] = {
+			name: BackendStats(config.window_size) for name in backends
+		}
+		self.executor = ThreadPoolExecutor(
+			max_workers=max(2, len(backends) * 2), thread_name_prefix="genner-router"
+		)
+
+	def is_healthy(self, name: str) -> bool:
+		"""
+		Check whether a backend's recent error rate is acceptable.
+
+		Backends without enough samples are always considered healthy so that
+		they get a chance to build up statistics.
+		"""
+		stats = self.stats[name]
+		if stats.samples < self.config.min_samples:
+			return True
+		return stats.error_rate <= self.config.max_error_rate
+
+	def ranked_backends(self) -> List[str]:
+		"""
+		Order backends from most to least preferred.
+
+		Healthy backends come first, sorted by p50 latency. Backends without
+		latency data sort ahead of measured ones so they get explored, and the
+		configured order breaks ties.
+
+		Returns:
+			List[str]: Backend names in routing order
+		"""
+		order = list(self.backends.keys())
+
+		def key(name: str) -> Tuple[bool, float, int]:
+			p50 = self.stats[name].p50
+			return (
+				not self.is_healthy(name),
+				p50 if p50 is not None else 0.0,
+				order.index(name),
+			)
+
+		return sorted(order, key=key)
+
+	def _hedge_delay(self, name: str) -> float | None:
+		"""
+		Seconds to wait on `name` before firing a hedged request, or None when
+		hedging is disabled or there is not enough data for a p95.
+		"""
+		if not self.config.hedge:
+			return None
+		stats = self.stats[name]
+		p95 = stats.p95
+		if p95 is None or len(stats.latencies) < self.config.min_samples:
+			return None
+		return max(p95, self.config.hedge_min_delay)
+
+	def _timed_call(
+		self, name: str, call: Callable[[Genner], Result[T, str]]
+	) -> Tuple[str, Result[T, str], TokenUsage | None]:
+		start = time.monotonic()
+		try:
+			result = call(self.backends[name])
+		except Exception as e:
+			result = Err(f"RouterGenner.{name}: An unexpected error occurred: \n{e}")
+		self.stats[name].record(time.monotonic() - start, result.is_ok())
+		# Backend usage is per thread, so it is read here in the worker
+		return name, result, self.backends[name].last_usage
+
+	def _dispatch(self, call: Callable[[Genner], Result[T, str]]) -> Result[T, str]:
+		"""
+		Route one call across the backends.
+
+		The ranked backends are consumed in order. While a request is in flight
+		and has outlived its hedge delay, the next backend is fired alongside
+		it. The first Ok result wins; the losers are cancelled if they have not
+		started yet, otherwise their results are discarded.
+
+		Args:
+			call (Callable[[Genner], Result]): The genner method invocation to route
+
+		Returns:
+			Result[T, str]: The first successful result, or the accumulated errors
+		"""
+		queue = self.ranked_backends()
+		in_flight: Dict[Future, str] = {}
+		errors: List[str] = []
+
+		def launch() -> str:
+			name = queue.pop(0)
+			in_flight[self.executor.submit(self._timed_call, name, call)] = name
+			return name
+
+		primary = launch()
+		hedge_delay = self._hedge_delay(primary)
+
+		while in_flight:
+			timeout = hedge_delay if queue and len(in_flight) == 1 else None
+			done, _ = wait(
+				list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED
+			)
+
+			if not done:
+				hedged = launch()
+				hedge_delay = None
+				logger.info(
+					f"RouterGenner: {primary} exceeded its p95, hedging with {hedged}"
+				)
+				continue
+
+			for future in done:
+				in_flight.pop(future)
+				name, result, usage = future.result()
+
+				if result.is_ok():
+					for loser in in_flight:
+						loser.cancel()
+					self.last_usage = usage
+					return result
+
+				errors.append(f"{name}: {result.unwrap_err()}")
+
+			if not in_flight and queue:
+				primary = launch()
+				hedge_delay = self._hedge_delay(primary)
+
+		return Err("RouterGenner: All backends failed: \n" + "\n".join(errors))
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		"""
+		Generate a completion on the fastest healthy backend.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+
+		Returns:
+			Result[str, str]:
+				Ok(str): The generated text if successful
+				Err(str): Error messages of every backend tried
+		"""
+		return self._dispatch(lambda genner: genner.ch_completion(messages))
+
+	def generate_code(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[str], str], str]:
+		"""
+		Generate code on the fastest healthy backend.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into code
+
+		Returns:
+			Result[Tuple[List[str], str], str]:
+				Ok(Tuple[List[str], str]): Processed code blocks and the raw response
+				Err(str): Error messages of every backend tried
+		"""
+		return self._dispatch(lambda genner: genner.generate_code(messages, blocks))
+
+	def generate_list(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[List[str]], str], str]:
+		"""
+		Generate lists on the fastest healthy backend.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into lists
+
+		Returns:
+			Result[Tuple[List[List[str]], str], str]:
+				Ok(Tuple[List[List[str]], str]): Processed lists and the raw response
+				Err(str): Error messages of every backend tried
+		"""
+		return self._dispatch(lambda genner: genner.generate_list(messages, blocks))
+
+	def extract_code(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[str], str]:
+		"""
+		Extract code blocks using the first configured backend's parser.
+		"""
+		return next(iter(self.backends.values())).extract_code(response, blocks)
+
+	def extract_list(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[List[str]], str]:
+		"""
+		Extract lists using the first configured backend's parser.
+		"""
+		return next(iter(self.backends.values())).extract_list(response, blocks)
+
+	def get_stats(self) -> Dict[str, Dict[str, float | int | None]]:
+		"""
+		Snapshot of per-backend routing statistics, for logging.
+
+		Returns:
+			Dict[str, Dict[str, float | int | None]]: p50, p95, error rate and sample count per backend
+		"""
+		return {
+			name: {
+				"p50": stats.p50,
+				"p95": stats.p95,
+				"error_rate": stats.error_rate,
+				"samples": stats.samples,
+			}
+			for name, stats in self.stats.items()
+		}
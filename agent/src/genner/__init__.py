@@ -1,3 +1,4 @@
+from copy import copy
 from typing import Callable
 
 from anthropic import Anthropic
@@ -10,10 +11,12 @@ from src.config import (
 	OAIConfig,
 	OllamaConfig,
 	OpenRouterConfig,
+	RouterConfig,
 )
 from src.genner.Claude import ClaudeGenner
 from src.genner.OAI import OAIGenner
 from src.genner.OR import OpenRouterGenner
+from src.genner.Router import RouterGenner
 
 from .Base import Genner
 from .Deepseek import DeepseekGenner
@@ -22,7 +25,7 @@ from tests.mock_genner.MockGenner import MockGenner
 # from src.types import ChatHistory
 from src.my_types import ChatHistory, Message
 
-__all__ = ["get_genner", "QwenGenner", "OllamaConfig"]
+__all__ = ["get_genner", "QwenGenner", "OllamaConfig", "RouterGenner"]
 
 
 class BackendException(Exception):
@@ -46,6 +49,7 @@ available_backends = [
 	"gemini",
 	"claude",
 	"qwq",
+	"router",
 ]
 
 
@@ -63,6 +67,7 @@ def get_genner(
 	gemini_config: OpenRouterConfig = OpenRouterConfig(),
 	llama_config: OAIConfig = OAIConfig(),
 	qwq_config: OpenRouterConfig = OpenRouterConfig(),
+	router_config: RouterConfig = RouterConfig(),
 ) -> Genner:
 	"""
 	Get a genner instance based on the backend.
@@ -74,6 +79,7 @@ def get_genner(
 		deepseek_local_client (OpenAI): OpenAI client but endpoint are pointed towards local endpoint for deepseek-r1.
 		deepseek_config (DeepseekConfig, optional): The configuration for the Deepseek backend. Defaults to DeepseekConfig().
 		qwen_config (QwenConfig, optional): The configuration for the Qwen backend. Defaults to QwenConfig().
+		router_config (RouterConfig, optional): Backends and hedging policy for the 'router' backend. Defaults to RouterConfig().
 
 	Raises:
 		BackendException: If the backend is not supported.
@@ -177,6 +183,32 @@ def get_genner(
 			raise Exception("Using backend 'qwq', OpenRouter client is not provided.")
 
 		return OpenRouterGenner(or_client, qwq_config, stream_fn)
+	elif backend == "router":
+		if "router" in router_config.backends:
+			raise BackendException("A router cannot route to another 'router' backend")
+		# Sub-backends get their own config copies since the branches above
+		# mutate them, and no stream_fn since hedged duplicates would interleave.
+		return RouterGenner(
+			backends={
+				name: get_genner(
+					backend=name,
+					stream_fn=None,
+					deepseek_deepseek_client=deepseek_deepseek_client,
+					deepseek_local_client=deepseek_local_client,
+					anthropic_client=anthropic_client,
+					or_client=or_client,
+					llama_client=llama_client,
+					deepseek_config=copy(deepseek_config),
+					claude_config=copy(claude_config),
+					openai_config=copy(openai_config),
+					gemini_config=copy(gemini_config),
+					llama_config=copy(llama_config),
+					qwq_config=copy(qwq_config),
+				)
+				for name in router_config.backends
+			},
+			config=router_config,
+		)
 	elif backend == "mock":
 		return MockGenner()
 	raise BackendException(
@@ -3,7 +3,7 @@ from datetime import datetime
 import os
 import signal
 import re
-from typing import Dict, List
+from typing import Any, Dict, List
 from src.constants import SERVICE_TO_PROMPT, SERVICE_TO_ENV
 import string
 import random
@@ -79,6 +79,47 @@ def extract_content(text: str, block_name: str) -> str:
 	return match.group(1).strip() if match else ""
 
 
+def with_cache_control(
+	messages: List[Dict[str, Any]], indices: List[int]
+) -> List[Dict[str, Any]]:
+	"""
+	Mark messages as prompt cache breakpoints.
+
+	The content of each selected message is converted into a single text part
+	carrying an ephemeral `cache_control` marker, the format used by Anthropic
+	and by OpenRouter for models with explicit prompt caching. Everything up to
+	and including a marked message becomes a cacheable prefix.
+
+	Args:
+	    messages (List[Dict[str, Any]]): Native messages, as returned by `ChatHistory.as_native`
+	    indices (List[int]): Indices of the messages to mark, negative indices allowed
+
+	Returns:
+	    List[Dict[str, Any]]: A new list of messages, the input is left untouched
+
+	Example:
+	    >>> with_cache_control([{"role": "system", "content": "..."}], [0])
+	    [{'role': 'system', 'content': [{'type': 'text', 'text': '...', 'cache_control': {'type': 'ephemeral'}}]}]
+	"""
+	marked = {i % len(messages) for i in indices if -len(messages) <= i < len(messages)}
+
+	return [
+		{
+			**message,
+			"content": [
+				{
+					"type": "text",
+					"text": message["content"],
+					"cache_control": {"type": "ephemeral"},
+				}
+			],
+		}
+		if i in marked and isinstance(message["content"], str)
+		else message
+		for i, message in enumerate(messages)
+	]
+
+
 def services_to_prompts(services: List[str]) -> List[str]:
 	"""
 	Convert service names to detailed prompt descriptions with environment variables.
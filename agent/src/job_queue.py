@@ -0,0 +1,459 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List
+
+from loguru import logger
+
+_SCHEMA = """
+create table if not exists jobs (
+  job_id TEXT PRIMARY KEY,
+  kind TEXT NOT NULL,
+  payload TEXT NOT NULL,
+  state TEXT NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL,
+  dedupe_key TEXT,
+  result TEXT,
+  error TEXT,
+  created_at REAL NOT NULL,
+  run_after REAL NOT NULL,
+  started_at REAL,
+  finished_at REAL,
+  claimed_at REAL,
+  consumed_at REAL
+);
+create index if not exists idx_jobs_state_run_after on jobs (state, run_after);
+create index if not exists idx_jobs_kind_state on jobs (kind, state);
+create index if not exists idx_jobs_dedupe_key on jobs (dedupe_key);
+"""
+
+_COLUMNS = (
+	"job_id, kind, payload, state, attempts, max_attempts, dedupe_key, result, "
+	"error, created_at, run_after, started_at, finished_at, claimed_at, consumed_at"
+)
+
+
+class JobState(str, Enum):
+	PENDING = "pending"  # Waiting for a worker, or for its retry delay to pass
+	RUNNING = "running"
+	SUCCEEDED = "succeeded"
+	FAILED = "failed"  # Out of attempts
+
+
+@dataclass
+class Job:
+	job_id: str
+	kind: str
+	payload: Dict[str, Any]
+	state: JobState
+	attempts: int
+	max_attempts: int
+	dedupe_key: str | None
+	result: Any
+	error: str | None
+	created_at: float
+	run_after: float
+	started_at: float | None
+	finished_at: float | None
+	# Handed out by `claim_finished`, and acknowledged as handled
+	claimed_at: float | None
+	consumed_at: float | None
+
+	@classmethod
+	def from_row(cls, row: tuple) -> "Job":
+		return cls(
+			job_id=row[0],
+			kind=row[1],
+			payload=json.loads(row[2]),
+			state=JobState(row[3]),
+			attempts=row[4],
+			max_attempts=row[5],
+			dedupe_key=row[6],
+			result=json.loads(row[7]) if row[7] is not None else None,
+			error=row[8],
+			created_at=row[9],
+			run_after=row[10],
+			started_at=row[11],
+			finished_at=row[12],
+			claimed_at=row[13],
+			consumed_at=row[14],
+		)
+
+
+@dataclass
+class JobQueueMetrics:
+	# Jobs per state
+	depth: Dict[str, int] = field(default_factory=dict)
+	finished: int = 0
+	failure_rate: float = 0.0
+	# From enqueue to finish, over finished jobs
+	latency_p50_seconds: float = 0.0
+	latency_p95_seconds: float = 0.0
+	# From start of the last attempt to finish
+	run_p50_seconds: float = 0.0
+
+
+JobHandler = Callable[[Dict[str, Any]], Any]
+JobCallback = Callable[[Job], None]
+
+
+class JobQueue:
+	"""
+	Persistent queue of long-running jobs, worked through by a pool of threads.
+
+	Jobs live in SQLite, so they survive restarts: a job that was running
+	when the process died is picked up again by the next `start()`. A job
+	whose handler raises is retried with exponential backoff until it runs
+	out of attempts. Callbacks run when a job finishes either way, and
+	finished results wait in the queue until claimed with `claim_finished`
+	and acknowledged with `ack`.
+	"""
+
+	def __init__(
+		self, db_path: str, retry_delay: float = 30.0, poll_interval: float = 1.0
+	):
+		"""
+		Open or create a queue.
+
+		Args:
+			db_path (str): SQLite database holding the jobs
+			retry_delay (float): Seconds before the first retry, doubled for each later one
+			poll_interval (float): Seconds an idle worker waits before looking for jobs again
+		"""
+		self.db_path = db_path
+		self.retry_delay = retry_delay
+		self.poll_interval = poll_interval
+		self._handlers: Dict[str, JobHandler] = {}
+		self._callbacks: Dict[str, List[JobCallback]] = {}
+		self._threads: List[threading.Thread] = []
+		self._stop = threading.Event()
+		self._wake = threading.Condition()
+		with self._connect() as conn:
+			conn.executescript(_SCHEMA)
+			columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+			# Queues created before claims were acknowledged
+			if "claimed_at" not in columns:
+				conn.execute("ALTER TABLE jobs ADD COLUMN claimed_at REAL")
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+	def register(self, kind: str, handler: JobHandler) -> None:
+		"""
+		Set the function that runs jobs of a kind. It gets the job's payload and
+		returns its result, which must be JSON serialisable.
+		"""
+		self._handlers[kind] = handler
+
+	def on_complete(self, kind: str, callback: JobCallback) -> None:
+		"""
+		Call `callback` with every job of a kind that succeeds or runs out of attempts.
+		"""
+		self._callbacks.setdefault(kind, []).append(callback)
+
+	def enqueue(
+		self,
+		kind: str,
+		payload: Dict[str, Any],
+		max_attempts: int = 3,
+		dedupe_key: str | None = None,
+	) -> str:
+		"""
+		Add a job.
+
+		Args:
+			kind (str): Kind of job, selects the handler
+			payload (Dict[str, Any]): Handler input, must be JSON serialisable
+			max_attempts (int): Runs before the job is failed for good
+			dedupe_key (str | None): If a job with this key is still queued or running, or succeeded and not yet acknowledged, that job is returned instead
+
+		Returns:
+			str: Id of the job
+		"""
+		now = time.time()
+		with self._connect() as conn:
+			conn.execute("BEGIN IMMEDIATE")
+			try:
+				if dedupe_key is not None:
+					row = conn.execute(
+						"""SELECT job_id FROM jobs WHERE dedupe_key = ?
+						AND (state IN (?, ?) OR (state = ? AND consumed_at IS NULL))
+						ORDER BY created_at DESC LIMIT 1""",
+						(
+							dedupe_key,
+							JobState.PENDING.value,
+							JobState.RUNNING.value,
+							JobState.SUCCEEDED.value,
+						),
+					).fetchone()
+					if row is not None:
+						conn.execute("COMMIT")
+						return row[0]
+				job_id = uuid.uuid4().hex
+				conn.execute(
+					"""INSERT INTO jobs (job_id, kind, payload, state, max_attempts, dedupe_key, created_at, run_after)
+					VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+					(
+						job_id,
+						kind,
+						json.dumps(payload),
+						JobState.PENDING.value,
+						max_attempts,
+						dedupe_key,
+						now,
+						now,
+					),
+				)
+				conn.execute("COMMIT")
+			except BaseException:
+				conn.execute("ROLLBACK")
+				raise
+		with self._wake:
+			self._wake.notify()
+		return job_id
+
+	def get(self, job_id: str) -> Job | None:
+		with self._connect() as conn:
+			row = conn.execute(
+				f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)
+			).fetchone()
+		return Job.from_row(row) if row else None
+
+	def jobs(self, kind: str | None = None, state: JobState | None = None) -> List[Job]:
+		query = f"SELECT {_COLUMNS} FROM jobs WHERE 1 = 1"
+		params: List[Any] = []
+		if kind is not None:
+			query += " AND kind = ?"
+			params.append(kind)
+		if state is not None:
+			query += " AND state = ?"
+			params.append(state.value)
+		with self._connect() as conn:
+			rows = conn.execute(query + " ORDER BY created_at", params).fetchall()
+		return [Job.from_row(row) for row in rows]
+
+	def claim_finished(self, kind: str, lease_seconds: float = 3600.0) -> List[Job]:
+		"""
+		Get the succeeded jobs of a kind that are not acknowledged or claimed by
+		someone else, and mark them claimed.
+
+		A claimed job is done with once `ack`ed. Given back with `release`, or
+		not acknowledged within `lease_seconds`, e.g. because the claimer
+		crashed, it is claimable again.
+		"""
+		now = time.time()
+		with self._connect() as conn:
+			rows = conn.execute(
+				f"""UPDATE jobs SET claimed_at = ?
+				WHERE kind = ? AND state = ? AND consumed_at IS NULL
+				AND (claimed_at IS NULL OR claimed_at <= ?)
+				RETURNING {_COLUMNS}""",
+				(now, kind, JobState.SUCCEEDED.value, now - lease_seconds),
+			).fetchall()
+		return sorted((Job.from_row(row) for row in rows), key=lambda j: j.created_at)
+
+	def ack(self, job_ids: List[str]) -> None:
+		"""
+		Mark claimed jobs as handled, so they are never claimed again.
+		"""
+		now = time.time()
+		with self._connect() as conn:
+			conn.executemany(
+				"UPDATE jobs SET consumed_at = ? WHERE job_id = ?",
+				[(now, job_id) for job_id in job_ids],
+			)
+
+	def release(self, job_ids: List[str]) -> None:
+		"""
+		Give claimed jobs back, so the next `claim_finished` gets them again.
+		"""
+		with self._connect() as conn:
+			conn.executemany(
+				"UPDATE jobs SET claimed_at = NULL WHERE job_id = ? AND consumed_at IS NULL",
+				[(job_id,) for job_id in job_ids],
+			)
+
+	def _claim(self) -> Job | None:
+		if not self._handlers:
+			return None
+		kinds = list(self._handlers)
+		now = time.time()
+		with self._connect() as conn:
+			row = conn.execute(
+				f"""UPDATE jobs SET state = ?, started_at = ?, attempts = attempts + 1
+				WHERE job_id = (
+					SELECT job_id FROM jobs
+					WHERE state = ? AND run_after <= ? AND kind IN ({",".join("?" * len(kinds))})
+					ORDER BY run_after LIMIT 1
+				)
+				RETURNING {_COLUMNS}""",
+				(JobState.RUNNING.value, now, JobState.PENDING.value, now, *kinds),
+			).fetchone()
+		return Job.from_row(row) if row else None
+
+	def _finish(self, job: Job, result: Any = None, error: str | None = None) -> Job:
+		now = time.time()
+		if error is None:
+			state, run_after = JobState.SUCCEEDED, job.run_after
+		elif job.attempts < job.max_attempts:
+			state = JobState.PENDING
+			run_after = now + self.retry_delay * 2 ** (job.attempts - 1)
+		else:
+			state, run_after = JobState.FAILED, job.run_after
+		with self._connect() as conn:
+			conn.execute(
+				"""UPDATE jobs SET state = ?, result = ?, error = ?, run_after = ?, finished_at = ?
+				WHERE job_id = ?""",
+				(
+					state.value,
+					json.dumps(result) if error is None else None,
+					error,
+					run_after,
+					now if state != JobState.PENDING else None,
+					job.job_id,
+				),
+			)
+		return self.get(job.job_id)
+
+	def run_one(self) -> bool:
+		"""
+		Run the next due job in the calling thread.
+
+		Returns:
+			bool: Whether there was a job to run
+		"""
+		job = self._claim()
+		if job is None:
+			return False
+		try:
+			result = self._handlers[job.kind](job.payload)
+			finished = self._finish(job, result=result)
+		except Exception as e:
+			logger.warning(
+				f"[Jobs] {job.kind} job {job.job_id} failed on attempt {job.attempts}/{job.max_attempts}: {e}"
+			)
+			finished = self._finish(job, error=f"{type(e).__name__}: {e}")
+
+		if finished.state in (JobState.SUCCEEDED, JobState.FAILED):
+			for callback in self._callbacks.get(job.kind, []):
+				try:
+					callback(finished)
+				except Exception as e:
+					logger.error(
+						f"[Jobs] Callback for {job.kind} job {job.job_id} failed: {e}"
+					)
+		return True
+
+	def _work(self) -> None:
+		while not self._stop.is_set():
+			if self.run_one():
+				continue
+			with self._wake:
+				self._wake.wait(self.poll_interval)
+
+	def recover(self) -> int:
+		"""
+		Put jobs left running by a process that died back in the queue.
+
+		Returns:
+			int: Number of jobs requeued
+		"""
+		with self._connect() as conn:
+			cursor = conn.execute(
+				"UPDATE jobs SET state = ?, run_after = ? WHERE state = ?",
+				(JobState.PENDING.value, time.time(), JobState.RUNNING.value),
+			)
+			return cursor.rowcount
+
+	def start(self, workers: int = 2) -> "JobQueue":
+		"""
+		Requeue interrupted jobs and start the worker threads.
+		"""
+		recovered = self.recover()
+		if recovered:
+			logger.info(f"[Jobs] Requeued {recovered} interrupted jobs")
+		self._stop.clear()
+		self._threads = [
+			threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+			for i in range(workers)
+		]
+		for thread in self._threads:
+			thread.start()
+		return self
+
+	def stop(self, wait: bool = True) -> None:
+		"""
+		Stop the workers once they finish the jobs they are running.
+		"""
+		self._stop.set()
+		with self._wake:
+			self._wake.notify_all()
+		if wait:
+			for thread in self._threads:
+				thread.join()
+		self._threads = []
+
+	def __enter__(self) -> "JobQueue":
+		return self
+
+	def __exit__(self, *exc: Any) -> None:
+		self.stop()
+
+	def wait_idle(self, timeout: float | None = None) -> bool:
+		"""
+		Wait until no job is pending or running.
+
+		Returns:
+			bool: Whether the queue went idle before the timeout
+		"""
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while True:
+			depth = self.metrics().depth
+			if not depth.get(JobState.PENDING.value) and not depth.get(
+				JobState.RUNNING.value
+			):
+				return True
+			if deadline is not None and time.monotonic() >= deadline:
+				return False
+			time.sleep(0.05)
+
+	def metrics(self, kind: str | None = None) -> JobQueueMetrics:
+		"""
+		Get the queue depth, job latencies and failure rate, for one kind or all.
+		"""
+		where, params = ("kind = ?", (kind,)) if kind is not None else ("1 = 1", ())
+		with self._connect() as conn:
+			depth = dict(
+				conn.execute(
+					f"SELECT state, COUNT(*) FROM jobs WHERE {where} GROUP BY state",
+					params,
+				).fetchall()
+			)
+			finished = conn.execute(
+				f"""SELECT state, finished_at - created_at, finished_at - started_at
+				FROM jobs WHERE {where} AND finished_at IS NOT NULL""",
+				params,
+			).fetchall()
+
+		def percentile(values: List[float], q: float) -> float:
+			if not values:
+				return 0.0
+			ordered = sorted(values)
+			return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+		latencies = [row[1] for row in finished]
+		runs = [row[2] for row in finished]
+		failed = sum(1 for row in finished if row[0] == JobState.FAILED.value)
+		return JobQueueMetrics(
+			depth=depth,
+			finished=len(finished),
+			failure_rate=failed / len(finished) if finished else 0.0,
+			latency_p50_seconds=percentile(latencies, 0.5),
+			latency_p95_seconds=percentile(latencies, 0.95),
+			run_p50_seconds=percentile(runs, 0.5),
+		)
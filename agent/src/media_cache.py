@@ -0,0 +1,358 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import requests
+from loguru import logger
+
+# Leading bytes of the image formats we accept, and the extension to store them under
+IMAGE_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+	(b"\xff\xd8\xff", "jpg"),
+	(b"\x89PNG\r\n\x1a\n", "png"),
+	(b"GIF87a", "gif"),
+	(b"GIF89a", "gif"),
+)
+
+CHUNK_SIZE = 64 * 1024
+
+_SCHEMA = """
+create table if not exists media_urls (
+  url_key TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  sha256 TEXT NOT NULL,
+  etag TEXT,
+  last_modified TEXT,
+  checked_at REAL NOT NULL
+);
+create index if not exists idx_media_urls_sha256 on media_urls (sha256);
+create table if not exists media_blobs (
+  sha256 TEXT PRIMARY KEY,
+  path TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  last_access REAL NOT NULL
+);
+create index if not exists idx_media_blobs_last_access on media_blobs (last_access);
+"""
+
+
+class MediaRejected(Exception):
+	"""
+	The response is not something we store: too large or not an image.
+	"""
+
+
+def url_key(url: str) -> str:
+	"""
+	Get a hash of a URL that is the same in every process, unlike `hash()`.
+	"""
+	return hashlib.sha256(url.strip().encode("utf-8")).hexdigest()
+
+
+def sniff_image(head: bytes) -> str | None:
+	"""
+	Get the file extension for an image from its first bytes, None if it is
+	not a supported image.
+	"""
+	for signature, ext in IMAGE_SIGNATURES:
+		if head.startswith(signature):
+			return ext
+	if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+		return "webp"
+	return None
+
+
+@dataclass
+class MediaCacheStats:
+	hits: int = 0
+	revalidated: int = 0
+	downloads: int = 0
+	bytes_downloaded: int = 0
+	deduplicated: int = 0
+	failures: int = 0
+	evictions: int = 0
+
+
+class MediaCache:
+	"""
+	Content-addressed store of downloaded images.
+
+	Files are named by the SHA-256 of their content, so the same image behind
+	many URLs is stored once. An index maps a stable hash of each URL to its
+	file along with the validators the server sent, so a stale entry is
+	checked with a conditional GET instead of downloaded again. Downloads are
+	streamed to disk with a size cap, and the least recently used files are
+	evicted once the store outgrows `max_bytes`.
+	"""
+
+	def __init__(
+		self,
+		directory: str,
+		max_bytes: int = 512 * 1024 * 1024,
+		max_file_bytes: int = 20 * 1024 * 1024,
+		max_age: float = 24 * 3600,
+		timeout: float = 10.0,
+		session: requests.Session | None = None,
+	):
+		"""
+		Open or create a store.
+
+		Args:
+			directory (str): Directory holding the files and the index
+			max_bytes (int): Total size of stored files to evict down to
+			max_file_bytes (int): Largest single file to accept
+			max_age (float): Seconds an entry is used without asking the server whether it changed
+			timeout (float): Seconds to wait for a server
+			session (requests.Session | None): Session to share, a pooled one by default
+		"""
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.max_file_bytes = max_file_bytes
+		self.max_age = max_age
+		self.timeout = timeout
+		if session is None:
+			session = requests.Session()
+			adapter = requests.adapters.HTTPAdapter(pool_maxsize=16)
+			session.mount("http://", adapter)
+			session.mount("https://", adapter)
+		self.session = session
+		self.stats = MediaCacheStats()
+		self.db_path = os.path.join(directory, "index.db")
+		self._url_locks: Dict[str, threading.Lock] = {}
+		self._lock = threading.Lock()
+
+		os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+		os.makedirs(os.path.join(directory, "tmp"), exist_ok=True)
+		with sqlite3.connect(self.db_path) as conn:
+			conn.executescript(_SCHEMA)
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.db_path, timeout=30)
+
+	def _count(self, **deltas: int) -> None:
+		with self._lock:
+			for name, delta in deltas.items():
+				setattr(self.stats, name, getattr(self.stats, name) + delta)
+
+	def _url_lock(self, key: str) -> threading.Lock:
+		with self._lock:
+			return self._url_locks.setdefault(key, threading.Lock())
+
+	def _lookup(self, key: str) -> Tuple[str, str | None, str | None, float] | None:
+		"""
+		Get (path, etag, last_modified, checked_at) of a URL whose file still exists.
+		"""
+		with self._connect() as conn:
+			row = conn.execute(
+				"""SELECT b.path, u.etag, u.last_modified, u.checked_at
+				FROM media_urls u JOIN media_blobs b ON b.sha256 = u.sha256
+				WHERE u.url_key = ?""",
+				(key,),
+			).fetchone()
+		if row is None or not os.path.exists(row[0]):
+			return None
+		return row
+
+	def _touch(self, key: str, checked: bool) -> None:
+		now = time.time()
+		with self._connect() as conn:
+			conn.execute(
+				"""UPDATE media_blobs SET last_access = ?
+				WHERE sha256 = (SELECT sha256 FROM media_urls WHERE url_key = ?)""",
+				(now, key),
+			)
+			if checked:
+				conn.execute(
+					"UPDATE media_urls SET checked_at = ? WHERE url_key = ?", (now, key)
+				)
+
+	def _download(self, url: str, response: requests.Response) -> Tuple[str, str, int]:
+		"""
+		Stream a response body to a temporary file.
+
+		Returns:
+			Tuple[str, str, int]: Temporary path, SHA-256 and size of the body
+		"""
+		length = response.headers.get("Content-Length")
+		if length is not None and int(length) > self.max_file_bytes:
+			raise MediaRejected(
+				f"{length} bytes is over the {self.max_file_bytes} byte cap"
+			)
+
+		digest = hashlib.sha256()
+		size = 0
+		ext = None
+		fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.directory, "tmp"))
+		try:
+			with os.fdopen(fd, "wb") as f:
+				for chunk in response.iter_content(CHUNK_SIZE):
+					if ext is None:
+						ext = sniff_image(chunk[:16])
+						if ext is None:
+							raise MediaRejected("not a supported image")
+					size += len(chunk)
+					if size > self.max_file_bytes:
+						raise MediaRejected(
+							f"more than the {self.max_file_bytes} byte cap"
+						)
+					digest.update(chunk)
+					f.write(chunk)
+			if ext is None:
+				raise MediaRejected("empty body")
+		except BaseException:
+			os.remove(tmp_path)
+			raise
+		self._count(downloads=1, bytes_downloaded=size)
+		return tmp_path, f"{digest.hexdigest()}.{ext}", size
+
+	def _store(
+		self,
+		key: str,
+		url: str,
+		tmp_path: str,
+		name: str,
+		size: int,
+		response: requests.Response,
+	) -> str:
+		sha256 = name.split(".")[0]
+		path = os.path.join(self.directory, "blobs", sha256[:2], name)
+		now = time.time()
+		with self._lock:
+			if os.path.exists(path):
+				os.remove(tmp_path)
+				self.stats.deduplicated += 1
+			else:
+				os.makedirs(os.path.dirname(path), exist_ok=True)
+				os.replace(tmp_path, path)
+		with self._connect() as conn:
+			conn.execute(
+				"""INSERT INTO media_blobs (sha256, path, size, last_access) VALUES (?, ?, ?, ?)
+				ON CONFLICT(sha256) DO UPDATE SET last_access = excluded.last_access""",
+				(sha256, path, size, now),
+			)
+			conn.execute(
+				"""INSERT OR REPLACE INTO media_urls
+				(url_key, url, sha256, etag, last_modified, checked_at)
+				VALUES (?, ?, ?, ?, ?, ?)""",
+				(
+					key,
+					url,
+					sha256,
+					response.headers.get("ETag"),
+					response.headers.get("Last-Modified"),
+					now,
+				),
+			)
+		self._evict(keep=sha256)
+		return path
+
+	def _evict(self, keep: str) -> None:
+		with self._lock, self._connect() as conn:
+			total = conn.execute(
+				"SELECT COALESCE(SUM(size), 0) FROM media_blobs"
+			).fetchone()[0]
+			if total <= self.max_bytes:
+				return
+			for sha256, path, size in conn.execute(
+				"SELECT sha256, path, size FROM media_blobs ORDER BY last_access"
+			).fetchall():
+				if total <= self.max_bytes:
+					break
+				if sha256 == keep:
+					continue
+				if os.path.exists(path):
+					os.remove(path)
+				conn.execute("DELETE FROM media_blobs WHERE sha256 = ?", (sha256,))
+				conn.execute("DELETE FROM media_urls WHERE sha256 = ?", (sha256,))
+				total -= size
+				self.stats.evictions += 1
+
+	def get(self, url: str | None) -> str | None:
+		"""
+		Get the local path of an image, downloading it if needed.
+
+		Args:
+			url (str | None): Image URL
+
+		Returns:
+			str | None: Path of the stored image, None without a URL or if it could not be fetched
+		"""
+		if not url:
+			return None
+		key = url_key(url)
+		with self._url_lock(key):
+			cached = self._lookup(key)
+			if cached is not None and time.time() - cached[3] < self.max_age:
+				self._touch(key, checked=False)
+				self._count(hits=1)
+				return cached[0]
+
+			headers = {}
+			if cached is not None:
+				if cached[1]:
+					headers["If-None-Match"] = cached[1]
+				if cached[2]:
+					headers["If-Modified-Since"] = cached[2]
+			try:
+				with self.session.get(
+					url, headers=headers, stream=True, timeout=self.timeout
+				) as response:
+					if response.status_code == 304 and cached is not None:
+						self._touch(key, checked=True)
+						self._count(revalidated=1)
+						return cached[0]
+					response.raise_for_status()
+					tmp_path, name, size = self._download(url, response)
+					return self._store(key, url, tmp_path, name, size, response)
+			except (requests.RequestException, MediaRejected, OSError) as e:
+				self._count(failures=1)
+				logger.warning(f"[Media] Failed to fetch {url}: {e}")
+				# A copy we already have beats none at all
+				return cached[0] if cached is not None else None
+
+	def prefetch(
+		self, urls: Iterable[str | None], max_workers: int = 8
+	) -> Dict[str, str | None]:
+		"""
+		Fetch many images at once, e.g. for a batch of products.
+
+		Args:
+			urls (Iterable[str | None]): Image URLs, empty ones and duplicates are skipped
+			max_workers (int): Maximum number of downloads at once
+
+		Returns:
+			Dict[str, str | None]: Local path of each image by URL, None where it could not be fetched
+		"""
+		unique = list(dict.fromkeys(url for url in urls if url))
+		if not unique:
+			return {}
+		with ThreadPoolExecutor(
+			max_workers=min(max_workers, len(unique)), thread_name_prefix="media"
+		) as pool:
+			return dict(zip(unique, pool.map(self.get, unique)))
+
+	def total_bytes(self) -> int:
+		with self._connect() as conn:
+			return conn.execute(
+				"SELECT COALESCE(SUM(size), 0) FROM media_blobs"
+			).fetchone()[0]
+
+
+_caches: Dict[str, MediaCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_media_cache(directory: str = "downloaded_images") -> MediaCache:
+	"""
+	Get the process-wide media cache for a directory.
+	"""
+	key = os.path.abspath(directory)
+	with _caches_lock:
+		if key not in _caches:
+			_caches[key] = MediaCache(directory)
+		return _caches[key]
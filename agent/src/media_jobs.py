@@ -0,0 +1,121 @@
+import os
+import threading
+from typing import Any, Dict
+
+from loguru import logger
+
+from src.job_queue import Job, JobHandler, JobQueue, JobState
+
+# Worker threads per process. Each job mostly waits on Replicate, Google or
+# an ffmpeg child process, so a few threads keep them all busy.
+MEDIA_JOB_WORKERS = 2
+
+
+def run_video_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Generate a video on Replicate from `payload["prompt"]`.
+	"""
+	from scripts.replicate_video_generation import generate_video
+
+	video_path = generate_video(payload["prompt"])
+	if video_path is None:
+		raise RuntimeError(f"No video generated for '{payload['prompt']}'")
+	return {"video_path": video_path}
+
+
+def run_tts_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Narrate `payload["script"]` with Google TTS into `payload["output_path"]`.
+	"""
+	from scripts.tts_helper import generate_tts_audio
+
+	return {"audio_path": generate_tts_audio(payload["script"], payload["output_path"])}
+
+
+def run_slideshow_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Render `payload["image_paths"]` and an optional `audio_path` into a slideshow.
+	"""
+	from scripts.slideshow_maker import make_slideshow
+
+	video_path = make_slideshow(
+		payload["image_paths"],
+		audio_path=payload.get("audio_path"),
+		output_path=payload["output_path"],
+		duration_per_image=payload.get("duration_per_image", 2.5),
+		ken_burns=payload.get("ken_burns", False),
+	)
+	return {"video_path": video_path}
+
+
+def run_compose_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Lay narration, music and captions over a video.
+	"""
+	from scripts.video_composer import compose_video
+
+	video_path = compose_video(
+		payload["video_path"],
+		payload["audio_path"],
+		payload.get("music_path"),
+		payload.get("captions_path"),
+		payload["output_path"],
+	)
+	return {"video_path": video_path}
+
+
+def run_render_batch_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Render `payload["jobs"]`, each the fields of a `RenderJob`, across all cores.
+	"""
+	from dataclasses import asdict
+
+	from src.video_batch import BatchRenderer, RenderJob
+
+	report = BatchRenderer().render([RenderJob(**job) for job in payload["jobs"]])
+	# An empty batch has nothing to fail
+	if report.timings and len(report.failed()) == len(report.timings):
+		raise RuntimeError(f"Every render failed: {report.failed()[0].error}")
+	return asdict(report)
+
+
+MEDIA_JOB_HANDLERS: Dict[str, JobHandler] = {
+	"video": run_video_job,
+	"tts": run_tts_job,
+	"slideshow": run_slideshow_job,
+	"compose": run_compose_job,
+	"render_batch": run_render_batch_job,
+}
+
+
+def log_finished_job(job: Job) -> None:
+	if job.state == JobState.SUCCEEDED:
+		logger.info(
+			f"[Jobs] {job.kind} job {job.job_id} done in {job.finished_at - job.created_at:.1f}s: {job.result}"
+		)
+	else:
+		logger.error(
+			f"[Jobs] {job.kind} job {job.job_id} failed after {job.attempts} attempts: {job.error}"
+		)
+
+
+_queues: Dict[str, JobQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_media_jobs(
+	db_path: str = "media_jobs.db", workers: int = MEDIA_JOB_WORKERS
+) -> JobQueue:
+	"""
+	Get the process-wide media job queue for a database, with every media
+	handler registered and its workers started.
+	"""
+	key = os.path.abspath(db_path)
+	with _queues_lock:
+		if key not in _queues:
+			queue = JobQueue(db_path)
+			for kind, handler in MEDIA_JOB_HANDLERS.items():
+				queue.register(kind, handler)
+				queue.on_complete(kind, log_finished_job)
+			_queues[key] = queue.start(workers=workers)
+		return _queues[key]
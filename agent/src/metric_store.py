@@ -0,0 +1,259 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+from loguru import logger
+
+from src.datatypes import WalletStats
+
+# Leading columns of every row, token balances follow
+TIMESTAMP, TOTAL_VALUE_USD, ETH_BALANCE = 0, 1, 2
+FIXED_COLUMNS = 3
+
+HOUR = 3600.0
+
+
+class ColumnarSeries:
+	"""
+	Append-only file of fixed-width float64 rows, read back memory-mapped.
+
+	Rows are appended with plain writes and the mapping is refreshed when the
+	file has grown, so readers never copy the series into memory.
+	"""
+
+	def __init__(self, path: str, width: int):
+		self.path = path
+		self.width = width
+		self._row_bytes = width * np.dtype(np.float64).itemsize
+		self._view: np.ndarray = np.empty((0, width))
+		self._lock = threading.Lock()
+		if os.path.exists(path) and os.path.getsize(path) % self._row_bytes:
+			raise ValueError(f"{path} is not a series of {width}-column rows")
+
+	def append(self, row: np.ndarray) -> None:
+		data = np.asarray(row, dtype=np.float64)
+		if data.shape != (self.width,):
+			raise ValueError(f"Expected a row of {self.width} values, got {data.shape}")
+		with self._lock:
+			with open(self.path, "ab") as f:
+				f.write(data.tobytes())
+
+	def __len__(self) -> int:
+		if not os.path.exists(self.path):
+			return 0
+		return os.path.getsize(self.path) // self._row_bytes
+
+	def view(self) -> np.ndarray:
+		"""
+		Get every row as a read-only (rows, width) array backed by the file.
+		"""
+		rows = len(self)
+		with self._lock:
+			if len(self._view) != rows:
+				self._view = (
+					np.memmap(
+						self.path, dtype=np.float64, mode="r", shape=(rows, self.width)
+					)
+					if rows
+					else np.empty((0, self.width))
+				)
+			return self._view
+
+
+@dataclass
+class WalletSeries:
+	timestamps: np.ndarray
+	total_value_usd: np.ndarray
+	eth_balance: np.ndarray
+	# Token address to its balance column
+	token_balances: Dict[str, np.ndarray]
+
+
+class WalletMetricStore:
+	"""
+	Time series of `WalletStats` samples, one columnar file per wallet.
+
+	Each sample is a row of (timestamp, total_value_usd, eth_balance) and
+	then one balance column per token, up to `max_tokens` tokens per wallet.
+	Windowed queries work on memory-mapped columns, so computing deltas,
+	drawdown or volatility never touches the chain or the price APIs.
+	"""
+
+	def __init__(self, directory: str, max_tokens: int = 32):
+		"""
+		Open or create a store.
+
+		Args:
+			directory (str): Directory holding the series files
+			max_tokens (int): Token balance columns per wallet, later tokens are not recorded
+		"""
+		self.directory = directory
+		self.max_tokens = max_tokens
+		self._series: Dict[str, ColumnarSeries] = {}
+		self._tokens: Dict[str, List[str]] = {}
+		self._lock = threading.Lock()
+		os.makedirs(directory, exist_ok=True)
+
+	def _paths(self, wallet_address: str) -> Tuple[str, str]:
+		base = os.path.join(self.directory, wallet_address.lower())
+		return f"{base}.f64", f"{base}.tokens.json"
+
+	def _open(self, wallet_address: str) -> Tuple[ColumnarSeries, List[str]]:
+		key = wallet_address.lower()
+		with self._lock:
+			if key not in self._series:
+				series_path, tokens_path = self._paths(key)
+				tokens: List[str] = []
+				if os.path.exists(tokens_path):
+					with open(tokens_path) as f:
+						tokens = json.load(f)
+				self._series[key] = ColumnarSeries(
+					series_path, FIXED_COLUMNS + self.max_tokens
+				)
+				self._tokens[key] = tokens
+			return self._series[key], self._tokens[key]
+
+	def record(self, stats: WalletStats) -> None:
+		"""
+		Append one sample, e.g. a `get_wallet_stats` result.
+		"""
+		address = stats["wallet_address"]
+		series, tokens = self._open(address)
+
+		new_tokens = [
+			token_addr.lower()
+			for token_addr in stats["tokens"]
+			if token_addr.lower() not in tokens
+		]
+		if new_tokens:
+			room = self.max_tokens - len(tokens)
+			if len(new_tokens) > room:
+				logger.warning(
+					f"WalletMetricStore: {address} holds more than {self.max_tokens} tokens, "
+					f"not recording {new_tokens[room:]}"
+				)
+			tokens.extend(new_tokens[:room])
+			with open(self._paths(address)[1], "w") as f:
+				json.dump(tokens, f)
+
+		row = np.zeros(series.width)
+		row[TIMESTAMP] = datetime.fromisoformat(stats["timestamp"]).timestamp()
+		row[TOTAL_VALUE_USD] = stats["total_value_usd"]
+		row[ETH_BALANCE] = stats["eth_balance"]
+		columns = {token: i for i, token in enumerate(tokens)}
+		for token_addr, token in stats["tokens"].items():
+			column = columns.get(token_addr.lower())
+			if column is not None:
+				row[FIXED_COLUMNS + column] = token["balance"]
+		series.append(row)
+
+	def series(self, wallet_address: str) -> WalletSeries:
+		series, tokens = self._open(wallet_address)
+		rows = series.view()
+		return WalletSeries(
+			timestamps=rows[:, TIMESTAMP],
+			total_value_usd=rows[:, TOTAL_VALUE_USD],
+			eth_balance=rows[:, ETH_BALANCE],
+			token_balances={
+				token: rows[:, FIXED_COLUMNS + i] for i, token in enumerate(tokens)
+			},
+		)
+
+	def _window(
+		self, wallet_address: str, window: float, now: float | None
+	) -> Tuple[np.ndarray, np.ndarray]:
+		s = self.series(wallet_address)
+		now = s.timestamps[-1] if now is None and len(s.timestamps) else now
+		if now is None:
+			return s.timestamps, s.total_value_usd
+		# Samples are appended in time order, so the window is a slice
+		start, end = np.searchsorted(s.timestamps, [now - window, now], side="right")
+		start = max(start - 1, 0)  # the last sample at or before the window start
+		return s.timestamps[start:end], s.total_value_usd[start:end]
+
+	def value_at(self, wallet_address: str, timestamp: float) -> float | None:
+		"""
+		Get the total value of the last sample at or before `timestamp`.
+		"""
+		s = self.series(wallet_address)
+		i = int(np.searchsorted(s.timestamps, timestamp, side="right")) - 1
+		return float(s.total_value_usd[i]) if i >= 0 else None
+
+	def delta(
+		self, wallet_address: str, window: float, now: float | None = None
+	) -> float | None:
+		"""
+		Get the change in total value over the last `window` seconds, or since
+		the first sample if the series is shorter than that.
+
+		Args:
+			wallet_address (str): Wallet to query
+			window (float): Window length in seconds
+			now (float | None): End of the window as a Unix time, the latest sample by default
+
+		Returns:
+			float | None: Change in USD, None without two samples in the window
+		"""
+		_, values = self._window(wallet_address, window, now)
+		if len(values) < 2:
+			return None
+		return float(values[-1] - values[0])
+
+	def max_drawdown(
+		self, wallet_address: str, window: float, now: float | None = None
+	) -> float | None:
+		"""
+		Get the largest fall from a peak within the window, as a fraction of the peak.
+		"""
+		_, values = self._window(wallet_address, window, now)
+		if len(values) < 2:
+			return None
+		peaks = np.maximum.accumulate(values)
+		drawdowns = np.divide(
+			peaks - values, peaks, out=np.zeros(len(values)), where=peaks > 0
+		)
+		return float(drawdowns.max())
+
+	def volatility(
+		self, wallet_address: str, window: float, now: float | None = None
+	) -> float | None:
+		"""
+		Get the standard deviation of the sample-to-sample returns in the window.
+		"""
+		_, values = self._window(wallet_address, window, now)
+		if len(values) < 3:
+			return None
+		previous, current = values[:-1], values[1:]
+		returns = np.divide(
+			current - previous,
+			previous,
+			out=np.zeros(len(previous)),
+			where=previous > 0,
+		)
+		return float(returns.std(ddof=1))
+
+	def summary(self, wallet_address: str, now: float | None = None) -> str:
+		"""
+		Describe recent performance in a few lines, for prompts.
+
+		Returns:
+			str: The summary, or an empty string without history
+		"""
+		lines = []
+		for hours in (1, 12, 24):
+			change = self.delta(wallet_address, hours * HOUR, now)
+			if change is not None:
+				lines.append(f"Change in total value over {hours}h: ${change:,.2f}")
+		drawdown = self.max_drawdown(wallet_address, 24 * HOUR, now)
+		if drawdown is not None:
+			lines.append(f"Max drawdown over 24h: {drawdown:.2%}")
+		volatility = self.volatility(wallet_address, 24 * HOUR, now)
+		if volatility is not None:
+			lines.append(
+				f"Volatility of returns between samples over 24h: {volatility:.2%}"
+			)
+		return "\n".join(lines)
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import Any, List, Dict
 
 
@@ -245,6 +246,35 @@ class ChatHistory:
 
 		return self
 
+	def trim_older_turns(self, max_messages: int) -> "ChatHistory":
+		"""
+		Drop the oldest turns so at most `max_messages` non-system messages remain.
+
+		Leading system messages are always kept. The kept window is advanced to
+		start on a user message so the history still alternates correctly.
+
+		Args:
+		    max_messages (int): Maximum number of non-system messages to keep
+
+		Returns:
+		    ChatHistory: A new, possibly shorter, ChatHistory
+		"""
+		n_system = 0
+		while (
+			n_system < len(self.messages) and self.messages[n_system].role == "system"
+		):
+			n_system += 1
+
+		system, rest = self.messages[:n_system], self.messages[n_system:]
+		if len(rest) <= max_messages:
+			return ChatHistory(self.messages.copy())
+
+		rest = rest[len(rest) - max_messages :]
+		while rest and rest[0].role != "user":
+			rest = rest[1:]
+
+		return ChatHistory(system + rest)
+
 	def get_x_metadata(self, x: str) -> List[str]:
 		"""
 		Extract a specific metadata field from all messages.
@@ -256,3 +286,47 @@ class ChatHistory:
 		    List[str]: List of values for the specified metadata key from all messages
 		"""
 		return [message.metadata[x] for message in self.messages]
+
+
+@dataclass
+class TokenUsage:
+	"""
+	Input/output token accounting of a single completion call.
+
+	Attributes:
+	    input_tokens (int): Total prompt tokens, cached or not
+	    cached_input_tokens (int): Prompt tokens served from the provider's prompt cache
+	    cache_write_tokens (int): Prompt tokens written into the prompt cache
+	    output_tokens (int): Completion tokens
+	"""
+
+	input_tokens: int = 0
+	cached_input_tokens: int = 0
+	cache_write_tokens: int = 0
+	output_tokens: int = 0
+
+	@property
+	def uncached_input_tokens(self) -> int:
+		return self.input_tokens - self.cached_input_tokens
+
+	@staticmethod
+	def from_openai(usage: Dict[str, Any] | None) -> "TokenUsage | None":
+		"""
+		Create a TokenUsage from an OpenAI/OpenRouter style `usage` object.
+
+		Args:
+		    usage (Dict[str, Any] | None): The `usage` object of a chat completion response
+
+		Returns:
+		    TokenUsage | None: The parsed usage, or None if no usage was reported
+		"""
+		if not usage:
+			return None
+
+		details = usage.get("prompt_tokens_details") or {}
+		return TokenUsage(
+			input_tokens=usage.get("prompt_tokens", 0) or 0,
+			cached_input_tokens=details.get("cached_tokens", 0) or 0,
+			cache_write_tokens=details.get("cache_write_tokens", 0) or 0,
+			output_tokens=usage.get("completion_tokens", 0) or 0,
+		)
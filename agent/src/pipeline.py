@@ -0,0 +1,241 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List
+
+from loguru import logger
+
+from src.rate_limit import TokenBucket
+
+# Put on a stage's queue once per worker when nothing more is coming
+_DONE = object()
+
+
+@dataclass
+class Stage:
+	"""
+	One step of a `Pipeline`.
+
+	`fn` is called once per item from `workers` threads. A `fan_out` stage
+	returns an iterable and every element goes downstream as its own item.
+	"""
+
+	name: str
+	fn: Callable[[Any], Any]
+	workers: int = 1
+	# Items waiting for this stage, 0 for twice the number of workers
+	queue_size: int = 0
+	fan_out: bool = False
+	# Shared by the stage's workers, taken once per item
+	limiter: TokenBucket | None = None
+
+
+@dataclass
+class StageStats:
+	name: str
+	workers: int
+	processed: int = 0
+	failed: int = 0
+	emitted: int = 0
+	busy_seconds: float = 0.0
+	first_started_at: float | None = None
+	last_finished_at: float | None = None
+	latencies: List[float] = field(default_factory=list)
+
+	@property
+	def throughput(self) -> float:
+		"""
+		Items handled per second while the stage was active.
+		"""
+		if self.first_started_at is None or self.last_finished_at is None:
+			return 0.0
+		elapsed = self.last_finished_at - self.first_started_at
+		handled = self.processed + self.failed
+		return handled / elapsed if elapsed > 0 else float(handled)
+
+	def percentile(self, q: float) -> float:
+		if not self.latencies:
+			return 0.0
+		ordered = sorted(self.latencies)
+		return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			"workers": self.workers,
+			"processed": self.processed,
+			"failed": self.failed,
+			"emitted": self.emitted,
+			"busy_seconds": round(self.busy_seconds, 3),
+			"throughput_per_second": round(self.throughput, 3),
+			"latency_p50_seconds": round(self.percentile(0.5), 3),
+			"latency_p95_seconds": round(self.percentile(0.95), 3),
+		}
+
+
+@dataclass
+class PipelineFailure:
+	stage: str
+	item: Any
+	error: Exception
+
+
+@dataclass
+class PipelineResult:
+	# Items that came out of the last stage, in completion order
+	outputs: List[Any]
+	failures: List[PipelineFailure]
+	stats: Dict[str, StageStats]
+	elapsed_seconds: float
+
+	def metrics(self) -> Dict[str, Any]:
+		"""
+		Get the run's metrics as plain data, e.g. for logging as JSON.
+		"""
+		return {
+			"elapsed_seconds": round(self.elapsed_seconds, 3),
+			"outputs": len(self.outputs),
+			"failures": len(self.failures),
+			"stages": {name: stats.to_dict() for name, stats in self.stats.items()},
+		}
+
+	def summary(self) -> str:
+		"""
+		Describe each stage's counts and timings, one line per stage.
+		"""
+		lines = [
+			f"Pipeline finished in {self.elapsed_seconds:.2f}s with "
+			f"{len(self.outputs)} outputs and {len(self.failures)} failures"
+		]
+		for stats in self.stats.values():
+			lines.append(
+				f"  {stats.name}: {stats.processed} ok, {stats.failed} failed, "
+				f"{stats.throughput:.2f}/s with {stats.workers} workers, "
+				f"p50 {stats.percentile(0.5):.2f}s p95 {stats.percentile(0.95):.2f}s"
+			)
+		return "\n".join(lines)
+
+
+class Pipeline:
+	"""
+	Runs items through stages concurrently, each stage with its own pool of
+	worker threads.
+
+	Stages are connected by bounded queues, so a slow stage holds back the
+	ones before it instead of letting work pile up in memory. An item whose
+	stage raises is recorded as a failure and dropped, the rest carry on.
+	"""
+
+	def __init__(self, stages: List[Stage]):
+		if not stages:
+			raise ValueError("Pipeline needs at least one stage")
+		if len({stage.name for stage in stages}) != len(stages):
+			raise ValueError("Pipeline stage names must be unique")
+		if any(stage.workers < 1 for stage in stages):
+			raise ValueError("Every pipeline stage needs at least one worker")
+		self.stages = stages
+
+	def run(self, items: Iterable[Any]) -> PipelineResult:
+		"""
+		Push every item through all stages and wait for them to finish.
+
+		Args:
+			items (Iterable[Any]): Inputs of the first stage, consumed as the first stage frees up
+
+		Returns:
+			PipelineResult: Outputs of the last stage, failures and per-stage stats
+		"""
+		queues = [
+			queue.Queue(maxsize=stage.queue_size or 2 * stage.workers)
+			for stage in self.stages
+		]
+		stats = {
+			stage.name: StageStats(name=stage.name, workers=stage.workers)
+			for stage in self.stages
+		}
+		remaining = [stage.workers for stage in self.stages]
+		outputs: List[Any] = []
+		failures: List[PipelineFailure] = []
+		lock = threading.Lock()
+
+		def emit(index: int, item: Any) -> None:
+			if index + 1 < len(self.stages):
+				queues[index + 1].put(item)
+			else:
+				with lock:
+					outputs.append(item)
+
+		def work(index: int) -> None:
+			stage = self.stages[index]
+			stage_stats = stats[stage.name]
+			while True:
+				item = queues[index].get()
+				if item is _DONE:
+					break
+				if stage.limiter is not None:
+					stage.limiter.acquire()
+
+				started = time.monotonic()
+				try:
+					result = stage.fn(item)
+					results = list(result) if stage.fan_out else [result]
+					error = None
+				except Exception as e:
+					results, error = [], e
+				finished = time.monotonic()
+
+				with lock:
+					if stage_stats.first_started_at is None:
+						stage_stats.first_started_at = started
+					stage_stats.last_finished_at = finished
+					stage_stats.busy_seconds += finished - started
+					stage_stats.latencies.append(finished - started)
+					if error is None:
+						stage_stats.processed += 1
+						stage_stats.emitted += len(results)
+					else:
+						stage_stats.failed += 1
+						failures.append(PipelineFailure(stage.name, item, error))
+				if error is not None:
+					logger.error(
+						f"[Pipeline] Stage '{stage.name}' failed on an item: {error}"
+					)
+				for output in results:
+					emit(index, output)
+
+			# The last worker out tells the next stage nothing more is coming
+			with lock:
+				remaining[index] -= 1
+				last = remaining[index] == 0
+			if last and index + 1 < len(self.stages):
+				for _ in range(self.stages[index + 1].workers):
+					queues[index + 1].put(_DONE)
+
+		threads = [
+			threading.Thread(
+				target=work,
+				args=(index,),
+				name=f"pipeline-{stage.name}-{n}",
+				daemon=True,
+			)
+			for index, stage in enumerate(self.stages)
+			for n in range(stage.workers)
+		]
+		started = time.monotonic()
+		for thread in threads:
+			thread.start()
+		try:
+			for item in items:
+				queues[0].put(item)
+		finally:
+			for _ in range(self.stages[0].workers):
+				queues[0].put(_DONE)
+			for thread in threads:
+				thread.join()
+
+		return PipelineResult(
+			outputs=outputs,
+			failures=failures,
+			stats=stats,
+			elapsed_seconds=time.monotonic() - started,
+		)
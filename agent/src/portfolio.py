@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from src.datatypes import WalletStats
+
+# Column of ETH itself in the holdings arrays, tokens follow
+ETH_KEY = "ETH"
+
+PriceLookup = Callable[[List[Tuple[str, str]]], Dict[str, float]]
+ChangeLookup = Callable[[List[str]], Dict[str, float]]
+
+
+@dataclass
+class WalletValuation:
+	wallet_address: str
+	total_value_usd: float
+	change_24h_usd: float
+	change_24h_pct: float
+
+
+@dataclass
+class Holdings:
+	"""
+	Balances of many wallets as flat parallel arrays, one entry per
+	(wallet, asset) pair. Asset 0 is ETH, the rest are tokens.
+	"""
+
+	wallet_addresses: List[str]
+	# (token address, symbol) of every asset, ETH first
+	assets: List[Tuple[str, str]]
+	wallet_index: np.ndarray
+	asset_index: np.ndarray
+	balance: np.ndarray
+
+	@classmethod
+	def from_wallet_stats(cls, wallets: Sequence[WalletStats]) -> "Holdings":
+		"""
+		Collect the ETH and token balances of `get_wallet_stats` results.
+
+		Token addresses are compared case-insensitively, so a token held by
+		many wallets becomes one asset.
+		"""
+		assets: List[Tuple[str, str]] = [(ETH_KEY, ETH_KEY)]
+		columns: Dict[str, int] = {ETH_KEY: 0}
+		counts: List[int] = []
+		asset_index: List[int] = []
+		balance: List[float] = []
+
+		for wallet in wallets:
+			tokens = wallet["tokens"]
+			counts.append(len(tokens) + 1)
+			asset_index.append(0)
+			balance.append(wallet["eth_balance"])
+			for token_address, token in tokens.items():
+				key = token_address.lower()
+				column = columns.get(key)
+				if column is None:
+					column = columns[key] = len(columns)
+					assets.append((token_address, token["symbol"]))
+				asset_index.append(column)
+				balance.append(token["balance"])
+
+		return cls(
+			wallet_addresses=[wallet["wallet_address"] for wallet in wallets],
+			assets=assets,
+			wallet_index=np.repeat(np.arange(len(wallets), dtype=np.int64), counts),
+			asset_index=np.asarray(asset_index, dtype=np.int64),
+			balance=np.asarray(balance, dtype=np.float64),
+		)
+
+
+def value_holdings(
+	holdings: Holdings, prices: np.ndarray, changes_24h_pct: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Value every wallet in one pass over the holdings.
+
+	Args:
+		holdings (Holdings): Balances of all wallets
+		prices (np.ndarray): USD price per asset, NaN where unknown
+		changes_24h_pct (np.ndarray): 24h price change per asset in percent, NaN where unknown
+
+	Returns:
+		Tuple[np.ndarray, np.ndarray, np.ndarray]: Per wallet, the total value in
+			USD, its change over 24h in USD and in percent. Unpriced assets count
+			as worth nothing and unknown changes as no change.
+	"""
+	n_wallets = len(holdings.wallet_addresses)
+	prices = np.nan_to_num(prices, nan=0.0)
+	prices_24h_ago = prices / (1.0 + np.nan_to_num(changes_24h_pct, nan=0.0) / 100.0)
+
+	totals = np.bincount(
+		holdings.wallet_index,
+		weights=holdings.balance * prices[holdings.asset_index],
+		minlength=n_wallets,
+	)
+	totals_24h_ago = np.bincount(
+		holdings.wallet_index,
+		weights=holdings.balance * prices_24h_ago[holdings.asset_index],
+		minlength=n_wallets,
+	)
+
+	change_usd = totals - totals_24h_ago
+	change_pct = np.divide(
+		change_usd * 100.0,
+		totals_24h_ago,
+		out=np.zeros(n_wallets),
+		where=totals_24h_ago > 0,
+	)
+	return totals, change_usd, change_pct
+
+
+class PortfolioEngine:
+	"""
+	Values many wallets at once.
+
+	Every asset is priced once no matter how many wallets hold it, with one
+	batched price lookup and one batched 24h change lookup for the lot.
+	"""
+
+	def __init__(
+		self,
+		get_eth_price: Callable[[], float],
+		get_prices: PriceLookup,
+		get_changes_24h: ChangeLookup | None = None,
+	):
+		"""
+		Initialize the engine.
+
+		Args:
+			get_eth_price (Callable[[], float]): ETH price in USD
+			get_prices (PriceLookup): Prices in USD by token address, for (token address, symbol) pairs
+			get_changes_24h (ChangeLookup | None): 24h price changes in percent by symbol, or None to report no change
+		"""
+		self.get_eth_price = get_eth_price
+		self.get_prices = get_prices
+		self.get_changes_24h = get_changes_24h
+
+	def _price_assets(self, assets: List[Tuple[str, str]]) -> np.ndarray:
+		prices = np.full(len(assets), np.nan)
+		prices[0] = self.get_eth_price()
+		found = self.get_prices(assets[1:]) if len(assets) > 1 else {}
+		for i, (token_address, _) in enumerate(assets[1:], start=1):
+			prices[i] = found.get(token_address, np.nan)
+		return prices
+
+	def _changes(self, assets: List[Tuple[str, str]]) -> np.ndarray:
+		changes = np.full(len(assets), np.nan)
+		if self.get_changes_24h is None:
+			return changes
+		symbols = list(dict.fromkeys(symbol for _, symbol in assets))
+		try:
+			found = self.get_changes_24h(symbols)
+		except Exception as e:
+			logger.warning(f"24h price changes unavailable, reporting none: {e}")
+			return changes
+		for i, (_, symbol) in enumerate(assets):
+			changes[i] = found.get(symbol, np.nan)
+		return changes
+
+	def value(self, wallets: Sequence[WalletStats]) -> List[WalletValuation]:
+		"""
+		Value wallets at current prices.
+
+		Args:
+			wallets (Sequence[WalletStats]): Wallet balances, e.g. from `get_wallet_stats`. Only
+				`wallet_address`, `eth_balance` and `tokens` are used.
+
+		Returns:
+			List[WalletValuation]: One valuation per wallet, in order
+		"""
+		holdings = Holdings.from_wallet_stats(wallets)
+		totals, change_usd, change_pct = value_holdings(
+			holdings,
+			self._price_assets(holdings.assets),
+			self._changes(holdings.assets),
+		)
+		return [
+			WalletValuation(
+				wallet_address=address,
+				total_value_usd=float(totals[i]),
+				change_24h_usd=float(change_usd[i]),
+				change_24h_pct=float(change_pct[i]),
+			)
+			for i, address in enumerate(holdings.wallet_addresses)
+		]
+
+
+def get_portfolio_engine() -> PortfolioEngine:
+	"""
+	Get an engine priced by the shared wallet price layer, with 24h changes
+	from Binance.
+	"""
+	from src.wallet import _price_provider, get_eth_price_v2
+
+	return PortfolioEngine(
+		get_eth_price=get_eth_price_v2,
+		get_prices=_price_provider.get_token_prices,
+		get_changes_24h=_price_provider.binance_changes_24h_by_symbol,
+	)
@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, Tuple
+
+from loguru import logger
+
+
+@dataclass
+class _Entry:
+	value: float
+	fetched_at: float
+
+
+class PriceCache:
+	"""
+	In-process price cache with single-flight loading and stale-while-revalidate.
+
+	Ages are measured on the monotonic clock. Within `ttl` a value is served
+	as is. Within a further `stale_ttl` it is still served immediately, while
+	one background refresh runs. Past that, or on a miss, callers block on a
+	load, and concurrent callers for the same key share that one load.
+	"""
+
+	def __init__(self, ttl: float, stale_ttl: float, max_workers: int = 4):
+		"""
+		Initialize an empty cache.
+
+		Args:
+			ttl (float): Seconds a value is fresh
+			stale_ttl (float): Seconds after `ttl` a value may still be served while refreshing
+			max_workers (int): Maximum number of background refreshes at once
+		"""
+		self.ttl = ttl
+		self.stale_ttl = stale_ttl
+		self._entries: Dict[str, _Entry] = {}
+		self._inflight: Dict[str, Future] = {}
+		self._lock = Lock()
+		self._executor = ThreadPoolExecutor(
+			max_workers=max_workers, thread_name_prefix="price-cache"
+		)
+
+	def get_fresh(self, key: str) -> float | None:
+		"""
+		Get a value only if it is still fresh, without loading anything.
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry and time.monotonic() - entry.fetched_at < self.ttl:
+				return entry.value
+			return None
+
+	def put(self, key: str, value: float, age: float = 0.0) -> None:
+		"""
+		Store a value that was fetched `age` seconds ago.
+		"""
+		with self._lock:
+			self._entries[key] = _Entry(value, time.monotonic() - age)
+
+	def get(self, key: str, load: Callable[[], Tuple[float, float]]) -> float:
+		"""
+		Get a value, loading it if needed.
+
+		Args:
+			key (str): Cache key
+			load (Callable[[], Tuple[float, float]]): Returns the value and its age in
+				seconds, e.g. a non-zero age when it came from a slower cache tier
+
+		Returns:
+			float: The cached or freshly loaded value
+
+		Raises:
+			Exception: Whatever `load` raised, when there is no usable value
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry:
+				age = time.monotonic() - entry.fetched_at
+				if age < self.ttl:
+					return entry.value
+				if age < self.ttl + self.stale_ttl:
+					if key not in self._inflight:
+						future: Future = Future()
+						self._inflight[key] = future
+						self._executor.submit(self._load, key, load, future)
+					return entry.value
+
+			future = self._inflight.get(key)
+			is_loader = future is None
+			if is_loader:
+				future = Future()
+				self._inflight[key] = future
+
+		if is_loader:
+			self._load(key, load, future)
+		return future.result()
+
+	def _load(
+		self, key: str, load: Callable[[], Tuple[float, float]], future: Future
+	) -> None:
+		try:
+			value, age = load()
+		except Exception as e:
+			with self._lock:
+				if self._inflight.get(key) is future:
+					del self._inflight[key]
+			logger.warning(f"PriceCache: loading {key} failed: {e}")
+			future.set_exception(e)
+			return
+
+		with self._lock:
+			self._entries[key] = _Entry(value, time.monotonic() - age)
+			if self._inflight.get(key) is future:
+				del self._inflight[key]
+		future.set_result(value)
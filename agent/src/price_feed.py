@@ -0,0 +1,282 @@
+import asyncio
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Protocol
+
+from loguru import logger
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+# Quote asset of the Binance books we follow, prices are in USD terms
+QUOTE_ASSET = "USDT"
+
+
+@dataclass
+class Tick:
+	"""Top of an order book at one point in time"""
+
+	symbol: str
+	bid: float
+	ask: float
+	# Unix time in seconds
+	ts: float
+
+	@property
+	def mid(self) -> float:
+		return (self.bid + self.ask) / 2
+
+
+class PriceTable:
+	"""
+	Thread-safe table of the latest order-book top per symbol.
+
+	Writers are feed threads, readers are anything that needs a price
+	without a network round trip.
+	"""
+
+	def __init__(self):
+		self._books: Dict[str, Tick] = {}
+		self._changed = threading.Condition(threading.Lock())
+
+	def update(self, tick: Tick) -> None:
+		with self._changed:
+			symbol = tick.symbol.upper()
+			current = self._books.get(symbol)
+			# Replayed and reconnecting streams can deliver old ticks
+			if current is None or tick.ts >= current.ts:
+				self._books[symbol] = tick
+			self._changed.notify_all()
+
+	def book(self, symbol: str) -> Tick | None:
+		with self._changed:
+			return self._books.get(symbol.upper())
+
+	def get(self, symbol: str, max_age: float | None = None) -> float | None:
+		"""
+		Get the mid price of a symbol.
+
+		Args:
+			symbol (str): Base asset symbol, e.g. "ETH"
+			max_age (float | None): Ignore books last updated more than this many seconds ago
+
+		Returns:
+			float | None: The price, or None if there is no usable book
+		"""
+		tick = self.book(symbol)
+		if tick is None or (max_age is not None and time.time() - tick.ts > max_age):
+			return None
+		return tick.mid
+
+	def snapshot(self) -> Dict[str, Tick]:
+		with self._changed:
+			return dict(self._books)
+
+	def wait_for(self, symbols: Iterable[str], timeout: float) -> bool:
+		"""
+		Block until every symbol has a book.
+
+		Returns:
+			bool: False if `timeout` seconds passed first
+		"""
+		wanted = {symbol.upper() for symbol in symbols}
+		with self._changed:
+			return self._changed.wait_for(
+				lambda: wanted <= self._books.keys(), timeout=timeout
+			)
+
+
+class TickSource(Protocol):
+	def __aiter__(self) -> AsyncIterator[Tick]: ...
+
+
+class BinanceBookTickerSource:
+	"""
+	Best bid and ask of `<symbol>USDT` books from Binance's combined
+	websocket stream. Needs the `websockets` package.
+	"""
+
+	def __init__(self, symbols: List[str], url: str = BINANCE_STREAM_URL):
+		self.symbols = [symbol.upper() for symbol in symbols]
+		self.url = url
+
+	def stream_url(self) -> str:
+		streams = "/".join(
+			f"{symbol.lower()}{QUOTE_ASSET.lower()}@bookTicker"
+			for symbol in self.symbols
+		)
+		return f"{self.url}?streams={streams}"
+
+	@staticmethod
+	def parse(message: str | bytes) -> Tick | None:
+		data = json.loads(message).get("data", {})
+		pair = data.get("s", "")
+		if not pair.endswith(QUOTE_ASSET) or "b" not in data or "a" not in data:
+			return None
+		return Tick(
+			symbol=pair.removesuffix(QUOTE_ASSET),
+			bid=float(data["b"]),
+			ask=float(data["a"]),
+			ts=time.time(),
+		)
+
+	async def __aiter__(self) -> AsyncIterator[Tick]:
+		import websockets
+
+		async with websockets.connect(self.stream_url()) as ws:
+			async for message in ws:
+				tick = self.parse(message)
+				if tick is not None:
+					yield tick
+
+
+class ReplaySource:
+	"""
+	Ticks recorded in a JSON lines file, one `Tick` per line.
+
+	With a `speed` the original spacing between ticks is kept, divided by
+	`speed`. Without one the file is replayed as fast as it can be read,
+	which is what benchmarks want. Replayed ticks are restamped with the
+	current time so they count as fresh.
+	"""
+
+	def __init__(self, path: str, speed: float | None = None, loop: bool = False):
+		self.path = path
+		self.speed = speed
+		self.loop = loop
+
+	async def __aiter__(self) -> AsyncIterator[Tick]:
+		while True:
+			previous_ts = None
+			with open(self.path) as f:
+				for line in f:
+					if not line.strip():
+						continue
+					tick = Tick(**json.loads(line))
+					if self.speed and previous_ts is not None:
+						await asyncio.sleep(
+							max(0.0, tick.ts - previous_ts) / self.speed
+						)
+					else:
+						# Let the feed be stopped mid-file
+						await asyncio.sleep(0)
+					previous_ts = tick.ts
+					tick.ts = time.time()
+					yield tick
+			if not self.loop:
+				return
+
+
+def write_ticks(path: str, ticks: Iterable[Tick]) -> int:
+	"""
+	Record ticks in the format `ReplaySource` reads.
+
+	Returns:
+		int: Number of ticks written
+	"""
+	count = 0
+	with open(path, "w") as f:
+		for tick in ticks:
+			f.write(json.dumps(asdict(tick)) + "\n")
+			count += 1
+	return count
+
+
+@dataclass
+class PriceFeedStats:
+	ticks: int = 0
+	errors: int = 0
+	reconnects: int = 0
+
+
+class PriceFeed:
+	"""
+	Background thread that keeps a `PriceTable` up to date from a tick source.
+
+	The source runs on the thread's own event loop. If it fails, e.g. the
+	websocket drops, it is reopened with exponential backoff. A source that
+	simply ends, like a replay without `loop`, stops the feed.
+	"""
+
+	def __init__(
+		self,
+		source: TickSource,
+		table: PriceTable | None = None,
+		reconnect_delay: float = 1.0,
+		max_reconnect_delay: float = 30.0,
+	):
+		"""
+		Initialize a stopped feed.
+
+		Args:
+			source (TickSource): Where ticks come from
+			table (PriceTable | None): Table to update, a new one by default
+			reconnect_delay (float): Seconds to wait before the first reconnect
+			max_reconnect_delay (float): Upper bound of the reconnect backoff
+		"""
+		self.source = source
+		self.table = table if table is not None else PriceTable()
+		self.reconnect_delay = reconnect_delay
+		self.max_reconnect_delay = max_reconnect_delay
+		self.stats = PriceFeedStats()
+		self._loop: asyncio.AbstractEventLoop | None = None
+		self._task: asyncio.Task | None = None
+		self._thread: threading.Thread | None = None
+		self._started = threading.Event()
+
+	def start(self) -> "PriceFeed":
+		self._thread = threading.Thread(
+			target=asyncio.run, args=(self._main(),), name="price-feed", daemon=True
+		)
+		self._thread.start()
+		self._started.wait()
+		return self
+
+	def stop(self, timeout: float = 5.0) -> None:
+		if self.running and self._loop is not None and self._task is not None:
+			try:
+				self._loop.call_soon_threadsafe(self._task.cancel)
+			except RuntimeError:
+				pass  # the source ended and the loop closed meanwhile
+		if self._thread is not None:
+			self._thread.join(timeout)
+
+	def join(self, timeout: float | None = None) -> None:
+		"""Wait for a source that ends on its own, e.g. a replay, to finish"""
+		if self._thread is not None:
+			self._thread.join(timeout)
+
+	@property
+	def running(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def __enter__(self) -> "PriceFeed":
+		return self.start()
+
+	def __exit__(self, *exc) -> None:
+		self.stop()
+
+	async def _main(self) -> None:
+		self._loop = asyncio.get_running_loop()
+		self._task = asyncio.current_task()
+		self._started.set()
+		try:
+			await self._consume()
+		except asyncio.CancelledError:
+			pass
+
+	async def _consume(self) -> None:
+		delay = self.reconnect_delay
+		while True:
+			try:
+				async for tick in self.source:
+					self.table.update(tick)
+					self.stats.ticks += 1
+					delay = self.reconnect_delay
+				return
+			except Exception as e:
+				self.stats.errors += 1
+				logger.warning(f"Price feed failed, reconnecting in {delay:.1f}s: {e}")
+			await asyncio.sleep(delay)
+			delay = min(delay * 2, self.max_reconnect_delay)
+			self.stats.reconnects += 1
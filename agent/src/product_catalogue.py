@@ -0,0 +1,175 @@
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from enum import Enum
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from src.datatypes.affiliate_promoter import ProductData, PublishingResult
+from src.db.sqlite import CatalogueProduct, SQLiteDB
+
+# Listing ids in marketplace URLs, e.g. ebay.com/itm/<id> and aliexpress.com/item/<id>.html
+_LISTING_ID = re.compile(r"/(?:itm|item|dp)/(?:[^/]+/)?([A-Za-z0-9]{6,})(?:\.html)?/?$")
+
+
+class ProductChange(Enum):
+	NEW = "new"  # Never promoted before
+	PRICE_DROPPED = "price_dropped"  # Cheaper than when it was last promoted
+	UNCHANGED = "unchanged"
+
+
+@dataclass
+class ClassifiedProduct:
+	product: ProductData
+	change: ProductChange
+	product_id: str
+	# Price when last promoted, None if never promoted
+	previous_price: float | None = None
+
+
+def product_id(product: ProductData) -> str:
+	"""
+	Get a product's id on its marketplace.
+
+	Uses the listing id in the product URL, or a hash of the URL without its
+	query string when there is none, so tracking parameters never matter.
+	"""
+	parts = urlsplit(product.url or "")
+	match = _LISTING_ID.search(parts.path)
+	if match:
+		return match.group(1)
+	key = f"{parts.netloc.lower()}{parts.path}" or product.title
+	return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def catalogue_key(product: ProductData) -> str:
+	"""
+	Get a product's key across marketplaces, e.g. to tag the posts made for
+	it as their `content_id`.
+	"""
+	return f"{product.source}:{product_id(product)}"
+
+
+class ProductCatalogue:
+	"""
+	Every product ever discovered, with the price it was last promoted at.
+
+	Comparing a discovery against the catalogue tells which products are new
+	and which got cheaper since they were promoted, so only those need new
+	images, videos and posts.
+	"""
+
+	def __init__(self, db: SQLiteDB, min_price_drop: float = 0.01):
+		"""
+		Initialize the catalogue.
+
+		Args:
+			db (SQLiteDB): Database holding the catalogue
+			min_price_drop (float): Smallest fall in price, as a fraction, that counts as a drop
+		"""
+		self.db = db
+		self.min_price_drop = min_price_drop
+
+	def classify(self, products: List[ProductData]) -> List[ClassifiedProduct]:
+		"""
+		Compare products against the catalogue and record them as seen.
+
+		Products never promoted, even if seen before, are new.
+
+		Args:
+			products (List[ProductData]): Products as just discovered
+
+		Returns:
+			List[ClassifiedProduct]: One per product, in order
+		"""
+		keys = [(p.source, product_id(p)) for p in products]
+		known = self.db.get_catalogue_products(keys)
+		now = datetime.now().isoformat()
+
+		classified = []
+		for product, key in zip(products, keys):
+			entry = known.get(key)
+			previous_price = entry.promoted_price if entry else None
+			if previous_price is None:
+				change = ProductChange.NEW
+			elif product.price < previous_price * (1 - self.min_price_drop):
+				change = ProductChange.PRICE_DROPPED
+			else:
+				change = ProductChange.UNCHANGED
+			classified.append(
+				ClassifiedProduct(
+					product=product,
+					change=change,
+					product_id=key[1],
+					previous_price=previous_price,
+				)
+			)
+
+		records = [
+			CatalogueProduct(
+				source=product.source,
+				product_id=key[1],
+				title=product.title,
+				price=product.price,
+				currency=product.currency,
+				data=json.dumps(asdict(product)),
+				first_seen_at=now,
+				last_seen_at=now,
+			)
+			for product, key in zip(products, keys)
+		]
+		if not self.db.upsert_catalogue_products(records):
+			logger.error("[Catalogue] Failed to record discovered products")
+		return classified
+
+	def changed(self, products: List[ProductData]) -> List[ClassifiedProduct]:
+		"""
+		Classify products and keep the new and price-dropped ones.
+		"""
+		classified = self.classify(products)
+		counts = {change: 0 for change in ProductChange}
+		for c in classified:
+			counts[c.change] += 1
+		logger.info(
+			f"[Catalogue] {counts[ProductChange.NEW]} new, "
+			f"{counts[ProductChange.PRICE_DROPPED]} price dropped, "
+			f"{counts[ProductChange.UNCHANGED]} unchanged"
+		)
+		return [c for c in classified if c.change != ProductChange.UNCHANGED]
+
+	def mark_promoted(self, products: List[ProductData]) -> None:
+		"""
+		Record that products were promoted at their current price.
+		"""
+		promoted: List[Tuple[str, str, float]] = [
+			(p.source, product_id(p), p.price) for p in products
+		]
+		if not self.db.mark_catalogue_products_promoted(promoted):
+			logger.error("[Catalogue] Failed to record promoted products")
+
+	def mark_published(
+		self, products: List[ProductData], results: List[PublishingResult]
+	) -> List[ProductData]:
+		"""
+		Record as promoted the products that at least one post went out for.
+		Products every platform rejected stay new, so the next cycle retries them.
+
+		Args:
+			products (List[ProductData]): Products posts were planned for
+			results (List[PublishingResult]): Outcome of every post, tagged with the product's `catalogue_key` as `content_id`
+
+		Returns:
+			List[ProductData]: The products recorded as promoted
+		"""
+		published = {r.content_id for r in results if r.status == "success"}
+		promoted = [p for p in products if catalogue_key(p) in published]
+		if len(promoted) < len(products):
+			logger.warning(
+				f"[Catalogue] {len(products) - len(promoted)} products had no successful post, keeping them for the next cycle"
+			)
+		self.mark_promoted(promoted)
+		return promoted
@@ -0,0 +1,297 @@
+import hashlib
+import heapq
+import math
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from src.datatypes.affiliate_promoter import ProductData
+from src.rate_limit import get_limiter
+
+# (query, limit, page) to listings, pages start at 1
+SearchFn = Callable[[str, int, int], List[ProductData]]
+
+# Listings whose prices differ by less than this fraction can be the same item
+PRICE_TOLERANCE = 0.03
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Marketing filler that differs between listings of the same item
+_FILLER_WORDS = {
+	"new",
+	"hot",
+	"sale",
+	"free",
+	"shipping",
+	"original",
+	"genuine",
+	"official",
+	"the",
+	"and",
+	"with",
+	"for",
+	"2023",
+	"2024",
+	"2025",
+}
+
+
+@dataclass
+class Marketplace:
+	name: str
+	search: SearchFn
+	page_size: int = 20
+	max_pages: int = 1
+	# Requests per second, shared by everyone searching this marketplace
+	rate_limit: float = 2.0
+
+
+@dataclass
+class DiscoveryStats:
+	requests: int = 0
+	failed_requests: int = 0
+	listings: int = 0
+	duplicates: int = 0
+	# Requests per marketplace
+	by_marketplace: Dict[str, int] = field(default_factory=dict)
+
+
+def title_fingerprint(title: str) -> str:
+	"""
+	Get a title with case, punctuation, word order and filler words removed,
+	so listings of the same item on different marketplaces match.
+	"""
+	words = set(_WORD.findall(title.lower())) - _FILLER_WORDS
+	return " ".join(sorted(words))
+
+
+def image_url_key(image: str | None) -> str | None:
+	"""
+	Get a stable hash of an image URL without its query string, or None
+	without an image.
+
+	Only the same URL matches: the same picture served from another CDN,
+	as eBay and AliExpress do, gets a different key and is left to the
+	title fingerprint.
+	"""
+	if not image:
+		return None
+	parts = urlsplit(image.strip().lower())
+	return hashlib.sha256(f"{parts.netloc}{parts.path}".encode()).hexdigest()
+
+
+def default_score(product: ProductData) -> float:
+	"""
+	Rank listings by rating weighted by review count, with a bonus for each
+	thing a promotion needs: an affiliate link, an image and value features.
+	"""
+	score = (product.rating or 0.0) * math.log1p(product.reviews or 0)
+	score += 2.0 if product.affiliate_link else 0.0
+	score += 1.0 if product.image else 0.0
+	score += 0.5 * sum(
+		1
+		for value in (
+			product.guarantees,
+			product.return_policy,
+			product.seller_trust,
+			product.shipping_info,
+			product.certifications,
+		)
+		if value
+	)
+	return score
+
+
+class ListingIndex:
+	"""
+	Unique listings seen so far, with near-identical listings merged.
+
+	Two listings are the same item if they share an image URL, or if their title
+	fingerprints match and their prices are within `PRICE_TOLERANCE`. Of
+	duplicates, the higher scoring listing is kept.
+	"""
+
+	def __init__(self, score: Callable[[ProductData], float] = default_score):
+		self.score = score
+		self.listings: Dict[int, Tuple[float, ProductData]] = {}
+		self._by_image_url: Dict[str, int] = {}
+		self._by_title: Dict[str, List[int]] = {}
+		self._next_id = 0
+
+	def _find(self, product: ProductData) -> int | None:
+		key = image_url_key(product.image)
+		if key is not None and key in self._by_image_url:
+			return self._by_image_url[key]
+		for listing_id in self._by_title.get(title_fingerprint(product.title), []):
+			price = self.listings[listing_id][1].price
+			if abs(price - product.price) <= PRICE_TOLERANCE * max(
+				price, product.price
+			):
+				return listing_id
+		return None
+
+	def add(self, product: ProductData) -> bool:
+		"""
+		Add a listing.
+
+		Returns:
+			bool: Whether it was new rather than a duplicate
+		"""
+		score = self.score(product)
+		listing_id = self._find(product)
+		is_new = listing_id is None
+		if is_new:
+			listing_id = self._next_id
+			self._next_id += 1
+			self._by_title.setdefault(title_fingerprint(product.title), []).append(
+				listing_id
+			)
+			self.listings[listing_id] = (score, product)
+		elif score > self.listings[listing_id][0]:
+			self.listings[listing_id] = (score, product)
+
+		key = image_url_key(product.image)
+		if key is not None:
+			self._by_image_url.setdefault(key, listing_id)
+		return is_new
+
+	def top(self, k: int) -> List[ProductData]:
+		"""
+		Get the best `k` listings, taking every marketplace's best in turn.
+
+		Scores only compare within a marketplace, as each client fills in
+		different fields. The n-th best listing of every marketplace comes
+		before any marketplace's next best, higher scores first.
+		"""
+		by_source: Dict[str, List[Tuple[float, int]]] = {}
+		for listing_id, (score, product) in self.listings.items():
+			by_source.setdefault(product.source, []).append((score, -listing_id))
+		ranked = [
+			(rank, -score, -negative_id)
+			for entries in by_source.values()
+			for rank, (score, negative_id) in enumerate(heapq.nlargest(k, entries))
+		]
+		return [
+			self.listings[listing_id][1]
+			for _, _, listing_id in heapq.nsmallest(k, ranked)
+		]
+
+
+class ProductDiscovery:
+	"""
+	Searches many keywords on many marketplaces at once.
+
+	Every (marketplace, keyword) pair is searched concurrently, one page at a
+	time: the next page is only requested when the previous one came back
+	full. Results are merged into one ranked list of unique listings as they
+	arrive, so the best listings can be used before slow marketplaces finish.
+	"""
+
+	def __init__(
+		self,
+		marketplaces: Sequence[Marketplace],
+		max_workers: int = 8,
+		score: Callable[[ProductData], float] = default_score,
+	):
+		"""
+		Initialize the service.
+
+		Args:
+			marketplaces (Sequence[Marketplace]): Marketplaces to search
+			max_workers (int): Maximum number of searches in flight
+			score (Callable[[ProductData], float]): Ranks listings, higher is better
+		"""
+		self.marketplaces = list(marketplaces)
+		self.max_workers = max_workers
+		self.score = score
+		self.stats = DiscoveryStats()
+
+	def _search(
+		self, marketplace: Marketplace, query: str, page: int
+	) -> List[ProductData]:
+		get_limiter(f"discovery:{marketplace.name}", marketplace.rate_limit).acquire()
+		return marketplace.search(query, marketplace.page_size, page)
+
+	def stream(self, keywords: Sequence[str], k: int) -> Iterator[List[ProductData]]:
+		"""
+		Search and yield the current top `k` listings whenever they change.
+
+		Args:
+			keywords (Sequence[str]): Search queries, each is sent to every marketplace
+			k (int): Number of listings to rank
+
+		Yields:
+			List[ProductData]: The best `k` unique listings so far, best first. The
+				last one yielded is the final ranking.
+		"""
+		self.stats = DiscoveryStats()
+		index = ListingIndex(self.score)
+		done: queue.Queue = queue.Queue()
+		pending = 0
+		pool = ThreadPoolExecutor(
+			max_workers=self.max_workers, thread_name_prefix="discovery"
+		)
+
+		def submit(marketplace: Marketplace, query: str, page: int) -> None:
+			nonlocal pending
+			pending += 1
+			future = pool.submit(self._search, marketplace, query, page)
+			future.add_done_callback(lambda f: done.put((marketplace, query, page, f)))
+
+		try:
+			for query in keywords:
+				for marketplace in self.marketplaces:
+					submit(marketplace, query, 1)
+
+			top: List[ProductData] = []
+			while pending:
+				marketplace, query, page, future = done.get()
+				pending -= 1
+				self.stats.requests += 1
+				self.stats.by_marketplace[marketplace.name] = (
+					self.stats.by_marketplace.get(marketplace.name, 0) + 1
+				)
+				try:
+					listings = future.result() or []
+				except Exception as e:
+					self.stats.failed_requests += 1
+					logger.warning(
+						f"[Discovery] {marketplace.name} search for '{query}' page {page} failed: {e}"
+					)
+					continue
+
+				if (
+					len(listings) >= marketplace.page_size
+					and page < marketplace.max_pages
+				):
+					submit(marketplace, query, page + 1)
+
+				for product in listings:
+					self.stats.listings += 1
+					if not index.add(product):
+						self.stats.duplicates += 1
+				ranked = index.top(k)
+				if [id(p) for p in ranked] != [id(p) for p in top]:
+					top = ranked
+					yield top
+		finally:
+			# A caller that stops early does not wait for the remaining searches
+			pool.shutdown(wait=False, cancel_futures=True)
+
+	def discover(self, keywords: Sequence[str], k: int) -> List[ProductData]:
+		"""
+		Search and return the best `k` unique listings once every search is done.
+		"""
+		top: List[ProductData] = []
+		for top in self.stream(keywords, k):
+			pass
+		logger.info(
+			f"[Discovery] {self.stats.listings} listings from {self.stats.requests} searches "
+			f"({self.stats.failed_requests} failed), {self.stats.duplicates} duplicates, "
+			f"kept the top {len(top)}"
+		)
+		return top
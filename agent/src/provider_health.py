@@ -0,0 +1,132 @@
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, List, Sequence
+
+
+@dataclass
+class ProviderHealthData:
+	provider: str
+	success_rate: float
+	latency: float
+	consecutive_failures: int
+	# Wall-clock time, so an open circuit survives a restart
+	open_until: float
+
+
+class ProviderHealth:
+	"""
+	Rolling health of a set of API providers, with a circuit breaker each.
+
+	Success rate and latency are exponentially weighted moving averages, so
+	recent requests count most. Providers are ranked by success rate divided
+	by (1 + latency in seconds). Unknown providers start at a full success
+	rate but a pessimistic one-second latency, so they rank below providers
+	known to be fast and above ones known to fail.
+
+	After `failure_threshold` consecutive failures a provider's circuit opens
+	for `cooldown` seconds and it is skipped. Once the cooldown has passed it
+	is tried again: a success closes the circuit, a failure opens it for
+	another `cooldown`.
+	"""
+
+	def __init__(
+		self,
+		alpha: float = 0.2,
+		failure_threshold: int = 3,
+		cooldown: float = 300.0,
+		persist_interval: float = 30.0,
+		persist: Callable[[List[ProviderHealthData]], object] | None = None,
+	):
+		"""
+		Initialize with no history.
+
+		Args:
+			alpha (float): Weight of the newest request in the moving averages
+			failure_threshold (int): Consecutive failures that open the circuit
+			cooldown (float): Seconds an open circuit stays open
+			persist_interval (float): Minimum seconds between calls to `persist`, except when a circuit opens or closes
+			persist (Callable[[List[ProviderHealthData]], object] | None): Called with a snapshot of every provider's health
+		"""
+		self.alpha = alpha
+		self.failure_threshold = failure_threshold
+		self.cooldown = cooldown
+		self.persist_interval = persist_interval
+		self._persist = persist
+		self._persisted_at = float("-inf")
+		self._health: Dict[str, ProviderHealthData] = {}
+		self._lock = Lock()
+
+	def restore(self, records: Sequence[ProviderHealthData]) -> None:
+		"""
+		Load health saved by an earlier process.
+		"""
+		with self._lock:
+			for record in records:
+				self._health[record.provider] = record
+
+	def snapshot(self) -> List[ProviderHealthData]:
+		with self._lock:
+			return [
+				ProviderHealthData(**vars(record)) for record in self._health.values()
+			]
+
+	def _get(self, provider: str) -> ProviderHealthData:
+		if provider not in self._health:
+			self._health[provider] = ProviderHealthData(provider, 1.0, 1.0, 0, 0.0)
+		return self._health[provider]
+
+	def is_available(self, provider: str) -> bool:
+		"""
+		Whether the provider's circuit is closed, or its cooldown has passed.
+		"""
+		with self._lock:
+			return time.time() >= self._get(provider).open_until
+
+	def score(self, provider: str) -> float:
+		with self._lock:
+			health = self._get(provider)
+			return health.success_rate / (1.0 + health.latency)
+
+	def order(self, providers: Sequence[str]) -> List[str]:
+		"""
+		Get the available providers, healthiest first.
+
+		Ties keep their order in `providers`.
+		"""
+		available = [p for p in providers if self.is_available(p)]
+		return sorted(available, key=self.score, reverse=True)
+
+	def record(self, provider: str, success: bool, latency: float) -> None:
+		"""
+		Record the outcome of one request to `provider`.
+
+		Args:
+			provider (str): Provider name
+			success (bool): Whether the provider answered properly
+			latency (float): Seconds the request took
+		"""
+		with self._lock:
+			health = self._get(provider)
+			was_open = health.open_until > 0
+			health.success_rate += self.alpha * (float(success) - health.success_rate)
+			health.latency += self.alpha * (latency - health.latency)
+			if success:
+				health.consecutive_failures = 0
+				health.open_until = 0.0
+			else:
+				health.consecutive_failures += 1
+				if health.consecutive_failures >= self.failure_threshold:
+					health.open_until = time.time() + self.cooldown
+
+			now = time.monotonic()
+			changed = was_open != (health.open_until > 0) or (
+				not success and health.open_until > 0
+			)
+			if self._persist is None or (
+				not changed and now - self._persisted_at < self.persist_interval
+			):
+				return
+			self._persisted_at = now
+
+		self._persist(self.snapshot())
@@ -0,0 +1,650 @@
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Set, Tuple
+
+import requests
+from loguru import logger
+
+from src.datatypes.affiliate_promoter import PublishingResult
+from src.rate_limit import TokenBucket, get_limiter
+
+# Statuses worth trying again: rate limited, timed out or a server-side failure
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class PublishError(Exception):
+	"""
+	A platform refused a post.
+
+	Args:
+		message (str): What went wrong
+		retryable (bool): Whether the same post may succeed later
+		retry_after (float | None): Seconds the platform asked us to wait
+	"""
+
+	def __init__(
+		self, message: str, retryable: bool = False, retry_after: float | None = None
+	):
+		super().__init__(message)
+		self.retryable = retryable
+		self.retry_after = retry_after
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None) -> float | None:
+	"""
+	Get how long a response asks us to wait, from `Retry-After` in seconds or
+	as a date, or from a rate limit reset time in epoch seconds.
+	"""
+	if not headers:
+		return None
+	headers = {k.lower(): v for k, v in headers.items()}
+	value = headers.get("retry-after")
+	if value is not None:
+		try:
+			return max(0.0, float(value))
+		except ValueError:
+			try:
+				return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+			except (TypeError, ValueError):
+				return None
+	for name in ("x-rate-limit-reset", "x-ratelimit-reset"):
+		if name in headers:
+			try:
+				return max(0.0, float(headers[name]) - time.time())
+			except ValueError:
+				return None
+	return None
+
+
+def check_response(response: requests.Response) -> None:
+	"""
+	Raise a `PublishError` for an unsuccessful response, retryable with the
+	server's backoff hint when the status says trying later may work.
+	"""
+	if response.ok:
+		return
+	raise PublishError(
+		f"HTTP {response.status_code}: {response.text[:200]}",
+		retryable=response.status_code in RETRYABLE_STATUSES,
+		retry_after=retry_after_seconds(response.headers),
+	)
+
+
+def classify_error(error: Exception) -> Tuple[bool, float | None]:
+	"""
+	Get whether an error from any client library is worth retrying, and the
+	wait it asked for.
+
+	Understands `PublishError`, requests (and tweepy, which carries a requests
+	response) and Google API client errors (an httplib2 response in `resp`).
+	"""
+	if isinstance(error, PublishError):
+		return error.retryable, error.retry_after
+	if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+		return True, None
+	response = getattr(error, "response", None)
+	if response is not None and hasattr(response, "status_code"):
+		return (
+			response.status_code in RETRYABLE_STATUSES,
+			retry_after_seconds(response.headers),
+		)
+	resp = getattr(error, "resp", None)
+	if resp is not None and hasattr(resp, "status"):
+		return int(resp.status) in RETRYABLE_STATUSES, retry_after_seconds(dict(resp))
+	return False, None
+
+
+@dataclass
+class PostItem:
+	"""
+	One piece of content, in every shape the platforms take it.
+	"""
+
+	title: str
+	content_type: str  # e.g. 'blog', 'qa', 'video'
+	# Short post for social networks
+	text: str = ""
+	# Markdown article
+	body: str = ""
+	summary: str = ""
+	link: str | None = None
+	image: str | None = None
+	tags: List[str] = field(default_factory=list)
+	# Posted as a thread where the platform has them
+	thread: List[str] = field(default_factory=list)
+	video_path: str | None = None
+	content_id: str | None = None
+	# Platforms to post to, None for every platform taking this content type
+	platforms: List[str] | None = None
+
+
+@dataclass
+class Platform:
+	name: str
+	# Posts an item and returns its URL, raises on failure
+	publish: Callable[[PostItem, requests.Session], str | None]
+	content_types: Set[str]
+	# Paces posts to the platform's quota, shared by every worker
+	limiter: TokenBucket | None = None
+	max_attempts: int = 3
+
+
+@dataclass
+class PublisherStats:
+	attempts: int = 0
+	retries: int = 0
+	published: int = 0
+	failed: int = 0
+	# Slept honouring backoff hints and between retries
+	backoff_seconds: float = 0.0
+	published_by_platform: Dict[str, int] = field(default_factory=dict)
+
+
+class MultiPlatformPublisher:
+	"""
+	Posts content to every platform at once.
+
+	Each platform gets one pooled HTTP session and one token bucket sized to
+	its quota, shared by all workers. Failures a platform says are temporary
+	are retried after the wait it asked for, or with exponential backoff
+	without a hint; when a platform asks for a wait, every worker posting to
+	it holds off. Every attempt ends in a `PublishingResult`, nothing raises.
+	"""
+
+	def __init__(
+		self,
+		platforms: Sequence[Platform],
+		max_workers: int = 8,
+		base_delay: float = 1.0,
+		max_delay: float = 60.0,
+		on_failure: Callable[[PostItem, str, str], None] | None = None,
+	):
+		"""
+		Initialize the publisher.
+
+		Args:
+			platforms (Sequence[Platform]): Platforms to post to
+			max_workers (int): Posts in flight at once, across all platforms
+			base_delay (float): Seconds before the first retry without a hint, doubled for each later one
+			max_delay (float): Longest wait before a retry; asked to wait longer, we give up instead
+			on_failure (Callable[[PostItem, str, str], None] | None): Called with (item, platform, error) for posts that failed for good
+		"""
+		self.platforms = {p.name: p for p in platforms}
+		self.max_workers = max_workers
+		self.base_delay = base_delay
+		self.max_delay = max_delay
+		self.on_failure = on_failure
+		self.stats = PublisherStats()
+		self._sessions: Dict[str, requests.Session] = {}
+		self._blocked_until: Dict[str, float] = {}
+		self._lock = threading.Lock()
+		self._pool = ThreadPoolExecutor(
+			max_workers=max_workers, thread_name_prefix="publish"
+		)
+
+	def _count(self, **deltas: Any) -> None:
+		with self._lock:
+			for name, delta in deltas.items():
+				setattr(self.stats, name, getattr(self.stats, name) + delta)
+
+	def session(self, platform: str) -> requests.Session:
+		with self._lock:
+			if platform not in self._sessions:
+				session = requests.Session()
+				adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+				session.mount("http://", adapter)
+				session.mount("https://", adapter)
+				self._sessions[platform] = session
+			return self._sessions[platform]
+
+	def _wait(self, platform: str, delay: float = 0.0) -> None:
+		"""
+		Sleep `delay`, and at least until the platform's requested pause is over.
+		"""
+		with self._lock:
+			delay = max(delay, self._blocked_until.get(platform, 0.0) - time.time())
+		if delay > 0:
+			self._count(backoff_seconds=delay)
+			time.sleep(delay)
+
+	def _publish_to(self, item: PostItem, platform: Platform) -> PublishingResult:
+		error = ""
+		for attempt in range(1, platform.max_attempts + 1):
+			self._wait(platform.name)
+			if platform.limiter is not None:
+				platform.limiter.acquire()
+			self._count(attempts=1)
+			try:
+				url = platform.publish(item, self.session(platform.name))
+			except Exception as e:
+				error = f"{type(e).__name__}: {e}"
+				retryable, hint = classify_error(e)
+				if hint is not None:
+					with self._lock:
+						self._blocked_until[platform.name] = max(
+							self._blocked_until.get(platform.name, 0.0),
+							time.time() + hint,
+						)
+				delay = (
+					hint if hint is not None else self.base_delay * 2 ** (attempt - 1)
+				)
+				if not retryable or attempt == platform.max_attempts:
+					break
+				if delay > self.max_delay:
+					error += f" (asked to wait {delay:.0f}s)"
+					break
+				logger.warning(
+					f"[Publish] {platform.name} attempt {attempt} for '{item.title}' failed, retrying in {delay:.1f}s: {error}"
+				)
+				self._count(retries=1)
+				self._wait(platform.name, delay)
+				continue
+
+			with self._lock:
+				self.stats.published += 1
+				by_platform = self.stats.published_by_platform
+				by_platform[platform.name] = by_platform.get(platform.name, 0) + 1
+			return self._result(item, platform.name, "success", url=url)
+
+		self._count(failed=1)
+		logger.error(f"[Publish] {platform.name} failed for '{item.title}': {error}")
+		if self.on_failure is not None:
+			try:
+				self.on_failure(item, platform.name, error)
+			except Exception as e:
+				logger.error(
+					f"[Publish] Failure handler for {platform.name} failed: {e}"
+				)
+		return self._result(item, platform.name, "error", error=error)
+
+	@staticmethod
+	def _result(
+		item: PostItem,
+		platform: str,
+		status: str,
+		url: str | None = None,
+		error: str | None = None,
+	) -> PublishingResult:
+		return PublishingResult(
+			platform=platform,
+			url=url,
+			status=status,
+			timestamp=datetime.now(),
+			error=error,
+			content_type=item.content_type,
+			content_title=item.title,
+			content_id=item.content_id,
+		)
+
+	def targets(self, item: PostItem) -> List[Platform]:
+		"""
+		Get the platforms an item goes to.
+		"""
+		names = item.platforms if item.platforms is not None else list(self.platforms)
+		return [
+			self.platforms[name]
+			for name in names
+			if name in self.platforms
+			and item.content_type in self.platforms[name].content_types
+		]
+
+	def publish(self, items: Sequence[PostItem]) -> List[PublishingResult]:
+		"""
+		Post items to all their platforms at once.
+
+		Args:
+			items (Sequence[PostItem]): Content to post
+
+		Returns:
+			List[PublishingResult]: One per (item, platform), in item then platform order
+		"""
+		futures = [
+			self._pool.submit(self._publish_to, item, platform)
+			for item in items
+			for platform in self.targets(item)
+		]
+		return [future.result() for future in futures]
+
+	def publish_item(self, item: PostItem) -> List[PublishingResult]:
+		return self.publish([item])
+
+	def close(self) -> None:
+		self._pool.shutdown(wait=True)
+		for session in self._sessions.values():
+			session.close()
+
+	def __enter__(self) -> "MultiPlatformPublisher":
+		return self
+
+	def __exit__(self, *exc: Any) -> None:
+		self.close()
+
+
+# Posts per second and burst per platform, below their published quotas
+PLATFORM_QUOTAS: Dict[str, Tuple[float, float]] = {
+	"twitter": (0.2, 5),
+	"devto": (0.3, 3),
+	"hashnode": (0.5, 2),
+	"blogger": (0.5, 2),
+	"linkedin": (0.5, 2),
+	"facebook": (1.0, 3),
+	"youtube": (0.05, 1),
+	"site": (2.0, 4),
+}
+
+# Content types each platform takes
+BLOG_TYPES = {"blog"}
+
+
+def _platform(
+	name: str,
+	publish: Callable[[PostItem, requests.Session], str | None],
+	types: Set[str],
+) -> Platform:
+	rate, capacity = PLATFORM_QUOTAS[name]
+	return Platform(
+		name, publish, types, limiter=get_limiter(f"publish:{name}", rate, capacity)
+	)
+
+
+def devto_platform(client) -> Platform:
+	"""
+	Dev.to articles, with the key and endpoint of a `DevtoAPIClient`.
+	"""
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		article = {
+			"title": item.title,
+			"body_markdown": item.body,
+			"published": True,
+			"tags": item.tags[:4],
+		}
+		if item.link:
+			article["canonical_url"] = item.link
+		response = session.post(
+			client.base_url,
+			headers={"api-key": client.api_key},
+			json={"article": article},
+			timeout=10,
+		)
+		check_response(response)
+		return response.json().get("url")
+
+	return _platform("devto", publish, BLOG_TYPES)
+
+
+def hashnode_platform(client) -> Platform:
+	"""
+	Hashnode stories, with the token and endpoint of a `HashnodeAPIClient`.
+	"""
+	query = """
+	mutation CreateStory($input: CreateStoryInput!) {
+	  createStory(input: $input) { code success message post { title slug } }
+	}
+	"""
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		story = {
+			"title": item.title,
+			"contentMarkdown": item.body,
+			"tags": item.tags or ["affiliate", "review"],
+			"isPublished": True,
+		}
+		if client.publication_id:
+			story["publicationId"] = client.publication_id
+		response = session.post(
+			client.base_url,
+			headers={"Authorization": client.api_key},
+			json={"query": query, "variables": {"input": story}},
+			timeout=10,
+		)
+		check_response(response)
+		result = (response.json().get("data") or {}).get("createStory") or {}
+		if not result.get("success"):
+			raise PublishError(f"Hashnode refused the story: {response.text[:200]}")
+		return None
+
+	return _platform("hashnode", publish, BLOG_TYPES)
+
+
+def linkedin_platform(client) -> Platform:
+	"""
+	LinkedIn shares, with the token, author and endpoint of a `LinkedInAPIClient`.
+	"""
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		share: Dict[str, Any] = {
+			"shareCommentary": {"text": item.text},
+			"shareMediaCategory": "NONE",
+		}
+		if item.link:
+			share["shareMediaCategory"] = "ARTICLE"
+			share["media"] = [{"status": "READY", "originalUrl": item.link}]
+		response = session.post(
+			client.base_url,
+			headers={
+				"Authorization": f"Bearer {client.access_token}",
+				"X-Restli-Protocol-Version": "2.0.0",
+			},
+			json={
+				"author": client.author_urn,
+				"lifecycleState": "PUBLISHED",
+				"specificContent": {"com.linkedin.ugc.ShareContent": share},
+				"visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
+			},
+			timeout=10,
+		)
+		check_response(response)
+		post_id = response.headers.get("x-restli-id")
+		return f"https://www.linkedin.com/feed/update/{post_id}" if post_id else None
+
+	return _platform("linkedin", publish, BLOG_TYPES)
+
+
+def facebook_platform(
+	page_id: str, access_token: str, base_url: str = "https://graph.facebook.com/v19.0"
+) -> Platform:
+	"""
+	Posts to a Facebook page feed.
+	"""
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		response = session.post(
+			f"{base_url}/{page_id}/feed",
+			data={"message": item.text, "access_token": access_token},
+			timeout=10,
+		)
+		check_response(response)
+		post_id = response.json().get("id")
+		return f"https://www.facebook.com/{post_id}" if post_id else None
+
+	return _platform("facebook", publish, BLOG_TYPES)
+
+
+def twitter_platform(client) -> Platform:
+	"""
+	Tweets and threads through the tweepy client of an
+	`AffiliatePromoterTwitterClient`, counted against its monthly budget.
+
+	A thread that fails part way is resumed from the failed tweet when the
+	publisher retries it, so the tweets already posted are never posted again.
+	"""
+	# Serialises the budget check with the count it is checked against
+	budget_lock = threading.Lock()
+	# Ids already posted of unfinished threads, by item
+	progress_lock = threading.Lock()
+	progress: Dict[int, Tuple[PostItem, List[str]]] = {}
+
+	def post_tweet(text: str, reply_to: str | None) -> str:
+		with budget_lock:
+			if not client.can_post():
+				raise PublishError("Monthly post limit reached")
+			client.write_count += 1
+		try:
+			if reply_to is None:
+				response = client.client.create_tweet(text=text)
+			else:
+				response = client.client.create_tweet(
+					text=text, in_reply_to_tweet_id=reply_to
+				)
+		except Exception:
+			with budget_lock:
+				client.write_count -= 1
+			raise
+		return response.data["id"]
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		texts = item.thread or [item.text]
+		with progress_lock:
+			saved = progress.pop(id(item), None)
+		posted = list(saved[1]) if saved is not None and saved[0] is item else []
+		for text in texts[len(posted) :]:
+			try:
+				posted.append(post_tweet(text, posted[-1] if posted else None))
+			except Exception as e:
+				if not posted:
+					raise
+				retryable, hint = classify_error(e)
+				if retryable:
+					with progress_lock:
+						progress[id(item)] = (item, posted)
+				raise PublishError(
+					f"Thread stopped after {len(posted)} of {len(texts)} tweets: {e}",
+					retryable=retryable,
+					retry_after=hint,
+				) from e
+		return f"https://x.com/i/web/status/{posted[0]}"
+
+	return _platform("twitter", publish, {"blog", "qa"})
+
+
+def blogger_platform(client) -> Platform:
+	"""
+	Blogger posts through the API service of a `BloggerAPIClient`, one at a
+	time: the service's httplib2 connection is not thread-safe.
+	"""
+	lock = threading.Lock()
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		with lock:
+			post = (
+				client.service.posts()
+				.insert(
+					blogId=client.blog_id,
+					isDraft=False,
+					body={
+						"title": item.title,
+						"content": item.body,
+						"labels": item.tags,
+					},
+				)
+				.execute()
+			)
+		return post.get("url")
+
+	return _platform("blogger", publish, BLOG_TYPES)
+
+
+def youtube_platform(client) -> Platform:
+	"""
+	Video uploads through a `YouTubeAPIClient`, one at a time as the client's
+	API service is not thread-safe. An upload is never retried: the client
+	already resumes it chunk by chunk.
+	"""
+	lock = threading.Lock()
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		if not item.video_path:
+			raise PublishError("No video file")
+		with lock:
+			response = client.upload_video(
+				video_file=item.video_path,
+				title=item.title,
+				description=item.body,
+				tags=item.tags or None,
+			)
+		if not response:
+			raise PublishError("Upload failed")
+		return f"https://www.youtube.com/watch?v={response['id']}"
+
+	platform = _platform("youtube", publish, {"video"})
+	platform.max_attempts = 1
+	return platform
+
+
+def site_platform(script: str) -> Platform:
+	"""
+	Posts on our own site by running its `publish_post.py` script.
+	"""
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		if not os.path.exists(script):
+			raise PublishError(f"No site publish script at {script}")
+		command = ["python3", script, "--title", item.title, "--desc", item.summary]
+		command += ["--img", item.image or "", "--afflink", item.link or ""]
+		if item.body:
+			command += ["--review", item.body]
+		result = subprocess.run(command, capture_output=True, text=True)
+		if result.returncode != 0:
+			raise PublishError(
+				f"{script} exited with {result.returncode}: {result.stderr[-200:]}"
+			)
+		return None
+
+	return _platform("site", publish, BLOG_TYPES)
+
+
+def unconfigured_platform(name: str, content_types: Set[str]) -> Platform:
+	"""
+	A platform without credentials. Every post to it fails for good, so it
+	goes to the failure handler rather than being counted as published.
+	"""
+
+	def publish(item: PostItem, session: requests.Session) -> str | None:
+		raise PublishError(f"{name} is not configured")
+
+	return Platform(name, publish, content_types, max_attempts=1)
+
+
+def publishing_platforms(
+	twitter,
+	devto,
+	hashnode,
+	blogger,
+	linkedin,
+	youtube,
+	site_script: str,
+	facebook_page_id: str | None = None,
+	facebook_token: str | None = None,
+) -> List[Platform]:
+	"""
+	Every platform the affiliate flow posts to, from its API clients.
+
+	Args:
+		site_script (str): Path of the site's `publish_post.py`
+		facebook_page_id (str | None): Page to post to, Facebook is unconfigured without it
+		facebook_token (str | None): Page access token, Facebook is unconfigured without it
+
+	Returns:
+		List[Platform]: Platforms for a `MultiPlatformPublisher`
+	"""
+	platforms = [
+		twitter_platform(twitter),
+		devto_platform(devto),
+		hashnode_platform(hashnode),
+		blogger_platform(blogger),
+		linkedin_platform(linkedin),
+		youtube_platform(youtube),
+		site_platform(site_script),
+	]
+	if facebook_page_id and facebook_token:
+		platforms.append(facebook_platform(facebook_page_id, facebook_token))
+	else:
+		platforms.append(unconfigured_platform("facebook", BLOG_TYPES))
+	return platforms
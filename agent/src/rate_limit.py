@@ -0,0 +1,92 @@
+import time
+from threading import Lock
+from typing import Dict
+
+
+class TokenBucket:
+	"""
+	Thread-safe token bucket rate limiter.
+
+	Tokens refill continuously at `rate` per second up to `capacity`, so short
+	bursts of up to `capacity` requests go through immediately and sustained
+	traffic is held to `rate`.
+	"""
+
+	def __init__(self, rate: float, capacity: float):
+		"""
+		Initialize a full bucket.
+
+		Args:
+			rate (float): Tokens added per second
+			capacity (float): Maximum number of tokens the bucket holds
+		"""
+		self.rate = rate
+		self.capacity = capacity
+		self.tokens = capacity
+		self.updated_at = time.monotonic()
+		self.lock = Lock()
+
+	def _refill(self) -> None:
+		now = time.monotonic()
+		self.tokens = min(
+			self.capacity, self.tokens + (now - self.updated_at) * self.rate
+		)
+		self.updated_at = now
+
+	def try_acquire(self, tokens: float = 1.0) -> bool:
+		"""
+		Take tokens if they are available right now.
+
+		Returns:
+			bool: Whether the tokens were taken
+		"""
+		with self.lock:
+			self._refill()
+			if self.tokens >= tokens:
+				self.tokens -= tokens
+				return True
+			return False
+
+	def acquire(self, tokens: float = 1.0) -> None:
+		"""
+		Take tokens, sleeping until enough have refilled.
+
+		Args:
+			tokens (float): Number of tokens to take, at most `capacity`
+		"""
+		while True:
+			with self.lock:
+				self._refill()
+				if self.tokens >= tokens:
+					self.tokens -= tokens
+					return
+				wait = (tokens - self.tokens) / self.rate
+			time.sleep(wait)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = Lock()
+
+
+def get_limiter(name: str, rate: float, capacity: float | None = None) -> TokenBucket:
+	"""
+	Get the process-wide limiter for `name`, creating it on first use.
+
+	Every caller talking to the same API should share one bucket, so later
+	calls with the same name get the existing limiter and their `rate` and
+	`capacity` are ignored.
+
+	Args:
+		name (str): Name of the rate-limited resource, e.g. a provider name
+		rate (float): Requests per second
+		capacity (float | None): Burst size. Defaults to `rate`, at least 1.
+
+	Returns:
+		TokenBucket: The shared limiter
+	"""
+	with _limiters_lock:
+		if name not in _limiters:
+			_limiters[name] = TokenBucket(
+				rate, capacity if capacity is not None else max(1.0, rate)
+			)
+		return _limiters[name]
@@ -1,5 +1,6 @@
-from typing import Any, Dict
-from src.wallet import get_wallet_stats
+from typing import Any, Dict, List
+from src.price_feed import BinanceBookTickerSource, PriceFeed, TickSource
+from src.wallet import get_wallet_stats, use_price_table
 from src.datatypes.trading import PortfolioStatus
 from functools import partial
 
@@ -62,6 +63,23 @@ class TradingSensor:
 
 		return wallet_stats
 
+	def start_price_feed(
+		self, symbols: List[str], source: TickSource | None = None
+	) -> PriceFeed:
+		"""
+		Start a background price feed and serve wallet prices from it.
+
+		Args:
+			symbols (List[str]): Symbols to follow, e.g. ["ETH", "LINK"]
+			source (TickSource | None): Tick source, Binance book tickers by default
+
+		Returns:
+			PriceFeed: The running feed, stop it with `stop()`
+		"""
+		feed = PriceFeed(source or BinanceBookTickerSource(symbols)).start()
+		use_price_table(feed.table)
+		return feed
+
 	def get_metric_fn(self, metric_name: str = "wallet"):
 		metrics = {
 			"wallet": partial(
@@ -0,0 +1,282 @@
+import os
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+from loguru import logger
+
+
+class SlideshowError(Exception):
+	"""
+	ffmpeg could not render a slideshow.
+	"""
+
+
+@dataclass
+class SlideshowOptions:
+	width: int = 720
+	# Fixed output height, None fits the tallest image at `width`
+	height: int | None = None
+	fps: int = 24
+	duration_per_image: float = 2.5
+	# Slowly zoom into every image instead of showing it still
+	ken_burns: bool = False
+	# Zoom reached at the end of each image with `ken_burns`
+	max_zoom: float = 1.15
+	crf: int = 23
+	preset: str = "veryfast"
+	# Processes resizing images, 1 resizes in the calling process
+	resize_workers: int = 1
+
+
+def _even(value: float) -> int:
+	# libx264 with yuv420p needs even dimensions
+	return max(2, int(round(value / 2)) * 2)
+
+
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+def canvas_size(
+	sizes: Sequence[Tuple[int, int]], width: int, height: int | None = None
+) -> Tuple[int, int]:
+	"""
+	Get the frame size for images scaled to `width`. Without a fixed `height`
+	it is as tall as the tallest of them, like MoviePy's "compose" concatenation.
+	"""
+	if height is None:
+		height = max(h * width / w for w, h in sizes)
+	return _even(width), _even(height)
+
+
+def run_ffmpeg(command: List[str], cwd: str | None = None) -> None:
+	"""
+	Run an ffmpeg command.
+
+	Raises:
+		SlideshowError: If ffmpeg is missing or fails
+	"""
+	try:
+		subprocess.run(command, check=True, capture_output=True, text=True, cwd=cwd)
+	except FileNotFoundError as e:
+		raise SlideshowError("ffmpeg is not installed") from e
+	except subprocess.CalledProcessError as e:
+		raise SlideshowError(f"ffmpeg failed: {e.stderr.strip()[-500:]}") from e
+
+
+def media_duration(path: str) -> float:
+	"""
+	Get the duration of an audio or video file in seconds, from ffmpeg's probe
+	of its header.
+	"""
+	try:
+		probe = subprocess.run(
+			["ffmpeg", "-hide_banner", "-i", path], capture_output=True, text=True
+		)
+	except FileNotFoundError as e:
+		raise SlideshowError("ffmpeg is not installed") from e
+	# Without an output ffmpeg exits with an error, but has printed the header
+	match = _DURATION.search(probe.stderr)
+	if match is None:
+		raise SlideshowError(f"No duration for {path}: {probe.stderr.strip()[-200:]}")
+	hours, minutes, seconds = match.groups()
+	return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _fit_image(args: Tuple[str, str, Tuple[int, int]]) -> str:
+	"""
+	Scale an image to fit the canvas and center it on black.
+	Runs in worker processes, so it takes and returns only picklable values.
+	"""
+	from PIL import Image
+
+	source, target, (width, height) = args
+	with Image.open(source) as image:
+		image = image.convert("RGB")
+		scale = min(width / image.width, height / image.height)
+		scaled = (
+			min(width, round(image.width * scale)),
+			min(height, round(image.height * scale)),
+		)
+		image = image.resize(scaled, Image.Resampling.LANCZOS)
+		canvas = Image.new("RGB", (width, height))
+		canvas.paste(image, ((width - scaled[0]) // 2, (height - scaled[1]) // 2))
+		canvas.save(target, quality=95)
+	return target
+
+
+def prepare_images(
+	image_paths: Sequence[str],
+	work_dir: str,
+	width: int,
+	workers: int = 1,
+	height: int | None = None,
+) -> Tuple[List[str], Tuple[int, int]]:
+	"""
+	Resize images once to the frame size ffmpeg will encode at.
+
+	Args:
+		image_paths (Sequence[str]): Source images, any size and format Pillow reads
+		work_dir (str): Directory to write the resized frames to
+		width (int): Frame width
+		workers (int): Processes to resize in
+		height (int | None): Frame height, None fits the tallest image
+
+	Returns:
+		Tuple[List[str], Tuple[int, int]]: Paths of the frames in order, and their size
+	"""
+	from PIL import Image
+
+	sizes = []
+	for path in image_paths:
+		# Only reads the header
+		with Image.open(path) as image:
+			sizes.append(image.size)
+	size = canvas_size(sizes, width, height)
+	jobs = [
+		(path, os.path.join(work_dir, f"frame_{i:04d}.jpg"), size)
+		for i, path in enumerate(image_paths)
+	]
+	if workers > 1 and len(jobs) > 1:
+		with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+			return list(pool.map(_fit_image, jobs)), size
+	return [_fit_image(job) for job in jobs], size
+
+
+def concat_list(frames: Sequence[str], duration: float) -> str:
+	"""
+	Get a concat demuxer script showing each frame for `duration` seconds.
+	"""
+	lines = []
+	for frame in frames:
+		escaped = os.path.abspath(frame).replace("'", "'\\''")
+		lines += [f"file '{escaped}'", f"duration {duration}"]
+	# The demuxer ignores the last duration unless the last file is listed again
+	lines.append(lines[-2])
+	return "\n".join(lines) + "\n"
+
+
+def ken_burns_filter(
+	count: int,
+	size: Tuple[int, int],
+	options: SlideshowOptions,
+	first_input: int = 0,
+	label: str = "v",
+) -> str:
+	"""
+	Get a filter graph that zooms into each of `count` still inputs, starting
+	at input `first_input`, and joins them into the stream `[label]`.
+	"""
+	frames = max(1, round(options.duration_per_image * options.fps))
+	step = (options.max_zoom - 1) / frames
+	width, height = size
+	chains = [
+		f"[{first_input + i}:v]zoompan=z='min(zoom+{step:.6f},{options.max_zoom})'"
+		f":x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)'"
+		f":d={frames}:s={width}x{height}:fps={options.fps},setsar=1[v{i}]"
+		for i in range(count)
+	]
+	joined = "".join(f"[v{i}]" for i in range(count))
+	return (
+		";".join(chains) + f";{joined}concat=n={count}:v=1:a=0,format=yuv420p[{label}]"
+	)
+
+
+def ffmpeg_command(
+	frames: Sequence[str],
+	size: Tuple[int, int],
+	audio_path: str | None,
+	output_path: str,
+	options: SlideshowOptions,
+	list_path: str,
+) -> List[str]:
+	"""
+	Get the ffmpeg command rendering prepared frames into a video.
+
+	Still slides go through the concat demuxer, read from `list_path`, which
+	must hold `concat_list(frames, ...)`. Ken Burns slides go through a
+	filter graph instead, each image being its own input.
+	"""
+	total = len(frames) * options.duration_per_image
+	command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+	if options.ken_burns:
+		for frame in frames:
+			command += ["-i", frame]
+		video_map = "[v]"
+		filters = ["-filter_complex", ken_burns_filter(len(frames), size, options)]
+	else:
+		command += ["-f", "concat", "-safe", "0", "-i", list_path]
+		video_map = "0:v"
+		filters = ["-vf", f"fps={options.fps},format=yuv420p"]
+	if audio_path:
+		command += ["-i", audio_path]
+	command += filters + ["-map", video_map]
+	if audio_path:
+		command += [
+			"-map",
+			f"{len(frames) if options.ken_burns else 1}:a",
+			"-c:a",
+			"aac",
+		]
+	command += [
+		"-c:v",
+		"libx264",
+		"-preset",
+		options.preset,
+		"-crf",
+		str(options.crf),
+		# Audio longer than the slides is cut, shorter audio leaves silence
+		"-t",
+		f"{total:.3f}",
+		"-movflags",
+		"+faststart",
+		output_path,
+	]
+	return command
+
+
+def render_slideshow(
+	image_paths: Sequence[str],
+	audio_path: str | None,
+	output_path: str,
+	options: SlideshowOptions | None = None,
+) -> str:
+	"""
+	Render images into a slideshow video with ffmpeg.
+
+	Images are resized once with Pillow and ffmpeg encodes straight to disk,
+	so no frame is ever held in Python.
+
+	Args:
+		image_paths (Sequence[str]): Images in order
+		audio_path (str | None): Narration to lay over the slides
+		output_path (str): Video to write
+		options (SlideshowOptions | None): Size, timing and encoding, defaults otherwise
+
+	Returns:
+		str: `output_path`
+
+	Raises:
+		SlideshowError: If there are no images or ffmpeg fails
+	"""
+	options = options or SlideshowOptions()
+	if not image_paths:
+		raise SlideshowError("No images to render")
+	with tempfile.TemporaryDirectory(prefix="slideshow_") as work_dir:
+		frames, size = prepare_images(
+			image_paths, work_dir, options.width, options.resize_workers, options.height
+		)
+		list_path = os.path.join(work_dir, "frames.txt")
+		with open(list_path, "w") as f:
+			f.write(concat_list(frames, options.duration_per_image))
+		command = ffmpeg_command(
+			frames, size, audio_path, output_path, options, list_path
+		)
+		run_ffmpeg(command)
+	logger.info(
+		f"[Slideshow] Rendered {len(frames)} images at {size[0]}x{size[1]} to {output_path}"
+	)
+	return output_path
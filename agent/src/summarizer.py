@@ -1,45 +1,46 @@
-from functools import partial
-from typing import Callable, List, Optional
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, List, Optional
 
 from src.genner.Base import Genner
+from src.helper import extract_content
 from src.my_types import ChatHistory, Message
 
+DEFAULT_TEMPLATE = "You are a summarizer agent. You are to summarize anything below in 1 single sentence or more."
 
-def summarize(
-	genner: "Genner",
-	talking_points: List[str],
-	template: str = "You are a summarizer agent. You are to summarize anything below in 1 single sentence or more.",
-	max_retries: int = 3,
-) -> str:
-	"""
-	Summarize a list of talking points using the provided language model.
+# Templates may put the talking points inline instead of in a separate message
+PLACEHOLDER = "{to_summarize}"
 
-	Args:
-	    genner: An instance of the Genner class that handles text generation
-	    talking_points: A list of strings containing the points to be summarized
-	    template: Optional template string for formatting the prompt
-	    max_retries: Maximum number of retry attempts for failed generations
+BATCH_INSTRUCTIONS = (
+	"You are given several independent inputs, each wrapped in <InputN> tags. "
+	"Summarize each one on its own, without mixing information between them, and "
+	"wrap each summary in the matching <SummaryN> tags, e.g. <Summary1>...</Summary1>."
+)
 
-	Returns:
-	    str: A summarized version of the input talking points
 
-	Raises:
-	    SummarizerError: If the summarization fails after max_retries attempts
-	    ValueError: If talking_points is empty or contains invalid data
+def estimate_tokens(text: str) -> int:
 	"""
-	if not talking_points:
-		raise ValueError("talking_points cannot be empty")
+	Rough token count of a text, at about four characters per token.
+	"""
+	return len(text) // 4 + 1
 
-	if not all(isinstance(point, str) for point in talking_points):
-		raise ValueError("All talking points must be strings")
 
+def _format_points(talking_points: List[str]) -> str:
 	# Format talking points with bullet points for better readability
-	talking_points_formatted = "\n• " + "\n• ".join(
+	return "\n• " + "\n• ".join(
 		point.strip() for point in talking_points if point.strip()
 	)
 
-	# Create the chat history with the formatted prompt
-	chat_history = ChatHistory(
+
+def _build_chat_history(template: str, body: str) -> ChatHistory:
+	if PLACEHOLDER in template:
+		return ChatHistory(
+			[Message(role="user", content=template.replace(PLACEHOLDER, body))]
+		)
+
+	return ChatHistory(
 		[
 			Message(
 				role="system",
@@ -47,11 +48,13 @@ def summarize(
 			),
 			Message(
 				role="user",
-				content=talking_points_formatted,
+				content=body,
 			),
 		]
 	)
 
+
+def _complete(genner: "Genner", chat_history: ChatHistory, max_retries: int) -> str:
 	# Attempt generation with retries
 	for attempt in range(max_retries):
 		try:
@@ -68,11 +71,297 @@ def summarize(
 	raise Exception("Failed to generate valid summary")
 
 
+def summarize(
+	genner: "Genner",
+	talking_points: List[str],
+	template: str = DEFAULT_TEMPLATE,
+	max_retries: int = 3,
+) -> str:
+	"""
+	Summarize a list of talking points using the provided language model.
+
+	Args:
+	    genner: An instance of the Genner class that handles text generation
+	    talking_points: A list of strings containing the points to be summarized
+	    template: Optional template string for formatting the prompt. If it contains
+	        `{to_summarize}`, the talking points are filled in there, otherwise it is
+	        sent as the system prompt
+	    max_retries: Maximum number of retry attempts for failed generations
+
+	Returns:
+	    str: A summarized version of the input talking points
+
+	Raises:
+	    SummarizerError: If the summarization fails after max_retries attempts
+	    ValueError: If talking_points is empty or contains invalid data
+	"""
+	if not talking_points:
+		raise ValueError("talking_points cannot be empty")
+
+	if not all(isinstance(point, str) for point in talking_points):
+		raise ValueError("All talking points must be strings")
+
+	chat_history = _build_chat_history(template, _format_points(talking_points))
+	return _complete(genner, chat_history, max_retries)
+
+
+class Summarizer:
+	def __init__(
+		self,
+		genner: "Genner",
+		template: str = DEFAULT_TEMPLATE,
+		max_retries: int = 3,
+		token_budget: int = 6000,
+		batch_token_budget: int = 2000,
+		max_workers: int = 4,
+		cache_size: int = 256,
+	):
+		"""
+		Summarizer that batches, splits and memoizes requests.
+
+		Small independent inputs are packed into one structured request of at
+		most `batch_token_budget` tokens. Inputs over `token_budget` are split
+		into chunks that are summarized in parallel and then reduced into one
+		summary. Every summary is memoized by a hash of its template and input,
+		so repeated inputs cost nothing.
+
+		Args:
+		    genner: An instance of the Genner class that handles text generation
+		    template: Template for the summary prompt, see `summarize`
+		    max_retries: Maximum number of retry attempts for failed generations
+		    token_budget: Estimated tokens above which an input is map-reduced
+		    batch_token_budget: Estimated tokens of inputs packed into one request
+		    max_workers: Number of requests in flight at once
+		    cache_size: Number of summaries to keep memoized
+		"""
+		self.genner = genner
+		self.template = template
+		self.max_retries = max_retries
+		self.token_budget = token_budget
+		self.batch_token_budget = batch_token_budget
+		self.cache_size = cache_size
+
+		self._cache: OrderedDict[str, str] = OrderedDict()
+		self._cache_lock = Lock()
+		self._executor = ThreadPoolExecutor(
+			max_workers=max_workers, thread_name_prefix="summarizer"
+		)
+
+	def __call__(self, talking_points: List[str]) -> str:
+		return self.summarize_many([talking_points])[0]
+
+	def _key(self, talking_points: List[str]) -> str:
+		digest = hashlib.sha256(self.template.encode("utf-8"))
+		for point in talking_points:
+			digest.update(b"\x00" + point.encode("utf-8"))
+		return digest.hexdigest()
+
+	def _cache_get(self, key: str) -> str | None:
+		with self._cache_lock:
+			if key not in self._cache:
+				return None
+			self._cache.move_to_end(key)
+			return self._cache[key]
+
+	def _cache_put(self, key: str, summary: str) -> None:
+		with self._cache_lock:
+			self._cache[key] = summary
+			self._cache.move_to_end(key)
+			while len(self._cache) > self.cache_size:
+				self._cache.popitem(last=False)
+
+	def _summarize_one(self, talking_points: List[str]) -> str:
+		key = self._key(talking_points)
+		if (cached := self._cache_get(key)) is not None:
+			return cached
+
+		summary = summarize(
+			self.genner, talking_points, self.template, self.max_retries
+		)
+		self._cache_put(key, summary)
+		return summary
+
+	def _summarize_batch(self, batch: List[List[str]]) -> List[str]:
+		"""
+		Summarize several small inputs with a single request.
+
+		Inputs whose summary is missing from the response are retried on
+		their own, so a sloppy answer costs extra requests, not correctness.
+		"""
+		if len(batch) == 1:
+			return [self._summarize_one(batch[0])]
+
+		body = (
+			BATCH_INSTRUCTIONS
+			+ "\n"
+			+ "\n".join(
+				f"<Input{i}>{_format_points(points)}\n</Input{i}>"
+				for i, points in enumerate(batch, start=1)
+			)
+		)
+		response = _complete(
+			self.genner, _build_chat_history(self.template, body), self.max_retries
+		)
+
+		summaries = []
+		for i, points in enumerate(batch, start=1):
+			summary = extract_content(response, f"Summary{i}").strip()
+			if summary:
+				self._cache_put(self._key(points), summary)
+			else:
+				summary = self._summarize_one(points)
+			summaries.append(summary)
+		return summaries
+
+	def _chunk(self, talking_points: List[str]) -> List[List[str]]:
+		"""
+		Split talking points into chunks of at most `token_budget` estimated
+		tokens, breaking oversized points on line boundaries first.
+		"""
+		max_chars = self.token_budget * 4
+
+		pieces: List[str] = []
+		for point in talking_points:
+			if estimate_tokens(point) <= self.token_budget:
+				pieces.append(point)
+				continue
+			piece = ""
+			for line in point.splitlines(keepends=True):
+				while len(line) > max_chars:
+					pieces.append(piece + line[: max_chars - len(piece)])
+					line = line[max_chars - len(piece) :]
+					piece = ""
+				if len(piece) + len(line) > max_chars:
+					pieces.append(piece)
+					piece = ""
+				piece += line
+			if piece:
+				pieces.append(piece)
+
+		chunks: List[List[str]] = [[]]
+		chunk_tokens = 0
+		for piece in pieces:
+			tokens = estimate_tokens(piece)
+			if chunks[-1] and chunk_tokens + tokens > self.token_budget:
+				chunks.append([])
+				chunk_tokens = 0
+			chunks[-1].append(piece)
+			chunk_tokens += tokens
+		return chunks
+
+	def _map_reduce(self, talking_points: List[str]) -> str:
+		"""
+		Summarize a long input by summarizing its chunks in parallel, then
+		summarizing the partial summaries until they fit in one request.
+		"""
+		key = self._key(talking_points)
+		if (cached := self._cache_get(key)) is not None:
+			return cached
+
+		chunks = self._chunk(talking_points)
+		while len(chunks) > 1:
+			points = list(self._executor.map(self._summarize_one, chunks))
+			chunks = self._chunk(points)
+			if len(chunks) >= len(points):
+				# Partial summaries no longer pack together, reduce them in one go
+				chunks = [points]
+
+		summary = self._summarize_one(chunks[0])
+		self._cache_put(key, summary)
+		return summary
+
+	def summarize_many(self, inputs: List[List[str]]) -> List[str]:
+		"""
+		Summarize several independent inputs at once.
+
+		Args:
+		    inputs: One list of talking points per summary to produce
+
+		Returns:
+		    List[str]: One summary per input, in the same order
+
+		Raises:
+		    ValueError: If an input is empty or contains invalid data
+		    Exception: If a summary fails after max_retries attempts
+		"""
+		for talking_points in inputs:
+			if not talking_points:
+				raise ValueError("talking_points cannot be empty")
+			if not all(isinstance(point, str) for point in talking_points):
+				raise ValueError("All talking points must be strings")
+
+		results: Dict[str, str] = {}
+		small: Dict[str, List[str]] = {}
+		large: Dict[str, List[str]] = {}
+		for talking_points in inputs:
+			key = self._key(talking_points)
+			if key in results or key in small or key in large:
+				continue
+			if (cached := self._cache_get(key)) is not None:
+				results[key] = cached
+			elif estimate_tokens("\n".join(talking_points)) > self.token_budget:
+				large[key] = talking_points
+			else:
+				small[key] = talking_points
+
+		batches: List[List[str]] = [[]]
+		batch_tokens = 0
+		for key, talking_points in small.items():
+			tokens = estimate_tokens("\n".join(talking_points))
+			if batches[-1] and batch_tokens + tokens > self.batch_token_budget:
+				batches.append([])
+				batch_tokens = 0
+			batches[-1].append(key)
+			batch_tokens += tokens
+
+		batch_futures = [
+			(
+				batch,
+				self._executor.submit(self._summarize_batch, [small[k] for k in batch]),
+			)
+			for batch in batches
+			if batch
+		]
+
+		# Map-reduce drivers only wait on the shared executor, so they get their
+		# own threads to avoid starving it
+		if large:
+			with ThreadPoolExecutor(max_workers=len(large)) as drivers:
+				for key, summary in zip(
+					large, drivers.map(self._map_reduce, large.values())
+				):
+					results[key] = summary
+
+		for batch, future in batch_futures:
+			for key, summary in zip(batch, future.result()):
+				results[key] = summary
+
+		return [results[self._key(talking_points)] for talking_points in inputs]
+
+
+def summarize_all(
+	summarizer: Callable[[List[str]], str], inputs: List[List[str]]
+) -> List[str]:
+	"""
+	Summarize several independent inputs, in as few requests as the summarizer allows.
+
+	Args:
+	    summarizer: A plain summarizer callable or a `Summarizer`
+	    inputs: One list of talking points per summary to produce
+
+	Returns:
+	    List[str]: One summary per input, in the same order
+	"""
+	if isinstance(summarizer, Summarizer):
+		return summarizer.summarize_many(inputs)
+	return [summarizer(talking_points) for talking_points in inputs]
+
+
 def get_summarizer(
 	genner: "Genner", custom_template: Optional[str] = None, max_retries: int = 3
-) -> Callable[[List[str]], str]:
+) -> Summarizer:
 	"""
-	Create a partial function for summarization with predefined parameters.
+	Create a summarizer with predefined parameters.
 
 	Args:
 	    genner: An instance of the Genner class
@@ -80,15 +369,14 @@ def get_summarizer(
 	    max_retries: Maximum number of retry attempts for failed generations
 
 	Returns:
-	    Callable: A function that takes a list of strings and returns a summary
+	    Summarizer: A callable that takes a list of strings and returns a summary
 
 	Example:
 	    >>> summarizer = get_summarizer(genner)
 	    >>> summary = summarizer(["Point 1", "Point 2", "Point 3"])
 	"""
 
-	return partial(
-		summarize,
+	return Summarizer(
 		genner,
 		template=custom_template
 		if custom_template
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Protocol, Sequence, Tuple
+
+
+class SpeechBackend(Protocol):
+	def synthesize(self, text: str, voice: str) -> bytes:
+		"""
+		Speak a text in a voice and return it as MP3.
+		"""
+		...
+
+
+class GoogleTTSBackend:
+	"""
+	Synthesises with Google Cloud Text-to-Speech, reading credentials from
+	`GOOGLE_APPLICATION_CREDENTIALS`. One client is shared by every thread.
+	"""
+
+	def __init__(self):
+		self._client = None
+		self._lock = threading.Lock()
+
+	def synthesize(self, text: str, voice: str) -> bytes:
+		from google.cloud import texttospeech
+
+		with self._lock:
+			if self._client is None:
+				self._client = texttospeech.TextToSpeechClient()
+		response = self._client.synthesize_speech(
+			input=texttospeech.SynthesisInput(text=text),
+			# Voice names start with their language, e.g. en-US-Wavenet-D
+			voice=texttospeech.VoiceSelectionParams(
+				language_code="-".join(voice.split("-")[:2]), name=voice
+			),
+			audio_config=texttospeech.AudioConfig(
+				audio_encoding=texttospeech.AudioEncoding.MP3
+			),
+		)
+		return response.audio_content
+
+
+def phrase_key(voice: str, text: str) -> str:
+	"""
+	Get a stable hash of a phrase spoken in a voice.
+	"""
+	return hashlib.sha256(f"{voice}\n{text.strip()}".encode("utf-8")).hexdigest()
+
+
+def strip_id3(audio: bytes) -> bytes:
+	"""
+	Drop a leading ID3v2 tag from MP3 data, so parts can be joined frame to frame.
+	"""
+	if audio[:3] != b"ID3" or len(audio) < 10:
+		return audio
+	# Tag size is four 7-bit bytes, not counting the 10-byte header
+	size = 0
+	for byte in audio[6:10]:
+		size = (size << 7) | (byte & 0x7F)
+	return audio[10 + size :]
+
+
+@dataclass
+class PhraseCacheStats:
+	hits: int = 0
+	syntheses: int = 0
+	# Callers that waited for an identical synthesis already running
+	joined: int = 0
+	synthesis_seconds: float = 0.0
+
+
+class PhraseCache:
+	"""
+	Store of synthesised speech, one MP3 per (voice, text).
+
+	Every video repeats the same intro, disclosure and outro, so those are
+	synthesised once and read from disk after that. Identical phrases asked
+	for while one is still synthesising wait for it.
+	"""
+
+	def __init__(self, directory: str, backend: SpeechBackend | None = None):
+		"""
+		Open or create a store.
+
+		Args:
+			directory (str): Directory holding the audio
+			backend (SpeechBackend | None): Synthesises phrases, Google TTS by default
+		"""
+		self.directory = directory
+		self.backend = backend if backend is not None else GoogleTTSBackend()
+		self.stats = PhraseCacheStats()
+		self._inflight: Dict[str, Future] = {}
+		self._lock = threading.Lock()
+		os.makedirs(os.path.join(directory, "tmp"), exist_ok=True)
+
+	def path(self, voice: str, text: str) -> str:
+		key = phrase_key(voice, text)
+		return os.path.join(self.directory, key[:2], f"{key}.mp3")
+
+	def _synthesize(self, voice: str, text: str, path: str) -> str:
+		started = time.monotonic()
+		audio = self.backend.synthesize(text, voice)
+		elapsed = time.monotonic() - started
+
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.directory, "tmp"))
+		with os.fdopen(fd, "wb") as f:
+			f.write(audio)
+		os.replace(tmp_path, path)
+		with self._lock:
+			self.stats.syntheses += 1
+			self.stats.synthesis_seconds += elapsed
+		return path
+
+	def get(self, voice: str, text: str) -> str:
+		"""
+		Get the audio file for a phrase, synthesising it on a miss.
+
+		Args:
+			voice (str): Voice name, e.g. "en-US-Wavenet-D"
+			text (str): Text to speak
+
+		Returns:
+			str: Path of the MP3
+		"""
+		path = self.path(voice, text)
+		if os.path.exists(path):
+			with self._lock:
+				self.stats.hits += 1
+			return path
+
+		with self._lock:
+			future = self._inflight.get(path)
+			owner = future is None
+			if owner:
+				future = self._inflight[path] = Future()
+			else:
+				self.stats.joined += 1
+
+		if owner:
+			try:
+				future.set_result(self._synthesize(voice, text, path))
+			except Exception as e:
+				future.set_exception(e)
+			finally:
+				with self._lock:
+					self._inflight.pop(path, None)
+		return future.result()
+
+	def synthesize_parts(
+		self, parts: Sequence[Tuple[str, str]], max_workers: int = 4
+	) -> List[str]:
+		"""
+		Get the audio for many (voice, text) parts at once.
+
+		Returns:
+			List[str]: Path of each part's MP3, in order
+		"""
+		if not parts:
+			return []
+		with ThreadPoolExecutor(
+			max_workers=min(max_workers, len(parts)), thread_name_prefix="tts"
+		) as pool:
+			return list(pool.map(lambda part: self.get(*part), parts))
+
+	def render(
+		self, parts: Sequence[Tuple[str, str]], output_path: str, max_workers: int = 4
+	) -> str:
+		"""
+		Speak (voice, text) parts one after the other into a single MP3.
+
+		The parts are joined frame to frame in memory, without decoding: they
+		come from the same backend and share their encoding.
+
+		Returns:
+			str: `output_path`
+		"""
+		audio = bytearray()
+		for i, path in enumerate(self.synthesize_parts(parts, max_workers)):
+			with open(path, "rb") as f:
+				data = f.read()
+			# The first part's tag, if any, describes the whole file well enough
+			audio += data if i == 0 else strip_id3(data)
+
+		directory = os.path.dirname(os.path.abspath(output_path))
+		fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".mp3")
+		with os.fdopen(fd, "wb") as f:
+			f.write(audio)
+		os.replace(tmp_path, output_path)
+		return output_path
+
+
+_caches: Dict[str, PhraseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_phrase_cache(directory: str = "tts_cache") -> PhraseCache:
+	"""
+	Get the process-wide phrase cache for a directory, backed by Google TTS.
+	"""
+	key = os.path.abspath(directory)
+	with _caches_lock:
+		if key not in _caches:
+			_caches[key] = PhraseCache(directory)
+		return _caches[key]
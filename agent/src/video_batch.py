@@ -0,0 +1,403 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Sequence, Tuple
+
+from loguru import logger
+
+from src.slideshow import (
+	SlideshowOptions,
+	concat_list,
+	ken_burns_filter,
+	media_duration,
+	prepare_images,
+	run_ffmpeg,
+)
+
+
+@dataclass
+class RenderJob:
+	name: str
+	image_paths: List[str]
+	output_path: str
+	# Narration, starts with the first image
+	audio_path: str | None = None
+	# SRT subtitles burned over the images
+	captions_path: str | None = None
+	# Background music, looped under the whole video
+	music_path: str | None = None
+	# Clip played before the images, without its own sound
+	intro_path: str | None = None
+
+
+@dataclass
+class SharedAsset:
+	"""
+	A music bed or intro clip decoded once per batch and used by every job
+	that asks for it.
+	"""
+
+	source: str
+	path: str
+	duration: float
+
+
+@dataclass
+class RenderTiming:
+	name: str
+	output_path: str | None
+	# From submission to the job's output being written
+	seconds: float = 0.0
+	# Seconds per step: queued, resize and encode
+	steps: Dict[str, float] = field(default_factory=dict)
+	# Process that rendered the job
+	worker: int = 0
+	error: str | None = None
+
+
+@dataclass
+class BatchReport:
+	timings: List[RenderTiming]
+	workers: int
+	# Spent decoding shared music and intros before rendering
+	shared_seconds: float
+	elapsed_seconds: float
+
+	def failed(self) -> List[RenderTiming]:
+		return [t for t in self.timings if t.error is not None]
+
+	def summary(self) -> str:
+		rendered = [t for t in self.timings if t.error is None]
+		slowest = max(rendered, key=lambda t: t.seconds, default=None)
+		return (
+			f"{len(rendered)}/{len(self.timings)} videos in {self.elapsed_seconds:.1f}s"
+			f" on {self.workers} workers ({self.shared_seconds:.1f}s on shared assets)"
+			+ (f", slowest '{slowest.name}' {slowest.seconds:.1f}s" if slowest else "")
+		)
+
+
+def _asset_key(path: str, *params: object) -> str:
+	"""
+	Hash a source file's identity and the parameters it is decoded with, so a
+	changed file or a new frame size is decoded again.
+	"""
+	stat = os.stat(path)
+	key = repr((os.path.abspath(path), stat.st_size, stat.st_mtime_ns, params))
+	return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def compose_command(
+	job: RenderJob,
+	frames: Sequence[str],
+	size: Tuple[int, int],
+	options: SlideshowOptions,
+	list_path: str,
+	intro: SharedAsset | None = None,
+	music: SharedAsset | None = None,
+	music_volume: float = 0.2,
+	threads: int = 0,
+) -> List[str]:
+	"""
+	Get the single ffmpeg command that renders a job: intro, slides with
+	burned captions, and narration over the music bed, encoded in one pass.
+
+	Captions are read as `captions.srt` from the working directory, which
+	spares escaping their path inside the filter graph.
+	"""
+	fps = options.fps
+	command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+	filters = []
+	index = 0
+
+	if intro is not None:
+		command += ["-i", intro.path]
+		index += 1
+	if options.ken_burns:
+		for frame in frames:
+			command += ["-i", frame]
+		filters.append(ken_burns_filter(len(frames), size, options, index, "slides"))
+		index += len(frames)
+	else:
+		command += ["-f", "concat", "-safe", "0", "-i", list_path]
+		filters.append(f"[{index}:v]fps={fps},format=yuv420p,setsar=1[slides]")
+		index += 1
+
+	video = "slides"
+	if job.captions_path:
+		filters.append(f"[{video}]subtitles=captions.srt[captioned]")
+		video = "captioned"
+	if intro is not None:
+		filters.append(f"[0:v][{video}]concat=n=2:v=1:a=0[video]")
+		video = "video"
+
+	offset_ms = round(intro.duration * 1000) if intro is not None else 0
+	audio = []
+	if job.audio_path:
+		command += ["-i", os.path.abspath(job.audio_path)]
+		filters.append(
+			f"[{index}:a]adelay={offset_ms}:all=1,aformat=channel_layouts=stereo[narration]"
+		)
+		audio.append("[narration]")
+		index += 1
+	if music is not None:
+		command += ["-stream_loop", "-1", "-i", music.path]
+		filters.append(f"[{index}:a]volume={music_volume}[music]")
+		audio.append("[music]")
+		index += 1
+	if len(audio) == 2:
+		filters.append(
+			"".join(audio) + "amix=inputs=2:duration=longest:normalize=0[audio]"
+		)
+	elif audio:
+		filters.append(f"{audio[0]}anull[audio]")
+
+	total = (intro.duration if intro is not None else 0.0) + len(
+		frames
+	) * options.duration_per_image
+	command += ["-filter_complex", ";".join(filters), "-map", f"[{video}]"]
+	if audio:
+		command += ["-map", "[audio]", "-c:a", "aac"]
+	command += [
+		"-c:v",
+		"libx264",
+		"-preset",
+		options.preset,
+		"-crf",
+		str(options.crf),
+		"-threads",
+		str(threads),
+		"-t",
+		f"{total:.3f}",
+		"-movflags",
+		"+faststart",
+		os.path.abspath(job.output_path),
+	]
+	return command
+
+
+def render_job(
+	job: RenderJob,
+	options: SlideshowOptions,
+	intro: SharedAsset | None,
+	music: SharedAsset | None,
+	music_volume: float,
+	threads: int,
+	submitted_at: float,
+) -> RenderTiming:
+	"""
+	Render one job. Runs in a worker process, so it reports failures in the
+	timing rather than raising.
+	"""
+	started = time.time()
+	timing = RenderTiming(
+		name=job.name,
+		output_path=None,
+		steps={"queued": started - submitted_at},
+		worker=os.getpid(),
+	)
+	try:
+		with tempfile.TemporaryDirectory(prefix="render_") as work_dir:
+			step = time.perf_counter()
+			frames, size = prepare_images(
+				job.image_paths, work_dir, options.width, height=options.height
+			)
+			list_path = os.path.join(work_dir, "frames.txt")
+			with open(list_path, "w") as f:
+				f.write(concat_list(frames, options.duration_per_image))
+			if job.captions_path:
+				shutil.copyfile(
+					job.captions_path, os.path.join(work_dir, "captions.srt")
+				)
+			timing.steps["resize"] = time.perf_counter() - step
+
+			step = time.perf_counter()
+			command = compose_command(
+				job,
+				frames,
+				size,
+				options,
+				list_path,
+				intro,
+				music,
+				music_volume,
+				threads,
+			)
+			run_ffmpeg(command, cwd=work_dir)
+			timing.steps["encode"] = time.perf_counter() - step
+		timing.output_path = job.output_path
+	except Exception as e:
+		timing.error = f"{type(e).__name__}: {e}"
+	timing.seconds = time.time() - submitted_at
+	return timing
+
+
+class BatchRenderer:
+	"""
+	Renders many product videos at once, one per core.
+
+	Every job is rendered by a single ffmpeg pass in its own worker process.
+	Music beds and intro clips shared between jobs are decoded once, to PCM
+	and to the output's frame size, and kept in `work_dir` for later batches,
+	so jobs only mix and join them.
+	"""
+
+	def __init__(
+		self,
+		options: SlideshowOptions | None = None,
+		max_workers: int | None = None,
+		music_volume: float = 0.2,
+		work_dir: str = "render_cache",
+	):
+		"""
+		Initialize the renderer.
+
+		Args:
+			options (SlideshowOptions | None): Frame size, timing and encoding; square 720p by default
+			max_workers (int | None): Processes rendering at once, the number of cores by default
+			music_volume (float): Music level under narration
+			work_dir (str): Directory keeping decoded shared assets
+		"""
+		options = options or SlideshowOptions()
+		# Shared intros are decoded to one frame size, so every job uses it
+		if options.height is None:
+			options = replace(options, height=options.width)
+		self.options = options
+		self.max_workers = max_workers or os.cpu_count() or 1
+		self.music_volume = music_volume
+		self.work_dir = os.path.abspath(work_dir)
+		os.makedirs(work_dir, exist_ok=True)
+
+	def _decode_music(self, source: str) -> SharedAsset:
+		path = os.path.join(self.work_dir, f"music_{_asset_key(source)}.wav")
+		if not os.path.exists(path):
+			tmp_path = path + ".tmp.wav"
+			run_ffmpeg(
+				["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", source]
+				+ ["-vn", "-ac", "2", "-ar", "44100", "-c:a", "pcm_s16le", tmp_path]
+			)
+			os.replace(tmp_path, path)
+		return SharedAsset(source=source, path=path, duration=media_duration(path))
+
+	def _decode_intro(self, source: str) -> SharedAsset:
+		width, height, fps = self.options.width, self.options.height, self.options.fps
+		path = os.path.join(
+			self.work_dir, f"intro_{_asset_key(source, width, height, fps)}.mp4"
+		)
+		if not os.path.exists(path):
+			tmp_path = path + ".tmp.mp4"
+			scale = (
+				f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+				f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={fps},format=yuv420p,setsar=1"
+			)
+			run_ffmpeg(
+				["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", source]
+				+ ["-an", "-vf", scale, "-c:v", "libx264", "-crf", "18", tmp_path]
+			)
+			os.replace(tmp_path, path)
+		return SharedAsset(source=source, path=path, duration=media_duration(path))
+
+	def prepare_shared(
+		self, jobs: Sequence[RenderJob]
+	) -> Tuple[Dict[str, SharedAsset], Dict[str, SharedAsset]]:
+		"""
+		Decode every distinct music bed and intro the jobs use, at once.
+
+		Returns:
+			Tuple[Dict[str, SharedAsset], Dict[str, SharedAsset]]: Music and intros by source path
+		"""
+		decoders = {"music": self._decode_music, "intro": self._decode_intro}
+		tasks = [("music", p) for p in {j.music_path for j in jobs} if p]
+		tasks += [("intro", p) for p in {j.intro_path for j in jobs} if p]
+		shared: Dict[str, Dict[str, SharedAsset]] = {"music": {}, "intro": {}}
+		if not tasks:
+			return shared["music"], shared["intro"]
+
+		def decode(task: Tuple[str, str]) -> SharedAsset | None:
+			kind, source = task
+			try:
+				return decoders[kind](source)
+			except Exception as e:
+				logger.error(f"[Render] Could not decode {kind} {source}: {e}")
+				return None
+
+		# ffmpeg does the work, so threads are enough
+		with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as pool:
+			for (kind, source), asset in zip(tasks, pool.map(decode, tasks)):
+				if asset is not None:
+					shared[kind][source] = asset
+		return shared["music"], shared["intro"]
+
+	def render(self, jobs: Sequence[RenderJob]) -> BatchReport:
+		"""
+		Render jobs across the worker processes.
+
+		Args:
+			jobs (Sequence[RenderJob]): Videos to render
+
+		Returns:
+			BatchReport: Per-job timings in job order, with failures recorded rather than raised
+		"""
+		started = time.perf_counter()
+		music, intros = self.prepare_shared(jobs)
+		shared_seconds = time.perf_counter() - started
+
+		workers = max(1, min(self.max_workers, len(jobs)))
+		# Split the cores between the ffmpeg processes running at once
+		threads = max(1, (os.cpu_count() or 1) // workers)
+		timings: Dict[int, RenderTiming] = {}
+		runnable = []
+		for i, job in enumerate(jobs):
+			missing = [
+				path
+				for path, assets in ((job.music_path, music), (job.intro_path, intros))
+				if path and path not in assets
+			]
+			if missing:
+				timings[i] = RenderTiming(
+					name=job.name,
+					output_path=None,
+					error=f"Could not decode {missing[0]}",
+				)
+			else:
+				runnable.append(i)
+		if runnable:
+			with ProcessPoolExecutor(max_workers=workers) as pool:
+				futures = {
+					i: pool.submit(
+						render_job,
+						jobs[i],
+						self.options,
+						intros.get(jobs[i].intro_path),
+						music.get(jobs[i].music_path),
+						self.music_volume,
+						threads,
+						time.time(),
+					)
+					for i in runnable
+				}
+				for i, future in futures.items():
+					try:
+						timings[i] = future.result()
+					except Exception as e:
+						# A worker that died, e.g. killed for memory, breaks the
+						# pool for every job still running in it
+						timings[i] = RenderTiming(
+							name=jobs[i].name,
+							output_path=None,
+							error=f"{type(e).__name__}: {e}",
+						)
+
+		report = BatchReport(
+			timings=[timings[i] for i in range(len(jobs))],
+			workers=workers,
+			shared_seconds=shared_seconds,
+			elapsed_seconds=time.perf_counter() - started,
+		)
+		logger.info(f"[Render] {report.summary()}")
+		for timing in report.failed():
+			logger.error(f"[Render] '{timing.name}' failed: {timing.error}")
+		return report
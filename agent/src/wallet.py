@@ -1,7 +1,8 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List, Set, Tuple
 
 import requests
 from loguru import logger
@@ -10,11 +11,33 @@ from web3 import Web3
 from src.datatypes import WalletStats
 from dotenv import load_dotenv
 from src.db import SQLiteDB
+from src.db.sqlite import TokenMetadata
+from src.multicall import get_erc20_balances
+from src.price_cache import PriceCache
+from src.price_feed import PriceTable
+from src.provider_health import ProviderHealth
+from src.rate_limit import get_limiter
+from src.web3_provider import get_web3, rpc_endpoints
 
 load_dotenv()
 
 DB = SQLiteDB(db_path=os.getenv("SQLITE_PATH", "../db/superior-agents.db"))
 
+ETHERSCAN_API_URL = os.getenv("ETHERSCAN_API_URL", "https://api.etherscan.io/api")
+# Etherscan returns at most this many transfers per query
+ETHERSCAN_MAX_RESULTS = 10000
+
+# Price API base URLs, overridable to point at a local simulator
+BINANCE_API_URL = os.getenv("BINANCE_API_URL", "https://api.binance.com")
+KRAKEN_API_URL = os.getenv("KRAKEN_API_URL", "https://api.kraken.com")
+HUOBI_API_URL = os.getenv("HUOBI_API_URL", "https://api.huobi.pro")
+COINGECKO_API_URL = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com")
+
+# Contract addresses per CoinGecko token_price request
+COINGECKO_BATCH_SIZE = 50
+# Responses that say more about the provider than about the token asked for
+UNHEALTHY_STATUS_CODES = {403, 429, 451}
+
 
 def save_to_db(token_addr, symbol, price, metadata=""):
 	token_price = DB.get_token_price(symbol=symbol)
@@ -33,14 +56,16 @@ class PriceProvider:
 		self.providers = [
 			{
 				"name": "binance",
-				"url": "https://api.binance.com/api/v3/ticker/price",
+				"url": f"{BINANCE_API_URL}/api/v3/ticker/price",
+				"rate": 10.0,
 				"params": {"symbol": "ETHUSDT"},
 				"params_token": lambda x: {"symbol": x.upper() + "USDT"},
 				"price_path": lambda x: float(x["price"]),
 			},
 			{
 				"name": "kraken",
-				"url": "https://api.kraken.com/0/public/Ticker",
+				"url": f"{KRAKEN_API_URL}/0/public/Ticker",
+				"rate": 1.0,
 				"params": {"pair": "ETHUSD"},
 				"params_token": lambda x: {"pair": x.upper() + "USD"},
 				"price_path": lambda x: float(x["result"]["XETHZUSD"]["c"][0]),
@@ -50,26 +75,69 @@ class PriceProvider:
 			},
 			{
 				"name": "huobi",
-				"url": "https://api.huobi.pro/market/detail/merged",
+				"url": f"{HUOBI_API_URL}/market/detail/merged",
+				"rate": 10.0,
 				"params": {"symbol": "ethusdt"},
 				"params_token": lambda x: {"symbol": x.lower() + "usdt"},
 				"price_path": lambda x: float(x["tick"]["close"]),
 			},
 			{
 				"name": "coingecko",
-				"url": "https://api.coingecko.com/api/v3/simple/price",
+				"url": f"{COINGECKO_API_URL}/api/v3/simple/price",
+				# The public API allows about 30 calls a minute
+				"rate": 0.5,
 				"params": {"ids": "ethereum", "vs_currencies": "usd"},
 				"params_token": {"ids": "ethereum", "vs_currencies": "usd"},  # not used
 				"price_path": lambda x: x["ethereum"]["usd"],
 			},
 		]
 		self._cache_ttl = 60
+		# In-memory tier in front of sup_token_price; prices up to this many
+		# seconds past the TTL are served while a refresh runs in the background
+		self._memory = PriceCache(ttl=self._cache_ttl, stale_ttl=240)
+		self._health = ProviderHealth(
+			persist=lambda records: DB.save_provider_health(records)
+		)
+		self._health.restore(DB.get_provider_health())
+		# Live order-book prices from a PriceFeed, used before any cache when set
+		self.price_table: PriceTable | None = None
+		self._feed_max_age = 30
+		self._rates = {
+			provider["name"]: provider["rate"] for provider in self.providers
+		}
+
+	def _request(self, provider_name: str, url: str, **kwargs) -> requests.Response:
+		"""GET through the process-wide rate limiter of `provider_name`"""
+		get_limiter(f"price:{provider_name}", self._rates[provider_name]).acquire()
+		started = time.monotonic()
+		try:
+			response = requests.get(url, **kwargs)
+		except Exception:
+			self._health.record(provider_name, False, time.monotonic() - started)
+			raise
+		self._health.record(
+			provider_name,
+			response.status_code < 500
+			and response.status_code not in UNHEALTHY_STATUS_CODES,
+			time.monotonic() - started,
+		)
+		return response
+
+	def _feed_price(self, symbol: str) -> float | None:
+		if self.price_table is None:
+			return None
+		return self.price_table.get(symbol, max_age=self._feed_max_age)
 
-	def _is_cache_valid(self, timestamp: float) -> bool:
-		print(timestamp)
-		return (
-			datetime.now() - datetime.fromisoformat(timestamp)
-		).total_seconds() < self._cache_ttl
+	def _ordered_providers(self) -> List[Dict]:
+		"""Providers whose circuit is not open, healthiest first"""
+		by_name = {provider["name"]: provider for provider in self.providers}
+		return [by_name[name] for name in self._health.order(list(by_name))]
+
+	def _age_seconds(self, timestamp: str) -> float:
+		return (datetime.now() - datetime.fromisoformat(timestamp)).total_seconds()
+
+	def _is_cache_valid(self, timestamp: str) -> bool:
+		return self._age_seconds(timestamp) < self._cache_ttl
 
 	def coingecko_provider_by_contract_address(
 		self, token_address: str, symbol: str, max_retries: int = 3
@@ -79,8 +147,9 @@ class PriceProvider:
 
 		for attempt in range(max_retries):
 			try:
-				response = requests.get(
-					"https://api.coingecko.com/api/v3/simple/token_price/ethereum",
+				response = self._request(
+					"coingecko",
+					f"{COINGECKO_API_URL}/api/v3/simple/token_price/ethereum",
 					params={
 						"contract_addresses": token_address,
 						"vs_currencies": "usd",
@@ -116,18 +185,28 @@ class PriceProvider:
 
 	def get_eth_price(self, max_retries: int = 3) -> float:
 		"""Get ETH price using multiple providers with failover"""
+		price = self._feed_price("ETH")
+		if price is not None:
+			return price
+		return self._memory.get("ETH", lambda: self._load_eth_price(max_retries))
+
+	def _load_eth_price(self, max_retries: int) -> Tuple[float, float]:
+		"""Load the ETH price and its age in seconds, from the DB if it is fresh"""
 		token_eth = DB.get_token_price(symbol="ETH")
 
 		if token_eth:
 			if self._is_cache_valid(token_eth.last_updated_at):
-				return token_eth.price
+				return float(token_eth.price), self._age_seconds(
+					token_eth.last_updated_at
+				)
 
 		errors = []
-		for provider in self.providers:
+		for provider in self._ordered_providers():
 			for attempt in range(max_retries):
 				try:
 					print(f"Trying to get ETH price from {provider['name']}")
-					response = requests.get(
+					response = self._request(
+						provider["name"],
 						provider["url"],
 						params=provider["params"],
 						headers={"Accept": "application/json"},
@@ -154,7 +233,7 @@ class PriceProvider:
 								price=price,
 							)
 							print(f"Successfully got ETH price from {provider['name']}")
-							return price
+							return price, 0.0
 
 				except Exception as e:
 					logger.error(f"get_eth_price.err {e}")
@@ -166,35 +245,68 @@ class PriceProvider:
 						break
 					errors.append(error_msg)
 					print(f"Error with {error_msg}")
+					if not self._health.is_available(provider["name"]):
+						logger.warning(
+							f"{provider['name']} circuit is open, trying other provider..."
+						)
+						break
 
 					if attempt < max_retries - 1:
 						time.sleep(2**attempt)
 					continue
 		# If we have a cached price, return it as fallback
+		# The fallback counts as already stale, so the next call retries the providers
 		token_eth = DB.get_token_price(symbol="ETH")
 		if token_eth:
 			print("Using cached price as fallback")
-			return token_eth.price
+			return float(token_eth.price), float(self._cache_ttl)
 
 		raise Exception(f"All providers failed: {'; '.join(errors)}")
 
-	def get_token_price(self, token_address, symbol, max_retries: int = 3) -> float:
+	def get_token_price(
+		self,
+		token_address,
+		symbol,
+		max_retries: int = 3,
+		skip_providers: Set[str] = set(),
+	) -> float:
 		"""Get token price using multiple providers with failover"""
+		price = self._feed_price(symbol)
+		if price is not None:
+			return price
+		return self._memory.get(
+			symbol,
+			lambda: self._load_token_price(
+				token_address, symbol, max_retries, skip_providers
+			),
+		)
+
+	def _load_token_price(
+		self,
+		token_address,
+		symbol,
+		max_retries: int,
+		skip_providers: Set[str],
+	) -> Tuple[float, float]:
+		"""Load a token price and its age in seconds, from the DB if it is fresh"""
 		token_symbol = symbol
 		token_price = DB.get_token_price(symbol=token_symbol)
 		if token_price:
 			if self._is_cache_valid(token_price.last_updated_at):
-				return token_price.price
+				return float(token_price.price), self._age_seconds(
+					token_price.last_updated_at
+				)
 
 		errors = []
-		for provider in self.providers:
-			if provider["name"] == "coingecko":
+		for provider in self._ordered_providers():
+			if provider["name"] == "coingecko" or provider["name"] in skip_providers:
 				continue
 			for attempt in range(max_retries):
 				try:
 					print(f"Trying to get token price from {provider['name']}")
 					new_params = provider["params_token"](token_symbol)
-					response = requests.get(
+					response = self._request(
+						provider["name"],
 						provider["url"],
 						params=new_params,
 						headers={"Accept": "application/json"},
@@ -226,7 +338,7 @@ class PriceProvider:
 								price=price,
 								metadata=provider["name"],
 							)
-							return price
+							return price, 0.0
 
 				except Exception as e:
 					logger.error(f"get_token_price.err {e}")
@@ -238,16 +350,25 @@ class PriceProvider:
 						break
 					errors.append(error_msg)
 					print(f"Error with {error_msg}")
+					if not self._health.is_available(provider["name"]):
+						logger.warning(
+							f"{provider['name']} circuit is open, trying other provider..."
+						)
+						break
 
 					if attempt < max_retries - 1:
 						time.sleep(2**attempt)
 					continue
 
 		try:  # one last attempt
+			if "coingecko" in skip_providers:
+				raise Exception("coingecko already tried")
+			if not self._health.is_available("coingecko"):
+				raise Exception("coingecko circuit is open")
 			price = self.coingecko_provider_by_contract_address(
 				token_address, token_symbol
 			)
-			return price
+			return price, 0.0
 		except Exception as e:
 			import traceback
 
@@ -258,14 +379,180 @@ class PriceProvider:
 			token_price = DB.get_token_price(symbol=symbol)
 			if token_price:
 				print("Using cached price as fallback")
-				return token_price.price
+				return float(token_price.price), float(self._cache_ttl)
 
 			raise Exception(f"All providers failed: {'; '.join(errors)}")
 
+	def binance_prices_by_symbol(self, symbols: List[str]) -> Dict[str, float]:
+		"""Get USDT prices of many symbols with one Binance request for all tickers"""
+		response = self._request(
+			"binance",
+			self.providers[0]["url"],
+			headers={"Accept": "application/json"},
+			timeout=10,
+		)
+		response.raise_for_status()
+
+		tickers = {ticker["symbol"]: ticker["price"] for ticker in response.json()}
+		prices = {}
+		for symbol in symbols:
+			price = tickers.get(symbol.upper() + "USDT")
+			if price is not None and float(price) > 0:
+				prices[symbol] = float(price)
+		return prices
+
+	def binance_changes_24h_by_symbol(self, symbols: List[str]) -> Dict[str, float]:
+		"""Get 24h USDT price changes in percent of many symbols with one Binance request"""
+		response = self._request(
+			"binance",
+			f"{BINANCE_API_URL}/api/v3/ticker/24hr",
+			headers={"Accept": "application/json"},
+			timeout=10,
+		)
+		response.raise_for_status()
+
+		tickers = {
+			ticker["symbol"]: ticker["priceChangePercent"] for ticker in response.json()
+		}
+		changes = {}
+		for symbol in symbols:
+			change = tickers.get(symbol.upper() + "USDT")
+			if change is not None:
+				changes[symbol] = float(change)
+		return changes
+
+	def coingecko_prices_by_contract_address(
+		self, token_addresses: List[str]
+	) -> Dict[str, float]:
+		"""Get prices of many tokens with one CoinGecko request per batch of addresses"""
+		prices = {}
+		for i in range(0, len(token_addresses), COINGECKO_BATCH_SIZE):
+			batch = token_addresses[i : i + COINGECKO_BATCH_SIZE]
+			response = self._request(
+				"coingecko",
+				f"{COINGECKO_API_URL}/api/v3/simple/token_price/ethereum",
+				params={"contract_addresses": ",".join(batch), "vs_currencies": "usd"},
+				timeout=10,
+			)
+			response.raise_for_status()
+
+			data = response.json()
+			for token_address in batch:
+				price = data.get(token_address.lower(), {}).get("usd")
+				if price is not None and float(price) > 0:
+					prices[token_address] = float(price)
+		return prices
+
+	def get_token_prices(
+		self, tokens: List[Tuple[str, str]], max_retries: int = 3
+	) -> Dict[str, float]:
+		"""
+		Get prices of many tokens with as few requests as possible.
+
+		Live feed prices and fresh cached prices are used first. The rest are looked up in one
+		Binance request for all tickers, then one CoinGecko request per batch
+		of contract addresses. Only tokens neither batch could price fall back
+		to per-token lookups on the remaining providers, run in parallel. All
+		requests go through the shared per-provider rate limiters.
+
+		Args:
+			tokens (List[Tuple[str, str]]): (token address, symbol) pairs
+			max_retries (int): Retries per provider in the per-token fallback
+
+		Returns:
+			Dict[str, float]: Price in USD by token address, for the tokens that could be priced
+		"""
+		prices: Dict[str, float] = {}
+		missing: List[Tuple[str, str]] = []
+		for token_address, symbol in dict.fromkeys(tokens):
+			cached = self._feed_price(symbol)
+			if cached is None:
+				cached = self._memory.get_fresh(symbol)
+			if cached is not None:
+				prices[token_address] = cached
+				continue
+			token_price = DB.get_token_price(symbol=symbol)
+			if token_price and self._is_cache_valid(token_price.last_updated_at):
+				prices[token_address] = float(token_price.price)
+			else:
+				missing.append((token_address, symbol))
+
+		tried: Set[str] = set()
+		batch_lookups = [
+			(
+				"binance",
+				lambda batch: self.binance_prices_by_symbol([s for _, s in batch]),
+				lambda token: token[1],
+			),
+			(
+				"coingecko",
+				lambda batch: self.coingecko_prices_by_contract_address(
+					[a for a, _ in batch]
+				),
+				lambda token: token[0],
+			),
+		]
+		for name, lookup, key in batch_lookups:
+			if not missing:
+				break
+			if not self._health.is_available(name):
+				logger.warning(
+					f"Skipping batch price lookup on {name}, circuit is open"
+				)
+				tried.add(name)
+				continue
+			try:
+				found = lookup(missing)
+				tried.add(name)
+			except Exception as e:
+				logger.warning(f"Batch price lookup on {name} failed: {e}")
+				continue
+
+			still_missing = []
+			for token_address, symbol in missing:
+				price = found.get(key((token_address, symbol)))
+				if price is None:
+					still_missing.append((token_address, symbol))
+					continue
+				prices[token_address] = price
+				self._memory.put(symbol, price)
+				save_to_db(
+					token_addr=token_address, symbol=symbol, price=price, metadata=name
+				)
+			missing = still_missing
+
+		if missing:
+			with ThreadPoolExecutor(
+				max_workers=min(len(missing), 8), thread_name_prefix="token-price"
+			) as executor:
+				futures = {
+					executor.submit(
+						self.get_token_price, token_address, symbol, max_retries, tried
+					): token_address
+					for token_address, symbol in missing
+				}
+				for future in as_completed(futures):
+					try:
+						prices[futures[future]] = float(future.result())
+					except Exception as e:
+						logger.warning(
+							f"get_token_prices: Failed to get price for token {futures[future]}: {e}"
+						)
+
+		return prices
+
 
 _price_provider = PriceProvider()
 
 
+def use_price_table(table: PriceTable | None) -> None:
+	"""
+	Serve prices from a live `PriceFeed` table whenever it has a fresh book,
+	so `get_wallet_stats` skips the REST providers. Pass None to stop.
+	"""
+	_price_provider.price_table = table
+
+
 def get_eth_price_v2(max_retries: int = 3) -> float:
 	"""Get ETH price using multiple providers with failover"""
 	base_delay = 1.0
@@ -291,38 +578,28 @@ def get_eth_price_v2(max_retries: int = 3) -> float:
 def get_token_prices_v2(
 	token_addresses: list[str], symbols, max_retries: int = 3
 ) -> Dict[str, float]:
-	"""Get token prices from CoinGecko with retry mechanism"""
-	base_delay = 1.0
-	prices = {}
-
-	for token_addr, symbol in zip(token_addresses, symbols):
-		for attempt in range(max_retries):
-			try:
-				data = _price_provider.get_token_price(token_addr, symbol)
-				if data:
-					prices[token_addr] = float(data)
-					break
-
-			except Exception as e:
-				if attempt == max_retries - 1:
-					print(
-						f"get_token_price_v2: Failed to get price for token {token_addr}: {e}"
-					)
-				delay = base_delay * (2**attempt)
-				time.sleep(delay)
-
-	return prices
+	"""Get token prices, batched per provider and fetched concurrently"""
+	return _price_provider.get_token_prices(
+		list(zip(token_addresses, symbols)), max_retries=max_retries
+	)
 
 
 def get_token_transactions(
-	address: str, etherscan_key: str, max_retries: int = 3
+	address: str,
+	etherscan_key: str,
+	max_retries: int = 3,
+	start_block: int | None = None,
 ) -> Dict:
-	"""Get token transactions from Etherscan with retry mechanism"""
+	"""Get token transactions from Etherscan with retry mechanism.
+
+	Without `start_block` the whole history is returned, newest first. With it,
+	only transfers from that block on are returned, oldest first.
+	"""
 	base_delay = 1.0
 
 	for attempt in range(max_retries):
 		try:
-			url = "https://api.etherscan.io/api"
+			url = ETHERSCAN_API_URL
 			params = {
 				"module": "account",
 				"action": "tokentx",
@@ -330,6 +607,9 @@ def get_token_transactions(
 				"sort": "desc",
 				"apikey": etherscan_key,
 			}
+			if start_block is not None:
+				params["startblock"] = start_block
+				params["sort"] = "asc"
 
 			logger.info(
 				f"Fetching token transactions from Etherscan (attempt {attempt + 1}/{max_retries})"
@@ -346,6 +626,9 @@ def get_token_transactions(
 				data = response.json()
 				if data.get("status") == "1" and "result" in data:
 					return data
+				# Etherscan reports an empty range as a failure, it is not one
+				elif data.get("message") == "No transactions found":
+					return {"status": "1", "message": "OK", "result": []}
 				elif "message" in data:
 					logger.warning(f"Etherscan API message: {data['message']}")
 
@@ -364,8 +647,90 @@ def get_token_transactions(
 	return {"status": "0", "message": "Max retries exceeded", "result": []}
 
 
+def discover_wallet_tokens(
+	address: str, etherscan_key: str
+) -> Dict[str, TokenMetadata]:
+	"""
+	Get every ERC-20 token a wallet has touched, from its persistent registry.
+
+	Only transfers after the wallet's last processed block are requested from
+	Etherscan, so a wallet that has not moved since the last sample costs one
+	empty request. Contracts are deduplicated, and their symbol and decimals
+	are stored once since they never change.
+
+	If Etherscan fails, the tokens known so far are returned and the sync
+	block stays put, so the next call retries the same range.
+
+	Args:
+		address (str): Wallet address
+		etherscan_key (str): API key for Etherscan
+
+	Returns:
+		Dict[str, TokenMetadata]: Token metadata keyed by checksummed token address
+	"""
+	last_block = DB.get_wallet_last_block(address)
+	start_block = 0 if last_block is None else last_block + 1
+
+	while True:
+		data = get_token_transactions(address, etherscan_key, start_block=start_block)
+		if data.get("status") != "1":
+			logger.warning(
+				f"Token discovery for {address} failed, using known tokens: {data.get('message')}"
+			)
+			break
+
+		txs = [tx for tx in data.get("result", []) if isinstance(tx, dict)]
+		if not txs:
+			break
+
+		new_tokens: Dict[str, TokenMetadata] = {}
+		first_seen_blocks: Dict[str, int] = {}
+		max_block = start_block - 1
+		for tx in txs:
+			try:
+				token_addr = Web3.to_checksum_address(tx.get("contractAddress", ""))
+				block = int(tx.get("blockNumber", 0))
+			except Exception as e:
+				logger.warning(
+					f"Error processing token {tx.get('contractAddress')}: {str(e)}"
+				)
+				continue
+
+			max_block = max(max_block, block)
+			if token_addr in new_tokens:
+				continue
+			try:
+				decimals = int(tx.get("tokenDecimal") or 18)
+			except ValueError:
+				decimals = 18
+			new_tokens[token_addr] = TokenMetadata(
+				token_addr=token_addr,
+				symbol=tx.get("tokenSymbol") or "UNKNOWN",
+				name=tx.get("tokenName") or "",
+				decimals=decimals,
+			)
+			first_seen_blocks[token_addr] = block
+
+		# A full page may have cut its last block short, so that block is read again
+		capped = len(txs) >= ETHERSCAN_MAX_RESULTS
+		synced_block = max_block - 1 if capped else max_block
+		if not DB.record_wallet_tokens(
+			address, synced_block, list(new_tokens.values()), first_seen_blocks
+		):
+			logger.warning(f"Failed to save the token registry of {address}")
+			break
+		if not capped or synced_block < start_block:
+			break
+		start_block = synced_block + 1
+
+	return {token.token_addr: token for token in DB.get_wallet_tokens(address)}
+
+
 def get_wallet_stats(
-	address: str, infura_project_id: str, etherscan_key: str
+	address: str,
+	infura_project_id: str,
+	etherscan_key: str,
+	balance_chunk_size: int = 200,
 ) -> WalletStats:
 	"""
 	Get basic wallet statistics and token holdings for a SuperAgent account.
@@ -378,6 +743,7 @@ def get_wallet_stats(
 		address (str): Wallet address of the agent
 		infura_project_id (str): Infura project ID for Web3 connection
 		etherscan_key (str): API key for Etherscan
+		balance_chunk_size (int): Maximum number of token balances read per RPC request
 
 	Returns:
 		Dict[str, Any]: Dictionary containing:
@@ -390,7 +756,9 @@ def get_wallet_stats(
 	Raises:
 		Exception: If the agent's Ethereum address cannot be retrieved
 	"""
-	w3 = Web3(Web3.HTTPProvider(f"https://mainnet.infura.io/v3/{infura_project_id}"))
+	# Shared across calls: keep-alive connections, cached immutable reads and
+	# failover to the endpoints in ETH_RPC_URLS
+	w3 = get_web3(rpc_endpoints(infura_project_id))
 
 	logger.info(f"Fetching wallet stats for address: {address}")
 
@@ -403,97 +771,73 @@ def get_wallet_stats(
 	eth_reserve = 0.01
 	eth_available = max(0.0, eth_balance_human - eth_reserve)
 
-	# Get tokens from Etherscan
-	data = get_token_transactions(address, etherscan_key)
+	# Get tokens from the registry, only transfers since the last sync hit Etherscan
+	known_tokens = discover_wallet_tokens(address, etherscan_key)
 
 	tokens = {}
-	if "result" in data:
-		token_txns = data["result"]
-		if isinstance(token_txns, list):
-			for tx in token_txns:
-				if isinstance(tx, dict):
-					# Convert token address to checksum format
-					try:
-						token_addr = w3.to_checksum_address(
-							tx.get("contractAddress", "")
-						)
-						if token_addr and token_addr not in tokens:
-							# Simple contract to get balance
-							contract = w3.eth.contract(
-								address=token_addr,
-								abi=[
-									{
-										"constant": True,
-										"inputs": [
-											{"name": "_owner", "type": "address"}
-										],
-										"name": "balanceOf",
-										"outputs": [
-											{"name": "balance", "type": "uint256"}
-										],
-										"type": "function",
-									}
-								],
-							)
-
-							balance = contract.functions.balanceOf(address).call()
-							decimal = int(tx.get("tokenDecimal", "18"))
-							if balance > 0:
-								tokens[token_addr] = {
-									"symbol": tx.get("tokenSymbol", "UNKNOWN"),
-									"balance": balance / (10**decimal),
-								}
-					except Exception as e:
-						print(
-							f"Error processing token {tx.get('contractAddress')}: {str(e)}"
-						)
-						continue
-
-		# Gets real-time ETH price from CoinGecko
-		try:
-			# Get ETH price with retries
-			eth_price_usd = get_eth_price_v2()
-			logger.info(f"Current ETH price: ${eth_price_usd:,.2f}")
-
-			# Calculate base portfolio value from ETH
-			total_value_usd = eth_balance_human * eth_price_usd
-
-			# Get all token prices in batch
-			if tokens:
-				# token_prices = get_token_prices(list(tokens.keys()))
-				token_addresses = list(tokens.keys())
-				symbols = [x["symbol"] for x in list(tokens.values())]
-				token_prices = get_token_prices_v2(token_addresses, symbols)
-
-				# Update token data with prices
-				for token_addr, price in token_prices.items():
-					if price and token_addr in tokens:
-						tokens[token_addr]["price_usd"] = price
-						total_value_usd += tokens[token_addr]["balance"] * price
-
-			return {
-				"wallet_address": address,
-				"eth_balance": eth_balance_human,
-				"eth_balance_reserved": eth_reserve,
-				"eth_balance_available": eth_available,
-				"eth_price_usd": eth_price_usd,
-				"tokens": tokens,
-				"total_value_usd": total_value_usd,
-				"timestamp": datetime.now().isoformat(),
-			}
-		except Exception as e:
-			raise Exception(f"Failed to get wallet stats: {e}")
-	else:
-		if eth_balance == 0 and eth_nonce == 0:
-			return {
-				"wallet_address": address,
-				"eth_balance": 0,
-				"eth_balance_reserved": eth_reserve,
-				"eth_balance_available": 0,
-				"eth_price_usd": 0,
-				"tokens": {},
-				"total_value_usd": 0,
-				"timestamp": datetime.now().isoformat(),
+	# One batched read instead of a balanceOf round trip per token
+	try:
+		balances = get_erc20_balances(
+			w3,
+			w3.to_checksum_address(address),
+			list(known_tokens.keys()),
+			chunk_size=balance_chunk_size,
+		)
+	except Exception as e:
+		# Both Multicall3 and the batched fallback failed, ETH stats still stand
+		logger.error(f"Failed to read token balances of {address}: {e}")
+		balances = {}
+	for token_addr, balance in balances.items():
+		token = known_tokens[token_addr]
+		if balance > 0:
+			tokens[token_addr] = {
+				"symbol": token.symbol,
+				"balance": balance / (10**token.decimals),
 			}
-		else:
-			raise Exception("Failed to get wallet stats: No wallet address provided")
+
+	if not known_tokens and eth_balance == 0 and eth_nonce == 0:
+		return {
+			"wallet_address": address,
+			"eth_balance": 0,
+			"eth_balance_reserved": eth_reserve,
+			"eth_balance_available": 0,
+			"eth_price_usd": 0,
+			"tokens": {},
+			"total_value_usd": 0,
+			"timestamp": datetime.now().isoformat(),
+		}
+
+	# Gets real-time ETH price from CoinGecko
+	try:
+		# Get ETH price with retries
+		eth_price_usd = get_eth_price_v2()
+		logger.info(f"Current ETH price: ${eth_price_usd:,.2f}")
+
+		# Calculate base portfolio value from ETH
+		total_value_usd = eth_balance_human * eth_price_usd
+
+		# Get all token prices in batch
+		if tokens:
+			# token_prices = get_token_prices(list(tokens.keys()))
+			token_addresses = list(tokens.keys())
+			symbols = [x["symbol"] for x in list(tokens.values())]
+			token_prices = get_token_prices_v2(token_addresses, symbols)
+
+			# Update token data with prices
+			for token_addr, price in token_prices.items():
+				if price and token_addr in tokens:
+					tokens[token_addr]["price_usd"] = price
+					total_value_usd += tokens[token_addr]["balance"] * price
+
+		return {
+			"wallet_address": address,
+			"eth_balance": eth_balance_human,
+			"eth_balance_reserved": eth_reserve,
+			"eth_balance_available": eth_available,
+			"eth_price_usd": eth_price_usd,
+			"tokens": tokens,
+			"total_value_usd": total_value_usd,
+			"timestamp": datetime.now().isoformat(),
+		}
+	except Exception as e:
+		raise Exception(f"Failed to get wallet stats: {e}")
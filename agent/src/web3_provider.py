@@ -0,0 +1,193 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import requests
+from loguru import logger
+from web3 import HTTPProvider, Web3
+from web3.providers import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+# Extra JSON-RPC endpoints to fail over to, comma-separated, tried in order
+RPC_URLS_ENV = "ETH_RPC_URLS"
+
+# decimals(), symbol() and name() never change for a deployed ERC-20
+IMMUTABLE_CALL_SELECTORS = {"0x313ce567", "0x95d89b41", "0x06fdde03"}
+
+# Errors that say the endpoint is unusable, rather than the request bad
+FAILOVER_ERRORS = (
+	requests.ConnectionError,
+	requests.Timeout,
+	requests.HTTPError,
+)
+
+
+def rpc_endpoints(infura_project_id: str | None = None) -> List[str]:
+	"""
+	Get the JSON-RPC endpoints to use, in order of preference.
+
+	Args:
+		infura_project_id (str | None): Infura project ID, its mainnet endpoint goes first
+
+	Returns:
+		List[str]: Endpoint URLs, without duplicates
+	"""
+	urls = []
+	if infura_project_id:
+		urls.append(f"https://mainnet.infura.io/v3/{infura_project_id}")
+	urls += [url.strip() for url in os.getenv(RPC_URLS_ENV, "").split(",")]
+	return list(dict.fromkeys(url for url in urls if url))
+
+
+class FailoverHTTPProvider(JSONBaseProvider):
+	"""
+	HTTP JSON-RPC provider over several endpoints that share one keep-alive
+	session.
+
+	Requests go to the last endpoint that worked and move on to the next
+	one when it fails at the transport level. Responses that can never
+	change are cached: the chain id, the latest code of deployed contracts,
+	and `decimals()`, `symbol()` and `name()` calls. Empty results are never
+	cached, as the contract may just not be deployed yet. Batches, e.g. from `w3.batch_requests()`,
+	are sent as one JSON-RPC batch and fail over the same way.
+	"""
+
+	def __init__(
+		self,
+		endpoints: Sequence[str],
+		session: requests.Session | None = None,
+		timeout: float = 10.0,
+		cache_size: int = 4096,
+	):
+		"""
+		Initialize the provider.
+
+		Args:
+			endpoints (Sequence[str]): Endpoint URLs, in order of preference
+			session (requests.Session | None): Session to share, a pooled one by default
+			timeout (float): Seconds to wait for an endpoint before failing over
+			cache_size (int): Maximum number of cached immutable responses
+		"""
+		super().__init__()
+		if not endpoints:
+			raise ValueError("FailoverHTTPProvider needs at least one endpoint")
+		if session is None:
+			session = requests.Session()
+			adapter = requests.adapters.HTTPAdapter(pool_maxsize=32)
+			session.mount("http://", adapter)
+			session.mount("https://", adapter)
+		self.session = session
+		self.endpoints = list(endpoints)
+		# Failover replaces web3's own retries with backoff on a dead endpoint
+		self._providers = [
+			HTTPProvider(
+				url,
+				request_kwargs={"timeout": timeout},
+				session=session,
+				exception_retry_configuration=None,
+			)
+			for url in self.endpoints
+		]
+		self._current = 0
+		self._cache: OrderedDict[Tuple[str, str], RPCResponse] = OrderedDict()
+		self._cache_size = cache_size
+		self._lock = threading.Lock()
+
+	def __str__(self) -> str:
+		return f"RPC failover over {len(self.endpoints)} endpoints"
+
+	@staticmethod
+	def _cache_key(method: str, params: Any) -> Tuple[str, str] | None:
+		if method == "eth_chainId":
+			return (method, "")
+		if method == "eth_getCode":
+			# Code at an older block says nothing about the code now
+			block = params[1] if len(params) > 1 else "latest"
+			if block != "latest":
+				return None
+			return (method, str(params[0]).lower())
+		if method == "eth_call" and params:
+			call = params[0]
+			data = str(call.get("data", call.get("input", "")))
+			if data.lower() in IMMUTABLE_CALL_SELECTORS:
+				return (method, f"{str(call.get('to', '')).lower()}:{data.lower()}")
+		return None
+
+	def _with_failover(self, name: str, send: Any) -> Any:
+		with self._lock:
+			start = self._current
+		errors = []
+		for offset in range(len(self._providers)):
+			index = (start + offset) % len(self._providers)
+			try:
+				response = send(self._providers[index])
+			except FAILOVER_ERRORS as e:
+				errors.append(f"{self.endpoints[index]}: {e}")
+				logger.warning(
+					f"RPC {name} failed on endpoint {index}, failing over: {e}"
+				)
+				continue
+			if index != start:
+				with self._lock:
+					self._current = index
+			return response
+		raise requests.ConnectionError(f"All RPC endpoints failed: {'; '.join(errors)}")
+
+	def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+		key = self._cache_key(method, params)
+		if key is not None:
+			with self._lock:
+				if key in self._cache:
+					self._cache.move_to_end(key)
+					return self._cache[key]
+
+		response = self._with_failover(
+			method, lambda provider: provider.make_request(method, params)
+		)
+
+		if key is not None and response.get("result") not in (None, "0x"):
+			with self._lock:
+				self._cache[key] = response
+				if len(self._cache) > self._cache_size:
+					self._cache.popitem(last=False)
+		return response
+
+	def make_batch_request(
+		self, batch_requests: List[Tuple[RPCEndpoint, Any]]
+	) -> List[RPCResponse] | RPCResponse:
+		return self._with_failover(
+			"batch", lambda provider: provider.make_batch_request(batch_requests)
+		)
+
+	def is_connected(self, show_traceback: bool = False) -> bool:
+		try:
+			return "error" not in self.make_request(RPCEndpoint("eth_chainId"), [])
+		except FAILOVER_ERRORS:
+			if show_traceback:
+				raise
+			return False
+
+
+_instances: Dict[Tuple[str, ...], Web3] = {}
+_instances_lock = threading.Lock()
+
+
+def get_web3(endpoints: Sequence[str]) -> Web3:
+	"""
+	Get the process-wide Web3 instance for a list of endpoints.
+
+	Every caller with the same endpoints shares one instance, and with it
+	the keep-alive connections and the cache of immutable responses.
+
+	Args:
+		endpoints (Sequence[str]): Endpoint URLs, in order of preference, see `rpc_endpoints`
+
+	Returns:
+		Web3: The shared instance
+	"""
+	key = tuple(endpoints)
+	with _instances_lock:
+		if key not in _instances:
+			_instances[key] = Web3(FailoverHTTPProvider(key))
+		return _instances[key]
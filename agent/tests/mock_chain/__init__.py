@@ -0,0 +1,15 @@
+from .server import (
+	SERVICES,
+	MockChainSimulator,
+	ServiceProfile,
+	ServiceStats,
+	SimToken,
+)
+
+__all__ = [
+	"SERVICES",
+	"MockChainSimulator",
+	"ServiceProfile",
+	"ServiceStats",
+	"SimToken",
+]
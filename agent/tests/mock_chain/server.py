@@ -0,0 +1,391 @@
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, FrozenSet, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from web3 import Web3
+
+from src.rate_limit import TokenBucket
+from tests.mock_rpc import MockChain
+
+EXCHANGES = frozenset({"binance", "kraken", "huobi", "coingecko"})
+SERVICES = ("rpc", "etherscan", *sorted(EXCHANGES))
+
+# Etherscan returns at most this many transfers per query
+ETHERSCAN_PAGE_SIZE = 10000
+
+
+@dataclass
+class ServiceProfile:
+	"""
+	How one simulated API behaves.
+
+	Every request waits `latency_seconds` plus up to `jitter_seconds`.
+	Requests above `rate_limit` per second (bursts of `burst`) get a 429, a
+	random `error_rate` of the rest get `error_status`, and a `blocked`
+	service answers everything with 451 like a geo-blocked exchange.
+	"""
+
+	latency_seconds: float = 0.0
+	jitter_seconds: float = 0.0
+	error_rate: float = 0.0
+	error_status: int = 503
+	rate_limit: float | None = None
+	burst: float | None = None
+	blocked: bool = False
+
+
+@dataclass
+class ServiceStats:
+	requests: int = 0
+	rate_limited: int = 0
+	injected_errors: int = 0
+
+
+@dataclass
+class SimToken:
+	address: str
+	symbol: str
+	name: str
+	decimals: int
+	price_usd: float
+	change_24h_pct: float = 0.0
+	# Exchanges that list the token
+	exchanges: FrozenSet[str] = field(default=EXCHANGES)
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	server: "_HTTPServer"
+
+	def log_message(self, format: str, *args: Any) -> None:
+		pass
+
+	def _serve(self, body: Any) -> None:
+		parts = urlsplit(self.path)
+		service, _, path = parts.path.lstrip("/").partition("/")
+		query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+		status, payload = self.server.owner.serve(service, "/" + path, query, body)
+
+		data = json.dumps(payload).encode("utf-8")
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+	def do_GET(self) -> None:
+		self._serve(None)
+
+	def do_POST(self) -> None:
+		length = int(self.headers.get("Content-Length", 0))
+		self._serve(json.loads(self.rfile.read(length) or b"null"))
+
+
+class _HTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+	owner: "MockChainSimulator"
+
+	def handle_error(self, request: Any, client_address: Any) -> None:
+		if isinstance(sys.exc_info()[1], ConnectionError):
+			return
+		super().handle_error(request, client_address)
+
+
+class MockChainSimulator:
+	def __init__(
+		self,
+		tokens: List[SimToken] | None = None,
+		eth_price_usd: float = 2000.0,
+		eth_change_24h_pct: float = 0.0,
+		profiles: Dict[str, ServiceProfile] | None = None,
+		seed: int | None = None,
+		host: str = "127.0.0.1",
+		port: int = 0,
+	):
+		"""
+		Offline stand-in for every API the wallet code talks to, on one port.
+
+		Paths are prefixed with the service name: `/rpc` is an Ethereum
+		JSON-RPC endpoint with Multicall3 (a `MockChain`), `/etherscan/api`
+		serves `tokentx`, and `/binance`, `/kraken`, `/huobi` and `/coingecko`
+		serve the price endpoints `PriceProvider` uses. Each service follows
+		its `ServiceProfile`.
+
+		Args:
+		    tokens (List[SimToken] | None): Tokens that exist, with their prices
+		    eth_price_usd (float): ETH price on every exchange
+		    eth_change_24h_pct (float): ETH 24h price change in percent
+		    profiles (Dict[str, ServiceProfile] | None): Behaviour per service name, see `SERVICES`
+		    seed (int | None): Seed for latency jitter and injected errors
+		    host (str): Interface to bind to
+		    port (int): Port to bind to, 0 picks a free one
+		"""
+		self.tokens = {token.address.lower(): token for token in tokens or []}
+		self.eth_price_usd = eth_price_usd
+		self.eth_change_24h_pct = eth_change_24h_pct
+		self.profiles = {name: ServiceProfile() for name in SERVICES}
+		self.profiles.update(profiles or {})
+		self.stats = {name: ServiceStats() for name in SERVICES}
+		self.chain = MockChain(
+			token_decimals={t.address: t.decimals for t in self.tokens.values()},
+			block_number=1,
+		)
+		# Wallet address to its token transfers, in block order
+		self.transfers: Dict[str, List[Dict[str, str]]] = {}
+		self._limiters = {
+			name: TokenBucket(p.rate_limit, p.burst or max(1.0, p.rate_limit))
+			for name, p in self.profiles.items()
+			if p.rate_limit
+		}
+		self._random = random.Random(seed)
+		self._lock = threading.Lock()
+
+		self._httpd = _HTTPServer((host, port), _Handler)
+		self._httpd.owner = self
+		self._thread: threading.Thread | None = None
+
+	@classmethod
+	def random_world(
+		cls,
+		n_wallets: int,
+		tokens_per_wallet: int,
+		n_tokens: int,
+		seed: int = 0,
+		**kwargs: Any,
+	) -> Tuple["MockChainSimulator", List[str]]:
+		"""
+		Build a simulator with random tokens and wallets holding them.
+
+		Returns:
+			Tuple[MockChainSimulator, List[str]]: The simulator and the wallet addresses
+		"""
+		rng = random.Random(seed)
+		tokens = [
+			SimToken(
+				address=Web3.to_checksum_address(f"0x{0x70000000 + i:040x}"),
+				symbol=f"TK{i}",
+				name=f"Token {i}",
+				decimals=rng.choice([6, 8, 18]),
+				price_usd=round(rng.uniform(0.01, 500.0), 4),
+				change_24h_pct=round(rng.uniform(-15.0, 15.0), 2),
+			)
+			for i in range(n_tokens)
+		]
+		sim = cls(tokens=tokens, seed=seed, **kwargs)
+		wallets = []
+		for w in range(n_wallets):
+			address = Web3.to_checksum_address(f"0x{0xA0000000 + w:040x}")
+			holdings = {
+				token.address: rng.randint(1, 10_000) * 10**token.decimals
+				for token in rng.sample(tokens, tokens_per_wallet)
+			}
+			sim.add_wallet(address, rng.randint(0, 10) * 10**17, holdings)
+			wallets.append(address)
+		return sim, wallets
+
+	def add_wallet(
+		self, address: str, eth_wei: int, holdings: Dict[str, int] | None = None
+	) -> None:
+		"""
+		Fund a wallet with ETH and receive each token in its own transfer.
+
+		Args:
+		    address (str): Wallet address
+		    eth_wei (int): ETH balance in wei
+		    holdings (Dict[str, int] | None): Token address to raw balance
+		"""
+		self.chain.eth_balances[address.lower()] = eth_wei
+		for token_address, amount in (holdings or {}).items():
+			self.transfer(address, token_address, amount)
+
+	def transfer(self, wallet: str, token_address: str, amount: int) -> None:
+		"""
+		Credit `amount` of a token to a wallet in a new block.
+		"""
+		token = self.tokens[token_address.lower()]
+		with self._lock:
+			self.chain.block_number += 1
+			balances = self.chain.token_balances.setdefault(token.address.lower(), {})
+			balances[wallet.lower()] = balances.get(wallet.lower(), 0) + amount
+			self.transfers.setdefault(wallet.lower(), []).append(
+				{
+					"blockNumber": str(self.chain.block_number),
+					"timeStamp": str(int(time.time())),
+					"hash": f"0x{self.chain.block_number:064x}",
+					"from": "0x" + "00" * 20,
+					"to": wallet.lower(),
+					"contractAddress": token.address.lower(),
+					"value": str(amount),
+					"tokenName": token.name,
+					"tokenSymbol": token.symbol,
+					"tokenDecimal": str(token.decimals),
+				}
+			)
+
+	def expected_total_usd(self, wallet: str) -> float:
+		"""
+		Value of a wallet at the simulated prices, what `get_wallet_stats` should report.
+		"""
+		total = (
+			self.chain.eth_balances.get(wallet.lower(), 0) / 1e18 * self.eth_price_usd
+		)
+		for token_address, owners in self.chain.token_balances.items():
+			token = self.tokens[token_address]
+			balance = owners.get(wallet.lower(), 0)
+			total += balance / 10**token.decimals * token.price_usd
+		return total
+
+	@property
+	def url(self) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def env(self) -> Dict[str, str]:
+		"""
+		Environment variables that point `src.wallet` at this simulator.
+		"""
+		return {
+			"ETH_RPC_URLS": f"{self.url}/rpc",
+			"ETHERSCAN_API_URL": f"{self.url}/etherscan/api",
+			"BINANCE_API_URL": f"{self.url}/binance",
+			"KRAKEN_API_URL": f"{self.url}/kraken",
+			"HUOBI_API_URL": f"{self.url}/huobi",
+			"COINGECKO_API_URL": f"{self.url}/coingecko",
+		}
+
+	def start(self) -> "MockChainSimulator":
+		self._thread = threading.Thread(
+			target=self._httpd.serve_forever, name="mock-chain-simulator", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		if self._thread is not None:
+			self._thread.join()
+
+	def __enter__(self) -> "MockChainSimulator":
+		return self.start()
+
+	def __exit__(self, *exc: Any) -> None:
+		self.stop()
+
+	def serve(
+		self, service: str, path: str, query: Dict[str, str], body: Any
+	) -> Tuple[int, Any]:
+		if service not in self.profiles:
+			return 404, {"error": f"unknown service {service}"}
+		profile = self.profiles[service]
+		stats = self.stats[service]
+		with self._lock:
+			stats.requests += 1
+			jitter = self._random.uniform(0, profile.jitter_seconds)
+			fail = self._random.random() < profile.error_rate
+
+		time.sleep(profile.latency_seconds + jitter)
+		if profile.blocked:
+			return 451, {"msg": "Service unavailable from a restricted location"}
+		limiter = self._limiters.get(service)
+		if limiter is not None and not limiter.try_acquire():
+			with self._lock:
+				stats.rate_limited += 1
+			return 429, {"msg": "Too many requests"}
+		if fail:
+			with self._lock:
+				stats.injected_errors += 1
+			return profile.error_status, {"msg": "Injected error"}
+
+		if service == "rpc":
+			return 200, self.chain.handle(body)
+		handler = getattr(self, f"_{service}")
+		return handler(path, query)
+
+	def _listed(self, exchange: str) -> Dict[str, SimToken]:
+		return {t.symbol: t for t in self.tokens.values() if exchange in t.exchanges}
+
+	def _etherscan(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+		if query.get("action") != "tokentx":
+			return 200, {"status": "0", "message": "NOTOK", "result": "Unknown action"}
+		start = int(query.get("startblock", 0))
+		end = int(query.get("endblock", 99_999_999))
+		with self._lock:
+			transfers = [
+				tx
+				for tx in self.transfers.get(query.get("address", "").lower(), [])
+				if start <= int(tx["blockNumber"]) <= end
+			]
+		if query.get("sort", "asc") == "desc":
+			transfers.reverse()
+		if not transfers:
+			return 200, {
+				"status": "0",
+				"message": "No transactions found",
+				"result": [],
+			}
+		return 200, {
+			"status": "1",
+			"message": "OK",
+			"result": transfers[:ETHERSCAN_PAGE_SIZE],
+		}
+
+	def _binance(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+		tickers = {"ETHUSDT": (self.eth_price_usd, self.eth_change_24h_pct)}
+		for symbol, token in self._listed("binance").items():
+			tickers[f"{symbol}USDT"] = (token.price_usd, token.change_24h_pct)
+
+		if path == "/api/v3/ticker/24hr":
+			return 200, [
+				{"symbol": s, "lastPrice": str(p), "priceChangePercent": str(c)}
+				for s, (p, c) in tickers.items()
+			]
+		if "symbol" not in query:
+			return 200, [
+				{"symbol": s, "price": str(p)} for s, (p, _) in tickers.items()
+			]
+		if query["symbol"] not in tickers:
+			return 400, {"code": -1121, "msg": "Invalid symbol."}
+		return 200, {
+			"symbol": query["symbol"],
+			"price": str(tickers[query["symbol"]][0]),
+		}
+
+	def _kraken(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+		pair = query.get("pair", "")
+		if pair == "ETHUSD":
+			price = self.eth_price_usd
+			pair = "XETHZUSD"
+		elif pair.removesuffix("USD") in self._listed("kraken"):
+			price = self._listed("kraken")[pair.removesuffix("USD")].price_usd
+		else:
+			return 200, {"error": ["EQuery:Unknown asset pair"]}
+		return 200, {"error": [], "result": {pair: {"c": [str(price), "1.0"]}}}
+
+	def _huobi(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+		symbol = query.get("symbol", "").upper().removesuffix("USDT")
+		if symbol == "ETH":
+			price = self.eth_price_usd
+		elif symbol in self._listed("huobi"):
+			price = self._listed("huobi")[symbol].price_usd
+		else:
+			return 200, {"status": "error", "err-msg": "invalid symbol"}
+		return 200, {"status": "ok", "tick": {"close": price}}
+
+	def _coingecko(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+		if path == "/api/v3/simple/price":
+			if "ethereum" not in query.get("ids", "").split(","):
+				return 200, {}
+			return 200, {"ethereum": {"usd": self.eth_price_usd}}
+		addresses = query.get("contract_addresses", "").lower().split(",")
+		return 200, {
+			address: {"usd": self.tokens[address].price_usd}
+			for address in addresses
+			if address in self.tokens and "coingecko" in self.tokens[address].exchanges
+		}
@@ -0,0 +1,35 @@
+import time
+from typing import List
+
+from result import Err, Ok, Result
+
+from src.my_types import ChatHistory
+from tests.mock_genner.MockGenner import MockGenner
+
+
+class ScriptedMockGenner(MockGenner):
+	"""
+	MockGenner that replays a script of (delay, error) steps, one per call.
+
+	The last step repeats once the script is exhausted. A step with a non-empty
+	error string returns Err after sleeping for its delay.
+	"""
+
+	def __init__(
+		self,
+		identifier: str,
+		script: List[tuple[float, str]],
+		response: str = "This is a mocked completion response.",
+	):
+		super().__init__(identifier, False)
+		self.script = script
+		self.response = response
+		self.calls = 0
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		delay, error = self.script[min(self.calls, len(self.script) - 1)]
+		self.calls += 1
+		time.sleep(delay)
+		if error:
+			return Err(f"{self.identifier}: {error}")
+		return Ok(self.response)
@@ -0,0 +1,15 @@
+from .server import (
+	DEFAULT_REASONING,
+	DEFAULT_RESPONSE,
+	MockLLMConfig,
+	MockLLMServer,
+	MockLLMStats,
+)
+
+__all__ = [
+	"DEFAULT_REASONING",
+	"DEFAULT_RESPONSE",
+	"MockLLMConfig",
+	"MockLLMServer",
+	"MockLLMStats",
+]
@@ -0,0 +1,330 @@
+import json
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+DEFAULT_REASONING = (
+	"The portfolio is small, so the safest move is to gather data first and only "
+	"then decide on a trade. I will write a short script that prints its findings."
+)
+
+# Carries both a python and a yaml block so any genner step can extract from it
+DEFAULT_RESPONSE = (
+	"Here is the plan for this step.\n"
+	"```python\n"
+	"print('mock step completed')\n"
+	"```\n"
+	"```yaml\n"
+	"- check the current portfolio\n"
+	"- hold until the next cycle\n"
+	"```"
+)
+
+
+def default_responder(messages: List[Dict[str, Any]]) -> str:
+	return DEFAULT_RESPONSE
+
+
+def tokenize(text: str) -> List[str]:
+	"""
+	Split text into word-sized pieces that concatenate back to the original.
+	"""
+	return re.findall(r"\s*\S+|\s+", text)
+
+
+@dataclass
+class MockLLMConfig:
+	"""
+	Behaviour of the stand-in LLM server.
+
+	Latency is modelled as a time-to-first-token followed by a steady token
+	rate, which is what dominates real completions. Errors are injected at
+	random, either as an HTTP error before any token or as a dropped
+	connection halfway through a stream.
+	"""
+
+	ttft_seconds: float = 0.2
+	tokens_per_second: float = 200.0
+	reasoning_tokens: int = 0
+	error_rate: float = 0.0
+	error_status: int = 503
+	mid_stream_error_rate: float = 0.0
+	seed: int | None = None
+	model: str = "mock/mock-llm"
+	responder: Callable[[List[Dict[str, Any]]], str] = field(default=default_responder)
+
+
+@dataclass
+class MockLLMStats:
+	requests: int = 0
+	streamed_requests: int = 0
+	injected_errors: int = 0
+	dropped_streams: int = 0
+	prompt_tokens: int = 0
+	completion_tokens: int = 0
+	reasoning_tokens: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	server: "_HTTPServer"
+
+	def log_message(self, format: str, *args: Any) -> None:
+		pass
+
+	def do_POST(self) -> None:
+		if self.path == "/v1/chat/completions":
+			flavour = "openai"
+		elif self.path == "/api/v1/chat/completions":
+			flavour = "openrouter"
+		else:
+			self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+			return
+
+		length = int(self.headers.get("Content-Length", 0))
+		payload = json.loads(self.rfile.read(length) or b"{}")
+		self.server.owner.handle(self, flavour, payload)
+
+	def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+		data = json.dumps(body).encode("utf-8")
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+	def _start_stream(self) -> None:
+		self.send_response(200)
+		self.send_header("Content-Type", "text/event-stream")
+		self.send_header("Cache-Control", "no-cache")
+		self.send_header("Transfer-Encoding", "chunked")
+		self.end_headers()
+
+	def _write_chunk(self, text: str) -> None:
+		data = text.encode("utf-8")
+		self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+		self.wfile.flush()
+
+	def _end_stream(self) -> None:
+		self.wfile.write(b"0\r\n\r\n")
+		self.wfile.flush()
+
+
+class _HTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+	owner: "MockLLMServer"
+
+	def handle_error(self, request: Any, client_address: Any) -> None:
+		# Clients hanging up on keep-alive connections is routine under load
+		if isinstance(sys.exc_info()[1], ConnectionError):
+			return
+		super().handle_error(request, client_address)
+
+
+class MockLLMServer:
+	def __init__(
+		self,
+		config: MockLLMConfig | None = None,
+		host: str = "127.0.0.1",
+		port: int = 0,
+	):
+		"""
+		Local stand-in for OpenAI-compatible chat completion APIs.
+
+		Unlike `MockGenner`, this exercises the real HTTP clients. Requests to
+		`/v1/chat/completions` are answered in the OpenAI format (reasoning in
+		`reasoning_content`), requests to `/api/v1/chat/completions` in the
+		OpenRouter format (reasoning in `reasoning`, processing comments while
+		waiting, usage on the final chunk). Both support streaming over SSE.
+
+		Args:
+		    config (MockLLMConfig | None): Latency and error behaviour. Defaults to MockLLMConfig().
+		    host (str): Interface to bind to
+		    port (int): Port to bind to, 0 picks a free one
+		"""
+		self.config = config or MockLLMConfig()
+		self.stats = MockLLMStats()
+		self._lock = threading.Lock()
+		self._rng = random.Random(self.config.seed)
+
+		self._httpd = _HTTPServer((host, port), _Handler)
+		self._httpd.owner = self
+		self._thread: threading.Thread | None = None
+
+	@property
+	def base_url(self) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}"
+
+	@property
+	def openai_base_url(self) -> str:
+		return f"{self.base_url}/v1"
+
+	@property
+	def openrouter_base_url(self) -> str:
+		return f"{self.base_url}/api/v1"
+
+	def start(self) -> "MockLLMServer":
+		self._thread = threading.Thread(
+			target=self._httpd.serve_forever, name="mock-llm-server", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		if self._thread is not None:
+			self._thread.join()
+
+	def __enter__(self) -> "MockLLMServer":
+		return self.start()
+
+	def __exit__(self, *exc: Any) -> None:
+		self.stop()
+
+	def _roll(self) -> float:
+		with self._lock:
+			return self._rng.random()
+
+	def _count(self, **deltas: int) -> None:
+		with self._lock:
+			for name, delta in deltas.items():
+				setattr(self.stats, name, getattr(self.stats, name) + delta)
+
+	def _pace(self, start: float, emitted: int) -> None:
+		"""
+		Sleep until token number `emitted` is due, keeping a steady rate
+		without drifting from sleep overshoot.
+		"""
+		if self.config.tokens_per_second <= 0:
+			return
+		delay = start + emitted / self.config.tokens_per_second - time.monotonic()
+		if delay > 0:
+			time.sleep(delay)
+
+	def handle(self, handler: _Handler, flavour: str, payload: Dict[str, Any]) -> None:
+		config = self.config
+		messages = payload.get("messages", [])
+		stream = bool(payload.get("stream"))
+
+		prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+		self._count(
+			requests=1, streamed_requests=int(stream), prompt_tokens=prompt_tokens
+		)
+
+		if self._roll() < config.error_rate:
+			self._count(injected_errors=1)
+			handler._send_json(
+				config.error_status,
+				{
+					"error": {
+						"code": config.error_status,
+						"message": "Injected error from the mock LLM server",
+					}
+				},
+			)
+			return
+
+		content = tokenize(config.responder(messages))
+		reasoning_pool = tokenize(DEFAULT_REASONING)
+		reasoning = [
+			reasoning_pool[i % len(reasoning_pool)]
+			for i in range(config.reasoning_tokens)
+		]
+		usage = {
+			"prompt_tokens": prompt_tokens,
+			"completion_tokens": len(reasoning) + len(content),
+			"total_tokens": prompt_tokens + len(reasoning) + len(content),
+		}
+		base = {
+			"id": f"mock-{time.monotonic_ns()}",
+			"created": int(time.time()),
+			"model": payload.get("model") or config.model,
+		}
+		reasoning_key = "reasoning" if flavour == "openrouter" else "reasoning_content"
+
+		if not stream:
+			time.sleep(config.ttft_seconds)
+			self._pace(time.monotonic(), len(reasoning) + len(content))
+			message: Dict[str, Any] = {"role": "assistant", "content": "".join(content)}
+			if reasoning:
+				message[reasoning_key] = "".join(reasoning)
+			handler._send_json(
+				200,
+				{
+					**base,
+					"object": "chat.completion",
+					"choices": [
+						{"index": 0, "message": message, "finish_reason": "stop"}
+					],
+					"usage": usage,
+				},
+			)
+			self._count(completion_tokens=len(content), reasoning_tokens=len(reasoning))
+			return
+
+		def event(delta: Dict[str, Any], finish_reason: str | None = None) -> str:
+			chunk = {
+				**base,
+				"object": "chat.completion.chunk",
+				"choices": [
+					{"index": 0, "delta": delta, "finish_reason": finish_reason}
+				],
+			}
+			return f"data: {json.dumps(chunk)}\n\n"
+
+		drop_at = (
+			(len(reasoning) + len(content)) // 2
+			if self._roll() < config.mid_stream_error_rate
+			else None
+		)
+
+		try:
+			handler._start_stream()
+			if flavour == "openrouter":
+				handler._write_chunk(": OPENROUTER PROCESSING\n\n")
+			time.sleep(config.ttft_seconds)
+
+			start = time.monotonic()
+			pieces = [(token, True) for token in reasoning] + [
+				(token, False) for token in content
+			]
+			for emitted, (token, is_reasoning) in enumerate(pieces):
+				if emitted == drop_at:
+					# Leave the chunked body unterminated, like a dropped upstream
+					self._count(dropped_streams=1)
+					handler.close_connection = True
+					return
+				self._pace(start, emitted)
+				if is_reasoning:
+					delta = {"role": "assistant", "content": None, reasoning_key: token}
+					if flavour == "openrouter":
+						delta["content"] = ""
+				else:
+					delta = {"role": "assistant", "content": token}
+				handler._write_chunk(event(delta))
+				self._count(
+					reasoning_tokens=int(is_reasoning),
+					completion_tokens=int(not is_reasoning),
+				)
+
+			handler._write_chunk(event({}, finish_reason="stop"))
+
+			# OpenRouter always reports usage, OpenAI only when asked to
+			include_usage = flavour == "openrouter" or (
+				payload.get("stream_options") or {}
+			).get("include_usage")
+			if include_usage:
+				handler._write_chunk(
+					f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+				)
+			handler._write_chunk("data: [DONE]\n\n")
+			handler._end_stream()
+		except (BrokenPipeError, ConnectionResetError):
+			handler.close_connection = True
@@ -0,0 +1,3 @@
+from .server import MockMediaServer, MockMediaStats
+
+__all__ = ["MockMediaServer", "MockMediaStats"]
@@ -0,0 +1,119 @@
+import hashlib
+import sys
+import threading
+from dataclasses import dataclass
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+
+@dataclass
+class MockMediaStats:
+	requests: int = 0
+	full_responses: int = 0
+	not_modified: int = 0
+	not_found: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	server: "_HTTPServer"
+
+	def log_message(self, format: str, *args: Any) -> None:
+		pass
+
+	def do_GET(self) -> None:
+		status, headers, body = self.server.owner.serve(
+			self.path, dict(self.headers.items())
+		)
+		self.send_response(status)
+		for name, value in headers.items():
+			self.send_header(name, value)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+	owner: "MockMediaServer"
+
+	def handle_error(self, request: Any, client_address: Any) -> None:
+		if isinstance(sys.exc_info()[1], ConnectionError):
+			return
+		super().handle_error(request, client_address)
+
+
+class MockMediaServer:
+	def __init__(
+		self,
+		files: Dict[str, bytes] | None = None,
+		validators: bool = True,
+		host: str = "127.0.0.1",
+		port: int = 0,
+	):
+		"""
+		Local static file server standing in for marketplace image CDNs.
+
+		Args:
+		    files (Dict[str, bytes] | None): URL path, e.g. "/a.jpg", to content
+		    validators (bool): Whether to send ETag and Last-Modified and answer conditional GETs
+		    host (str): Interface to bind to
+		    port (int): Port to bind to, 0 picks a free one
+		"""
+		self.files = dict(files or {})
+		self.validators = validators
+		self.stats = MockMediaStats()
+		self._lock = threading.Lock()
+		self._modified_at = {path: formatdate(usegmt=True) for path in self.files}
+		self._httpd = _HTTPServer((host, port), _Handler)
+		self._httpd.owner = self
+		self._thread: threading.Thread | None = None
+
+	def put(self, path: str, content: bytes) -> None:
+		with self._lock:
+			self.files[path] = content
+			self._modified_at[path] = formatdate(usegmt=True)
+
+	def serve(self, path: str, headers: Dict[str, str]):
+		with self._lock:
+			self.stats.requests += 1
+			content = self.files.get(path.split("?")[0])
+			if content is None:
+				self.stats.not_found += 1
+				return 404, {}, b""
+			response_headers = {"Content-Type": "application/octet-stream"}
+			if self.validators:
+				etag = f'"{hashlib.sha1(content).hexdigest()}"'
+				response_headers["ETag"] = etag
+				response_headers["Last-Modified"] = self._modified_at[
+					path.split("?")[0]
+				]
+				if headers.get("If-None-Match") == etag:
+					self.stats.not_modified += 1
+					return 304, {"ETag": etag}, b""
+			self.stats.full_responses += 1
+			return 200, response_headers, content
+
+	def url(self, path: str) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}{path}"
+
+	def start(self) -> "MockMediaServer":
+		self._thread = threading.Thread(
+			target=self._httpd.serve_forever, name="mock-media-server", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		if self._thread is not None:
+			self._thread.join()
+
+	def __enter__(self) -> "MockMediaServer":
+		return self.start()
+
+	def __exit__(self, *exc: Any) -> None:
+		self.stop()
@@ -0,0 +1,3 @@
+from .backend import FakeReplicate, FakeReplicateStats
+
+__all__ = ["FakeReplicate", "FakeReplicateStats"]
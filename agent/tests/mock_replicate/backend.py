@@ -0,0 +1,62 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+
+# Output file signatures, so generated content looks like the real thing
+SIGNATURES = {"image": b"\x89PNG\r\n\x1a\n", "video": b"\x00\x00\x00\x18ftypmp42"}
+
+
+@dataclass
+class FakeReplicateStats:
+	runs: int = 0
+	failures: int = 0
+	# (model, input) of every run, in order
+	calls: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+	max_concurrent: int = 0
+
+
+class FakeReplicate:
+	def __init__(
+		self,
+		delay_seconds: float = 0.0,
+		video_models: Set[str] | None = None,
+		failing_prompts: Set[str] | None = None,
+	):
+		"""
+		Local stand-in for Replicate with the `GenerationBackend` interface.
+
+		Output is derived from the model and input, so the same request always
+		gives the same file and different requests give different files.
+
+		Args:
+		    delay_seconds (float): How long every run takes
+		    video_models (Set[str] | None): Models that produce videos rather than images
+		    failing_prompts (Set[str] | None): Prompts whose runs raise
+		"""
+		self.delay_seconds = delay_seconds
+		self.video_models = video_models or {"minimax/video-01"}
+		self.failing_prompts = failing_prompts or set()
+		self.stats = FakeReplicateStats()
+		self._running = 0
+		self._lock = threading.Lock()
+
+	def run(self, model: str, input: Dict[str, Any]) -> bytes:
+		with self._lock:
+			self.stats.runs += 1
+			self.stats.calls.append((model, dict(input)))
+			self._running += 1
+			self.stats.max_concurrent = max(self.stats.max_concurrent, self._running)
+		try:
+			time.sleep(self.delay_seconds)
+			if input.get("prompt") in self.failing_prompts:
+				with self._lock:
+					self.stats.failures += 1
+				raise RuntimeError(f"Prediction failed for {input.get('prompt')!r}")
+			kind = "video" if model in self.video_models else "image"
+			seed = repr((model, sorted(input.items()))).encode()
+			return SIGNATURES[kind] + hashlib.sha256(seed).digest() * 64
+		finally:
+			with self._lock:
+				self._running -= 1
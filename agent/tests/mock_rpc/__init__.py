@@ -0,0 +1,3 @@
+from .server import MockChain, MockRPCServer, MockRPCStats
+
+__all__ = ["MockChain", "MockRPCServer", "MockRPCStats"]
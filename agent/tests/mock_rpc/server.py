@@ -0,0 +1,239 @@
+import json
+import sys
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Set
+
+from eth_abi import decode, encode
+
+from src.multicall import (
+	AGGREGATE3_SELECTOR,
+	BALANCE_OF_SELECTOR,
+	MULTICALL3_ADDRESS,
+)
+
+
+DECIMALS_SELECTOR = bytes.fromhex("313ce567")
+
+
+class Reverted(Exception):
+	pass
+
+
+@dataclass
+class MockRPCStats:
+	http_requests: int = 0
+	batch_requests: int = 0
+	rpc_calls: int = 0
+	eth_calls: int = 0
+	multicalls: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	server: "_HTTPServer"
+
+	def log_message(self, format: str, *args: Any) -> None:
+		pass
+
+	def do_POST(self) -> None:
+		length = int(self.headers.get("Content-Length", 0))
+		body = json.loads(self.rfile.read(length) or b"null")
+		response = self.server.owner.handle(body)
+
+		data = json.dumps(response).encode("utf-8")
+		self.send_response(200)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+	owner: "MockRPCServer"
+
+	def handle_error(self, request: Any, client_address: Any) -> None:
+		if isinstance(sys.exc_info()[1], ConnectionError):
+			return
+		super().handle_error(request, client_address)
+
+
+class MockChain:
+	def __init__(
+		self,
+		token_balances: Dict[str, Dict[str, int]] | None = None,
+		eth_balances: Dict[str, int] | None = None,
+		reverting_tokens: Set[str] | None = None,
+		token_decimals: Dict[str, int] | None = None,
+		multicall: bool = True,
+		chain_id: int = 1,
+		block_number: int = 1,
+	):
+		"""
+		In-memory Ethereum state that answers JSON-RPC requests for balance reads.
+
+		Answers `balanceOf` calls from an in-memory table, either directly or
+		through Multicall3 `aggregate3`, and accepts JSON-RPC batches. Unknown
+		tokens and `reverting_tokens` revert, like a call to a non-ERC-20.
+
+		Args:
+		    token_balances (Dict[str, Dict[str, int]] | None): Token address to owner to raw balance
+		    eth_balances (Dict[str, int] | None): Owner to wei balance
+		    reverting_tokens (Set[str] | None): Token addresses whose balanceOf reverts
+		    token_decimals (Dict[str, int] | None): Token address to decimals()
+		    multicall (bool): Whether Multicall3 is deployed
+		    chain_id (int): Chain id to report
+		    block_number (int): Block number to report
+		"""
+		self.token_balances = {
+			token.lower(): {owner.lower(): v for owner, v in owners.items()}
+			for token, owners in (token_balances or {}).items()
+		}
+		self.eth_balances = {k.lower(): v for k, v in (eth_balances or {}).items()}
+		self.reverting_tokens = {t.lower() for t in reverting_tokens or set()}
+		self.token_decimals = {k.lower(): v for k, v in (token_decimals or {}).items()}
+		self.multicall = multicall
+		self.chain_id = chain_id
+		self.block_number = block_number
+		self.stats = MockRPCStats()
+		self._lock = threading.Lock()
+
+	def _count(self, **deltas: int) -> None:
+		with self._lock:
+			for name, delta in deltas.items():
+				setattr(self.stats, name, getattr(self.stats, name) + delta)
+
+	def handle(self, body: Any) -> Any:
+		self._count(http_requests=1)
+		if isinstance(body, list):
+			self._count(batch_requests=1)
+			return [self._handle_one(request) for request in body]
+		return self._handle_one(body)
+
+	def _handle_one(self, request: Dict[str, Any]) -> Dict[str, Any]:
+		self._count(rpc_calls=1)
+		response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+		try:
+			response["result"] = self._dispatch(
+				request.get("method", ""), request.get("params") or []
+			)
+		except Reverted as e:
+			response["error"] = {"code": 3, "message": f"execution reverted: {e}"}
+		except KeyError as e:
+			response["error"] = {"code": -32601, "message": f"Method not found: {e}"}
+		return response
+
+	def _dispatch(self, method: str, params: List[Any]) -> Any:
+		if method == "eth_chainId":
+			return hex(self.chain_id)
+		if method == "eth_blockNumber":
+			return hex(self.block_number)
+		if method == "eth_getBalance":
+			return hex(self.eth_balances.get(params[0].lower(), 0))
+		if method == "eth_getTransactionCount":
+			return hex(0)
+		if method == "eth_getCode":
+			address = params[0].lower()
+			deployed = (
+				address in self.token_balances
+				or address in self.token_decimals
+				or (self.multicall and address == MULTICALL3_ADDRESS.lower())
+			)
+			return "0x6080" if deployed else "0x"
+		if method == "eth_call":
+			self._count(eth_calls=1)
+			call = params[0]
+			data = bytes.fromhex(call.get("data", call.get("input", "0x"))[2:])
+			return "0x" + self._call(call["to"].lower(), data).hex()
+		raise KeyError(method)
+
+	def _call(self, to: str, data: bytes) -> bytes:
+		if to == MULTICALL3_ADDRESS.lower():
+			if not self.multicall or data[:4] != AGGREGATE3_SELECTOR:
+				raise Reverted("no multicall")
+			self._count(multicalls=1)
+			(calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+			results = []
+			for target, allow_failure, call_data in calls:
+				try:
+					results.append((True, self._call(target.lower(), call_data)))
+				except Reverted:
+					if not allow_failure:
+						raise
+					results.append((False, b""))
+			return encode(["(bool,bytes)[]"], [results])
+
+		if data[:4] == DECIMALS_SELECTOR and to in self.token_decimals:
+			return encode(["uint8"], [self.token_decimals[to]])
+		if (
+			data[:4] != BALANCE_OF_SELECTOR
+			or to in self.reverting_tokens
+			or to not in self.token_balances
+		):
+			raise Reverted(to)
+		(owner,) = decode(["address"], data[4:])
+		return encode(["uint256"], [self.token_balances[to].get(owner.lower(), 0)])
+
+
+class MockRPCServer(MockChain):
+	def __init__(
+		self,
+		token_balances: Dict[str, Dict[str, int]] | None = None,
+		eth_balances: Dict[str, int] | None = None,
+		reverting_tokens: Set[str] | None = None,
+		token_decimals: Dict[str, int] | None = None,
+		multicall: bool = True,
+		chain_id: int = 1,
+		host: str = "127.0.0.1",
+		port: int = 0,
+	):
+		"""
+		Local Ethereum JSON-RPC stub for balance reads, serving a `MockChain`.
+
+		Args:
+		    token_balances (Dict[str, Dict[str, int]] | None): Token address to owner to raw balance
+		    eth_balances (Dict[str, int] | None): Owner to wei balance
+		    reverting_tokens (Set[str] | None): Token addresses whose balanceOf reverts
+		    token_decimals (Dict[str, int] | None): Token address to decimals()
+		    multicall (bool): Whether Multicall3 is deployed
+		    chain_id (int): Chain id to report
+		    host (str): Interface to bind to
+		    port (int): Port to bind to, 0 picks a free one
+		"""
+		super().__init__(
+			token_balances=token_balances,
+			eth_balances=eth_balances,
+			reverting_tokens=reverting_tokens,
+			token_decimals=token_decimals,
+			multicall=multicall,
+			chain_id=chain_id,
+		)
+		self._httpd = _HTTPServer((host, port), _Handler)
+		self._httpd.owner = self
+		self._thread: threading.Thread | None = None
+
+	@property
+	def url(self) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def start(self) -> "MockRPCServer":
+		self._thread = threading.Thread(
+			target=self._httpd.serve_forever, name="mock-rpc-server", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		if self._thread is not None:
+			self._thread.join()
+
+	def __enter__(self) -> "MockRPCServer":
+		return self.start()
+
+	def __exit__(self, *exc: Any) -> None:
+		self.stop()
@@ -0,0 +1,3 @@
+from .server import MockSocialServer, MockSocialStats
+
+__all__ = ["MockSocialServer", "MockSocialStats"]
@@ -0,0 +1,164 @@
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class MockSocialStats:
+	# Requests per platform
+	requests: Dict[str, int] = field(default_factory=dict)
+	# Posts accepted per platform
+	posts: Dict[str, List[Any]] = field(default_factory=dict)
+	throttled: int = 0
+	errors: int = 0
+	# TCP connections opened by clients
+	connections: int = 0
+	max_concurrent: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	server: "_HTTPServer"
+
+	def log_message(self, format: str, *args: Any) -> None:
+		pass
+
+	def setup(self) -> None:
+		super().setup()
+		self.server.owner.connected()
+
+	def do_POST(self) -> None:
+		length = int(self.headers.get("Content-Length", 0))
+		body = self.rfile.read(length)
+		status, headers, payload = self.server.owner.serve(
+			self.path, self.headers.get("Content-Type", ""), body
+		)
+		content = json.dumps(payload).encode()
+		self.send_response(status)
+		for name, value in headers.items():
+			self.send_header(name, value)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(content)))
+		self.end_headers()
+		self.wfile.write(content)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+	owner: "MockSocialServer"
+
+	def handle_error(self, request: Any, client_address: Any) -> None:
+		if isinstance(sys.exc_info()[1], ConnectionError):
+			return
+		super().handle_error(request, client_address)
+
+
+class MockSocialServer:
+	def __init__(
+		self,
+		latency_seconds: float = 0.0,
+		throttle: Dict[str, int] | None = None,
+		retry_after: str = "1",
+		failures: Dict[str, int] | None = None,
+		host: str = "127.0.0.1",
+		port: int = 0,
+	):
+		"""
+		Local stand-in for the Dev.to, Hashnode, LinkedIn and Facebook posting
+		APIs, each under its own path prefix: /devto, /hashnode, /linkedin and
+		/facebook.
+
+		Args:
+		    latency_seconds (float): How long every request takes
+		    throttle (Dict[str, int] | None): Per platform, how many first requests get a 429
+		    retry_after (str): `Retry-After` sent with every 429
+		    failures (Dict[str, int] | None): Per platform, how many first requests (after throttling) get a 500
+		    host (str): Interface to bind to
+		    port (int): Port to bind to, 0 picks a free one
+		"""
+		self.latency_seconds = latency_seconds
+		self.throttle = dict(throttle or {})
+		self.retry_after = retry_after
+		self.failures = dict(failures or {})
+		self.stats = MockSocialStats()
+		self._running = 0
+		self._lock = threading.Lock()
+		self._httpd = _HTTPServer((host, port), _Handler)
+		self._httpd.owner = self
+		self._thread: threading.Thread | None = None
+
+	def connected(self) -> None:
+		with self._lock:
+			self.stats.connections += 1
+
+	def serve(
+		self, path: str, content_type: str, body: bytes
+	) -> Tuple[int, Dict[str, str], Any]:
+		platform = path.strip("/").split("/")[0]
+		with self._lock:
+			self.stats.requests[platform] = self.stats.requests.get(platform, 0) + 1
+			self._running += 1
+			self.stats.max_concurrent = max(self.stats.max_concurrent, self._running)
+		try:
+			time.sleep(self.latency_seconds)
+			with self._lock:
+				if self.throttle.get(platform, 0) > 0:
+					self.throttle[platform] -= 1
+					self.stats.throttled += 1
+					return (
+						429,
+						{"Retry-After": self.retry_after},
+						{"error": "slow down"},
+					)
+				if self.failures.get(platform, 0) > 0:
+					self.failures[platform] -= 1
+					self.stats.errors += 1
+					return 500, {}, {"error": "internal error"}
+
+				if content_type.startswith("application/json"):
+					post = json.loads(body)
+				else:
+					post = body.decode()
+				posts = self.stats.posts.setdefault(platform, [])
+				posts.append(post)
+				n = len(posts)
+
+			if platform == "devto":
+				return 201, {}, {"id": n, "url": f"https://dev.to/bot/post-{n}"}
+			if platform == "hashnode":
+				return 200, {}, {"data": {"createStory": {"success": True}}}
+			if platform == "linkedin":
+				return 201, {"x-restli-id": f"urn:li:share:{n}"}, {}
+			if platform == "facebook":
+				return 200, {}, {"id": f"page_{n}"}
+			return 404, {}, {"error": f"unknown platform {platform}"}
+		finally:
+			with self._lock:
+				self._running -= 1
+
+	def url(self, path: str) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}{path}"
+
+	def start(self) -> "MockSocialServer":
+		self._thread = threading.Thread(
+			target=self._httpd.serve_forever, name="mock-social-server", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		if self._thread is not None:
+			self._thread.join()
+
+	def __enter__(self) -> "MockSocialServer":
+		return self.start()
+
+	def __exit__(self, *exc: Any) -> None:
+		self.stop()
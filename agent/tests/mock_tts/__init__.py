@@ -0,0 +1,3 @@
+from .backend import FakeTTS, FakeTTSStats
+
+__all__ = ["FakeTTS", "FakeTTSStats"]
@@ -0,0 +1,59 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+# Header of an MPEG-1 Layer III frame, 128 kbit/s at 44.1 kHz
+FRAME_HEADER = b"\xff\xfb\x90\x64"
+
+
+@dataclass
+class FakeTTSStats:
+	syntheses: int = 0
+	# (voice, text) of every synthesis, in order
+	calls: List[Tuple[str, str]] = field(default_factory=list)
+	max_concurrent: int = 0
+
+
+class FakeTTS:
+	def __init__(self, delay_seconds: float = 0.0, id3_tags: bool = False):
+		"""
+		Local stand-in for a TTS service with the `SpeechBackend` interface.
+
+		Audio is derived from the voice and text, so the same phrase always
+		sounds the same and different phrases differ.
+
+		Args:
+		    delay_seconds (float): How long every synthesis takes
+		    id3_tags (bool): Whether to start the audio with an ID3v2 tag, as some services do
+		"""
+		self.delay_seconds = delay_seconds
+		self.id3_tags = id3_tags
+		self.stats = FakeTTSStats()
+		self._running = 0
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def frames(voice: str, text: str) -> bytes:
+		"""
+		The audio frames, without any tag, synthesised for a phrase.
+		"""
+		return FRAME_HEADER + hashlib.sha256(f"{voice}|{text}".encode()).digest()
+
+	def synthesize(self, text: str, voice: str) -> bytes:
+		with self._lock:
+			self.stats.syntheses += 1
+			self.stats.calls.append((voice, text))
+			self._running += 1
+			self.stats.max_concurrent = max(self.stats.max_concurrent, self._running)
+		try:
+			time.sleep(self.delay_seconds)
+			audio = self.frames(voice, text)
+			if self.id3_tags:
+				# ID3v2.4 header declaring a 4-byte body
+				audio = b"ID3\x04\x00\x00\x00\x00\x00\x04TAG!" + audio
+			return audio
+		finally:
+			with self._lock:
+				self._running -= 1
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.asset_cache import GeneratedAssetCache, request_key
+from tests.mock_replicate import FakeReplicate
+
+
+def test_repeated_requests_reuse_the_stored_file(tmp_path):
+	backend = FakeReplicate()
+	cache = GeneratedAssetCache(str(tmp_path), backend=backend)
+
+	first = cache.get("google/imagen-4", "smart watch, product photo")
+	again = cache.get("google/imagen-4", "smart watch, product photo")
+	other = cache.get("google/imagen-4", "laptop, product photo")
+	video = cache.get("minimax/video-01", "smart watch, product photo", ext="mp4")
+
+	assert first == again
+	assert len({first, other, video}) == 3
+	assert video.endswith(".mp4")
+	assert backend.stats.runs == 3
+	assert cache.stats.hits == 1
+
+	# A new process finds the same file without running the model
+	reopened = GeneratedAssetCache(str(tmp_path), backend=backend)
+	assert reopened.get("google/imagen-4", "laptop, product photo") == other
+	assert backend.stats.runs == 3
+
+
+def test_params_are_part_of_the_key(tmp_path):
+	backend = FakeReplicate()
+	cache = GeneratedAssetCache(str(tmp_path), backend=backend)
+
+	square = cache.get("google/imagen-4", "watch", {"aspect_ratio": "1:1"})
+	wide = cache.get("google/imagen-4", "watch", {"aspect_ratio": "16:9"})
+
+	assert square != wide
+	assert backend.stats.calls[1] == (
+		"google/imagen-4",
+		{"aspect_ratio": "16:9", "prompt": "watch"},
+	)
+	assert request_key("m", "p", {"a": 1, "b": 2}) == request_key(
+		"m", "p", {"b": 2, "a": 1}
+	)
+
+
+def test_concurrent_identical_requests_share_one_generation(tmp_path):
+	backend = FakeReplicate(delay_seconds=0.2)
+	cache = GeneratedAssetCache(str(tmp_path), backend=backend)
+
+	with ThreadPoolExecutor(max_workers=8) as pool:
+		paths = list(
+			pool.map(
+				lambda i: cache.get("minimax/video-01", f"product {i % 2}", ext="mp4"),
+				range(8),
+			)
+		)
+
+	assert len(set(paths)) == 2
+	assert backend.stats.runs == 2
+	assert cache.stats.joined + cache.stats.hits == 6
+
+
+def test_failed_generation_is_not_cached(tmp_path):
+	backend = FakeReplicate(failing_prompts={"broken"})
+	cache = GeneratedAssetCache(str(tmp_path), backend=backend)
+
+	assert cache.get("google/imagen-4", "broken") is None
+	assert cache.get("google/imagen-4", "broken") is None
+	assert backend.stats.runs == 2
+	assert cache.stats.failures == 2
+	assert os.listdir(tmp_path / "tmp") == []
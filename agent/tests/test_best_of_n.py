@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "wallet.db"))
+
+from result import Err, Ok
+
+from src.flows.trading import BestOfNConfig, gen_code_best_of_n
+from src.my_types import ChatHistory, Message, TokenUsage
+from tests.mock_genner.MockGenner import MockGenner
+
+
+class FakeContainer:
+	"""
+	Runs a candidate by looking its code up: "raise" breaks the docker call,
+	"fail" exits non-zero, anything else succeeds.
+	"""
+
+	def __init__(self):
+		self.ran = []
+
+	def run_code_in_con_concurrent(self, code, postfix, timeout_seconds=600):
+		self.ran.append(code)
+		if code == "raise":
+			raise RuntimeError("500 Server Error: docker daemon went away")
+		if code == "fail":
+			return Err("Code that has been run failed")
+		return Ok((f"ran {code}\n", code))
+
+	def kill_codes_in_con(self, postfix):
+		pass
+
+
+def make_agent(codes):
+	"""
+	An agent whose candidates are `codes` in order, each reporting usage.
+	"""
+	genner = MockGenner()
+	lock = threading.Lock()
+	remaining = list(codes)
+
+	def gen():
+		with lock:
+			code = remaining.pop(0)
+		if code == "gen-error":
+			raise ConnectionError("LLM connection dropped")
+		genner.last_usage = TokenUsage(input_tokens=100, output_tokens=len(code))
+		ch = ChatHistory([Message(role="assistant", content=code)])
+		return Ok(code), ch
+
+	agent = SimpleNamespace(
+		genner=genner,
+		container_manager=FakeContainer(),
+		gen_better_code=lambda research_code, errors: gen(),
+	)
+	return agent, gen
+
+
+def test_broken_candidates_are_dropped_not_fatal():
+	agent, gen = make_agent(["gen-error", "raise", "good"])
+
+	result, chs = gen_code_best_of_n(agent, gen, "test", BestOfNConfig(n=3))
+
+	assert result.unwrap() == ("good", "ran good\n")
+	assert chs[-1].get_latest_response() == "good"
+
+
+def test_failed_round_regenerates_from_a_failed_candidate():
+	agent, gen = make_agent(["fail", "raise", "good"])
+
+	result, chs = gen_code_best_of_n(
+		agent, gen, "test", BestOfNConfig(n=2, max_candidates=4)
+	)
+
+	assert result.unwrap()[0] == "good"
+	assert len(chs) == 3
+	assert sorted(agent.container_manager.ran) == ["fail", "good", "raise"]
+
+
+def test_usage_is_tracked_per_thread():
+	genner = MockGenner()
+	genner.last_usage = TokenUsage(input_tokens=1, output_tokens=1)
+	seen = []
+
+	thread = threading.Thread(target=lambda: seen.append(genner.last_usage))
+	thread.start()
+	thread.join()
+
+	assert seen == [None]
+	assert genner.last_usage.input_tokens == 1
@@ -4,7 +4,7 @@ from dotenv import load_dotenv
 
 from src.client.openrouter import OpenRouter
 from src.genner import get_genner
-from src.types import ChatHistory, Message
+from src.my_types import ChatHistory, Message
 from anthropic import Anthropic
 
 load_dotenv()
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from src.job_queue import JobQueue, JobState
+
+
+def test_workers_run_jobs_and_results_are_claimed_once(tmp_path):
+	queue = JobQueue(str(tmp_path / "jobs.db"), poll_interval=0.05)
+	done = []
+	queue.register("render", lambda payload: {"path": f"{payload['name']}.mp4"})
+	queue.on_complete("render", done.append)
+
+	ids = [queue.enqueue("render", {"name": f"video-{i}"}) for i in range(5)]
+	with queue.start(workers=3):
+		assert queue.wait_idle(timeout=5)
+
+	assert sorted(job.job_id for job in done) == sorted(ids)
+	claimed = queue.claim_finished("render")
+	assert [job.result["path"] for job in claimed] == [
+		f"video-{i}.mp4" for i in range(5)
+	]
+	assert queue.claim_finished("render") == []
+	queue.ack([job.job_id for job in claimed])
+
+	metrics = queue.metrics()
+	assert metrics.depth == {"succeeded": 5}
+	assert metrics.finished == 5
+	assert metrics.failure_rate == 0.0
+
+
+def test_failed_jobs_are_retried_then_failed_for_good(tmp_path):
+	queue = JobQueue(str(tmp_path / "jobs.db"), retry_delay=0.0)
+	attempts = []
+
+	def flaky(payload):
+		attempts.append(payload["name"])
+		if payload["name"] == "broken" or attempts.count(payload["name"]) < 2:
+			raise RuntimeError("render failed")
+		return "ok"
+
+	queue.register("render", flaky)
+	flaky_id = queue.enqueue("render", {"name": "flaky"}, max_attempts=3)
+	broken_id = queue.enqueue("render", {"name": "broken"}, max_attempts=2)
+	while queue.run_one():
+		pass
+
+	flaky_job = queue.get(flaky_id)
+	broken_job = queue.get(broken_id)
+	assert (flaky_job.state, flaky_job.attempts, flaky_job.result) == (
+		JobState.SUCCEEDED,
+		2,
+		"ok",
+	)
+	assert (broken_job.state, broken_job.attempts) == (JobState.FAILED, 2)
+	assert "render failed" in broken_job.error
+	assert queue.metrics().failure_rate == 0.5
+
+
+def test_jobs_survive_a_restart_and_duplicates_are_merged(tmp_path):
+	db_path = str(tmp_path / "jobs.db")
+	first = JobQueue(db_path, poll_interval=0.05)
+	started = threading.Event()
+	first.register("render", lambda payload: started.set() or time.sleep(10))
+
+	job_id = first.enqueue("render", {"name": "a"}, dedupe_key="render:a")
+	assert first.enqueue("render", {"name": "a"}, dedupe_key="render:a") == job_id
+	first.start(workers=1)
+	assert started.wait(5)
+	# The process dies mid-job: its worker never finishes
+	first.stop(wait=False)
+	assert first.get(job_id).state == JobState.RUNNING
+
+	second = JobQueue(db_path, poll_interval=0.05)
+	second.register("render", lambda payload: "done")
+	with second.start(workers=1):
+		assert second.wait_idle(timeout=5)
+	job = second.get(job_id)
+	assert (job.state, job.attempts, job.result) == (JobState.SUCCEEDED, 2, "done")
+
+
+def test_claims_come_back_until_acknowledged(tmp_path):
+	queue = JobQueue(str(tmp_path / "jobs.db"), poll_interval=0.05)
+	queue.register("render", lambda payload: payload["name"])
+	ids = [queue.enqueue("render", {"name": name}) for name in "abc"]
+	with queue.start(workers=1):
+		assert queue.wait_idle(timeout=5)
+
+	assert [job.job_id for job in queue.claim_finished("render")] == ids
+	# Published a, failed b, crashed before getting to c
+	queue.ack([ids[0]])
+	queue.release([ids[1]])
+	assert [job.job_id for job in queue.claim_finished("render")] == [ids[1]]
+
+	# c's claim outlived its lease
+	reclaimed = queue.claim_finished("render", lease_seconds=0)
+	assert [job.job_id for job in reclaimed] == ids[1:]
+	queue.ack(ids)
+	assert queue.claim_finished("render", lease_seconds=0) == []
+
+
+def test_unacknowledged_results_are_not_queued_again(tmp_path):
+	queue = JobQueue(str(tmp_path / "jobs.db"), poll_interval=0.05)
+	queue.register("render", lambda payload: payload["name"])
+	job_id = queue.enqueue("render", {"name": "a"}, dedupe_key="render:a")
+	with queue.start(workers=1):
+		assert queue.wait_idle(timeout=5)
+
+	# The upload failed and the product comes round again next cycle
+	queue.release([job.job_id for job in queue.claim_finished("render")])
+	assert queue.enqueue("render", {"name": "a"}, dedupe_key="render:a") == job_id
+	assert [job.job_id for job in queue.claim_finished("render")] == [job_id]
+
+	# Once published, the same key makes a new job
+	queue.ack([job_id])
+	assert queue.enqueue("render", {"name": "a"}, dedupe_key="render:a") != job_id
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.media_cache import MediaCache, url_key
+from tests.mock_media import MockMediaServer
+
+JPEG = b"\xff\xd8\xff\xe0" + b"jpeg" * 1000
+PNG = b"\x89PNG\r\n\x1a\n" + b"png" * 1000
+
+
+def test_same_content_is_stored_once_and_revalidated(tmp_path):
+	with MockMediaServer({"/a.jpg": JPEG, "/b.jpg": JPEG, "/c.png": PNG}) as server:
+		cache = MediaCache(str(tmp_path), max_age=0)
+		a = cache.get(server.url("/a.jpg"))
+		b = cache.get(server.url("/b.jpg"))
+		c = cache.get(server.url("/c.png"))
+
+		assert a == b and a.endswith(".jpg") and c.endswith(".png")
+		with open(a, "rb") as f:
+			assert f.read() == JPEG
+		assert cache.stats.deduplicated == 1
+
+		# Past max_age the entry is checked with a conditional GET
+		assert cache.get(server.url("/a.jpg")) == a
+		assert server.stats.not_modified == 1
+		assert cache.stats.revalidated == 1
+
+		server.put("/a.jpg", PNG)
+		assert cache.get(server.url("/a.jpg")) == c
+
+
+def test_fresh_entries_survive_a_new_process(tmp_path):
+	with MockMediaServer({"/a.jpg": JPEG}) as server:
+		path = MediaCache(str(tmp_path)).get(server.url("/a.jpg"))
+		reopened = MediaCache(str(tmp_path))
+		assert reopened.get(server.url("/a.jpg")) == path
+		assert reopened.stats.hits == 1
+		assert server.stats.requests == 1
+	assert url_key("https://x/a.jpg") == url_key("https://x/a.jpg ")
+
+
+def test_oversized_and_non_image_responses_are_rejected(tmp_path):
+	with MockMediaServer(
+		{"/big.jpg": b"\xff\xd8\xff" + b"x" * 5000, "/page.jpg": b"<html>"}
+	) as server:
+		cache = MediaCache(str(tmp_path), max_file_bytes=4096)
+		assert cache.get(server.url("/big.jpg")) is None
+		assert cache.get(server.url("/page.jpg")) is None
+		assert cache.get(server.url("/missing.jpg")) is None
+		assert cache.stats.failures == 3
+		assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+	files = {f"/{i}.jpg": b"\xff\xd8\xff" + bytes([i]) * 1000 for i in range(4)}
+	with MockMediaServer(files) as server:
+		cache = MediaCache(str(tmp_path), max_bytes=2500)
+		first = cache.get(server.url("/0.jpg"))
+		cache.get(server.url("/1.jpg"))
+		cache.get(server.url("/0.jpg"))  # now more recently used than 1
+		cache.get(server.url("/2.jpg"))
+
+		assert cache.total_bytes() <= 2500
+		assert os.path.exists(first)
+		assert cache.stats.evictions == 1
+		requests_before = server.stats.requests
+		cache.get(server.url("/1.jpg"))
+		assert server.stats.requests == requests_before + 1
+
+
+def test_prefetch_downloads_each_url_once(tmp_path):
+	files = {f"/{i}.jpg": b"\xff\xd8\xff" + bytes([i]) * 100 for i in range(10)}
+	with MockMediaServer(files) as server:
+		cache = MediaCache(str(tmp_path))
+		urls = [server.url(f"/{i % 10}.jpg") for i in range(30)] + [None, ""]
+		with ThreadPoolExecutor(max_workers=2) as pool:
+			results = list(pool.map(lambda _: cache.prefetch(urls), range(2)))
+
+		assert len(results[0]) == 10
+		assert all(path is not None for path in results[0].values())
+		assert server.stats.full_responses == 10
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.metric_store import HOUR, WalletMetricStore
+
+START = datetime(2025, 1, 1)
+WALLET = "0xAbC"
+
+
+def sample(hours, total, tokens=None):
+	return {
+		"wallet_address": WALLET,
+		"eth_balance": total / 2000,
+		"eth_price_usd": 2000.0,
+		"tokens": {
+			addr: {"symbol": addr[-3:], "balance": balance}
+			for addr, balance in (tokens or {}).items()
+		},
+		"total_value_usd": total,
+		"timestamp": (START + timedelta(hours=hours)).isoformat(),
+	}
+
+
+@pytest.fixture
+def store(tmp_path):
+	store = WalletMetricStore(str(tmp_path / "metrics"), max_tokens=2)
+	# Hourly samples over two days: up to 150 after 24h, down to 120, back to 130
+	values = list(np.linspace(100, 150, 25)) + list(np.linspace(150, 120, 12))
+	values += list(np.linspace(120, 130, 12))
+	for hour, total in enumerate(values):
+		store.record(sample(hour, float(total)))
+	return store
+
+
+def test_deltas_over_windows(store):
+	now = (START + timedelta(hours=48)).timestamp()
+
+	assert store.delta(WALLET, 1 * HOUR) == pytest.approx(130 - 129.0909, abs=1e-3)
+	assert store.delta(WALLET, 24 * HOUR) == pytest.approx(130 - 150)
+	assert store.delta(WALLET, 24 * HOUR, now=now - 24 * HOUR) == pytest.approx(50)
+	assert store.value_at(WALLET.lower(), now - 24.5 * HOUR) == pytest.approx(
+		147.9167, abs=1e-3
+	)
+
+
+def test_drawdown_and_volatility(store):
+	assert store.max_drawdown(WALLET, 24 * HOUR) == pytest.approx(0.2)
+	assert (
+		store.max_drawdown(
+			WALLET, 12 * HOUR, now=(START + timedelta(hours=24)).timestamp()
+		)
+		== 0.0
+	)
+	assert store.volatility(WALLET, 24 * HOUR) > 0
+	assert "Max drawdown over 24h: 20.00%" in store.summary(WALLET)
+
+
+def test_series_survive_reopening_and_keep_token_columns(tmp_path):
+	directory = str(tmp_path / "metrics")
+	first = WalletMetricStore(directory, max_tokens=2)
+	first.record(sample(0, 10.0, {"0xaaa": 1.0}))
+	first.record(sample(1, 20.0, {"0xbbb": 2.0, "0xccc": 3.0, "0xaaa": 4.0}))
+
+	reopened = WalletMetricStore(directory, max_tokens=2)
+	series = reopened.series(WALLET)
+
+	assert series.total_value_usd.tolist() == [10.0, 20.0]
+	assert sorted(series.token_balances) == ["0xaaa", "0xbbb"]
+	assert series.token_balances["0xaaa"].tolist() == [1.0, 4.0]
+	assert series.token_balances["0xbbb"].tolist() == [0.0, 2.0]
+	assert isinstance(series.timestamps.base, np.memmap)
+
+
+def test_empty_and_single_sample_series(tmp_path):
+	store = WalletMetricStore(str(tmp_path / "metrics"))
+
+	assert store.delta(WALLET, HOUR) is None
+	assert store.summary(WALLET) == ""
+
+	store.record(sample(0, 10.0))
+	assert store.delta(WALLET, HOUR) is None
+	assert store.max_drawdown(WALLET, HOUR) is None
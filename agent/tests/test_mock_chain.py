@@ -0,0 +1,101 @@
+import os
+import tempfile
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "wallet.db"))
+
+import pytest
+
+import src.wallet as wallet
+from src.db import SQLiteDB
+from tests.mock_chain import MockChainSimulator, ServiceProfile
+
+
+def use_simulator(sim, monkeypatch, tmp_path):
+	"""Point the real wallet code at `sim`, with fresh caches and DB."""
+	for name, value in sim.env().items():
+		monkeypatch.setenv(name, value)
+		if hasattr(wallet, name):
+			monkeypatch.setattr(wallet, name, value)
+	monkeypatch.setattr(wallet, "DB", SQLiteDB(str(tmp_path / "wallet.db")))
+	monkeypatch.setattr(wallet, "_price_provider", wallet.PriceProvider())
+	monkeypatch.setattr(wallet.time, "sleep", lambda _: None)
+
+
+@pytest.fixture
+def world(monkeypatch, tmp_path):
+	sim, wallets = MockChainSimulator.random_world(
+		n_wallets=3, tokens_per_wallet=5, n_tokens=8, seed=1
+	)
+	with sim:
+		use_simulator(sim, monkeypatch, tmp_path)
+		yield sim, wallets
+
+
+def test_wallet_stats_match_the_simulated_world(world):
+	sim, wallets = world
+
+	for address in wallets:
+		stats = wallet.get_wallet_stats(address, "", "key")
+		assert len(stats["tokens"]) == 5
+		assert stats["total_value_usd"] == pytest.approx(
+			sim.expected_total_usd(address)
+		)
+
+	assert sim.stats["etherscan"].requests == 3
+	assert sim.chain.stats.multicalls == 3
+	# The first wallet's lookup priced its tokens, the rest mostly hit the caches
+	assert sim.stats["binance"].requests < 3 * 2
+
+
+def test_new_transfers_are_picked_up_incrementally(world):
+	sim, wallets = world
+	address = wallets[0]
+	wallet.get_wallet_stats(address, "", "key")
+	held = {t.lower() for t in wallet.get_wallet_stats(address, "", "key")["tokens"]}
+	new_token = next(t for t in sim.tokens.values() if t.address not in held)
+
+	sim.transfer(address, new_token.address, 10**new_token.decimals)
+	stats = wallet.get_wallet_stats(address, "", "key")
+
+	assert len(stats["tokens"]) == 6
+	assert stats["total_value_usd"] == pytest.approx(sim.expected_total_usd(address))
+
+
+def test_failed_balance_reads_still_report_eth(world, monkeypatch):
+	sim, wallets = world
+
+	def broken(*args, **kwargs):
+		raise ConnectionError("RPC batch failed")
+
+	monkeypatch.setattr(wallet, "get_erc20_balances", broken)
+	stats = wallet.get_wallet_stats(wallets[0], "", "key")
+
+	assert stats["tokens"] == {}
+	assert stats["eth_balance"] > 0
+	assert stats["total_value_usd"] == pytest.approx(
+		stats["eth_balance"] * stats["eth_price_usd"]
+	)
+
+
+def test_blocked_and_rate_limited_exchanges_fall_back(monkeypatch, tmp_path):
+	sim, wallets = MockChainSimulator.random_world(
+		n_wallets=2,
+		tokens_per_wallet=4,
+		n_tokens=6,
+		seed=2,
+		profiles={
+			"binance": ServiceProfile(blocked=True),
+			"kraken": ServiceProfile(rate_limit=1.0),
+			"rpc": ServiceProfile(latency_seconds=0.01),
+		},
+	)
+	with sim:
+		use_simulator(sim, monkeypatch, tmp_path)
+		for address in wallets:
+			stats = wallet.get_wallet_stats(address, "", "key")
+			assert stats["total_value_usd"] == pytest.approx(
+				sim.expected_total_usd(address)
+			)
+
+	# The circuit breaker stops retrying the blocked exchange
+	assert sim.stats["binance"].requests <= 3
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from openai import OpenAI
+
+from src.client.openrouter import OpenRouter, OpenRouterError
+from src.config import DeepseekConfig, OAIConfig
+from src.genner.Deepseek import DeepseekGenner
+from src.genner.OAI import OAIGenner
+from src.my_types import ChatHistory, Message
+from tests.mock_llm_server import (
+	DEFAULT_RESPONSE,
+	MockLLMConfig,
+	MockLLMServer,
+)
+
+CH = ChatHistory([Message(role="user", content="What should we trade today?")])
+
+
+@pytest.fixture
+def server(request):
+	config = getattr(request, "param", None) or MockLLMConfig(
+		ttft_seconds=0.0, tokens_per_second=0
+	)
+	with MockLLMServer(config) as server:
+		yield server
+
+
+def make_or_client(server: MockLLMServer) -> OpenRouter:
+	return OpenRouter(api_key="test", base_url=server.openrouter_base_url, timeout=5)
+
+
+@pytest.mark.parametrize(
+	"server",
+	[MockLLMConfig(ttft_seconds=0.0, tokens_per_second=0, reasoning_tokens=12)],
+	indirect=True,
+)
+def test_openrouter_stream_yields_reasoning_then_main(server):
+	chunks = list(make_or_client(server).create_chat_completion_stream(CH.as_native()))
+	types = [token_type for _, token_type in chunks]
+
+	assert types.count("reasoning") == 12
+	assert types == sorted(types, key=lambda t: t != "reasoning")
+	assert "".join(t for t, kind in chunks if kind == "main") == DEFAULT_RESPONSE
+
+
+def test_openrouter_usage_is_reported(server):
+	client = make_or_client(server)
+	genner = DeepseekGenner(client, DeepseekConfig(), stream_fn=None)
+
+	assert genner.ch_completion(CH).unwrap() == DEFAULT_RESPONSE
+	assert genner.last_usage is not None
+	assert genner.last_usage.output_tokens == server.stats.completion_tokens
+
+
+def test_openai_stream_through_oai_genner(server):
+	client = OpenAI(api_key="test", base_url=server.openai_base_url)
+	streamed = []
+	genner = OAIGenner(
+		client, OAIConfig(thinking_delimiter=""), stream_fn=streamed.append
+	)
+
+	code, raw = genner.generate_code(CH).unwrap()
+
+	assert raw == DEFAULT_RESPONSE
+	assert code == ["print('mock step completed')\n"]
+	assert "".join(streamed) == DEFAULT_RESPONSE
+	assert server.stats.streamed_requests == 1
+
+
+@pytest.mark.parametrize(
+	"server",
+	[MockLLMConfig(ttft_seconds=0.3, tokens_per_second=0)],
+	indirect=True,
+)
+def test_ttft_delays_the_first_token(server):
+	start = time.monotonic()
+	stream = make_or_client(server).create_chat_completion_stream(CH.as_native())
+	next(iter(stream))
+
+	assert time.monotonic() - start >= 0.3
+
+
+@pytest.mark.parametrize(
+	"server",
+	[MockLLMConfig(ttft_seconds=0.0, tokens_per_second=0, error_rate=1.0)],
+	indirect=True,
+)
+def test_injected_errors_surface_as_err(server):
+	genner = DeepseekGenner(make_or_client(server), DeepseekConfig(), stream_fn=None)
+
+	result = genner.ch_completion(CH)
+
+	assert result.is_err()
+	assert "503" in result.unwrap_err()
+	assert server.stats.injected_errors == 1
+
+
+@pytest.mark.parametrize(
+	"server",
+	[MockLLMConfig(ttft_seconds=0.0, tokens_per_second=0, mid_stream_error_rate=1.0)],
+	indirect=True,
+)
+def test_dropped_stream_raises(server):
+	with pytest.raises(OpenRouterError):
+		list(make_or_client(server).create_chat_completion_stream(CH.as_native()))
+	assert server.stats.dropped_streams == 1
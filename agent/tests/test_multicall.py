@@ -0,0 +1,55 @@
+import pytest
+from web3 import Web3
+
+from src.multicall import get_erc20_balances
+from tests.mock_rpc import MockRPCServer
+
+OWNER = Web3.to_checksum_address("0x" + "11" * 20)
+TOKENS = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, 26)]
+BROKEN = Web3.to_checksum_address("0x" + "ee" * 20)
+
+
+@pytest.fixture
+def balances():
+	return {token: {OWNER: i * 10**18} for i, token in enumerate(TOKENS)}
+
+
+def test_multicall_reads_all_balances_in_chunks(balances):
+	with MockRPCServer(token_balances=balances) as server:
+		w3 = Web3(Web3.HTTPProvider(server.url))
+		result = get_erc20_balances(w3, OWNER, TOKENS, chunk_size=10)
+
+		assert result == {token: owners[OWNER] for token, owners in balances.items()}
+		assert server.stats.multicalls == 3
+		assert server.stats.eth_calls == 3
+
+
+def test_reverting_tokens_are_skipped(balances):
+	with MockRPCServer(token_balances=balances, reverting_tokens={BROKEN}) as server:
+		w3 = Web3(Web3.HTTPProvider(server.url))
+		result = get_erc20_balances(w3, OWNER, TOKENS + [BROKEN])
+
+		assert BROKEN not in result
+		assert len(result) == len(TOKENS)
+		assert server.stats.eth_calls == 1
+
+
+def test_falls_back_to_rpc_batches_without_multicall(balances):
+	with MockRPCServer(token_balances=balances, multicall=False) as server:
+		w3 = Web3(Web3.HTTPProvider(server.url))
+		result = get_erc20_balances(w3, OWNER, TOKENS + [BROKEN], chunk_size=20)
+
+		assert result == {token: owners[OWNER] for token, owners in balances.items()}
+		# One failed multicall attempt, then two batches of up to 20 calls each
+		assert server.stats.batch_requests == 2
+		assert server.stats.eth_calls == 1 + len(TOKENS) + 1
+
+
+def test_duplicates_are_read_once(balances):
+	with MockRPCServer(token_balances=balances) as server:
+		w3 = Web3(Web3.HTTPProvider(server.url))
+		result = get_erc20_balances(w3, OWNER, TOKENS[:3] * 4, mode="batch")
+
+		assert len(result) == 3
+		assert server.stats.batch_requests == 1
+		assert server.stats.eth_calls == 3
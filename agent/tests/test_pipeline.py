@@ -0,0 +1,98 @@
+import threading
+import time
+
+from src.pipeline import Pipeline, Stage
+from src.rate_limit import TokenBucket
+
+
+def test_items_overlap_across_stages():
+	def slow(item):
+		time.sleep(0.1)
+		return item
+
+	pipeline = Pipeline(
+		[
+			Stage("first", slow, workers=10),
+			Stage("second", slow, workers=10),
+			Stage("third", slow, workers=10),
+		]
+	)
+	result = pipeline.run(range(10))
+
+	assert sorted(result.outputs) == list(range(10))
+	# Each item takes 0.3s, all of them together should not take much longer
+	assert result.elapsed_seconds < 0.8
+	assert result.stats["second"].processed == 10
+
+
+def test_failing_item_does_not_stop_the_others():
+	def check(item):
+		if item == 3:
+			raise ValueError("bad item")
+		return item * 2
+
+	result = Pipeline(
+		[Stage("check", check, workers=2), Stage("pass", lambda x: x)]
+	).run(range(6))
+
+	assert sorted(result.outputs) == [0, 2, 4, 8, 10]
+	assert len(result.failures) == 1
+	assert result.failures[0].stage == "check"
+	assert result.failures[0].item == 3
+	assert isinstance(result.failures[0].error, ValueError)
+	assert result.stats["check"].failed == 1
+	assert result.metrics()["stages"]["check"]["processed"] == 5
+
+
+def test_fan_out_sends_each_element_downstream():
+	result = Pipeline(
+		[
+			Stage("split", lambda n: [n] * n, fan_out=True),
+			Stage("square", lambda n: n * n, workers=3),
+		]
+	).run([1, 2, 3])
+
+	assert sorted(result.outputs) == [1, 4, 4, 9, 9, 9]
+	assert result.stats["split"].emitted == 6
+	assert result.stats["square"].processed == 6
+
+
+def test_bounded_queue_holds_back_producer():
+	in_flight = 0
+	peak = 0
+	lock = threading.Lock()
+
+	def produce(item):
+		nonlocal in_flight, peak
+		with lock:
+			in_flight += 1
+			peak = max(peak, in_flight)
+		return item
+
+	def consume(item):
+		nonlocal in_flight
+		time.sleep(0.01)
+		with lock:
+			in_flight -= 1
+		return item
+
+	result = Pipeline(
+		[
+			Stage("produce", produce, workers=4),
+			Stage("consume", consume, queue_size=2),
+		]
+	).run(range(30))
+
+	assert len(result.outputs) == 30
+	# Queue of 2, one item being consumed and one blocked put per producer
+	assert peak <= 2 + 1 + 4
+
+
+def test_stage_limiter_paces_items():
+	limiter = TokenBucket(rate=20.0, capacity=1.0)
+	result = Pipeline([Stage("limited", lambda x: x, workers=4, limiter=limiter)]).run(
+		range(6)
+	)
+
+	assert len(result.outputs) == 6
+	assert result.elapsed_seconds >= 0.2
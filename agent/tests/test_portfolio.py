@@ -0,0 +1,66 @@
+import pytest
+
+from src.portfolio import Holdings, PortfolioEngine
+
+
+def wallet(address, eth, tokens):
+	return {
+		"wallet_address": address,
+		"eth_balance": eth,
+		"tokens": {
+			addr: {"symbol": symbol, "balance": balance}
+			for addr, (symbol, balance) in tokens.items()
+		},
+	}
+
+
+WALLETS = [
+	wallet("0xa", 1.0, {"0xUSDT": ("USDT", 100.0), "0xLINK": ("LINK", 10.0)}),
+	# Same token, different address case
+	wallet("0xb", 0.0, {"0xusdt": ("USDT", 50.0), "0xNOPE": ("NOPE", 1e9)}),
+	wallet("0xc", 0.0, {}),
+]
+
+
+def test_many_wallets_are_priced_with_one_lookup():
+	lookups = []
+
+	def get_prices(tokens):
+		lookups.append(tokens)
+		return {"0xUSDT": 1.0, "0xLINK": 20.0}
+
+	engine = PortfolioEngine(lambda: 2000.0, get_prices)
+	valuations = engine.value(WALLETS)
+
+	assert len(lookups) == 1
+	assert sorted(lookups[0]) == [
+		("0xLINK", "LINK"),
+		("0xNOPE", "NOPE"),
+		("0xUSDT", "USDT"),
+	]
+	assert [v.total_value_usd for v in valuations] == [2300.0, 50.0, 0.0]
+	assert [v.change_24h_usd for v in valuations] == [0.0, 0.0, 0.0]
+
+
+def test_24h_change_is_computed_per_wallet():
+	engine = PortfolioEngine(
+		lambda: 2000.0,
+		lambda tokens: {"0xUSDT": 1.0, "0xLINK": 20.0},
+		lambda symbols: {"ETH": 100.0, "LINK": -50.0, "USDT": 0.0},
+	)
+
+	a, b, c = engine.value(WALLETS)
+
+	# ETH doubled from 1000 and LINK halved from 40: 1000 + 100 + 400 a day ago
+	assert a.change_24h_usd == pytest.approx(2300.0 - 1500.0)
+	assert a.change_24h_pct == pytest.approx(800.0 / 1500.0 * 100)
+	assert b.change_24h_pct == 0.0
+	assert c.change_24h_pct == 0.0
+
+
+def test_holdings_arrays_are_flat_and_deduplicated():
+	holdings = Holdings.from_wallet_stats(WALLETS)
+
+	assert [symbol for _, symbol in holdings.assets] == ["ETH", "USDT", "LINK", "NOPE"]
+	assert holdings.wallet_index.tolist() == [0, 0, 0, 1, 1, 1, 2]
+	assert holdings.asset_index.tolist() == [0, 1, 2, 0, 1, 3, 0]
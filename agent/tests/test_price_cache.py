@@ -0,0 +1,89 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "wallet.db"))
+
+import pytest
+
+import src.wallet as wallet
+from src.db import SQLiteDB
+from src.price_cache import PriceCache
+
+
+class SlowLoader:
+	def __init__(self, value=1.0, delay=0.2):
+		self.value = value
+		self.delay = delay
+		self.calls = 0
+		self.lock = threading.Lock()
+
+	def __call__(self):
+		with self.lock:
+			self.calls += 1
+		time.sleep(self.delay)
+		return self.value, 0.0
+
+
+def test_concurrent_misses_share_one_load():
+	cache = PriceCache(ttl=60, stale_ttl=60)
+	load = SlowLoader(value=42.0)
+
+	with ThreadPoolExecutor(max_workers=16) as pool:
+		results = list(pool.map(lambda _: cache.get("ETH", load), range(16)))
+
+	assert results == [42.0] * 16
+	assert load.calls == 1
+
+
+def test_stale_value_is_served_while_refreshing():
+	cache = PriceCache(ttl=1, stale_ttl=60)
+	cache.put("ETH", 1.0, age=5)
+	load = SlowLoader(value=2.0, delay=0.3)
+
+	started = time.monotonic()
+	assert cache.get("ETH", load) == 1.0
+	assert cache.get("ETH", load) == 1.0
+	assert time.monotonic() - started < 0.2
+
+	time.sleep(0.5)
+	assert load.calls == 1
+	assert cache.get_fresh("ETH") == 2.0
+
+
+def test_expired_value_blocks_on_load_and_errors_propagate():
+	cache = PriceCache(ttl=1, stale_ttl=1)
+	cache.put("ETH", 1.0, age=5)
+
+	assert cache.get("ETH", SlowLoader(value=3.0, delay=0)) == 3.0
+
+	def failing():
+		raise RuntimeError("providers down")
+
+	with pytest.raises(RuntimeError):
+		cache.get("BTC", failing)
+	# A failed load is not cached, the next caller tries again
+	assert cache.get("BTC", SlowLoader(value=4.0, delay=0)) == 4.0
+
+
+def test_price_provider_memory_tier_skips_sqlite(monkeypatch, tmp_path):
+	db = SQLiteDB(str(tmp_path / "prices.db"))
+	monkeypatch.setattr(wallet, "DB", db)
+	db.insert_token_price("0xeth", "ETH", 2000.0, "test")
+
+	reads = []
+	original = db.get_token_price
+
+	def counting_get_token_price(*args, **kwargs):
+		reads.append(kwargs)
+		return original(*args, **kwargs)
+
+	monkeypatch.setattr(db, "get_token_price", counting_get_token_price)
+	provider = wallet.PriceProvider()
+
+	for _ in range(50):
+		assert provider.get_eth_price() == 2000.0
+
+	assert len(reads) == 1
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "wallet.db"))
+
+import src.wallet as wallet
+from src.db import SQLiteDB
+from src.price_feed import (
+	BinanceBookTickerSource,
+	PriceFeed,
+	PriceTable,
+	ReplaySource,
+	Tick,
+	write_ticks,
+)
+
+
+def test_replay_fills_price_table(tmp_path):
+	path = str(tmp_path / "ticks.jsonl")
+	write_ticks(
+		path,
+		[
+			Tick("ETH", 1999.0, 2001.0, 1.0),
+			Tick("LINK", 9.9, 10.1, 1.5),
+			Tick("ETH", 2099.0, 2101.0, 2.0),
+		],
+	)
+
+	feed = PriceFeed(ReplaySource(path)).start()
+	feed.join(5)
+
+	assert not feed.running
+	assert feed.stats.ticks == 3
+	assert feed.table.get("ETH") == 2100.0
+	assert feed.table.get("link", max_age=60) == 10.0
+	assert feed.table.get("BTC") is None
+
+
+def test_feed_reconnects_after_source_errors():
+	class FlakySource:
+		def __init__(self):
+			self.opened = 0
+
+		async def __aiter__(self):
+			self.opened += 1
+			yield Tick("ETH", 1.0, 3.0, time.time())
+			if self.opened < 3:
+				raise ConnectionError("stream dropped")
+
+	source = FlakySource()
+	with PriceFeed(source, reconnect_delay=0.01) as feed:
+		feed.join(5)
+
+	assert source.opened == 3
+	assert feed.stats.errors == 2
+	assert feed.table.get("ETH") == 2.0
+
+
+def test_looping_replay_can_be_stopped(tmp_path):
+	path = str(tmp_path / "ticks.jsonl")
+	write_ticks(path, [Tick("ETH", 1.0, 1.0, 0.0)])
+
+	feed = PriceFeed(ReplaySource(path, loop=True)).start()
+	assert feed.table.wait_for(["ETH"], timeout=5)
+	feed.stop()
+
+	assert not feed.running
+
+
+def test_binance_book_ticker_messages_are_parsed():
+	message = json.dumps(
+		{
+			"stream": "ethusdt@bookTicker",
+			"data": {"s": "ETHUSDT", "b": "2000.5", "B": "1", "a": "2001.5", "A": "2"},
+		}
+	)
+
+	tick = BinanceBookTickerSource.parse(message)
+
+	assert (tick.symbol, tick.mid) == ("ETH", 2001.0)
+	assert (
+		BinanceBookTickerSource(["eth", "link"])
+		.stream_url()
+		.endswith("?streams=ethusdt@bookTicker/linkusdt@bookTicker")
+	)
+
+
+def test_wallet_prices_come_from_the_feed_table(monkeypatch, tmp_path):
+	monkeypatch.setattr(wallet, "DB", SQLiteDB(str(tmp_path / "prices.db")))
+
+	def no_network(*args, **kwargs):
+		raise AssertionError("price providers should not be called")
+
+	monkeypatch.setattr(wallet.requests, "get", no_network)
+	table = PriceTable()
+	table.update(Tick("ETH", 2000.0, 2002.0, time.time()))
+	table.update(Tick("LINK", 10.0, 10.0, time.time()))
+	wallet.use_price_table(table)
+	try:
+		assert wallet.get_eth_price_v2() == 2001.0
+		assert wallet.get_token_prices_v2(["0xlink"], ["LINK"]) == {"0xlink": 10.0}
+	finally:
+		wallet.use_price_table(None)
@@ -0,0 +1,189 @@
+from dataclasses import replace
+from datetime import datetime
+from types import SimpleNamespace
+
+from src.datatypes.affiliate_promoter import ProductData, PublishingResult
+from src.db import SQLiteDB
+from src.product_catalogue import (
+	ProductCatalogue,
+	ProductChange,
+	catalogue_key,
+	product_id,
+)
+from src.publisher import (
+	MultiPlatformPublisher,
+	PostItem,
+	PublishError,
+	publishing_platforms,
+)
+from tests.mock_social import MockSocialServer
+
+
+def product(item_id, price, source="ebay"):
+	url = (
+		f"https://www.ebay.com/itm/{item_id}?mkcid=1&campid=abc"
+		if source == "ebay"
+		else f"https://www.aliexpress.com/item/{item_id}.html?aff=x"
+	)
+	return ProductData(
+		title=f"Item {item_id}",
+		price=price,
+		url=url,
+		image=None,
+		affiliate_link=url,
+		source=source,
+	)
+
+
+def test_product_id_comes_from_the_listing_url():
+	assert product_id(product("1234567890", 10)) == "1234567890"
+	assert product_id(product("9876543210", 10, source="aliexpress")) == "9876543210"
+	# Without a listing id the URL is hashed, ignoring tracking parameters
+	a = ProductData("A", 1.0, "https://shop.example/a?ref=1", None, None, "shop")
+	b = ProductData("A", 1.0, "https://shop.example/a?ref=2", None, None, "shop")
+	assert product_id(a) == product_id(b)
+
+
+def test_only_new_and_cheaper_products_go_downstream(tmp_path):
+	catalogue = ProductCatalogue(SQLiteDB(str(tmp_path / "catalogue.db")))
+	first = [product("1000001", 100.0), product("2000002", 50.0, source="aliexpress")]
+
+	changes = catalogue.classify(first)
+	assert [c.change for c in changes] == [ProductChange.NEW, ProductChange.NEW]
+	# Only the first was promoted, so the second is still new next cycle
+	catalogue.mark_promoted(first[:1])
+
+	second = [
+		product("1000001", 100.0),
+		product("2000002", 50.0, source="aliexpress"),
+		product("3000003", 20.0),
+	]
+	changed = catalogue.changed(second)
+	assert [c.product.url for c in changed] == [second[1].url, second[2].url]
+
+	catalogue.mark_promoted(second)
+	third = [
+		product("1000001", 89.0),
+		product("2000002", 49.9, source="aliexpress"),  # within the 1% threshold
+		product("3000003", 25.0),
+	]
+	changes = catalogue.classify(third)
+	assert [c.change for c in changes] == [
+		ProductChange.PRICE_DROPPED,
+		ProductChange.UNCHANGED,
+		ProductChange.UNCHANGED,
+	]
+	assert changes[0].previous_price == 100.0
+
+
+def test_products_with_no_successful_post_stay_new(tmp_path):
+	catalogue = ProductCatalogue(SQLiteDB(str(tmp_path / "catalogue.db")))
+	rejected, posted = product("1000001", 100.0), product("2000002", 50.0)
+	catalogue.classify([rejected, posted])
+
+	def result(p, platform, status):
+		return PublishingResult(
+			platform=platform,
+			url=None,
+			status=status,
+			timestamp=datetime.now(),
+			content_id=catalogue_key(p),
+		)
+
+	promoted = catalogue.mark_published(
+		[rejected, posted],
+		[
+			result(rejected, "devto", "error"),
+			result(rejected, "twitter", "error"),
+			result(posted, "devto", "error"),
+			result(posted, "twitter", "success"),
+		],
+	)
+
+	assert promoted == [posted]
+	changes = catalogue.classify([rejected, posted])
+	assert [c.change for c in changes] == [ProductChange.NEW, ProductChange.UNCHANGED]
+
+
+def test_products_every_real_platform_rejected_stay_new(tmp_path):
+	catalogue = ProductCatalogue(SQLiteDB(str(tmp_path / "catalogue.db")))
+	watch = product("1000001", 100.0)
+	catalogue.classify([watch])
+
+	def rejected(*args, **kwargs):
+		raise PublishError("HTTP 403: forbidden")
+
+	with MockSocialServer() as server:
+		# Every HTTP platform posts to an endpoint that answers 404
+		platforms = publishing_platforms(
+			twitter=SimpleNamespace(
+				write_count=0,
+				can_post=lambda: True,
+				client=SimpleNamespace(create_tweet=rejected),
+			),
+			devto=SimpleNamespace(base_url=server.url("/gone/devto"), api_key="key"),
+			hashnode=SimpleNamespace(
+				base_url=server.url("/gone/hashnode"),
+				api_key="token",
+				publication_id=None,
+			),
+			blogger=SimpleNamespace(
+				blog_id="1",
+				service=SimpleNamespace(
+					posts=lambda: SimpleNamespace(
+						insert=lambda **kwargs: SimpleNamespace(execute=rejected)
+					)
+				),
+			),
+			linkedin=SimpleNamespace(
+				base_url=server.url("/gone/linkedin"),
+				access_token="token",
+				author_urn="urn:li:person:bot",
+			),
+			youtube=SimpleNamespace(upload_video=lambda **kwargs: None),
+			site_script=str(tmp_path / "publish_post.py"),
+		)
+		items = [
+			PostItem(
+				title=watch.title,
+				content_type=content_type,
+				text="Buy here",
+				body="# Review",
+				video_path="watch.mp4" if content_type == "video" else None,
+				content_id=catalogue_key(watch),
+			)
+			for content_type in ("blog", "video")
+		]
+		with MultiPlatformPublisher(
+			[replace(p, limiter=None) for p in platforms], base_delay=0.01
+		) as publisher:
+			results = publisher.publish(items)
+
+	assert {r.platform for r in results} == {
+		"twitter",
+		"devto",
+		"hashnode",
+		"blogger",
+		"linkedin",
+		"site",
+		"facebook",
+		"youtube",
+	}
+	assert all(r.status == "error" for r in results)
+	assert catalogue.mark_published([watch], results) == []
+	assert catalogue.classify([watch])[0].change == ProductChange.NEW
+
+
+def test_catalogue_keeps_first_sighting_and_latest_price(tmp_path):
+	db = SQLiteDB(str(tmp_path / "catalogue.db"))
+	catalogue = ProductCatalogue(db)
+	catalogue.classify([product("1000001", 100.0)])
+	first_seen = db.get_catalogue_products([("ebay", "1000001")])[
+		("ebay", "1000001")
+	].first_seen_at
+
+	catalogue.classify([product("1000001", 80.0)])
+	entry = db.get_catalogue_products([("ebay", "1000001"), ("ebay", "missing")])
+	assert list(entry) == [("ebay", "1000001")]
+	assert entry[("ebay", "1000001")].price == 80.0
+	assert entry[("ebay", "1000001")].first_seen_at == first_seen
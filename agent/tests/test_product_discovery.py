@@ -0,0 +1,171 @@
+import threading
+import time
+
+from src.datatypes.affiliate_promoter import ProductData
+from src.product_discovery import (
+	ListingIndex,
+	Marketplace,
+	ProductDiscovery,
+	title_fingerprint,
+)
+
+
+def product(title, price, source="ebay", image=None, rating=None, reviews=None):
+	return ProductData(
+		title=title,
+		price=price,
+		url=f"https://{source}.example/{title.replace(' ', '-')}",
+		image=image,
+		affiliate_link=None,
+		source=source,
+		rating=rating,
+		reviews=reviews,
+	)
+
+
+class FakeMarketplace:
+	def __init__(self, source, catalogue, delay=0.0, fail_on=()):
+		self.source = source
+		self.catalogue = catalogue
+		self.delay = delay
+		self.fail_on = set(fail_on)
+		self.calls = []
+		self.lock = threading.Lock()
+
+	def __call__(self, query, limit, page):
+		with self.lock:
+			self.calls.append((query, page))
+		time.sleep(self.delay)
+		if query in self.fail_on:
+			raise ConnectionError(f"{self.source} is down")
+		matches = [p for p in self.catalogue if query in p.title.lower()]
+		return matches[(page - 1) * limit : page * limit]
+
+
+def test_near_identical_listings_are_merged():
+	index = ListingIndex()
+	assert index.add(product("Xiaomi Redmi Note 12 128GB", 199.99))
+	# Same words in another order with filler, price within tolerance
+	assert not index.add(
+		product(
+			"NEW 128GB Redmi Note 12 Xiaomi",
+			203.0,
+			source="aliexpress",
+			rating=5,
+			reviews=90,
+		)
+	)
+	# Shared image URL, different title
+	assert index.add(
+		product("Smart Watch", 29.99, image="https://img.example/w.jpg?s=1")
+	)
+	assert not index.add(
+		product("Fitness band", 31.0, image="https://IMG.example/w.jpg")
+	)
+	# Same title, clearly different price
+	assert index.add(product("Xiaomi Redmi Note 12 128GB", 149.0))
+
+	assert len(index.listings) == 3
+	# The better rated duplicate is the one kept
+	assert index.top(1)[0].source == "aliexpress"
+	assert title_fingerprint("The New Watch, for Men!") == "men watch"
+
+
+def test_searches_fan_out_paginate_and_rank():
+	ebay = FakeMarketplace(
+		"ebay",
+		[
+			product(f"laptop model {i}", 500 + i * 10, rating=4, reviews=i)
+			for i in range(5)
+		],
+	)
+	ali = FakeMarketplace(
+		"aliexpress",
+		[
+			product(
+				f"smartwatch {i}", 20 + i * 5, source="aliexpress", rating=5, reviews=i
+			)
+			for i in range(3)
+		],
+		fail_on={"laptop"},
+	)
+	discovery = ProductDiscovery(
+		[
+			Marketplace("ebay", ebay, page_size=2, max_pages=5, rate_limit=1000),
+			Marketplace("aliexpress", ali, page_size=2, max_pages=5, rate_limit=1000),
+		]
+	)
+	top = discovery.discover(["laptop", "smartwatch"], k=3)
+
+	# eBay laptops take three pages, the last one short
+	assert sorted(page for query, page in ebay.calls if query == "laptop") == [1, 2, 3]
+	assert discovery.stats.failed_requests == 1
+	assert discovery.stats.listings == 8
+	# Each marketplace's best by rating weighted by review count, in turn:
+	# 4 * log(5) and 5 * log(3), then 4 * log(4)
+	assert [p.title for p in top] == [
+		"laptop model 4",
+		"smartwatch 2",
+		"laptop model 3",
+	]
+
+
+def test_stream_yields_fast_results_before_slow_sources_finish():
+	fast = FakeMarketplace("ebay", [product("laptop fast", 100, rating=3, reviews=5)])
+	slow = FakeMarketplace(
+		"aliexpress",
+		[product("laptop slow", 90, source="aliexpress", rating=5, reviews=50)],
+		delay=0.5,
+	)
+	discovery = ProductDiscovery(
+		[
+			Marketplace("ebay", fast, rate_limit=1000),
+			Marketplace("aliexpress", slow, rate_limit=1000),
+		]
+	)
+
+	started = time.monotonic()
+	stream = discovery.stream(["laptop"], k=2)
+	first = next(stream)
+	assert time.monotonic() - started < 0.4
+	assert [p.title for p in first] == ["laptop fast"]
+
+	last = first
+	for last in stream:
+		pass
+	assert [p.title for p in last] == ["laptop slow", "laptop fast"]
+
+
+def test_marketplaces_filling_more_fields_do_not_crowd_out_the_others():
+	index = ListingIndex()
+	# As the clients build them: no ratings, eBay adds seller and shipping
+	for i in range(40):
+		index.add(
+			ProductData(
+				title=f"ebay watch {i}",
+				price=30 + i,
+				url=f"https://www.ebay.com/itm/{i}",
+				image=f"https://i.ebayimg.com/{i}.jpg",
+				affiliate_link=f"https://www.ebay.com/itm/{i}?campid=1",
+				source="ebay",
+				seller_trust=f"seller{i} (99.1%, 1500 reviews)",
+				shipping_info="Shipping: 0.00 USD",
+			)
+		)
+	for i in range(10):
+		index.add(
+			ProductData(
+				title=f"aliexpress band {i}",
+				price=10 + i,
+				url=f"https://www.aliexpress.com/item/{i}.html",
+				image=f"https://ae01.alicdn.com/{i}.jpg",
+				affiliate_link=f"https://s.click.aliexpress.com/{i}?tracking_id=1",
+				source="aliexpress",
+			)
+		)
+
+	top = index.top(6)
+
+	assert [p.source for p in top] == ["ebay", "aliexpress"] * 3
+	# Ties keep arrival order within a marketplace
+	assert [p.title for p in top[1::2]] == [f"aliexpress band {i}" for i in range(3)]
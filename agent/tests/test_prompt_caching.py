@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from src.client.openrouter import OpenRouter
+from src.config import OpenRouterConfig
+from src.genner.Claude import ClaudeGenner
+from src.genner.OR import OpenRouterGenner
+from src.my_types import ChatHistory, Message, TokenUsage
+
+CH = ChatHistory(
+	[
+		Message(role="system", content="system prompt"),
+		Message(role="user", content="research"),
+		Message(role="assistant", content="research code"),
+		Message(role="user", content="strategy"),
+	]
+)
+
+
+def make_or_genner(model: str, **config) -> OpenRouterGenner:
+	return OpenRouterGenner(
+		OpenRouter(api_key="test"),
+		OpenRouterConfig(name=model, model=model, **config),
+		None,
+	)
+
+
+def test_explicit_cache_models_get_breakpoints():
+	native = make_or_genner("anthropic/claude-3.5-sonnet")._prepare_messages(CH)
+
+	assert native[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+	assert native[2]["content"][0]["text"] == "research code"
+	assert native[2]["content"][0]["cache_control"] == {"type": "ephemeral"}
+	assert native[1]["content"] == "research"
+	assert native[3]["content"] == "strategy"
+
+
+def test_implicit_cache_models_are_sent_as_is():
+	assert (
+		make_or_genner("deepseek/deepseek-r1")._prepare_messages(CH) == CH.as_native()
+	)
+
+
+def test_uncached_models_trim_older_turns():
+	genner = make_or_genner("qwen/qwq-32b", max_history_messages=2)
+	native = genner._prepare_messages(CH)
+
+	# The window is advanced so it starts on a user message
+	assert [m["content"] for m in native] == ["system prompt", "strategy"]
+
+
+def test_token_usage_from_openai():
+	usage = TokenUsage.from_openai(
+		{
+			"prompt_tokens": 1200,
+			"completion_tokens": 30,
+			"prompt_tokens_details": {"cached_tokens": 1000},
+		}
+	)
+
+	assert usage == TokenUsage(1200, 1000, 0, 30)
+	assert usage.uncached_input_tokens == 200
+	assert TokenUsage.from_openai(None) is None
+
+
+def test_claude_usage_counts_cache_reads_as_input():
+	usage = ClaudeGenner._to_token_usage(
+		SimpleNamespace(
+			input_tokens=50,
+			cache_read_input_tokens=1000,
+			cache_creation_input_tokens=0,
+			output_tokens=20,
+		)
+	)
+
+	assert usage.input_tokens == 1050
+	assert usage.uncached_input_tokens == 50
@@ -0,0 +1,101 @@
+import os
+import tempfile
+from collections import Counter
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "wallet.db"))
+
+import requests
+
+import src.provider_health as provider_health
+import src.wallet as wallet
+from src.db import SQLiteDB
+from src.provider_health import ProviderHealth
+
+
+class FakeResponse:
+	def __init__(self, data, status_code=200):
+		self.data = data
+		self.status_code = status_code
+
+	def json(self):
+		return self.data
+
+	def raise_for_status(self):
+		pass
+
+
+def test_order_prefers_healthy_fast_providers():
+	health = ProviderHealth()
+	health.record("slow", True, 2.0)
+	health.record("flaky", False, 0.1)
+	health.record("flaky", False, 0.1)
+	health.record("fast", True, 0.1)
+
+	assert health.order(["slow", "flaky", "fast", "new"]) == [
+		"fast",
+		"new",
+		"slow",
+		"flaky",
+	]
+
+
+def test_circuit_opens_and_half_opens_after_cooldown(monkeypatch):
+	now = [1000.0]
+	monkeypatch.setattr(provider_health.time, "time", lambda: now[0])
+	health = ProviderHealth(failure_threshold=3, cooldown=60)
+
+	for _ in range(3):
+		health.record("binance", False, 10.0)
+	assert health.order(["binance", "kraken"]) == ["kraken"]
+
+	now[0] += 61
+	assert health.is_available("binance")
+	health.record("binance", False, 10.0)
+	assert not health.is_available("binance")
+
+	now[0] += 61
+	health.record("binance", True, 0.1)
+	assert health.is_available("binance")
+	assert health.snapshot()[0].consecutive_failures == 0
+
+
+def test_health_is_persisted_across_restarts(monkeypatch, tmp_path):
+	db = SQLiteDB(str(tmp_path / "health.db"))
+	monkeypatch.setattr(wallet, "DB", db)
+
+	first = wallet.PriceProvider()
+	for _ in range(3):
+		first._health.record("binance", False, 10.0)
+
+	second = wallet.PriceProvider()
+	assert not second._health.is_available("binance")
+	assert [p["name"] for p in second._ordered_providers()] == [
+		"kraken",
+		"huobi",
+		"coingecko",
+	]
+
+
+def test_geo_blocked_provider_is_skipped_once_circuit_opens(monkeypatch, tmp_path):
+	monkeypatch.setattr(wallet, "DB", SQLiteDB(str(tmp_path / "prices.db")))
+	monkeypatch.setattr(wallet.time, "sleep", lambda _: None)
+	calls = Counter()
+
+	def fake_get(url, params=None, **kwargs):
+		if "binance" in url:
+			calls["binance"] += 1
+			raise requests.ConnectionError("connection refused")
+		calls["kraken"] += 1
+		return FakeResponse({"result": {"XETHZUSD": {"c": ["2000.0"]}}})
+
+	monkeypatch.setattr(wallet.requests, "get", fake_get)
+	provider = wallet.PriceProvider()
+
+	assert provider._load_eth_price(max_retries=3) == (2000.0, 0.0)
+	assert calls["binance"] == 3
+
+	# A fresh price table, so the next load has to ask the providers again
+	monkeypatch.setattr(wallet, "DB", SQLiteDB(str(tmp_path / "empty.db")))
+	provider._load_eth_price(max_retries=3)
+	assert calls["binance"] == 3
+	assert calls["kraken"] == 2
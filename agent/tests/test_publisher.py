@@ -0,0 +1,271 @@
+import threading
+import time
+from dataclasses import replace
+from email.utils import formatdate
+from types import SimpleNamespace
+
+from src.publisher import (
+	MultiPlatformPublisher,
+	Platform,
+	PostItem,
+	PublishError,
+	blogger_platform,
+	devto_platform,
+	facebook_platform,
+	hashnode_platform,
+	linkedin_platform,
+	retry_after_seconds,
+	site_platform,
+	twitter_platform,
+	unconfigured_platform,
+)
+from src.rate_limit import TokenBucket
+from tests.mock_social import MockSocialServer
+
+
+def http_platforms(server: MockSocialServer):
+	platforms = [
+		devto_platform(
+			SimpleNamespace(base_url=server.url("/devto/api/articles"), api_key="key")
+		),
+		hashnode_platform(
+			SimpleNamespace(
+				base_url=server.url("/hashnode/"), api_key="token", publication_id=None
+			)
+		),
+		linkedin_platform(
+			SimpleNamespace(
+				base_url=server.url("/linkedin/v2/ugcPosts"),
+				access_token="token",
+				author_urn="urn:li:person:bot",
+			)
+		),
+		facebook_platform("page", "token", base_url=server.url("/facebook")),
+	]
+	# Tests run faster than the real quotas allow
+	return [replace(p, limiter=TokenBucket(rate=100, capacity=100)) for p in platforms]
+
+
+def blog_post(i: int) -> PostItem:
+	return PostItem(
+		title=f"Smart watch review {i}",
+		content_type="blog",
+		text=f"Smart watch {i}, buy here",
+		body="# Review",
+		link=f"https://example.com/item/{i}",
+		tags=["review"],
+		content_id=str(i),
+	)
+
+
+def test_posts_go_to_every_platform_at_once_over_pooled_sessions():
+	with MockSocialServer(latency_seconds=0.05) as server:
+		with MultiPlatformPublisher(http_platforms(server), max_workers=8) as publisher:
+			started = time.monotonic()
+			results = publisher.publish([blog_post(i) for i in range(5)])
+			elapsed = time.monotonic() - started
+			opened = server.stats.connections
+			for i in range(5, 8):
+				publisher.publish_item(blog_post(i))
+
+	assert [(r.platform, r.content_id) for r in results[:4]] == [
+		("devto", "0"),
+		("hashnode", "0"),
+		("linkedin", "0"),
+		("facebook", "0"),
+	]
+	assert all(r.status == "success" and r.error is None for r in results)
+	assert {r.url for r in results if r.platform == "linkedin"} == {
+		f"https://www.linkedin.com/feed/update/urn:li:share:{n}" for n in range(1, 6)
+	}
+	assert {p["article"]["canonical_url"] for p in server.stats.posts["devto"]} == {
+		f"https://example.com/item/{i}" for i in range(8)
+	}
+	# 20 posts of 50ms each, in well under the 1s they take one by one
+	assert elapsed < 0.6
+	assert server.stats.max_concurrent > 4
+	# Later posts reuse the pooled keep-alive connections instead of opening more
+	assert server.stats.connections == opened
+
+
+def test_retries_honour_the_wait_the_platform_asks_for():
+	with MockSocialServer(
+		throttle={"devto": 2}, retry_after="0.3", failures={"facebook": 1}
+	) as server:
+		with MultiPlatformPublisher(
+			http_platforms(server), base_delay=0.01
+		) as publisher:
+			started = time.monotonic()
+			results = publisher.publish([blog_post(0)])
+			elapsed = time.monotonic() - started
+
+	assert all(r.status == "success" for r in results)
+	assert server.stats.requests["devto"] == 3
+	assert server.stats.requests["facebook"] == 2
+	assert publisher.stats.retries == 3
+	# Two waits of the asked-for 0.3s for devto
+	assert elapsed >= 0.6
+
+
+def test_failures_are_results_and_long_waits_give_up():
+	failed = []
+
+	def rejected(item, session):
+		raise PublishError("HTTP 403: forbidden")
+
+	def rate_limited(item, session):
+		raise PublishError("HTTP 429", retryable=True, retry_after=3600)
+
+	tweets = []
+	twitter_client = SimpleNamespace(
+		write_count=0,
+		can_post=lambda: True,
+		client=SimpleNamespace(
+			create_tweet=lambda **kwargs: (
+				tweets.append(kwargs) or SimpleNamespace(data={"id": str(len(tweets))})
+			)
+		),
+	)
+	platforms = [
+		Platform("rejecting", rejected, {"qa"}),
+		Platform("limited", rate_limited, {"qa"}),
+		replace(twitter_platform(twitter_client), limiter=None),
+	]
+	item = PostItem(title="Q&A", content_type="qa", thread=["Q: 1", "Q: 2"])
+
+	with MultiPlatformPublisher(
+		platforms, on_failure=lambda item, platform, error: failed.append(platform)
+	) as publisher:
+		results = publisher.publish([item])
+
+	assert [(r.platform, r.status) for r in results] == [
+		("rejecting", "error"),
+		("limited", "error"),
+		("twitter", "success"),
+	]
+	assert "asked to wait 3600s" in results[1].error
+	assert publisher.stats.attempts == 3
+	assert sorted(failed) == ["limited", "rejecting"]
+	# The thread replies to its first tweet
+	assert tweets == [{"text": "Q: 1"}, {"text": "Q: 2", "in_reply_to_tweet_id": "1"}]
+	assert results[2].url == "https://x.com/i/web/status/1"
+	assert twitter_client.write_count == 2
+
+
+def fake_twitter(can_post, fail_on=None, delay_seconds=0.0):
+	"""
+	A twitter client that rate limits the first attempt at the tweet `fail_on`.
+	"""
+	tweets = []
+	failed = []
+	lock = threading.Lock()
+
+	def create_tweet(**kwargs):
+		time.sleep(delay_seconds)
+		with lock:
+			if kwargs["text"] == fail_on and not failed:
+				failed.append(kwargs)
+				raise PublishError("HTTP 429", retryable=True, retry_after=0.01)
+			tweets.append(kwargs)
+			return SimpleNamespace(data={"id": str(len(tweets))})
+
+	client = SimpleNamespace(
+		write_count=0, client=SimpleNamespace(create_tweet=create_tweet)
+	)
+	client.can_post = lambda: can_post(client)
+	return client, tweets
+
+
+def test_threads_resume_from_the_failed_tweet():
+	client, tweets = fake_twitter(lambda c: True, fail_on="Q: 2")
+	platform = replace(twitter_platform(client), limiter=None)
+	item = PostItem(title="Q&A", content_type="qa", thread=["Q: 1", "Q: 2", "Q: 3"])
+
+	with MultiPlatformPublisher([platform], base_delay=0.01) as publisher:
+		(result,) = publisher.publish([item])
+
+	assert result.status == "success"
+	assert result.url == "https://x.com/i/web/status/1"
+	# The first tweet is not posted again, the rest still reply in order
+	assert tweets == [
+		{"text": "Q: 1"},
+		{"text": "Q: 2", "in_reply_to_tweet_id": "1"},
+		{"text": "Q: 3", "in_reply_to_tweet_id": "2"},
+	]
+	assert publisher.stats.retries == 1
+	assert client.write_count == 3
+
+
+def test_concurrent_tweets_stay_within_the_monthly_budget():
+	client, tweets = fake_twitter(lambda c: c.write_count < 3, delay_seconds=0.05)
+	platform = replace(twitter_platform(client), limiter=None)
+	items = [PostItem(title=str(i), content_type="blog", text=str(i)) for i in range(8)]
+
+	with MultiPlatformPublisher([platform], max_workers=8) as publisher:
+		results = publisher.publish(items)
+
+	assert [r.status for r in results].count("success") == 3
+	assert len(tweets) == client.write_count == 3
+
+
+def test_posts_that_did_not_happen_are_not_successes(tmp_path):
+	failing_script = tmp_path / "publish_post.py"
+	failing_script.write_text("import sys\nsys.exit('git push rejected')\n")
+	platforms = [
+		site_platform(str(tmp_path / "missing.py")),
+		replace(site_platform(str(failing_script)), name="site copy"),
+		unconfigured_platform("facebook", {"blog"}),
+	]
+	failed = []
+
+	with MultiPlatformPublisher(
+		platforms, on_failure=lambda item, platform, error: failed.append(error)
+	) as publisher:
+		results = publisher.publish([blog_post(0)])
+
+	assert [r.status for r in results] == ["error"] * 3
+	assert "No site publish script" in results[0].error
+	assert "git push rejected" in results[1].error
+	assert "facebook is not configured" in results[2].error
+	assert len(failed) == 3
+	assert publisher.stats.published == 0
+
+
+def test_google_api_calls_are_made_one_at_a_time():
+	running = []
+	overlaps = []
+	lock = threading.Lock()
+
+	def execute():
+		with lock:
+			running.append(1)
+			overlaps.append(len(running))
+		time.sleep(0.05)
+		with lock:
+			running.pop()
+		return {"url": "https://blog.example/post"}
+
+	posts = SimpleNamespace(insert=lambda **kwargs: SimpleNamespace(execute=execute))
+	client = SimpleNamespace(blog_id="1", service=SimpleNamespace(posts=lambda: posts))
+	platform = replace(blogger_platform(client), limiter=None)
+
+	with MultiPlatformPublisher([platform], max_workers=4) as publisher:
+		results = publisher.publish([blog_post(i) for i in range(4)])
+
+	assert all(r.status == "success" for r in results)
+	assert max(overlaps) == 1
+
+
+def test_backoff_hints_are_read_in_every_form():
+	assert retry_after_seconds({"Retry-After": "7"}) == 7.0
+	assert (
+		8
+		<= retry_after_seconds(
+			{"retry-after": formatdate(time.time() + 10, usegmt=True)}
+		)
+		<= 10
+	)
+	assert (
+		19 <= retry_after_seconds({"x-rate-limit-reset": str(time.time() + 20)}) <= 20
+	)
+	assert retry_after_seconds({"Content-Type": "application/json"}) is None
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+from src.config import RouterConfig
+from src.genner import BackendException, get_genner
+from src.genner.Router import RouterGenner
+from src.my_types import ChatHistory, Message
+from tests.mock_genner.ScriptedMockGenner import ScriptedMockGenner
+
+CH = ChatHistory(
+	[
+		Message(role="system", content="You are a helpful assistant."),
+		Message(role="user", content="Hello, how are you?"),
+	]
+)
+
+
+def make_router(backends, **config):
+	return RouterGenner(
+		backends={g.identifier: g for g in backends},
+		config=RouterConfig(backends=[g.identifier for g in backends], **config),
+	)
+
+
+def test_routes_to_fastest_backend_after_warmup():
+	slow = ScriptedMockGenner("slow", [(0.05, "")], response="slow")
+	fast = ScriptedMockGenner("fast", [(0.0, "")], response="fast")
+	router = make_router([slow, fast], min_samples=1)
+
+	# Both backends get explored once, then the fast one is preferred
+	router.ch_completion(CH)
+	router.ch_completion(CH)
+	assert router.ranked_backends()[0] == "fast"
+	assert router.ch_completion(CH).unwrap() == "fast"
+
+
+def test_fails_over_on_error():
+	broken = ScriptedMockGenner("broken", [(0.0, "boom")])
+	healthy = ScriptedMockGenner("healthy", [(0.0, "")], response="ok")
+	router = make_router([broken, healthy])
+
+	assert router.ch_completion(CH).unwrap() == "ok"
+	assert router.stats["broken"].error_rate == 1.0
+
+
+def test_unhealthy_backend_is_deprioritised():
+	broken = ScriptedMockGenner("broken", [(0.0, "boom")])
+	healthy = ScriptedMockGenner("healthy", [(0.01, "")])
+	router = make_router([broken, healthy], min_samples=2, max_error_rate=0.5)
+
+	for _ in range(3):
+		router.ch_completion(CH)
+
+	assert not router.is_healthy("broken")
+	assert router.ranked_backends() == ["healthy", "broken"]
+
+
+def test_all_backends_failing_returns_err():
+	router = make_router(
+		[
+			ScriptedMockGenner("a", [(0.0, "down")]),
+			ScriptedMockGenner("b", [(0.0, "down")]),
+		]
+	)
+
+	result = router.ch_completion(CH)
+	assert result.is_err()
+	assert "a: down" in result.unwrap_err() and "b: down" in result.unwrap_err()
+
+
+def test_hedged_request_wins_when_primary_stalls():
+	# Primary is fast for warmup, then stalls far beyond its p95
+	primary = ScriptedMockGenner(
+		"primary", [(0.01, "")] * 5 + [(1.0, "")], response="primary"
+	)
+	backup = ScriptedMockGenner("backup", [(0.02, "")], response="backup")
+	router = make_router(
+		[primary, backup], hedge=True, hedge_min_delay=0.0, min_samples=5
+	)
+	# Give the backup measured latency worse than the primary so it ranks second
+	for _ in range(5):
+		router.stats["backup"].record(0.5, True)
+	for _ in range(5):
+		assert router.ch_completion(CH).unwrap() == "primary"
+
+	start = time.monotonic()
+	result = router.ch_completion(CH)
+	elapsed = time.monotonic() - start
+
+	assert result.unwrap() == "backup"
+	assert elapsed < 0.5
+	assert backup.calls == 1
+
+
+def test_no_hedge_without_enough_samples():
+	primary = ScriptedMockGenner("primary", [(0.1, "")], response="primary")
+	backup = ScriptedMockGenner("backup", [(0.0, "")], response="backup")
+	router = make_router([primary, backup], hedge=True, hedge_min_delay=0.0)
+
+	assert router.ch_completion(CH).unwrap() == "primary"
+	assert backup.calls == 0
+
+
+def test_generate_code_is_routed():
+	genner = ScriptedMockGenner("mock", [(0.0, "")])
+	router = make_router([genner])
+
+	codes, _ = router.generate_code(CH).unwrap()
+	assert codes == ["print('Hello, world!')", "def add(a, b): return a + b"]
+
+
+def test_router_cannot_route_to_itself():
+	with pytest.raises(BackendException):
+		get_genner(
+			"router", None, router_config=RouterConfig(backends=["mock", "router"])
+		)
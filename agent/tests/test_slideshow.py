@@ -0,0 +1,65 @@
+from src.slideshow import (
+	SlideshowOptions,
+	canvas_size,
+	concat_list,
+	ffmpeg_command,
+	ken_burns_filter,
+)
+
+
+def test_canvas_fits_the_tallest_image_at_an_even_size():
+	assert canvas_size([(1000, 1000), (800, 1200), (1600, 900)], 720) == (720, 1080)
+	assert canvas_size([(1000, 999)], 721) == (720, 720)
+
+
+def test_still_slides_use_the_concat_demuxer():
+	frames = ["/tmp/work/frame_0000.jpg", "/tmp/work/it's.jpg"]
+	script = concat_list(frames, 2.5)
+	assert script.splitlines() == [
+		"file '/tmp/work/frame_0000.jpg'",
+		"duration 2.5",
+		"file '/tmp/work/it'\\''s.jpg'",
+		"duration 2.5",
+		"file '/tmp/work/it'\\''s.jpg'",
+	]
+
+	command = ffmpeg_command(
+		frames, (720, 720), "voice.mp3", "out.mp4", SlideshowOptions(), "list.txt"
+	)
+	assert command[command.index("-f") : command.index("-f") + 6] == [
+		"-f",
+		"concat",
+		"-safe",
+		"0",
+		"-i",
+		"list.txt",
+	]
+	assert command[command.index("-t") + 1] == "5.000"
+	assert ["-map", "0:v", "-map", "1:a"] == [
+		arg
+		for i, arg in enumerate(command)
+		if arg == "-map" or command[i - 1] == "-map"
+	]
+	assert command[-1] == "out.mp4"
+
+
+def test_ken_burns_zooms_each_image_in_one_filter_graph():
+	options = SlideshowOptions(ken_burns=True, fps=24, duration_per_image=2.5)
+	graph = ken_burns_filter(3, (720, 1080), options)
+	assert graph.count("zoompan=") == 3
+	assert ":d=60:s=720x1080:fps=24" in graph
+	assert graph.endswith("[v0][v1][v2]concat=n=3:v=1:a=0,format=yuv420p[v]")
+
+	command = ffmpeg_command(
+		["a.jpg", "b.jpg", "c.jpg"],
+		(720, 1080),
+		"voice.mp3",
+		"out.mp4",
+		options,
+		"list.txt",
+	)
+	assert "concat" not in command
+	assert command.count("-i") == 4
+	assert command[command.index("-filter_complex") + 1] == graph
+	# Audio is the input after the three images
+	assert command[command.index("3:a") - 1] == "-map"
@@ -0,0 +1,80 @@
+import re
+import threading
+from typing import List
+
+from result import Ok, Result
+
+from src.my_types import ChatHistory
+from src.summarizer import Summarizer, get_summarizer, summarize_all
+from tests.mock_genner.MockGenner import MockGenner
+
+
+class RecordingSummaryGenner(MockGenner):
+	"""
+	Answers batch prompts with one <SummaryN> per <InputN> and anything else
+	with a short summary, recording every prompt it receives.
+	"""
+
+	def __init__(self):
+		super().__init__("summary", False)
+		self.prompts: List[str] = []
+		self.lock = threading.Lock()
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		prompt = messages.messages[-1].content
+		with self.lock:
+			self.prompts.append(prompt)
+		inputs = re.findall(r"<Input(\d+)>", prompt)
+		if inputs:
+			return Ok("".join(f"<Summary{i}>summary {i}</Summary{i}>" for i in inputs))
+		return Ok(f"summary of {len(prompt)} chars")
+
+
+def test_default_template_placeholder_is_filled():
+	genner = RecordingSummaryGenner()
+
+	get_summarizer(genner)(["first point", "second point"])
+
+	assert "{to_summarize}" not in genner.prompts[0]
+	assert "• first point" in genner.prompts[0]
+
+
+def test_small_inputs_are_batched_into_one_request():
+	genner = RecordingSummaryGenner()
+	summarizer = Summarizer(genner)
+
+	summaries = summarize_all(summarizer, [["code"], ["strategy"], ["notes"]])
+
+	assert summaries == ["summary 1", "summary 2", "summary 3"]
+	assert len(genner.prompts) == 1
+
+
+def test_summaries_are_memoized_by_content():
+	genner = RecordingSummaryGenner()
+	summarizer = Summarizer(genner)
+
+	first = summarizer(["the same points"])
+	second = summarizer(["the same points"])
+
+	assert first == second
+	assert len(genner.prompts) == 1
+
+
+def test_long_inputs_are_map_reduced():
+	genner = RecordingSummaryGenner()
+	summarizer = Summarizer(genner, token_budget=100)
+	long_input = ["\n".join(f"line {i} " + "x" * 60 for i in range(40))]
+
+	summary = summarizer(long_input)
+
+	assert summary.startswith("summary of")
+	# Every map prompt fits the budget, plus one reduce over the partials
+	assert len(genner.prompts) > 2
+	assert all(len(prompt) < 100 * 4 + 200 for prompt in genner.prompts)
+
+
+def test_plain_callables_still_work_with_summarize_all():
+	assert summarize_all(lambda points: points[0].upper(), [["a"], ["b"]]) == [
+		"A",
+		"B",
+	]
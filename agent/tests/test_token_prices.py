@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "wallet.db"))
+
+import pytest
+
+import src.wallet as wallet
+from src.db import SQLiteDB
+from src.rate_limit import TokenBucket
+
+TOKENS = [(f"0x{i:040x}", f"TK{i}") for i in range(20)]
+
+
+class FakeResponse:
+	def __init__(self, data, status_code=200):
+		self.data = data
+		self.status_code = status_code
+
+	def json(self):
+		return self.data
+
+	def raise_for_status(self):
+		pass
+
+
+class FakeExchanges:
+	"""Binance knows TK0-TK14, CoinGecko knows TK15-TK18, only Kraken knows TK19."""
+
+	def __init__(self):
+		self.calls = Counter()
+
+	def __call__(self, url, params=None, **kwargs):
+		params = params or {}
+		if "binance" in url:
+			self.calls["binance" if "symbol" not in params else "binance_single"] += 1
+			return FakeResponse(
+				[{"symbol": f"TK{i}USDT", "price": str(i + 1)} for i in range(15)]
+			)
+		if "coingecko" in url:
+			self.calls["coingecko"] += 1
+			requested = params["contract_addresses"].split(",")
+			return FakeResponse(
+				{
+					addr: {"usd": 100.0}
+					for addr, symbol in TOKENS[15:19]
+					if addr in requested
+				}
+			)
+		if "kraken" in url:
+			self.calls["kraken"] += 1
+			return FakeResponse({"result": {"TK19USD": {"c": ["7.5"]}}})
+		self.calls["other"] += 1
+		return FakeResponse({}, status_code=404)
+
+
+@pytest.fixture
+def exchanges(monkeypatch, tmp_path):
+	monkeypatch.setattr(wallet, "DB", SQLiteDB(str(tmp_path / "prices.db")))
+	fake = FakeExchanges()
+	monkeypatch.setattr(wallet.requests, "get", fake)
+	return fake
+
+
+def test_prices_use_one_batch_request_per_provider(exchanges):
+	addresses, symbols = zip(*TOKENS)
+
+	prices = wallet.get_token_prices_v2(list(addresses), list(symbols))
+
+	assert len(prices) == 20
+	assert prices[TOKENS[0][0]] == 1.0
+	assert prices[TOKENS[15][0]] == 100.0
+	assert prices[TOKENS[19][0]] == 7.5
+	# Only the token neither batch knew falls back to a per-token lookup,
+	# and the providers already tried in batch are skipped for it
+	assert exchanges.calls == Counter(binance=1, coingecko=1, kraken=1)
+
+
+def test_fresh_cached_prices_skip_the_network(exchanges):
+	addresses, symbols = zip(*TOKENS[:15])
+	wallet.get_token_prices_v2(list(addresses), list(symbols))
+	exchanges.calls.clear()
+
+	prices = wallet.get_token_prices_v2(list(addresses), list(symbols))
+
+	assert len(prices) == 15
+	assert sum(exchanges.calls.values()) == 0
+
+
+def test_token_bucket_holds_the_rate():
+	bucket = TokenBucket(rate=20, capacity=2)
+	start = time.monotonic()
+
+	for _ in range(6):
+		bucket.acquire()
+
+	# The burst of 2 is free, the other 4 wait 1/20s each
+	assert time.monotonic() - start >= 0.19
+	assert not bucket.try_acquire()
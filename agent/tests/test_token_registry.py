@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "wallet.db"))
+
+import pytest
+
+import src.wallet as wallet
+from src.db import SQLiteDB
+
+WALLET = "0x" + "ab" * 20
+USDT = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+MATIC = "0x7D1AfA7B718fb893dB30A3aBc0Cfc608AaCfeBB0"
+
+
+def transfer(token: str, symbol: str, decimals: int, block: int) -> dict:
+	return {
+		"contractAddress": token.lower(),
+		"tokenSymbol": symbol,
+		"tokenName": symbol,
+		"tokenDecimal": str(decimals),
+		"blockNumber": str(block),
+	}
+
+
+class FakeEtherscan:
+	def __init__(self, txs):
+		self.txs = txs
+		self.start_blocks = []
+
+	def __call__(self, address, etherscan_key, max_retries=3, start_block=None):
+		self.start_blocks.append(start_block)
+		result = [tx for tx in self.txs if int(tx["blockNumber"]) >= start_block]
+		result = result[: wallet.ETHERSCAN_MAX_RESULTS]
+		return {"status": "1", "message": "OK", "result": result}
+
+
+@pytest.fixture
+def etherscan(monkeypatch, tmp_path):
+	monkeypatch.setattr(wallet, "DB", SQLiteDB(str(tmp_path / "registry.db")))
+	fake = FakeEtherscan(
+		[
+			transfer(USDT, "USDT", 6, 100),
+			transfer(USDT, "USDT", 6, 105),
+			transfer(MATIC, "MATIC", 18, 110),
+		]
+	)
+	monkeypatch.setattr(wallet, "get_token_transactions", fake)
+	return fake
+
+
+def test_first_sync_reads_full_history_and_dedupes(etherscan):
+	tokens = wallet.discover_wallet_tokens(WALLET, "key")
+
+	assert list(tokens) == [USDT, MATIC]
+	assert tokens[USDT].decimals == 6
+	assert tokens[MATIC].symbol == "MATIC"
+	assert etherscan.start_blocks == [0]
+	assert wallet.DB.get_wallet_last_block(WALLET) == 110
+
+
+def test_later_syncs_only_ask_for_new_blocks(etherscan):
+	wallet.discover_wallet_tokens(WALLET, "key")
+	etherscan.txs.append(transfer(USDT, "RENAMED", 2, 120))
+
+	tokens = wallet.discover_wallet_tokens(WALLET, "key")
+	wallet.discover_wallet_tokens(WALLET, "key")
+
+	assert etherscan.start_blocks == [0, 111, 121]
+	# Metadata is cached permanently, later transfers do not overwrite it
+	assert tokens[USDT].symbol == "USDT"
+	assert tokens[USDT].decimals == 6
+
+
+def test_failed_requests_keep_the_known_tokens(etherscan, monkeypatch):
+	wallet.discover_wallet_tokens(WALLET, "key")
+	monkeypatch.setattr(
+		wallet,
+		"get_token_transactions",
+		lambda *args, **kwargs: {"status": "0", "message": "down", "result": []},
+	)
+
+	tokens = wallet.discover_wallet_tokens(WALLET, "key")
+
+	assert list(tokens) == [USDT, MATIC]
+	assert wallet.DB.get_wallet_last_block(WALLET) == 110
+
+
+def test_capped_pages_are_continued(etherscan, monkeypatch):
+	monkeypatch.setattr(wallet, "ETHERSCAN_MAX_RESULTS", 2)
+
+	tokens = wallet.discover_wallet_tokens(WALLET, "key")
+
+	# Each full page may end mid-block, so its last block is read again
+	assert etherscan.start_blocks == [0, 105, 110]
+	assert list(tokens) == [USDT, MATIC]
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.tts_helper import split_script_by_voice
+from src.tts_cache import PhraseCache, strip_id3
+from tests.mock_tts import FakeTTS
+
+MALE = "en-US-Wavenet-D"
+FEMALE = "en-US-Wavenet-F"
+
+
+def test_parts_are_synthesised_concurrently_and_joined_in_order(tmp_path):
+	backend = FakeTTS(delay_seconds=0.1)
+	cache = PhraseCache(str(tmp_path / "cache"), backend=backend)
+	parts = [(MALE, "Welcome!"), (FEMALE, "Does it work?"), (MALE, "It does.")]
+
+	output = cache.render(parts, str(tmp_path / "out.mp3"), max_workers=3)
+
+	with open(output, "rb") as f:
+		assert f.read() == b"".join(FakeTTS.frames(v, t) for v, t in parts)
+	assert backend.stats.syntheses == 3
+	assert backend.stats.max_concurrent == 3
+
+
+def test_repeated_phrases_are_synthesised_once(tmp_path):
+	backend = FakeTTS(delay_seconds=0.1)
+	cache = PhraseCache(str(tmp_path / "cache"), backend=backend)
+	outro = (MALE, "SuggestoAI – Your smart product finder!")
+
+	# Two videos at once share the outro, as does a third one later
+	with ThreadPoolExecutor(max_workers=2) as pool:
+		list(
+			pool.map(
+				lambda i: cache.render(
+					[(MALE, f"Review of product {i}"), outro],
+					str(tmp_path / f"video-{i}.mp3"),
+				),
+				range(2),
+			)
+		)
+	cache.render([(MALE, "Review of product 2"), outro], str(tmp_path / "video-2.mp3"))
+
+	assert backend.stats.calls.count(outro) == 1
+	assert backend.stats.syntheses == 4
+	assert cache.stats.hits + cache.stats.joined == 2
+
+	# The same text in another voice is another phrase
+	cache.get(FEMALE, outro[1])
+	assert backend.stats.syntheses == 5
+
+
+def test_id3_tags_are_dropped_between_parts(tmp_path):
+	backend = FakeTTS(id3_tags=True)
+	cache = PhraseCache(str(tmp_path / "cache"), backend=backend)
+	parts = [(MALE, "One."), (FEMALE, "Two.")]
+
+	with open(cache.render(parts, str(tmp_path / "out.mp3")), "rb") as f:
+		audio = f.read()
+
+	assert audio.count(b"ID3") == 1
+	assert strip_id3(audio) == b"".join(FakeTTS.frames(v, t) for v, t in parts)
+
+
+def test_shared_lines_of_a_script_are_their_own_phrases(tmp_path):
+	backend = FakeTTS()
+	cache = PhraseCache(str(tmp_path / "cache"), backend=backend)
+	script = """
+[Male Voice]
+Welcome to SuggestoAI!
+Today we review the {product}.
+[Female Voice]
+Does it work?
+[Male Voice]
+It does.
+SuggestoAI – Your smart product finder!
+"""
+
+	for product in ("SmartWatch X", "Desk Lamp"):
+		parts = split_script_by_voice(script.format(product=product))
+		cache.render(parts, str(tmp_path / f"{product}.mp3"))
+
+	assert parts[:2] == [
+		(MALE, "Welcome to SuggestoAI!"),
+		(MALE, "Today we review the Desk Lamp."),
+	]
+	# Only the line naming the product is new in the second script
+	assert backend.stats.syntheses == 6
@@ -0,0 +1,128 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import src.video_batch as video_batch
+from src.media_jobs import run_render_batch_job
+from src.slideshow import SlideshowOptions
+from src.video_batch import BatchRenderer, RenderJob, SharedAsset, compose_command
+
+
+def fake_ffmpeg(calls):
+	def run(command, cwd=None):
+		calls.append(command)
+		with open(command[-1], "wb") as f:
+			f.write(b"decoded")
+
+	return run
+
+
+def test_one_pass_joins_intro_slides_narration_and_music():
+	job = RenderJob(
+		"watch",
+		["a.jpg", "b.jpg"],
+		"out/watch.mp4",
+		audio_path="narration.mp3",
+		captions_path="watch.srt",
+		music_path="bed.mp3",
+		intro_path="intro.mp4",
+	)
+	intro = SharedAsset("intro.mp4", "/cache/intro.mp4", 2.0)
+	music = SharedAsset("bed.mp3", "/cache/music.wav", 30.0)
+	options = SlideshowOptions(height=720)
+
+	command = compose_command(
+		job,
+		["/w/f0.jpg", "/w/f1.jpg"],
+		(720, 720),
+		options,
+		"/w/frames.txt",
+		intro,
+		music,
+	)
+
+	inputs = [command[i + 1] for i, arg in enumerate(command) if arg == "-i"]
+	assert inputs == [
+		"/cache/intro.mp4",
+		"/w/frames.txt",
+		os.path.abspath("narration.mp3"),
+		"/cache/music.wav",
+	]
+	graph = command[command.index("-filter_complex") + 1].split(";")
+	assert graph[1] == "[slides]subtitles=captions.srt[captioned]"
+	assert graph[2] == "[0:v][captioned]concat=n=2:v=1:a=0[video]"
+	# Narration starts after the intro, music plays under everything
+	assert graph[3].startswith("[2:a]adelay=2000:all=1")
+	assert graph[4] == "[3:a]volume=0.2[music]"
+	assert graph[5].startswith("[narration][music]amix=inputs=2")
+	assert command[command.index("-stream_loop") + 3] == "/cache/music.wav"
+	assert command[command.index("-t") + 1] == "7.000"
+	assert command[-1] == os.path.abspath("out/watch.mp4")
+
+
+def test_shared_assets_are_decoded_once_and_kept(tmp_path, monkeypatch):
+	calls = []
+	monkeypatch.setattr(video_batch, "run_ffmpeg", fake_ffmpeg(calls))
+	monkeypatch.setattr(video_batch, "media_duration", lambda path: 3.0)
+	for name in ("bed.mp3", "other.mp3", "intro.mp4"):
+		(tmp_path / name).write_bytes(name.encode())
+	jobs = [
+		RenderJob(
+			f"product {i}",
+			["a.jpg"],
+			f"{i}.mp4",
+			music_path=str(tmp_path / ("other.mp3" if i == 3 else "bed.mp3")),
+			intro_path=str(tmp_path / "intro.mp4"),
+		)
+		for i in range(4)
+	]
+	renderer = BatchRenderer(work_dir=str(tmp_path / "cache"), max_workers=2)
+
+	music, intros = renderer.prepare_shared(jobs)
+	assert len(calls) == 3
+	assert set(music) == {str(tmp_path / "bed.mp3"), str(tmp_path / "other.mp3")}
+	intro = intros[str(tmp_path / "intro.mp4")]
+	assert intro.duration == 3.0
+	# Intros are decoded at the batch frame size
+	assert any("scale=720:720" in arg for command in calls for arg in command)
+
+	# A later batch reuses what was decoded
+	assert renderer.prepare_shared(jobs) == (music, intros)
+	assert len(calls) == 3
+
+
+def test_jobs_whose_shared_assets_fail_are_reported(tmp_path):
+	renderer = BatchRenderer(work_dir=str(tmp_path / "cache"))
+	jobs = [
+		RenderJob("missing music", ["a.jpg"], "a.mp4", music_path="missing.mp3"),
+		RenderJob("missing intro", ["b.jpg"], "b.mp4", intro_path="missing.mp4"),
+	]
+
+	report = renderer.render(jobs)
+
+	assert [t.name for t in report.failed()] == ["missing music", "missing intro"]
+	assert report.timings[0].error == "Could not decode missing.mp3"
+	assert report.summary().startswith("0/2 videos")
+
+
+def test_a_broken_worker_fails_only_its_jobs(tmp_path, monkeypatch):
+	def render_job(job, *args):
+		if job.name == "oom":
+			raise BrokenProcessPool("A process in the process pool was terminated")
+		return video_batch.RenderTiming(name=job.name, output_path=job.output_path)
+
+	monkeypatch.setattr(video_batch, "ProcessPoolExecutor", ThreadPoolExecutor)
+	monkeypatch.setattr(video_batch, "render_job", render_job)
+	renderer = BatchRenderer(work_dir=str(tmp_path / "cache"), max_workers=2)
+	jobs = [RenderJob(name, ["a.jpg"], f"{name}.mp4") for name in ("a", "oom", "b")]
+
+	report = renderer.render(jobs)
+
+	assert [t.output_path for t in report.timings] == ["a.mp4", None, "b.mp4"]
+	assert report.failed()[0].error.startswith("BrokenProcessPool:")
+
+
+def test_an_empty_render_batch_succeeds(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+
+	assert run_render_batch_job({"jobs": []})["timings"] == []
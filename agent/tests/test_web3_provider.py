@@ -0,0 +1,73 @@
+from web3 import Web3
+
+from src.web3_provider import FailoverHTTPProvider, get_web3, rpc_endpoints
+from tests.mock_rpc import MockRPCServer
+
+TOKEN = Web3.to_checksum_address("0x" + "11" * 20)
+OWNER = Web3.to_checksum_address("0x" + "aa" * 20)
+# Nothing listens on port 1, connections are refused straight away
+DEAD_URL = "http://127.0.0.1:1"
+
+
+def test_fails_over_to_the_next_endpoint_and_sticks_to_it():
+	with MockRPCServer(eth_balances={OWNER: 5}) as server:
+		provider = FailoverHTTPProvider([DEAD_URL, server.url])
+		w3 = Web3(provider)
+
+		assert w3.eth.get_balance(OWNER) == 5
+		assert w3.eth.get_balance(OWNER) == 5
+		assert provider._current == 1
+
+
+def test_immutable_responses_are_cached():
+	with MockRPCServer(token_decimals={TOKEN: 6}) as server:
+		w3 = Web3(FailoverHTTPProvider([server.url]))
+		decimals = "0x313ce567"
+
+		for _ in range(5):
+			assert w3.eth.chain_id == 1
+			raw = w3.eth.call({"to": TOKEN, "data": decimals})
+			assert int.from_bytes(raw, "big") == 6
+
+		assert server.stats.eth_calls == 1
+		assert server.stats.rpc_calls == 2
+
+
+def test_only_latest_deployed_code_is_cached():
+	with MockRPCServer(token_decimals={TOKEN: 6}) as server:
+		w3 = Web3(FailoverHTTPProvider([server.url]))
+
+		for _ in range(3):
+			assert w3.eth.get_code(TOKEN) == b"\x60\x80"
+			assert w3.eth.get_code(OWNER) == b""
+			assert w3.eth.get_code(TOKEN, block_identifier=1) == b"\x60\x80"
+
+		# Cached once, the empty and historical reads go out every time
+		assert server.stats.rpc_calls == 1 + 3 + 3
+
+
+def test_batches_go_out_as_one_request():
+	with MockRPCServer(eth_balances={OWNER: 7}) as server:
+		w3 = Web3(FailoverHTTPProvider([DEAD_URL, server.url]))
+
+		with w3.batch_requests() as batch:
+			for _ in range(10):
+				batch.add(w3.eth.get_balance(OWNER))
+			results = batch.execute()
+
+		assert results == [7] * 10
+		assert server.stats.batch_requests == 1
+
+
+def test_get_web3_shares_one_instance_per_endpoint_list(monkeypatch):
+	monkeypatch.setenv("ETH_RPC_URLS", "http://a.example, http://b.example,")
+
+	endpoints = rpc_endpoints("project")
+
+	assert endpoints == [
+		"https://mainnet.infura.io/v3/project",
+		"http://a.example",
+		"http://b.example",
+	]
+	assert get_web3(endpoints) is get_web3(list(endpoints))
+	assert get_web3(endpoints) is not get_web3(endpoints[1:])